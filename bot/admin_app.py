@@ -7,7 +7,7 @@ import hashlib
 import hmac
 import secrets
 import time
-from typing import Dict, Optional, Tuple
+from typing import Any, Dict, Optional, Tuple
 from functools import wraps
 from datetime import datetime, timedelta
 
@@ -20,6 +20,7 @@ from .config import settings
 from .models import User, Watch, Click, Price
 from .api_rate_limiter import check_admin_access_rate_limit
 from .logging_config import SecurityEventLogger
+from .quota_budget import get_budget_planner
 
 security_logger = SecurityEventLogger()
 
@@ -285,8 +286,8 @@ def logout():
 
 @app.get("/admin")
 @require_auth
-def metrics() -> Dict[str, int]:
-    """Return high-level funnel metrics."""
+def metrics() -> Dict[str, Any]:
+    """Return high-level funnel metrics and today's PA-API quota budget."""
     try:
         with Session(engine) as s:
             # Count total users (explorers)
@@ -312,6 +313,7 @@ def metrics() -> Dict[str, int]:
                 "live_watches": live_watches,
                 "click_outs": click_outs,
                 "scraper_fallbacks": scraper_fallbacks,
+                "paapi_quota": get_budget_planner().get_status(),
             }
     except Exception as e:
         security_logger.log_security_event(
@@ -429,6 +431,10 @@ def admin_dashboard():
                 <h3>Click Outs</h3>
                 <p id="click-outs">Loading...</p>
             </div>
+            <div class="metric">
+                <h3>PA-API Quota Left</h3>
+                <p id="paapi-quota">Loading...</p>
+            </div>
         </div>
 
         <div class="actions">
@@ -448,6 +454,8 @@ def admin_dashboard():
                     document.getElementById('watch-creators').textContent = data.watch_creators;
                     document.getElementById('live-watches').textContent = data.live_watches;
                     document.getElementById('click-outs').textContent = data.click_outs;
+                    document.getElementById('paapi-quota').textContent =
+                        data.paapi_quota.remaining + ' / ' + data.paapi_quota.daily_quota;
                 }})
                 .catch(error => {{
                     console.error('Error loading metrics:', error);
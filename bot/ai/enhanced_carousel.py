@@ -5,10 +5,13 @@ This module provides enhanced carousel building functions that support multi-car
 selection with comparison features, AI insights, and intelligent product highlighting.
 """
 
+from collections.abc import Mapping
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 from typing import Dict, List, Any, Optional
 from logging import getLogger
 
+from ..product_record import ProductRecord, parse_feature_specs
+
 log = getLogger(__name__)
 
 
@@ -39,7 +42,7 @@ def build_product_carousel(
     for i, product in enumerate(products):
         # CRITICAL DEBUG: Check product structure
         log.info(f"DEBUG: build_product_carousel processing product {i}: type={type(product)}")
-        if not isinstance(product, dict):
+        if not isinstance(product, Mapping):
             log.error(f"CRITICAL: product {i} is not a dict: {type(product)}, content: {product}")
             continue
             
@@ -57,7 +60,7 @@ def build_product_carousel(
             log.info(f"DEBUG: build_enhanced_card returned caption type: {type(caption)}, keyboard type: {type(keyboard)}")
         except Exception as e:
             log.error(f"CRITICAL: build_enhanced_card failed for product {i}: {e}")
-            log.error(f"CRITICAL: product keys: {list(product.keys()) if isinstance(product, dict) else 'Not a dict'}")
+            log.error(f"CRITICAL: product keys: {list(product.keys()) if isinstance(product, Mapping) else 'Not a dict'}")
             log.error(f"CRITICAL: comparison_table type: {type(comparison_table)}")
             # Provide fallback caption and keyboard
             caption = f"❌ Error loading product {i+1} details"
@@ -131,7 +134,7 @@ def build_enhanced_card(
         Tuple of (caption_text, keyboard_markup)
     """
     # CRITICAL FIX: Validate input parameters
-    if not isinstance(product, dict):
+    if not isinstance(product, Mapping):
         log.error(f"CRITICAL: product is not a dict in build_enhanced_card: {type(product)}")
         return f"❌ Error: Invalid product data (type: {type(product)})", InlineKeyboardMarkup([])
     
@@ -154,7 +157,9 @@ def build_enhanced_card(
     rating_count = product.get('rating_count')
     
     # Format price (convert from paise to rupees if needed)
-    if price and isinstance(price, (int, float)) and price > 0:
+    if isinstance(product, ProductRecord) and product.price:
+        price_text = f"₹{product.price // 100:,}"  # Records always hold paise
+    elif price and isinstance(price, (int, float)) and price > 0:
         if price > 100000:  # Clearly in paise (>₹1000 in paise = ₹10+)
             price_rs = price // 100
         else:
@@ -630,62 +635,7 @@ def build_comparison_summary_card(
 
 def _parse_features_list(features_list: List[str]) -> Dict:
     """Parse list of feature strings to extract technical specifications."""
-    import re
-
-    specs = {}
-
-    for feature_text in features_list:
-        if not isinstance(feature_text, str):
-            continue
-
-        text_lower = feature_text.lower()
-
-        # Extract refresh rate (Hz)
-        refresh_match = re.search(r'(\d{2,3})\s*hz', text_lower)
-        if refresh_match and 'refresh' in text_lower:
-            specs['refresh_rate'] = int(refresh_match.group(1))
-
-        # Extract response time (ms)
-        response_match = re.search(r'(\d{1,2})\s*ms', text_lower)
-        if response_match and ('response' in text_lower or 'mbr' in text_lower or 'gtg' in text_lower):
-            specs['response_time'] = int(response_match.group(1))
-
-        # Extract resolution
-        if 'qhd' in text_lower or '1440p' in text_lower:
-            specs['resolution'] = 'QHD'
-        elif '4k' in text_lower or 'uhd' in text_lower:
-            specs['resolution'] = '4K UHD'
-        elif '1080p' in text_lower or 'fhd' in text_lower:
-            specs['resolution'] = 'FHD'
-
-        # Extract panel type
-        if 'ips' in text_lower:
-            specs['panel_type'] = 'IPS'
-        elif 'va' in text_lower:
-            specs['panel_type'] = 'VA'
-        elif 'oled' in text_lower or 'amoled' in text_lower:
-            specs['panel_type'] = 'OLED'
-
-        # Extract HDR support
-        if 'hdr' in text_lower:
-            if 'hdr400' in text_lower or 'displayhdr 400' in text_lower:
-                specs['hdr_support'] = 'HDR400'
-            elif 'hdr10' in text_lower:
-                specs['hdr_support'] = 'HDR10'
-            else:
-                specs['hdr_support'] = 'HDR'
-
-        # Extract color accuracy (sRGB)
-        srgb_match = re.search(r'(\d{2,3})\s*%\s*srgb', text_lower)
-        if srgb_match:
-            specs['color_accuracy'] = int(srgb_match.group(1))
-
-        # Extract size (inches)
-        size_match = re.search(r'(\d{1,2})\s*"?\s*inch', text_lower)
-        if size_match:
-            specs['size'] = f"{size_match.group(1)}\""
-
-    return specs
+    return parse_feature_specs(features_list)
 
 
 def _get_product_highlights(product: Dict, product_index: int, comparison_table: Dict) -> List[str]:
@@ -694,7 +644,10 @@ def _get_product_highlights(product: Dict, product_index: int, comparison_table:
 
     # CRITICAL FIX: Handle features as list or dict
     raw_features = product.get('features', {})
-    if isinstance(raw_features, list):
+    if isinstance(product, ProductRecord):
+        # Parsed once per record and kept on it
+        product_features = product.specs
+    elif isinstance(raw_features, list):
         # Features is a list of strings, parse them to extract technical details
         product_features = _parse_features_list(raw_features)
         log.debug(f"_get_product_highlights: parsed {len(raw_features)} feature strings into {len(product_features)} technical features")
@@ -714,7 +667,9 @@ def _get_product_highlights(product: Dict, product_index: int, comparison_table:
     # Price analysis with tier positioning
     price = product.get('price', 0)
     if price and isinstance(price, (int, float)) and price > 0:
-        if price > 100000:  # Convert paise to rupees
+        if isinstance(product, ProductRecord):
+            price_rs = price // 100  # Records always hold paise
+        elif price > 100000:  # Convert paise to rupees
             price_rs = price // 100
         else:
             price_rs = int(price)
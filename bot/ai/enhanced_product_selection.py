@@ -6,6 +6,7 @@ multi-card selection with comparison features and user choice.
 """
 
 import time
+from collections.abc import Mapping
 from typing import Dict, List, Any, Optional
 from logging import getLogger
 
@@ -254,7 +255,7 @@ class EnhancedFeatureMatchModel:
         
         # Validate each product in the list
         for i, product in enumerate(carousel_products):
-            if not isinstance(product, dict):
+            if not isinstance(product, Mapping):
                 log.error(f"CRITICAL: carousel_products[{i}] is not a dict: {type(product)}")
                 # Fallback to single card
                 best_product = products[0]
@@ -5,21 +5,229 @@ Based on POC results, this implementation uses a pure regex approach for optimal
 performance (0.1ms average, 92.9% success rate, 73.3% accuracy).
 
 Supports:
-- Gaming monitor features: refresh_rate, size, resolution, curvature, panel_type
+- Every category vocabulary in vocabularies.py (gaming monitors, laptops, headphones)
 - Hinglish queries and unit variants (cm→inches, Hz/FPS/hertz synonyms)
 - Marketing fluff filtering
 - Confidence scoring based on technical density
+
+Each vocabulary is compiled once per process into a ``VocabularyMatcher``,
+whose combined regexes find the first match of every pattern in a single scan
+of the query instead of one ``findall`` per pattern. Results are cached per
+normalized query, so the several extractions a watch creation makes for the
+same text cost one scan.
 """
 
 import re
 import time
-from typing import Dict, Any, Optional
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Any, List, Optional, Tuple
 from logging import getLogger
 
-from .vocabularies import get_category_vocabulary
+from .vocabularies import (
+    get_category_vocabulary,
+    get_supported_categories,
+    resolve_vocabulary_category,
+)
 
 log = getLogger(__name__)
 
+_RESULT_CACHE_SIZE = 2048  # Normalized (query, category) pairs kept
+
+
+def _pattern_syntax(pattern: str):
+    """Yield ``(index, char)`` for unescaped characters outside character classes."""
+    in_class, i = False, 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            i += 2
+            continue
+        if in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+        else:
+            yield i, char
+        i += 1
+
+
+def _strip_leading_boundary(pattern: str) -> Optional[str]:
+    """Pattern without its leading ``\\b``, if the boundary applies to the whole pattern."""
+    if not pattern.startswith(r"\b"):
+        return None
+    depth = 0
+    for _, char in _pattern_syntax(pattern):
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            return None  # top-level alternation: the boundary only guards the first branch
+    return pattern[2:]
+
+
+def _name_value_group(pattern: str, name: str, groups: int) -> str:
+    """Name the group holding the value ``findall`` returns, adding one if needed.
+
+    A pattern with a single capture group has it renamed in place; an extra
+    wrapping group per pattern would double the groups the regex engine
+    saves and restores at every branch.
+    """
+    if groups == 1:
+        for index, char in _pattern_syntax(pattern):
+            if char == "(" and not pattern.startswith("?", index + 1):
+                return f"{pattern[:index]}(?P<{name}>{pattern[index + 1:]}"
+    return f"(?P<{name}>{pattern})"
+
+
+class VocabularyMatcher:
+    """A category vocabulary compiled into combined scanning regexes.
+
+    Every pattern becomes a named alternative inside a lookahead, so one
+    ``finditer`` pass stops at each position where any pattern matches without
+    consuming the text other patterns may need. An alternation reports only
+    its first matching branch at a position, so the scan looks for further
+    matches there with the precompiled scanner of the alternatives after the
+    winner. Identical patterns used by several features ("bluetooth" is a
+    headphone type and a wireless mode) are scanned once.
+
+    Patterns that start with ``\\b`` are combined under one shared boundary,
+    so positions inside words are skipped, and the rest (numbers with units)
+    in a second scanner. Joining the two kinds in one top-level alternation
+    measured about twice as slow as the two passes.
+
+    ``scan`` gives the same values as ``pattern.findall(query)[0]`` for
+    every pattern.
+    """
+
+    def __init__(self, vocabulary: Dict[str, List[str]]):
+        self.patterns = {
+            feature: [re.compile(pattern, re.IGNORECASE) for pattern in pattern_list]
+            for feature, pattern_list in vocabulary.items()
+        }
+
+        targets: Dict[str, List[Tuple[str, int]]] = {}
+        compiled: Dict[str, "re.Pattern[str]"] = {}
+        for feature, compiled_patterns in self.patterns.items():
+            for index, pattern in enumerate(compiled_patterns):
+                targets.setdefault(pattern.pattern, []).append((feature, index))
+                compiled[pattern.pattern] = pattern
+
+        # (compiled pattern, (feature, index) targets); bounded patterns first
+        bounded = [source for source in targets if _strip_leading_boundary(source) is not None]
+        free = [source for source in targets if _strip_leading_boundary(source) is None]
+        self._entries = [(compiled[source], targets[source]) for source in bounded + free]
+        # Per feature, the entry of each of its patterns in pattern order
+        entry_of = {source: entry for entry, source in enumerate(bounded + free)}
+        self._feature_entries = [
+            (feature, [entry_of[pattern.pattern] for pattern in compiled_patterns])
+            for feature, compiled_patterns in self.patterns.items()
+        ]
+
+        # One pass per kind: (first entry, scanners for entries[first + i:] of that kind)
+        self._passes = []
+        for first, stop, boundary in ((0, len(bounded), True), (len(bounded), len(self._entries), False)):
+            if first < stop:
+                scanners = [self._compile_scanner(start, stop, boundary) for start in range(first, stop)]
+                self._passes.append((first, scanners))
+
+    def _compile_scanner(
+        self, start: int, stop: int, boundary: bool
+    ) -> Tuple["re.Pattern[str]", Dict[int, int]]:
+        alternatives = []
+        for pattern, entry_targets in self._entries[start:stop]:
+            feature, index = entry_targets[0]
+            source = _strip_leading_boundary(pattern.pattern) if boundary else pattern.pattern
+            alternatives.append(_name_value_group(source, f"{feature}__{index}", pattern.groups))
+        scanner = re.compile(
+            (r"\b" if boundary else "") + "(?=" + "|".join(alternatives) + ")", re.IGNORECASE
+        )
+
+        # Value group number -> entry; the value group is the last one a match closes
+        lookup = {}
+        for entry in range(start, stop):
+            feature, index = self._entries[entry][1][0]
+            lookup[scanner.groupindex[f"{feature}__{index}"]] = entry
+        return scanner, lookup
+
+    def _winner(self, query: str, position: int, start: int, stop: int) -> Tuple[int, str]:
+        """First entry in ``[start, stop)`` matching at ``position`` (when its value group is unset)."""
+        for entry in range(start, stop):
+            match = self._entries[entry][0].match(query, position)
+            if match is not None:
+                value = match.group(1) if match.re.groups == 1 else match.group(0)
+                return entry, value or ""
+        raise AssertionError("scanner matched but no pattern does")
+
+    def scan(self, query: str) -> Dict[str, List[str]]:
+        """First match of every pattern in ``query``.
+
+        Args:
+        ----
+            query: Lowercased query text
+
+        Returns:
+        -------
+            Matched values per feature, in vocabulary order; each list follows
+            the feature's pattern order and skips patterns that did not match
+
+        """
+        found: Dict[int, str] = {}
+        for first, scanners in self._passes:
+            stop = first + len(scanners)
+            scanner, lookup = scanners[0]
+            for match in scanner.finditer(query):
+                position = match.start()
+                start = first
+                while True:
+                    if match.lastindex is None:
+                        # The winning pattern's group did not take part; find it directly
+                        entry, value = self._winner(query, position, start, stop)
+                    else:
+                        entry = lookup[match.lastindex]
+                        value = match.group(match.lastindex) or ""
+                    if entry not in found:
+                        found[entry] = value
+                    start = entry + 1
+                    if start == stop:
+                        break
+                    tail, lookup = scanners[start - first]
+                    match = tail.match(query, position)
+                    if match is None:
+                        break
+                lookup = scanners[0][1]
+
+        values = {}
+        for feature, entries in self._feature_entries:
+            matched = [found[entry] for entry in entries if entry in found]
+            if matched:
+                values[feature] = matched
+        return values
+
+
+_matchers: Dict[str, VocabularyMatcher] = {}
+
+
+def get_vocabulary_matcher(category: str) -> VocabularyMatcher:
+    """Get the compiled matcher for a category's vocabulary (compiled once per process)."""
+    # Keyed by vocabulary, so categories sharing the fallback share one matcher
+    name = resolve_vocabulary_category(category)
+    matcher = _matchers.get(name)
+    if matcher is None:
+        matcher = _matchers[name] = VocabularyMatcher(get_category_vocabulary(name))
+    return matcher
+
+
+_results: "OrderedDict[Tuple[str, Optional[str]], Dict[str, Any]]" = OrderedDict()
+_results_lock = Lock()
+
+
+def clear_extraction_cache() -> None:
+    """Forget cached query extractions (benchmarks and vocabulary reloads)."""
+    with _results_lock:
+        _results.clear()
+
 
 def safe_string_extract(value: Any, default: str = "") -> str:
     """
@@ -87,16 +295,12 @@ class FeatureExtractor:
         }
 
     def _compile_patterns(self):
-        """Compile regex patterns for better performance."""
-        # Get gaming monitor vocabulary as default
-        vocab = get_category_vocabulary("gaming_monitor")
-        
-        self.patterns = {}
-        for feature_name, pattern_list in vocab.items():
-            self.patterns[feature_name] = [
-                re.compile(pattern, re.IGNORECASE) 
-                for pattern in pattern_list
-            ]
+        """Compile every category vocabulary (shared by all extractors in the process)."""
+        for category in get_supported_categories():
+            get_vocabulary_matcher(category)
+
+        # Per-pattern view of the default vocabulary
+        self.patterns = get_vocabulary_matcher("gaming_monitor").patterns
 
     def extract_features(
         self, 
@@ -130,15 +334,38 @@ class FeatureExtractor:
         if not query or not query.strip():
             return {"confidence": 0.0, "processing_time_ms": 0.0}
         
-        query_clean = query.lower().strip()
+        query_clean = " ".join(query.lower().split())
+        cache_key = (query_clean, category)
+        with _results_lock:
+            cached = _results.get(cache_key)
+            if cached is not None:
+                _results.move_to_end(cache_key)
+        if cached is not None:
+            return dict(cached, processing_time_ms=(time.time() - start_time) * 1000)
+
+        features = self._extract(query_clean, category)
+        with _results_lock:
+            _results[cache_key] = features
+            if len(_results) > _RESULT_CACHE_SIZE:
+                _results.popitem(last=False)
+
+        # Callers annotate the result (validate_extraction), so hand out a copy
+        features = dict(features, processing_time_ms=(time.time() - start_time) * 1000)
+        log.debug(
+            "Extracted features from '%s': %d features, %.3f confidence, %.1fms",
+            query[:50], features.get("matched_features_count", 0), features["confidence"],
+            features["processing_time_ms"]
+        )
+        return features
+
+    def _extract(self, query_clean: str, category: Optional[str]) -> Dict[str, Any]:
+        """Extract features from a normalized query (without timing)."""
         features = {}
         
         # Early marketing fluff detection
         if self._is_marketing_heavy(query_clean):
-            processing_time = (time.time() - start_time) * 1000
             return {
                 "confidence": 0.1,
-                "processing_time_ms": processing_time,
                 "marketing_heavy": True
             }
         
@@ -147,25 +374,22 @@ class FeatureExtractor:
         if detected_category:
             features["category_detected"] = detected_category
         
-        # Extract features using patterns
+        # Extract features with the category's vocabulary, in one scan
         total_words = len(query_clean.split())
         matched_features = 0
+        matcher = get_vocabulary_matcher(detected_category)
         
-        for feature_name, compiled_patterns in self.patterns.items():
-            for pattern in compiled_patterns:
-                matches = pattern.findall(query_clean)
-                if matches:
-                    value = matches[0].strip()
-                    
-                    # Apply normalization
-                    normalized_value = self._normalize_feature_value(
-                        feature_name, value, query_clean
-                    )
-                    
-                    if normalized_value:
-                        features[feature_name] = normalized_value
-                        matched_features += 1
-                        break  # Take first match for each feature
+        for feature_name, values in matcher.scan(query_clean).items():
+            for value in values:
+                # Apply normalization
+                normalized_value = self._normalize_feature_value(
+                    feature_name, value.strip(), query_clean
+                )
+                
+                if normalized_value:
+                    features[feature_name] = normalized_value
+                    matched_features += 1
+                    break  # Take the first pattern that matched for each feature
         
         # Calculate technical density for confidence scoring
         tech_word_count = sum(1 for word in query_clean.split() 
@@ -180,17 +404,11 @@ class FeatureExtractor:
         # Add metadata
         features.update({
             "confidence": confidence,
-            "processing_time_ms": (time.time() - start_time) * 1000,
             "technical_query": technical_density > 0.3,
             "matched_features_count": matched_features,
             "technical_density": technical_density
         })
         
-        log.debug(
-            "Extracted features from '%s': %d features, %.3f confidence, %.1fms",
-            query[:50], matched_features, confidence, features["processing_time_ms"]
-        )
-        
         return features
 
     def _is_marketing_heavy(self, query: str) -> bool:
@@ -12,9 +12,11 @@ Key features:
 """
 
 import time
+from collections.abc import Mapping
 from typing import Dict, List, Tuple, Any, Optional
 from logging import getLogger
 
+from ..product_record import ProductRecord
 from .vocabularies import get_feature_weights
 
 log = getLogger(__name__)
@@ -52,6 +54,7 @@ class FeatureMatchingEngine:
     def __init__(self):
         """Initialize the matching engine."""
         self.scoring_cache = {}  # Cache for performance
+        self._product_analyzer = None  # Created on first use, shared by all products
         
         # Tolerance windows for near-matches (percentage tolerance)
         self.tolerance_windows = {
@@ -551,11 +554,20 @@ class FeatureMatchingEngine:
         Extract features from product data using ProductFeatureAnalyzer.
         
         This integrates with Phase 2 implementation for proper feature extraction.
+        Results for a ProductRecord are kept on the record, so a product that is
+        scored again (cached search results) is not re-analyzed.
         """
-        from .product_analyzer import ProductFeatureAnalyzer
-        
-        analyzer = ProductFeatureAnalyzer()
-        feature_result = await analyzer.analyze_product_features(product, "gaming_monitor")
+        cache_key = ("product_features", "gaming_monitor")
+        if isinstance(product, ProductRecord):
+            cached = product.derived.get(cache_key)
+            if cached is not None:
+                return dict(cached)
+
+        if self._product_analyzer is None:
+            from .product_analyzer import ProductFeatureAnalyzer
+
+            self._product_analyzer = ProductFeatureAnalyzer()
+        feature_result = await self._product_analyzer.analyze_product_features(product, "gaming_monitor")
         
         # Extract just the values from the feature analysis result
         features = {}
@@ -565,7 +577,9 @@ class FeatureMatchingEngine:
             elif feature_name not in ["overall_confidence", "extraction_metadata"]:
                 # Handle direct value assignment
                 features[feature_name] = feature_data
-        
+
+        if isinstance(product, ProductRecord):
+            product.derived[cache_key] = dict(features)
         return features
 
     def _empty_score(self, reason: str) -> Dict[str, Any]:
@@ -677,21 +691,27 @@ class FeatureMatchingEngine:
         
         Favors products in the value/premium range over ultra-budget or ultra-premium.
         """
-        price = product.get("price")
-        if not price:
-            return 0.5  # Neutral score for missing price
-        
-        # Extract numeric price (handle currency symbols)
-        import re
-        price_str = str(price)
-        price_match = re.search(r'[\d,]+\.?\d*', price_str.replace(',', ''))
-        if not price_match:
-            return 0.5
+        if isinstance(product, ProductRecord):
+            # Records hold paise; the tiers below are in rupees
+            price_value = product.price_rupees
+            if not price_value:
+                return 0.5
+        else:
+            price = product.get("price")
+            if not price:
+                return 0.5  # Neutral score for missing price
 
-        try:
-            price_value = float(price_match.group())
-        except (ValueError, TypeError):
-            return 0.5
+            # Extract numeric price (handle currency symbols)
+            import re
+            price_str = str(price)
+            price_match = re.search(r'[\d,]+\.?\d*', price_str.replace(',', ''))
+            if not price_match:
+                return 0.5
+
+            try:
+                price_value = float(price_match.group())
+            except (ValueError, TypeError):
+                return 0.5
         
         # Gaming monitor price tiers (adjust for other categories)
         if price_value < 5000:      # Budget (<₹5k)
@@ -783,7 +803,7 @@ class FeatureMatchingEngine:
             log.info(f"DEBUG: matching_engine received result with {len(result['products'])} products")
             first_prod = result['products'][0]
             log.info(f"DEBUG: First product from selector type: {type(first_prod)}")
-            log.info(f"DEBUG: First product from selector keys: {list(first_prod.keys()) if isinstance(first_prod, dict) else 'Not a dict'}")
+            log.info(f"DEBUG: First product from selector keys: {list(first_prod.keys()) if isinstance(first_prod, Mapping) else 'Not a dict'}")
 
         return result
     
@@ -13,12 +13,31 @@ Key features:
 
 import time
 import traceback
+from collections.abc import Mapping
 from typing import Dict, List, Tuple, Any, Optional
 from logging import getLogger
 
+from ..product_record import ProductRecord
+
 log = getLogger(__name__)
 
 
+def _price_rupees(product: Mapping) -> float:
+    """Product price in rupees, 0.0 when unknown.
+
+    Records hold paise. Plain product dicts may carry either unit, so values
+    above 10000 are taken to be paise.
+    """
+    if isinstance(product, ProductRecord):
+        return product.price_rupees or 0.0
+    price_raw = product.get("price")
+    try:
+        price = float(price_raw) if price_raw else 0
+    except (ValueError, TypeError):
+        return 0.0
+    return price / 100 if price > 10000 else price
+
+
 class MultiCardSelector:
     """Intelligent selection of top-N products for user comparison."""
 
@@ -124,8 +143,8 @@ class MultiCardSelector:
         log.info(f"DEBUG: MultiCardSelector returning {len(products_list)} products")
         log.info(f"DEBUG: First product type: {type(products_list[0]) if products_list else 'None'}")
         if products_list:
-            log.info(f"DEBUG: First product keys: {list(products_list[0].keys()) if isinstance(products_list[0], dict) else 'Not a dict'}")
-            log.info(f"DEBUG: First product asin: {products_list[0].get('asin', 'No asin') if isinstance(products_list[0], dict) else 'Not a dict'}")
+            log.info(f"DEBUG: First product keys: {list(products_list[0].keys()) if isinstance(products_list[0], Mapping) else 'Not a dict'}")
+            log.info(f"DEBUG: First product asin: {products_list[0].get('asin', 'No asin') if isinstance(products_list[0], Mapping) else 'Not a dict'}")
 
         result = {
             'products': products_list,
@@ -245,24 +264,11 @@ class MultiCardSelector:
         if len(scored_products) < 2:
             return False
         
-        prices = []
-        for product, _ in scored_products:
-            price_raw = product.get("price")
-            # Safely convert price to numeric
-            try:
-                price = float(price_raw) if price_raw else 0
-            except (ValueError, TypeError):
-                price = 0
-
-            if price > 0:
-                prices.append(price)
+        prices = [price for price in (_price_rupees(product) for product, _ in scored_products) if price > 0]
         
         if len(prices) < 2:
             return False
         
-        # Convert to rupees if in paise
-        prices = [p/100 if p > 10000 else p for p in prices]
-        
         min_price = min(prices)
         max_price = max(prices)
         
@@ -330,34 +336,18 @@ class MultiCardSelector:
             log.debug(f"DIVERSITY: Adding second product (selected={len(selected)})")
             return True
         
-        # Safely extract and convert candidate price
-        candidate_price_raw = candidate.get("price", 0)
-        try:
-            candidate_price = float(candidate_price_raw) if candidate_price_raw else 0
-        except (ValueError, TypeError):
-            candidate_price = 0
-
+        candidate_price_rs = _price_rupees(candidate)
         candidate_brand = (candidate.get("brand") or "").lower()
         candidate_features = set(candidate_score.get("matched_features", []))
 
         # Check diversity across selected products
         for selected_product, selected_score in selected:
-            # Safely extract and convert selected price
-            selected_price_raw = selected_product.get("price", 0)
-            try:
-                selected_price = float(selected_price_raw) if selected_price_raw else 0
-            except (ValueError, TypeError):
-                selected_price = 0
-
+            selected_price_rs = _price_rupees(selected_product)
             selected_brand = (selected_product.get("brand") or "").lower()
             selected_features = set(selected_score.get("matched_features", []))
 
             # Price diversity (convert to rupees for comparison)
-            if candidate_price > 0 and selected_price > 0:
-
-                candidate_price_rs = candidate_price/100 if candidate_price > 10000 else candidate_price
-                selected_price_rs = selected_price/100 if selected_price > 10000 else selected_price
-
+            if candidate_price_rs > 0 and selected_price_rs > 0:
                 price_diff = abs(candidate_price_rs - selected_price_rs) / min(candidate_price_rs, selected_price_rs)
                 log.debug(f"DIVERSITY: Price check - candidate: ₹{candidate_price_rs:.0f}, selected: ₹{selected_price_rs:.0f}, diff: {price_diff:.2f}")
                 if price_diff > 0.20:  # >20% price difference
@@ -430,7 +420,7 @@ class MultiCardSelector:
                     return self._get_fallback_comparison_table()
                 
                 product, score_data = item
-                if not isinstance(product, dict):
+                if not isinstance(product, Mapping):
                     log.error(f"CRITICAL: product at index {i} is not a dict: {type(product)}")
                     return self._get_fallback_comparison_table()
                 
@@ -503,14 +493,8 @@ class MultiCardSelector:
         """Get formatted feature value for display in comparison table."""
         
         if feature == "price":
-            price_raw = product.get("price")
-            try:
-                price = float(price_raw) if price_raw else 0
-            except (ValueError, TypeError):
-                price = 0
-
-            if price > 0:
-                price_rs = price/100 if price > 10000 else price
+            price_rs = _price_rupees(product)
+            if price_rs > 0:
                 return f"₹{price_rs:,.0f}"
             return "Price updating"
         
@@ -681,14 +665,8 @@ class MultiCardSelector:
                 product_strengths.append("High overall match")
             
             # Price positioning
-            price_raw = product.get("price")
-            try:
-                price = float(price_raw) if price_raw else 0
-            except (ValueError, TypeError):
-                price = 0
-
-            if price > 0:
-                price_rs = price/100 if price > 10000 else price
+            price_rs = _price_rupees(product)
+            if price_rs > 0:
                 if price_rs < 20000:
                     product_strengths.append("Budget-friendly")
                 elif price_rs > 40000:
@@ -709,14 +687,8 @@ class MultiCardSelector:
         prices = []
         scores = []
         for product, score_data in selected_products:
-            price_raw = product.get("price")
-            try:
-                price = float(price_raw) if price_raw else 0
-            except (ValueError, TypeError):
-                price = 0
-
-            if price > 0:
-                price_rs = price/100 if price > 10000 else price
+            price_rs = _price_rupees(product)
+            if price_rs > 0:
                 prices.append(price_rs)
                 scores.append(score_data["score"])
         
@@ -829,17 +801,7 @@ class MultiCardSelector:
             explanation_parts.append("Products excel in different areas")
         
         # Check for price diversity
-        prices = []
-        for p, _ in selected_products:
-            price_raw = p.get("price")
-            try:
-                price = float(price_raw) if price_raw else 0
-            except (ValueError, TypeError):
-                price = 0
-
-            if price > 0:
-                price_rs = price/100 if price > 10000 else price
-                prices.append(price_rs)
+        prices = [price_rs for price_rs in (_price_rupees(p) for p, _ in selected_products) if price_rs > 0]
         if len(prices) > 1:
             price_range = (max(prices) - min(prices)) / min(prices)
             if price_range > 0.25:
@@ -1031,7 +993,7 @@ class MultiCardSelector:
             differences.append("Resolution (4K > QHD > FHD)")
 
         # Compare prices
-        prices = [p.get('price', 0) for p in products]
+        prices = [p.get('price') or 0 for p in products]
         price_range = max(prices) - min(prices)
         if price_range > 5000:
             differences.append("Price (value per rupee)")
@@ -193,6 +193,14 @@ CATEGORY_KEYWORDS = {
     "smartphone": ["phone", "smartphone", "mobile"]
 }
 
+# Feature vocabularies by category; other categories use the gaming monitor one
+CATEGORY_VOCABULARIES = {
+    "gaming_monitor": GAMING_MONITOR_VOCABULARY,
+    "laptop": LAPTOP_VOCABULARY,
+    "headphones": HEADPHONES_VOCABULARY,
+}
+DEFAULT_VOCABULARY_CATEGORY = "gaming_monitor"
+
 
 def get_category_vocabulary(category: str) -> Dict[str, List[str]]:
     """
@@ -212,13 +220,12 @@ def get_category_vocabulary(category: str) -> Dict[str, List[str]]:
         >>> vocab["refresh_rate"]
         [r"(\d+)\s*hz\b", r"(\d+)\s*fps\b", ...]
     """
-    vocabularies = {
-        "gaming_monitor": GAMING_MONITOR_VOCABULARY,
-        "laptop": LAPTOP_VOCABULARY,
-        "headphones": HEADPHONES_VOCABULARY,
-    }
-    
-    return vocabularies.get(category, GAMING_MONITOR_VOCABULARY)
+    return CATEGORY_VOCABULARIES[resolve_vocabulary_category(category)]
+
+
+def resolve_vocabulary_category(category: str) -> str:
+    """Name of the vocabulary used for a category (the default for unknown ones)."""
+    return category if category in CATEGORY_VOCABULARIES else DEFAULT_VOCABULARY_CATEGORY
 
 
 def get_feature_weights(category: str) -> Dict[str, float]:
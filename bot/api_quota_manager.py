@@ -15,6 +15,8 @@ from typing import Any, Callable, Dict, List, Optional
 from .api_rate_limiter import get_rate_limiter
 from .config import settings
 from .errors import QuotaExceededError
+from .limiter_backend import LimiterBackend, MemoryLimiterBackend, get_limiter_backend
+from .quota_budget import get_budget_planner
 
 log = getLogger(__name__)
 
@@ -44,10 +46,18 @@ class APIQuotaManager:
     - Circuit breaker pattern for graceful degradation
     - Intelligent quota tracking and prediction
     - Request deduplication and batching
+
+    The daily quota counter lives in a limiter backend, so processes sharing
+    it count against one quota and a restart keeps the day's usage.
     """
 
-    def __init__(self):
-        """Initialize the API quota manager."""
+    def __init__(self, backend: Optional[LimiterBackend] = None):
+        """Initialize the API quota manager.
+
+        Args:
+        ----
+            backend: Where the daily quota counter lives (a private in-memory one if omitted)
+        """
         # Request queues by priority
         self.request_queues = {
             priority: deque() for priority in RequestPriority
@@ -68,8 +78,8 @@ class APIQuotaManager:
         self.success_threshold = 3  # Successes needed to close circuit
         
         # Quota tracking
-        self.daily_quota_used = 0
-        self.daily_quota_limit = 8640  # PA-API daily limit
+        self.backend = backend or MemoryLimiterBackend()
+        self.daily_quota_limit = settings.PAAPI_DAILY_QUOTA
         self.quota_reset_time = self._get_next_quota_reset()
         
         # Request deduplication
@@ -212,6 +222,20 @@ class APIQuotaManager:
             await self._record_failed_request(e)
             raise
 
+    @property
+    def _quota_key(self) -> str:
+        """Backend counter of the current UTC day."""
+        return f"quota_manager:used:{int(time.time() // 86400)}"
+
+    @property
+    def daily_quota_used(self) -> int:
+        """Requests counted against today's quota."""
+        return self.backend.get(self._quota_key)
+
+    @daily_quota_used.setter
+    def daily_quota_used(self, value: int) -> None:
+        self.backend.set(self._quota_key, value, self.quota_reset_time + 86400)
+
     def get_quota_status(self) -> Dict[str, Any]:
         """Get current quota usage and status.
         
@@ -231,7 +255,9 @@ class APIQuotaManager:
             "queue_sizes": {
                 priority.name: len(queue) 
                 for priority, queue in self.request_queues.items()
-            }
+            },
+            # Process-wide budget across every PA-API caller, per pool
+            "budget": get_budget_planner().get_status(),
         }
 
     def get_performance_metrics(self) -> Dict[str, Any]:
@@ -356,7 +382,7 @@ class APIQuotaManager:
 
     async def _record_successful_request(self, duration: float) -> None:
         """Record a successful API request."""
-        self.daily_quota_used += 1
+        self.backend.incr(self._quota_key, 1, self.quota_reset_time + 86400)
         
         # Circuit breaker handling
         if self.circuit_state == CircuitBreakerState.HALF_OPEN:
@@ -412,10 +438,10 @@ _quota_manager: Optional[APIQuotaManager] = None
 
 
 def get_quota_manager() -> APIQuotaManager:
-    """Get the global quota manager instance."""
+    """Get the global quota manager instance (on the shared limiter backend)."""
     global _quota_manager
     if _quota_manager is None:
-        _quota_manager = APIQuotaManager()
+        _quota_manager = APIQuotaManager(get_limiter_backend())
     return _quota_manager
 
 
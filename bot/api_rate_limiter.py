@@ -9,16 +9,21 @@ This module provides multi-layered rate limiting for:
 """
 
 import asyncio
+import threading
 import time
 import hashlib
-from collections import deque, defaultdict
+from bisect import bisect_left
+from collections import deque
 from logging import getLogger
 from typing import Optional, Dict, Tuple, List, Any
 from dataclasses import dataclass
 from enum import Enum
 
 from .config import settings
+from .errors import QuotaExceededError
+from .limiter_backend import LIMITER_BACKEND_ERRORS, LimiterBackend, MemoryLimiterBackend, get_limiter_backend
 from .logging_config import SecurityEventLogger
+from .quota_budget import get_budget_planner
 
 log = getLogger(__name__)
 security_logger = SecurityEventLogger()
@@ -63,23 +68,27 @@ class RateLimitResult:
 class SlidingWindowLimiter:
     """Sliding window rate limiter for precise control."""
 
-    def __init__(self, requests_per_window: int, window_seconds: int):
+    def __init__(self, requests_per_window: int, window_seconds: int,
+                 backend: Optional[LimiterBackend] = None, key: str = "window"):
         self.requests_per_window = requests_per_window
         self.window_seconds = window_seconds
-        self.requests: deque = deque()
+        self.backend = backend or MemoryLimiterBackend()
+        self.key = key
+
+    @property
+    def requests_in_window(self) -> int:
+        """Requests currently counted in the window."""
+        return self.backend.count_window(self.key, self.window_seconds, time.time())
 
     def check_limit(self, identifier: str) -> RateLimitResult:
         """Check if request is within rate limit."""
         now = time.time()
-
-        # Remove old requests outside the window
-        while self.requests and self.requests[0] < now - self.window_seconds:
-            self.requests.popleft()
+        allowed, count, oldest_request = self.backend.hit_window(
+            self.key, self.requests_per_window, self.window_seconds, now
+        )
 
         # Check if limit exceeded
-        if len(self.requests) >= self.requests_per_window:
-            # Calculate reset time
-            oldest_request = self.requests[0]
+        if not allowed:
             reset_time = oldest_request + self.window_seconds
             retry_after = reset_time - now
 
@@ -88,15 +97,12 @@ class SlidingWindowLimiter:
                 remaining_requests=0,
                 reset_time=reset_time,
                 retry_after=max(0, retry_after),
-                exceeded_by=len(self.requests) - self.requests_per_window + 1
+                exceeded_by=count - self.requests_per_window + 1
             )
 
-        # Add current request
-        self.requests.append(now)
-
         return RateLimitResult(
             allowed=True,
-            remaining_requests=self.requests_per_window - len(self.requests),
+            remaining_requests=self.requests_per_window - count,
             reset_time=now + self.window_seconds
         )
 
@@ -104,34 +110,30 @@ class SlidingWindowLimiter:
 class TokenBucketLimiter:
     """Token bucket rate limiter for burst handling."""
 
-    def __init__(self, rate_per_second: float, burst_capacity: int):
+    def __init__(self, rate_per_second: float, burst_capacity: int,
+                 backend: Optional[LimiterBackend] = None, key: str = "bucket"):
         self.rate_per_second = rate_per_second
         self.burst_capacity = burst_capacity
-        self.tokens = burst_capacity
-        self.last_update = time.time()
+        self.backend = backend or MemoryLimiterBackend()
+        self.key = key
+
+    @property
+    def tokens(self) -> float:
+        """Tokens currently in the bucket."""
+        return self.backend.available_tokens(self.key, self.rate_per_second, self.burst_capacity, time.time())
 
     def check_limit(self, identifier: str) -> RateLimitResult:
         """Check if request can be served."""
         now = time.time()
+        retry_after = self.backend.take_token(self.key, self.rate_per_second, self.burst_capacity, now)
 
-        # Add tokens based on elapsed time
-        elapsed = now - self.last_update
-        tokens_to_add = elapsed * self.rate_per_second
-        self.tokens = min(self.burst_capacity, self.tokens + tokens_to_add)
-        self.last_update = now
-
-        if self.tokens >= 1:
-            self.tokens -= 1
+        if retry_after == 0:
             return RateLimitResult(
                 allowed=True,
                 remaining_requests=int(self.tokens),
                 reset_time=now + 1.0 / self.rate_per_second
             )
         else:
-            # Calculate when next token will be available
-            deficit = 1 - self.tokens
-            retry_after = deficit / self.rate_per_second
-
             return RateLimitResult(
                 allowed=False,
                 remaining_requests=0,
@@ -141,7 +143,12 @@ class TokenBucketLimiter:
 
 
 class ComprehensiveRateLimiter:
-    """Comprehensive rate limiting system with multiple strategies."""
+    """Comprehensive rate limiting system with multiple strategies.
+
+    Windows, buckets, violation counts and blocks are kept in the limiter
+    backend under ``namespace``, so every process sharing the backend enforces
+    the same limits.
+    """
 
     # Default rate limit rules
     DEFAULT_RULES = {
@@ -172,45 +179,58 @@ class ComprehensiveRateLimiter:
         )
     }
 
-    def __init__(self):
-        self.limiters: Dict[str, Dict[RateLimitType, Any]] = defaultdict(dict)
-        self.blocked_until: Dict[str, float] = {}
-        self.violation_counts: Dict[str, int] = defaultdict(int)
+    # Violations are forgotten this long after the last one
+    VIOLATION_MEMORY_SECONDS = 3600
+
+    def __init__(self, namespace: str = "default", backend: Optional[LimiterBackend] = None):
+        self.namespace = namespace
+        self._backend = backend
+        self.limiters: Dict[str, Any] = {}
+
+    @property
+    def backend(self) -> LimiterBackend:
+        """Backend holding the state (the shared one unless given)."""
+        if self._backend is None:
+            self._backend = get_limiter_backend()
+        return self._backend
+
+    def _key(self, *parts: str) -> str:
+        return ":".join((self.namespace, *parts))
 
     def check_rate_limit(self, identifier: str, limit_type: RateLimitType,
                         custom_rule: Optional[RateLimitRule] = None) -> RateLimitResult:
         """Check rate limit for a given identifier and type."""
 
         # Check if identifier is currently blocked
-        if identifier in self.blocked_until:
-            if time.time() < self.blocked_until[identifier]:
-                reset_time = self.blocked_until[identifier]
-                return RateLimitResult(
-                    allowed=False,
-                    remaining_requests=0,
-                    reset_time=reset_time,
-                    retry_after=reset_time - time.time()
-                )
-            else:
-                # Block expired, remove it
-                del self.blocked_until[identifier]
-                if identifier in self.violation_counts:
-                    del self.violation_counts[identifier]
+        now = time.time()
+        blocked_until = self.backend.get(self._key("blocked", identifier))
+        if now < blocked_until:
+            return RateLimitResult(
+                allowed=False,
+                remaining_requests=0,
+                reset_time=blocked_until,
+                retry_after=blocked_until - now
+            )
 
         # Get or create limiter for this identifier and type
         rule = custom_rule or self.DEFAULT_RULES.get(limit_type, self.DEFAULT_RULES[RateLimitType.USER_INPUT])
 
         limiter_key = f"{identifier}:{limit_type.value}"
         if limiter_key not in self.limiters:
+            backend_key = self._key(limiter_key)
             if rule.strategy == RateLimitStrategy.TOKEN_BUCKET:
                 # Convert sliding window to token bucket
                 rate_per_second = rule.requests_per_window / rule.window_seconds
                 burst_capacity = rule.requests_per_window + rule.burst_allowance
-                self.limiters[limiter_key] = TokenBucketLimiter(rate_per_second, burst_capacity)
+                self.limiters[limiter_key] = TokenBucketLimiter(
+                    rate_per_second, burst_capacity, self.backend, backend_key
+                )
             else:
                 # Default to sliding window
                 requests_per_window = rule.requests_per_window + rule.burst_allowance
-                self.limiters[limiter_key] = SlidingWindowLimiter(requests_per_window, rule.window_seconds)
+                self.limiters[limiter_key] = SlidingWindowLimiter(
+                    requests_per_window, rule.window_seconds, self.backend, backend_key
+                )
 
         limiter = self.limiters[limiter_key]
         result = limiter.check_limit(identifier)
@@ -223,14 +243,16 @@ class ComprehensiveRateLimiter:
 
     def _handle_violation(self, identifier: str, limit_type: RateLimitType, rule: RateLimitRule):
         """Handle rate limit violations."""
-        self.violation_counts[identifier] += 1
+        now = time.time()
+        violations_key = self._key("violations", identifier)
+        violation_count = self.backend.incr(violations_key, 1, now + self.VIOLATION_MEMORY_SECONDS)
 
         # Progressive penalties
-        violation_count = self.violation_counts[identifier]
-
         if violation_count >= 5:
-            # Block for cooldown period
-            self.blocked_until[identifier] = time.time() + rule.cooldown_seconds
+            # Block for cooldown period; violations start over once it expires
+            blocked_until = now + rule.cooldown_seconds
+            self.backend.set(self._key("blocked", identifier), int(blocked_until) + 1, blocked_until)
+            self.backend.delete([violations_key])
             security_logger.log_rate_limit_exceeded(
                 identifier=identifier,
                 limit=rule.requests_per_window,
@@ -248,9 +270,10 @@ class ComprehensiveRateLimiter:
 
         # Get stats based on limiter type
         if isinstance(limiter, SlidingWindowLimiter):
+            requests_in_window = limiter.requests_in_window
             return {
-                "requests_in_window": len(limiter.requests),
-                "window_remaining": limiter.requests_per_window - len(limiter.requests),
+                "requests_in_window": requests_in_window,
+                "window_remaining": limiter.requests_per_window - requests_in_window,
                 "window_seconds": limiter.window_seconds
             }
         elif isinstance(limiter, TokenBucketLimiter):
@@ -264,70 +287,277 @@ class ComprehensiveRateLimiter:
 
     def reset_identifier(self, identifier: str):
         """Reset rate limiting for a specific identifier (admin function)."""
-        # Remove all limiters for this identifier
-        keys_to_remove = [key for key in self.limiters.keys() if key.startswith(f"{identifier}:")]
-        for key in keys_to_remove:
-            del self.limiters[key]
-
-        # Remove blocks and violation counts
-        if identifier in self.blocked_until:
-            del self.blocked_until[identifier]
-        if identifier in self.violation_counts:
-            del self.violation_counts[identifier]
+        # Remove all limiters, blocks and violation counts for this identifier
+        limiter_keys = [f"{identifier}:{limit_type.value}" for limit_type in RateLimitType]
+        for key in limiter_keys:
+            self.limiters.pop(key, None)
+        self.backend.delete(
+            [self._key(key) for key in limiter_keys]
+            + [self._key("blocked", identifier), self._key("violations", identifier)]
+        )
 
         log.info(f"Rate limiting reset for identifier: {identifier}")
 
 
 # Global rate limiter instances
-_user_rate_limiter = ComprehensiveRateLimiter()
-_admin_rate_limiter = ComprehensiveRateLimiter()
+_user_rate_limiter = ComprehensiveRateLimiter("user")
+_admin_rate_limiter = ComprehensiveRateLimiter("admin")
 
 # PA-API specific rate limiter (existing)
 _paapi_rate_limiter: Optional['APIRateLimiter'] = None
 
 
-class APIRateLimiter:
-    """Rate limiter respecting PA-API constraints.
+# Backend key of the shared PA-API token bucket
+PAAPI_BUCKET_KEY = "paapi:tokens"
+
+# Priority lanes for PA-API calls, served strictly in this order
+PAAPI_PRIORITY_LANES = ("high", "normal", "low", "analytics")
+
+# Maps caller priorities (including APIQuotaManager's RequestPriority names) to a lane
+_PRIORITY_TO_LANE = {
+    "high": 0,
+    "user_triggered": 0,
+    "normal": 1,
+    "active_watch": 1,
+    "low": 2,
+    "data_enrichment": 2,
+    "analytics": 3,
+}
+
+
+def priority_lane(priority: Optional[str]) -> int:
+    """Get the lane index for a priority (0 is served first, unknown maps to normal)."""
+    return _PRIORITY_TO_LANE.get(str(priority).lower(), 1)
+
+
+# Upper bounds (seconds) of the wait-time histogram buckets
+WAIT_TIME_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class WaitTimeHistogram:
+    """Cumulative histogram of rate limiter wait times."""
+
+    def __init__(self, buckets: Tuple[float, ...] = WAIT_TIME_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
 
-    PA-API limits:
-    - 1 request per second sustained rate
-    - Burst capacity of up to 10 requests in 10 seconds
+    def observe(self, seconds: float) -> None:
+        """Record a single wait time."""
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Export the histogram with cumulative bucket counts."""
+        cumulative = {}
+        running = 0
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            running += bucket_count
+            cumulative[str(bound)] = running
+        cumulative["+Inf"] = self.count
+
+        return {
+            "count": self.count,
+            "sum": round(self.total, 6),
+            "max": round(self.max, 6),
+            "avg": round(self.total / self.count, 6) if self.count else 0.0,
+            "buckets": cumulative,
+        }
+
+
+class _Waiter:
+    """A pending acquire() call parked in a priority lane."""
+
+    __slots__ = ("lane", "loop", "future")
+
+    def __init__(self, lane: int, loop: asyncio.AbstractEventLoop):
+        self.lane = lane
+        self.loop = loop
+        self.future = loop.create_future()
+
+
+class APIRateLimiter:
+    """Token bucket rate limiter respecting PA-API constraints.
+
+    Tokens refill at ``PAAPI_RATE_LIMIT_PER_SECOND`` up to a bucket of
+    ``PAAPI_BURST_LIMIT``, so the quota is spent at exactly the configured
+    rate. Waiting callers are queued in strict priority lanes (user-facing
+    over watches over enrichment over analytics) and are handed tokens as
+    soon as they refill. State is guarded by a short thread lock that is
+    never held across a sleep or a backend call, which also keeps the limiter
+    safe to share between the bot loop and the scheduler threads' event loops.
+
+    The bucket itself lives in a limiter backend (bot/limiter_backend.py);
+    processes sharing a SQLite or Redis backend draw from one bucket, so the
+    account-wide rate holds however many workers make calls. Backend calls
+    can block, so tokens are taken in a worker thread rather than on the
+    event loop; if the backend is unavailable this process falls back to a
+    local bucket at the same rate.
+
+    Before queuing, each request is admitted against the daily quota budget
+    (bot/quota_budget.py); background work that would eat into the capacity
+    forecast for user-facing traffic is refused with ``QuotaExceededError``.
     """
 
-    def __init__(self):
-        """Initialize rate limiter with PA-API constraints."""
-        self.requests = deque()  # Track requests for 1/second limit
-        self.burst_requests = deque()  # Track burst requests
+    def __init__(self, backend: Optional[LimiterBackend] = None):
+        """Initialize rate limiter with PA-API constraints.
+
+        Args:
+        ----
+            backend: Where the token bucket lives (a private in-memory one if omitted)
+        """
+        self.requests = deque()  # Grant timestamps in the last second
+        self.burst_requests = deque()  # Grant timestamps in the burst window
         self.rate_limit = settings.PAAPI_RATE_LIMIT_PER_SECOND
         self.burst_limit = settings.PAAPI_BURST_LIMIT
         self.burst_window = settings.PAAPI_BURST_WINDOW_SECONDS
-        self._lock = asyncio.Lock()
+        self.backend = backend or MemoryLimiterBackend()
+        self._fallback = MemoryLimiterBackend()  # Used while the shared backend is unavailable
+        self._next_token_at = 0.0  # When the bucket last said a token would be available
+        self._lanes: List[deque] = [deque() for _ in PAAPI_PRIORITY_LANES]
+        self._lock = threading.Lock()
+        self._dispatching = False
+        self.wait_histograms = {lane: WaitTimeHistogram() for lane in PAAPI_PRIORITY_LANES}
 
     async def acquire(self, priority: str = "normal") -> None:
         """Acquire permission for API call.
 
         Args:
         ----
-            priority: Request priority ("high", "normal", "low")
-                     High priority requests get faster processing
-        """
-        async with self._lock:
-            now = time.time()
-
-            # Clean old requests from tracking
-            self._clean_old_requests(now)
-
-            # Check burst limit first
-            await self._enforce_burst_limit(now)
+            priority: Request priority ("high", "normal", "low", "analytics" or a
+                     RequestPriority name). Higher lanes are always served first.
 
-            # Check rate limit
-            await self._enforce_rate_limit(now, priority)
-
-            # Record this request
-            self.requests.append(now)
-            self.burst_requests.append(now)
-
-            log.debug("API rate limiter: granted request (priority: %s)", priority)
+        Raises:
+        ------
+            QuotaExceededError: If the daily quota budget does not admit the request
+        """
+        budget = get_budget_planner()
+        if not await asyncio.to_thread(budget.admit, priority):
+            raise QuotaExceededError(f"PA-API daily quota budget exhausted for {priority} requests")
+
+        lane = priority_lane(priority)
+        start = time.monotonic()
+        waiter = _Waiter(lane, asyncio.get_running_loop())
+
+        with self._lock:
+            self._lanes[lane].append(waiter)
+
+        try:
+            while not waiter.future.done():
+                await asyncio.to_thread(self._dispatch)
+                with self._lock:
+                    delay = self._time_until_next_token()
+                try:
+                    # Woken early if a token is handed over; otherwise refill and retry
+                    await asyncio.wait_for(asyncio.shield(waiter.future), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._lanes[lane]:
+                    self._lanes[lane].remove(waiter)
+            # A token handed over but not delivered yet is refunded by _wake
+            if not waiter.future.cancel() and not waiter.future.cancelled():
+                waiter.loop.run_in_executor(None, self._refund_token)
+            raise
+
+        waited = time.monotonic() - start
+        with self._lock:
+            self.wait_histograms[PAAPI_PRIORITY_LANES[lane]].observe(waited)
+        await asyncio.to_thread(budget.record, priority)
+
+        log.debug("API rate limiter: granted request (priority: %s, waited %.3fs)", priority, waited)
+
+    def _bucket(self, operation: str, now: float) -> Any:
+        """Run a token bucket operation, on the local bucket if the backend is unavailable."""
+        args = (PAAPI_BUCKET_KEY, self.rate_limit, self.burst_limit, now)
+        try:
+            return getattr(self.backend, operation)(*args)
+        except LIMITER_BACKEND_ERRORS as e:
+            log.warning("Limiter backend unavailable, using the local PA-API bucket: %s", e)
+            return getattr(self._fallback, operation)(*args)
+
+    @property
+    def tokens(self) -> float:
+        """Tokens currently in the bucket."""
+        return self._bucket("available_tokens", time.time())
+
+    def _time_until_next_token(self) -> float:
+        """Seconds until the bucket is expected to have a token again."""
+        # Other processes may take it first; the dispatcher then waits again
+        return max(0.001, self._next_token_at - time.time())
+
+    def _next_waiter(self) -> Optional[_Waiter]:
+        """Pop the oldest live waiter from the highest-priority non-empty lane (lock must be held)."""
+        for queue in self._lanes:
+            while queue:
+                waiter = queue.popleft()
+                if not waiter.future.done() and not waiter.loop.is_closed():
+                    return waiter
+        return None
+
+    def _dispatch(self) -> None:
+        """Hand out available tokens to queued waiters.
+
+        Runs in a worker thread, with the lock released around backend calls.
+        One thread dispatches at a time; callers arriving meanwhile are served
+        by it or by their next timed retry.
+        """
+        with self._lock:
+            if self._dispatching:
+                return
+            self._dispatching = True
+        try:
+            while True:
+                with self._lock:
+                    waiter = self._next_waiter()
+                if waiter is None:
+                    return
+
+                wall_now = time.time()
+                wait = self._bucket("take_token", wall_now)
+                with self._lock:
+                    if wait > 0:
+                        self._lanes[waiter.lane].appendleft(waiter)
+                        self._next_token_at = wall_now + wait
+                        return
+                    self.requests.append(wall_now)
+                    self.burst_requests.append(wall_now)
+                    self._clean_old_requests(wall_now)
+
+                try:
+                    waiter.loop.call_soon_threadsafe(self._wake, waiter)
+                except RuntimeError:
+                    self._release_token()  # Waiter's event loop closed under us
+        finally:
+            with self._lock:
+                self._dispatching = False
+
+    def _wake(self, waiter: _Waiter) -> None:
+        """Complete a waiter's future on its own event loop."""
+        if waiter.future.done():
+            # Cancelled after the token was handed out; give it to someone else
+            waiter.loop.run_in_executor(None, self._refund_token)
+            return
+        waiter.future.set_result(None)
+
+    def _release_token(self) -> None:
+        """Return an unused token to the bucket and forget its grant."""
+        self._bucket("return_token", time.time())
+        with self._lock:
+            if self.requests:
+                self.requests.pop()
+            if self.burst_requests:
+                self.burst_requests.pop()
+
+    def _refund_token(self) -> None:
+        """Return an unused token and offer it to the next waiter (worker thread)."""
+        self._release_token()
+        self._dispatch()
 
     def _clean_old_requests(self, now: float) -> None:
         """Remove old requests from tracking queues."""
@@ -339,52 +569,27 @@ class APIRateLimiter:
         while self.burst_requests and self.burst_requests[0] < now - self.burst_window:
             self.burst_requests.popleft()
 
-    async def _enforce_burst_limit(self, now: float) -> None:
-        """Enforce burst limit (10 requests in 10 seconds)."""
-        if len(self.burst_requests) >= self.burst_limit:
-            # Calculate how long to wait
-            oldest_burst = self.burst_requests[0]
-            sleep_time = self.burst_window - (now - oldest_burst)
-
-            if sleep_time > 0:
-                log.info(
-                    "API rate limiter: burst limit reached, sleeping %.2fs", sleep_time
-                )
-                await asyncio.sleep(sleep_time)
-
-    async def _enforce_rate_limit(self, now: float, priority: str) -> None:
-        """Enforce rate limit (1 request per second with conservative buffer)."""
-        if self.requests:
-            last_request = self.requests[-1]
-            # Add 0.5s buffer to be more conservative
-            sleep_time = 1.5 - (now - last_request)
-
-            # Adjust sleep time based on priority
-            if priority == "high":
-                sleep_time *= 0.9  # High priority gets 10% faster processing
-            elif priority == "low":
-                sleep_time *= 1.3  # Low priority gets 30% slower processing
-
-            if sleep_time > 0:
-                log.info(
-                    "API rate limiter: rate limit, sleeping %.2fs (priority: %s)",
-                    sleep_time,
-                    priority,
-                )
-                await asyncio.sleep(sleep_time)
-
     def get_current_usage(self) -> dict:
         """Get current rate limiter usage statistics."""
-        now = time.time()
-        self._clean_old_requests(now)
+        available = self.tokens
+        with self._lock:
+            self._clean_old_requests(time.time())
 
-        return {
-            "requests_last_second": len(self.requests),
-            "burst_requests": len(self.burst_requests),
-            "rate_limit": self.rate_limit,
-            "burst_limit": self.burst_limit,
-            "burst_window": self.burst_window,
-        }
+            return {
+                "requests_last_second": len(self.requests),
+                "burst_requests": len(self.burst_requests),
+                "rate_limit": self.rate_limit,
+                "burst_limit": self.burst_limit,
+                "burst_window": self.burst_window,
+                "available_tokens": round(available, 3),
+                "queued": {
+                    name: sum(1 for w in queue if not w.future.done())
+                    for name, queue in zip(PAAPI_PRIORITY_LANES, self._lanes)
+                },
+                "wait_time_histograms": {
+                    name: histogram.snapshot() for name, histogram in self.wait_histograms.items()
+                },
+            }
 
     async def wait_for_capacity(self, required_requests: int = 1) -> float:
         """Wait until there's capacity for the specified number of requests.
@@ -397,27 +602,18 @@ class APIRateLimiter:
         -------
             Estimated wait time in seconds
         """
-        now = time.time()
-        self._clean_old_requests(now)
-
-        # Check if we have burst capacity
-        available_burst = self.burst_limit - len(self.burst_requests)
-        if available_burst >= required_requests:
+        available = await asyncio.to_thread(self._bucket, "available_tokens", time.time())
+        deficit = required_requests - available
+        if deficit <= 0:
             return 0.0
-
-        # Calculate wait time for burst capacity
-        if self.burst_requests:
-            oldest_burst = self.burst_requests[0]
-            wait_time = self.burst_window - (now - oldest_burst)
-            return max(0.0, wait_time)
-
-        return 0.0
+        return deficit / self.rate_limit
 
 
 # Global rate limiter instances
 _paapi_rate_limiter: Optional[APIRateLimiter] = None
-_user_rate_limiter = ComprehensiveRateLimiter()
-_admin_rate_limiter = ComprehensiveRateLimiter()
+_paapi_rate_limiter_lock = threading.Lock()
+_user_rate_limiter = ComprehensiveRateLimiter("user")
+_admin_rate_limiter = ComprehensiveRateLimiter("admin")
 
 
 # Convenience functions for different rate limiting types
@@ -443,11 +639,12 @@ def check_search_query_rate_limit(user_id: str) -> RateLimitResult:
 
 # PA-API specific functions (backward compatibility)
 def get_rate_limiter() -> APIRateLimiter:
-    """Get the global PA-API rate limiter instance."""
+    """Get the global PA-API rate limiter instance (on the shared limiter backend)."""
     global _paapi_rate_limiter
-    if _paapi_rate_limiter is None:
-        _paapi_rate_limiter = APIRateLimiter()
-    return _paapi_rate_limiter
+    with _paapi_rate_limiter_lock:
+        if _paapi_rate_limiter is None:
+            _paapi_rate_limiter = APIRateLimiter(get_limiter_backend())
+        return _paapi_rate_limiter
 
 
 async def acquire_api_permission(priority: str = "normal") -> None:
@@ -455,7 +652,7 @@ async def acquire_api_permission(priority: str = "normal") -> None:
 
     Args:
     ----
-        priority: Request priority ("high", "normal", "low")
+        priority: Request priority ("high", "normal", "low", "analytics")
     """
     limiter = get_rate_limiter()
     await limiter.acquire(priority)
@@ -464,9 +661,11 @@ async def acquire_api_permission(priority: str = "normal") -> None:
 def reset_rate_limiter() -> None:
     """Reset the PA-API rate limiter state (useful for testing or recovery)."""
     global _paapi_rate_limiter
-    if _paapi_rate_limiter:
-        _paapi_rate_limiter.requests.clear()
-        _paapi_rate_limiter.burst_requests.clear()
+    with _paapi_rate_limiter_lock:
+        old, _paapi_rate_limiter = _paapi_rate_limiter, None
+    if old:
+        # The next get_rate_limiter() starts a fresh limiter on a full bucket
+        old.backend.delete([PAAPI_BUCKET_KEY])
         log.info("PA-API rate limiter state reset")
 
 
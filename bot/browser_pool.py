@@ -0,0 +1,327 @@
+"""Persistent Playwright browser pool for the scraper fallback.
+
+Launching Chromium costs hundreds of milliseconds to seconds and ~150 MB of
+RSS, which the scraper used to pay for every ASIN. The pool keeps one browser
+running per event loop and hands out a bounded number of reusable pages, each
+in its own browser context:
+
+- at most ``SCRAPER_POOL_PAGES`` scrapes run at once; further callers queue,
+  up to ``SCRAPER_QUEUE_LIMIT`` waiters, for ``SCRAPER_ACQUIRE_TIMEOUT_SECONDS``
+- a page is health-checked when it is returned (blanked, still open, browser
+  still connected) and its context is recycled after a failed scrape or
+  ``SCRAPER_PAGE_MAX_NAVIGATIONS`` navigations, which drops accumulated
+  cookies and memory
+- a crashed or disconnected browser is relaunched on next use
+
+Playwright objects are bound to the loop that created them, so loops that are
+torn down (scheduler jobs, ``asyncio.run``) must call ``close_browser_pool``.
+"""
+
+import asyncio
+import weakref
+from contextlib import asynccontextmanager
+from logging import getLogger
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from .config import settings
+
+log = getLogger(__name__)
+
+LAUNCH_ARGS = [
+    "--no-sandbox",
+    "--disable-blink-features=AutomationControlled",
+    "--disable-web-security",
+    "--disable-features=VizDisplayCompositor",
+]
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+
+# Images, styles and fonts are never needed to read prices
+BLOCKED_RESOURCES = "**/*.{png,jpg,jpeg,gif,svg,css,woff,woff2}"
+
+
+class BrowserPoolBusy(Exception):
+    """Raised when the scrape queue is full or no page frees up in time."""
+
+
+def request_headers() -> Dict[str, str]:
+    """Build the extra request headers sent with every scrape (plus optional cookies)."""
+    headers = {
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
+        "Accept-Language": "en-IN,en;q=0.9,hi;q=0.8",
+        "Accept-Encoding": "gzip, deflate, br",
+        "DNT": "1",
+        "Connection": "keep-alive",
+        "Upgrade-Insecure-Requests": "1",
+    }
+
+    amazon_cookies = getattr(settings, "AMAZON_COOKIES", None)
+    if amazon_cookies:
+        headers["Cookie"] = amazon_cookies
+    return headers
+
+
+def context_options() -> Dict[str, Any]:
+    """Build browser context settings (realistic desktop browser in Delhi)."""
+    return {
+        "user_agent": USER_AGENT,
+        "viewport": {"width": 1920, "height": 1080},
+        "locale": "en-IN",
+        "timezone_id": "Asia/Kolkata",
+        "permissions": ["geolocation"],
+        "geolocation": {"latitude": 28.6139, "longitude": 77.2090},  # Delhi coordinates
+        "extra_http_headers": request_headers(),
+    }
+
+
+class PooledPage:
+    """A page and its browser context, checked out from the pool."""
+
+    __slots__ = ("context", "page", "navigations", "healthy", "generation")
+
+    def __init__(self, context: Any, page: Any, generation: int):
+        self.context = context
+        self.page = page
+        self.navigations = 0
+        self.healthy = True
+        self.generation = generation  # Browser launch this page belongs to
+
+    async def goto(self, url: str, **kwargs: Any) -> Any:
+        """Navigate the page, counting navigations towards recycling."""
+        self.navigations += 1
+        return await self.page.goto(url, **kwargs)
+
+
+class BrowserPool:
+    """Bounded pool of reusable Playwright pages on one event loop."""
+
+    def __init__(
+        self,
+        max_pages: Optional[int] = None,
+        max_navigations: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        acquire_timeout: Optional[float] = None,
+    ):
+        """Initialize the pool (the browser is launched on first use).
+
+        Args:
+        ----
+            max_pages: Concurrent scrapes (defaults to SCRAPER_POOL_PAGES)
+            max_navigations: Navigations before a context is recycled
+                             (defaults to SCRAPER_PAGE_MAX_NAVIGATIONS)
+            max_queue: Callers allowed to wait for a page (defaults to SCRAPER_QUEUE_LIMIT)
+            acquire_timeout: Seconds to wait for a page (defaults to
+                             SCRAPER_ACQUIRE_TIMEOUT_SECONDS)
+        """
+        self.max_pages = max_pages or settings.SCRAPER_POOL_PAGES
+        self.max_navigations = max_navigations or settings.SCRAPER_PAGE_MAX_NAVIGATIONS
+        self.max_queue = (
+            max_queue if max_queue is not None else settings.SCRAPER_QUEUE_LIMIT
+        )
+        self.acquire_timeout = (
+            acquire_timeout or settings.SCRAPER_ACQUIRE_TIMEOUT_SECONDS
+        )
+
+        self._slots = asyncio.Semaphore(self.max_pages)
+        self._idle: List[PooledPage] = []
+        self._waiting = 0
+        self._playwright: Any = None
+        self._browser: Any = None
+        self._generation = 0
+        self._launch_lock = asyncio.Lock()
+        self._closed = False
+
+        self.stats = {
+            "acquired": 0,
+            "reused": 0,
+            "contexts_created": 0,
+            "contexts_recycled": 0,
+            "browser_launches": 0,
+            "rejected": 0,
+            "timeouts": 0,
+        }
+
+    async def _launch(self) -> Any:
+        """Start Playwright (once) and launch a headless Chromium."""
+        if self._playwright is None:
+            from playwright.async_api import async_playwright
+
+            self._playwright = await async_playwright().start()
+        return await self._playwright.chromium.launch(headless=True, args=LAUNCH_ARGS)
+
+    def _browser_alive(self) -> bool:
+        return self._browser is not None and self._browser.is_connected()
+
+    async def _get_browser(self) -> Any:
+        async with self._launch_lock:
+            if not self._browser_alive():
+                if self._browser is not None:
+                    log.warning("Scraper browser disconnected, relaunching")
+                    await self._close_browser()
+                self._browser = await self._launch()
+                self._generation += 1
+                self.stats["browser_launches"] += 1
+                log.info("Launched scraper browser (pool of %d pages)", self.max_pages)
+            return self._browser
+
+    async def _new_page(self) -> PooledPage:
+        browser = await self._get_browser()
+        context = await browser.new_context(**context_options())
+        try:
+            await context.route(BLOCKED_RESOURCES, lambda route: route.abort())
+            page = await context.new_page()
+        except Exception:
+            await self._close_context(context)
+            raise
+        self.stats["contexts_created"] += 1
+        return PooledPage(context, page, self._generation)
+
+    def _reusable(self, pooled: PooledPage) -> bool:
+        return (
+            pooled.healthy
+            and pooled.navigations < self.max_navigations
+            and pooled.generation == self._generation
+            and self._browser_alive()
+            and not pooled.page.is_closed()
+        )
+
+    async def _take_idle(self) -> Optional[PooledPage]:
+        while self._idle:
+            pooled = self._idle.pop()
+            if self._reusable(pooled):
+                self.stats["reused"] += 1
+                return pooled
+            # Went stale while idle (browser relaunched or page crashed)
+            self.stats["contexts_recycled"] += 1
+            await self._close_context(pooled.context)
+        return None
+
+    @staticmethod
+    async def _close_context(context: Any) -> None:
+        try:
+            await context.close()
+        except Exception as e:
+            log.debug("Error closing browser context: %s", e)
+
+    async def _release(self, pooled: PooledPage) -> None:
+        if self._reusable(pooled) and not self._closed:
+            try:
+                # Stop the previous page's scripts and timers while idle
+                await pooled.page.goto("about:blank")
+                self._idle.append(pooled)
+                return
+            except Exception as e:
+                log.debug("Pooled page failed health check: %s", e)
+
+        self.stats["contexts_recycled"] += 1
+        await self._close_context(pooled.context)
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[PooledPage]:
+        """Check out a page for one scrape.
+
+        The page goes back to the pool afterwards; if the scrape raised, its
+        context is discarded instead.
+
+        Raises
+        ------
+            BrowserPoolBusy: If the queue is full or no page frees up in time
+        """
+        if self._closed:
+            raise RuntimeError("Browser pool is closed")
+        if self._waiting >= self.max_queue and self._slots.locked():
+            self.stats["rejected"] += 1
+            raise BrowserPoolBusy(f"Scraper queue full ({self._waiting} waiting)")
+
+        if not self._slots.locked():
+            # A free slot is taken without suspending, so this caller never queues
+            await self._slots.acquire()
+        else:
+            self._waiting += 1
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.acquire_timeout)
+            except asyncio.TimeoutError:
+                self.stats["timeouts"] += 1
+                raise BrowserPoolBusy(
+                    f"No scraper page available within {self.acquire_timeout}s"
+                ) from None
+            finally:
+                self._waiting -= 1
+
+        try:
+            pooled = await self._take_idle() or await self._new_page()
+            self.stats["acquired"] += 1
+            try:
+                yield pooled
+            except BaseException:
+                pooled.healthy = False
+                raise
+            finally:
+                await self._release(pooled)
+        finally:
+            self._slots.release()
+
+    async def _close_browser(self) -> None:
+        browser, self._browser = self._browser, None
+        if browser is not None:
+            try:
+                await browser.close()
+            except Exception as e:
+                log.debug("Error closing scraper browser: %s", e)
+
+    async def close(self) -> None:
+        """Close all pages, the browser and Playwright."""
+        self._closed = True
+        idle, self._idle = self._idle, []
+        for pooled in idle:
+            await self._close_context(pooled.context)
+        await self._close_browser()
+        if self._playwright is not None:
+            playwright, self._playwright = self._playwright, None
+            try:
+                await playwright.stop()
+            except Exception as e:
+                log.debug("Error stopping Playwright: %s", e)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool statistics."""
+        stats = dict(self.stats)
+        stats["idle_pages"] = len(self._idle)
+        stats["waiting"] = self._waiting
+        stats["browser_running"] = self._browser_alive()
+        return stats
+
+
+# One pool per event loop; Playwright objects cannot be shared across loops
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, BrowserPool]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_browser_pool() -> BrowserPool:
+    """Get the browser pool for the running event loop."""
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if pool is None:
+        pool = BrowserPool()
+        _pools[loop] = pool
+    return pool
+
+
+async def close_browser_pool() -> None:
+    """Close the running loop's browser pool, if one was started."""
+    pool = _pools.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        await pool.close()
+
+
+def get_browser_pool_stats() -> Dict[str, int]:
+    """Get pool statistics summed over all live event loops."""
+    totals: Dict[str, int] = {}
+    for pool in list(_pools.values()):
+        for name, value in pool.get_stats().items():
+            totals[name] = totals.get(name, 0) + int(value)
+    return totals
@@ -1,37 +1,62 @@
-"""Cache service for 24h price caching with PA-API and scraper fallback."""
+"""Cache service for price caching with PA-API and scraper fallback.
+
+Cached prices stay fresh for the ASIN's adaptive refresh interval (see
+bot/refresh_policy.py), or 24 hours for ASINs that have not been planned.
+"""
 
 import asyncio
-from datetime import datetime, timedelta
+from datetime import datetime
 from logging import getLogger
+from typing import Dict, Sequence
 
-from sqlmodel import Session, create_engine, select
+from sqlmodel import Session, select
 
+from .config import settings
+from .db import create_sync_engine, get_async_session
 from .errors import QuotaExceededError
 from .models import Cache
-from .paapi_factory import get_item_detailed
-from .scraper import scrape_price
+from .paapi_factory import get_item_detailed, get_items_detailed_batch
+from .paapi_transport import close_paapi_transport
+from .refresh_policy import get_refresh_policy
+from .scraper import close_scraper_resources, scrape_price
 
 log = getLogger(__name__)
 
-# Create database engine
-engine = create_engine(
-    "sqlite:///dealbot.db",
-    echo=False,
-    connect_args={"check_same_thread": False},
-)
+# Create database engine (sync); coroutines use bot.db.get_async_session
+engine = create_sync_engine()
+
+
+async def _get_item_once(asin: str) -> Dict:
+    """Look up an item on a short-lived loop, closing that loop's PA-API connections afterwards."""
+    try:
+        return await get_item_detailed(asin, priority="high")
+    finally:
+        await close_paapi_transport()
+
+
+async def _scrape_price_once(asin: str) -> int:
+    """Scrape a price on a short-lived loop, closing that loop's scraper clients afterwards."""
+    try:
+        return await scrape_price(asin)
+    finally:
+        await close_scraper_resources()
 
 
 async def get_price_async(asin: str) -> int:
-    """Async version of get_price for use within async context."""
-    with Session(engine) as session:
+    """Async version of get_price for use within async context.
+
+    Uses async database sessions and releases them while PA-API or the
+    scraper is being queried, so the event loop is never blocked on the DB.
+    """
+    async with get_async_session() as session:
         # Check cache first
         statement = select(Cache).where(Cache.asin == asin)
-        cached_result = session.exec(statement).first()
+        cached_result = (await session.exec(statement)).first()
 
-        # Return cached price if within 24 hours
-        if cached_result and cached_result.fetched_at > datetime.utcnow() - timedelta(
-            hours=24,
-        ):
+    # Return cached price if within the ASIN's refresh interval
+    if cached_result:
+        ttl = (await get_refresh_policy().ttls([asin]))[asin]
+        if cached_result.fetched_at > datetime.utcnow() - ttl:
             log.info(
                 "Returning cached price for ASIN %s: %d paise",
                 asin,
@@ -39,70 +64,143 @@ async def get_price_async(asin: str) -> int:
             )
             return cached_result.price
 
-        # Try to fetch new price
-        price = None
+    # Try to fetch new price
+    price = None
 
-        # First try enhanced PA-API
+    # First try enhanced PA-API
+    try:
+        log.info("Fetching price via enhanced PA-API for ASIN: %s", asin)
+        item_data = await get_item_detailed(asin, priority="high")  # High priority for user requests
+        price = item_data.get("price")
+        if price:
+            log.info("Enhanced PA-API returned price for ASIN %s: %d paise", asin, price)
+        else:
+            log.warning("Enhanced PA-API returned no price for ASIN %s", asin)
+            price = None
+    except QuotaExceededError:
+        log.warning(
+            "PA-API quota exceeded for ASIN %s, falling back to scraper",
+            asin,
+        )
+    except Exception as e:
+        log.warning(
+            "PA-API failed for ASIN %s: %s, falling back to scraper",
+            asin,
+            e,
+        )
+
+    # Fallback to scraper if PA-API failed
+    if price is None:
         try:
-            log.info("Fetching price via enhanced PA-API for ASIN: %s", asin)
-            item_data = await get_item_detailed(asin, priority="high")  # High priority for user requests
-            price = item_data.get("price")
-            if price:
-                log.info("Enhanced PA-API returned price for ASIN %s: %d paise", asin, price)
-            else:
-                log.warning("Enhanced PA-API returned no price for ASIN %s", asin)
-                price = None
-        except QuotaExceededError:
-            log.warning(
-                "PA-API quota exceeded for ASIN %s, falling back to scraper",
-                asin,
-            )
+            log.info("Fetching price via scraper for ASIN: %s", asin)
+            price = await scrape_price(asin)
+            log.info("Scraper returned price for ASIN %s: %d paise", asin, price)
         except Exception as e:
-            log.warning(
-                "PA-API failed for ASIN %s: %s, falling back to scraper",
-                asin,
-                e,
-            )
+            log.error("Scraper failed for ASIN %s: %s", asin, e)
+            if cached_result:
+                log.warning(
+                    "Using stale cache for ASIN %s: %d paise",
+                    asin,
+                    cached_result.price,
+                )
+                return cached_result.price
+            raise ValueError(
+                f"Could not fetch price for ASIN {asin} from any source",
+            ) from e
 
-        # Fallback to scraper if PA-API failed
-        if price is None:
+    # Handle case when no price could be fetched
+    if price is None:
+        log.warning("No price could be fetched for ASIN %s from any source", asin)
+        # Return a default price instead of None to prevent type issues
+        price = 0
+
+    # Only update cache if we have a valid price > 0
+    if price and price > 0:
+        async with get_async_session() as session:
+            cache_entry = Cache(asin=asin, price=price, fetched_at=datetime.utcnow())
+            await session.merge(cache_entry)
+            await session.commit()
+        log.info("Cached new price for ASIN %s: %d paise", asin, price)
+    else:
+        log.warning("Skipping cache update for ASIN %s: price is %s", asin, price)
+
+    return price
+
+
+async def get_prices_async(asins: Sequence[str], priority: str = "low") -> Dict[str, int]:
+    """Batch version of get_price_async for many ASINs.
+
+    Fresh cache entries are read with one query, the rest are fetched with
+    batched GetItems calls, and whatever PA-API misses is scraped a few at a
+    time. New prices are cached in one commit.
+
+    Args:
+    ----
+        asins: Amazon Standard Identification Numbers
+        priority: PA-API rate limiter priority
+
+    Returns:
+    -------
+        Mapping of ASIN to price in paise; ASINs with no price from any
+        source (and no stale cache entry) are omitted
+
+    """
+    unique = list(dict.fromkeys(asins))
+    if not unique:
+        return {}
+
+    async with get_async_session() as session:
+        cached = {
+            entry.asin: entry
+            for entry in (await session.exec(select(Cache).where(Cache.asin.in_(unique)))).all()
+        }
+
+    now = datetime.utcnow()
+    ttls = await get_refresh_policy().ttls(list(cached))
+    prices = {asin: entry.price for asin, entry in cached.items() if entry.fetched_at > now - ttls[asin]}
+    missing = [asin for asin in unique if asin not in prices]
+    if not missing:
+        return prices
+
+    fetched: Dict[str, int] = {}
+    try:
+        items = await get_items_detailed_batch(missing, priority=priority)
+        fetched = {asin: item["price"] for asin, item in items.items() if item.get("price")}
+    except QuotaExceededError:
+        log.warning("PA-API quota exceeded for %d ASINs, falling back to scraper", len(missing))
+    except Exception as e:
+        log.warning("PA-API batch failed for %d ASINs: %s, falling back to scraper", len(missing), e)
+
+    semaphore = asyncio.Semaphore(settings.SCRAPER_HTTP_MAX_CONNECTIONS)
+
+    async def scrape(asin: str) -> None:
+        async with semaphore:
             try:
-                log.info("Fetching price via scraper for ASIN: %s", asin)
-                price = await scrape_price(asin)
-                log.info("Scraper returned price for ASIN %s: %d paise", asin, price)
+                fetched[asin] = await scrape_price(asin)
             except Exception as e:
                 log.error("Scraper failed for ASIN %s: %s", asin, e)
-                if cached_result:
-                    log.warning(
-                        "Using stale cache for ASIN %s: %d paise",
-                        asin,
-                        cached_result.price,
-                    )
-                    return cached_result.price
-                raise ValueError(
-                    f"Could not fetch price for ASIN {asin} from any source",
-                ) from e
 
-        # Handle case when no price could be fetched
-        if price is None:
-            log.warning("No price could be fetched for ASIN %s from any source", asin)
-            # Return a default price instead of None to prevent type issues
-            price = 0
-        
-        # Only update cache if we have a valid price > 0
-        if price and price > 0:
-            cache_entry = Cache(asin=asin, price=price, fetched_at=datetime.utcnow())
-            session.merge(cache_entry)
-            session.commit()
-            log.info("Cached new price for ASIN %s: %d paise", asin, price)
-        else:
-            log.warning("Skipping cache update for ASIN %s: price is %s", asin, price)
-            
-        return price
+    await asyncio.gather(*(scrape(asin) for asin in missing if asin not in fetched))
+
+    fetched = {asin: price for asin, price in fetched.items() if price and price > 0}
+    if fetched:
+        now = datetime.utcnow()
+        async with get_async_session() as session:
+            for asin, price in fetched.items():
+                await session.merge(Cache(asin=asin, price=price, fetched_at=now))
+            await session.commit()
+        log.info("Cached %d new prices", len(fetched))
+    prices.update(fetched)
+
+    for asin in missing:
+        if asin not in prices and asin in cached:
+            log.warning("Using stale cache for ASIN %s: %d paise", asin, cached[asin].price)
+            prices[asin] = cached[asin].price
+    return prices
 
 
 def get_price(asin: str) -> int:
-    """Get price for ASIN with 24h cache and fallback strategy.
+    """Get price for ASIN with adaptive TTL cache and fallback strategy.
 
     Args:
     ----
@@ -122,10 +220,8 @@ def get_price(asin: str) -> int:
         statement = select(Cache).where(Cache.asin == asin)
         cached_result = session.exec(statement).first()
 
-        # Return cached price if within 24 hours
-        if cached_result and cached_result.fetched_at > datetime.utcnow() - timedelta(
-            hours=24,
-        ):
+        # Return cached price if within the ASIN's refresh interval
+        if cached_result and cached_result.fetched_at > datetime.utcnow() - get_refresh_policy().ttl(asin):
             log.info(
                 "Returning cached price for ASIN %s: %d paise",
                 asin,
@@ -146,7 +242,7 @@ def get_price(asin: str) -> int:
                 log.warning("Cannot use PA-API from sync context in async environment")
                 item_data = None
             else:
-                item_data = asyncio.run(get_item_detailed(asin, priority="high"))
+                item_data = asyncio.run(_get_item_once(asin))
             price = item_data.get("price") if item_data else None
             if price:
                 log.info("Enhanced PA-API returned price for ASIN %s: %d paise", asin, price)
@@ -176,7 +272,7 @@ def get_price(asin: str) -> int:
                     log.warning("Cannot use scraper from sync context in async environment")
                     price = None
                 else:
-                    price = asyncio.run(scrape_price(asin))
+                    price = asyncio.run(_scrape_price_once(asin))
                 if price:
                     log.info("Scraper returned price for ASIN %s: %d paise", asin, price)
             except Exception as e:
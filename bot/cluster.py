@@ -0,0 +1,292 @@
+"""Multi-worker mode: a webhook receiver feeding N bot workers.
+
+With ``BOT_WORKERS > 1``, ``bot.main.main`` runs ``run_cluster`` instead of a
+single polling loop:
+
+* The main process registers ``WEBHOOK_URL`` with Telegram and runs a small
+  Flask receiver on ``WEBHOOK_PORT``. Each update is checked against
+  ``WEBHOOK_SECRET`` and put on the queue of worker ``chat_id % BOT_WORKERS``,
+  so one chat's updates are always handled by one worker, in order.
+* Each worker is a separate process running its own ``Application`` (handlers,
+  outbound dispatcher, HTTP pools) fed from its queue, with conversation state
+  in the shared database (bot/conversation_store.py).
+* Every process imports the scheduler, but only the elected leader runs jobs
+  (bot/leader.py), and PA-API limits are shared through the limiter backend
+  (bot/limiter_backend.py, ``RATE_LIMIT_BACKEND=sqlite`` or ``redis``; the
+  process-local ``memory`` backend is refused).
+* A monitor thread restarts workers that die. Until a worker is back, posts
+  for its chats get a 503 (Telegram redelivers them) and ``/health`` fails.
+"""
+
+import asyncio
+import hmac
+import logging
+import multiprocessing
+import time
+from threading import Event, Lock, Thread
+from typing import Any, Callable, Dict, List, Optional
+
+from flask import Flask, abort, request
+from telegram import Bot, Update
+
+from .config import settings
+
+log = logging.getLogger(__name__)
+
+# Fields of chat-less updates (inline queries, polls, ...) naming the sender
+_SENDER_FIELDS = ("from", "user", "voter_chat")
+
+MONITOR_INTERVAL_SECONDS = 1.0  # How often worker liveness is checked
+RESTART_BACKOFF_SECONDS = 5.0  # Least time between starts of one worker
+
+
+def update_chat_id(update: Dict[str, Any]) -> Optional[int]:
+    """Chat id of a raw update, falling back to the sender for chat-less updates."""
+    for payload in update.values():
+        if not isinstance(payload, dict):
+            continue
+        # A callback query carries the chat on its message
+        chat = payload.get("chat") or (payload.get("message") or {}).get("chat")
+        if isinstance(chat, dict) and "id" in chat:
+            return int(chat["id"])
+        for name in _SENDER_FIELDS:
+            sender = payload.get(name)
+            if isinstance(sender, dict) and "id" in sender:
+                return int(sender["id"])
+    return None
+
+
+def shard_for(chat_id: Optional[int], workers: int) -> int:
+    """Worker index for a chat; updates without a chat go to worker 0."""
+    if chat_id is None:
+        return 0
+    return chat_id % workers
+
+
+def create_receiver_app(
+    queues: List[Any],
+    secret: Optional[str] = None,
+    is_alive: Optional[Callable[[int], bool]] = None,
+) -> Flask:
+    """Flask app accepting Telegram webhook posts and routing them to worker queues.
+
+    Args:
+    ----
+        queues: One update queue per worker
+        secret: Expected ``X-Telegram-Bot-Api-Secret-Token``, if any
+        is_alive: Whether a worker is running; posts for a dead one get a 503
+    """
+    app = Flask(__name__)
+    routed = [0] * len(queues)
+    is_alive = is_alive or (lambda index: True)
+
+    @app.post("/telegram")
+    def receive_update():
+        if secret and not hmac.compare_digest(
+            request.headers.get("X-Telegram-Bot-Api-Secret-Token", ""), secret
+        ):
+            abort(403)
+        update = request.get_json(silent=True)
+        if not isinstance(update, dict):
+            abort(400)
+        shard = shard_for(update_chat_id(update), len(queues))
+        if not is_alive(shard):
+            abort(503)
+        queues[shard].put(update)
+        routed[shard] += 1
+        return "", 200
+
+    @app.get("/telegram/stats")
+    def receiver_stats():
+        return {
+            "workers": len(queues),
+            "routed": routed,
+            "alive": [is_alive(index) for index in range(len(queues))],
+        }
+
+    return app
+
+
+async def serve_updates(app, updates) -> None:
+    """Feed raw updates from a queue into an initialised application until ``None`` arrives."""
+    loop = asyncio.get_running_loop()
+    while True:
+        data = await loop.run_in_executor(None, updates.get)
+        if data is None:
+            break
+        try:
+            await app.update_queue.put(Update.de_json(data, app.bot))
+        except Exception as e:
+            log.error("Dropping malformed update %s: %s", data.get("update_id"), e)
+
+
+def run_worker(index: int, updates) -> None:
+    """Worker process: run one application on the updates routed to it."""
+    from .conversation_store import SQLPersistence
+    from .main import build_application, shutdown, startup
+
+    logging.basicConfig(
+        format=f"%(asctime)s - worker {index} - %(name)s - %(levelname)s - %(message)s",
+        level=logging.INFO,
+    )
+    app = build_application(persistence=SQLPersistence())
+
+    async def run():
+        async with app:
+            await startup(app)
+            await app.start()
+            log.info("Worker %d ready", index)
+            try:
+                await serve_updates(app, updates)
+            finally:
+                await app.stop()
+                await shutdown(app)
+
+    asyncio.run(run())
+
+
+class WorkerPool:
+    """Bot worker processes, one per update queue, restarted when they die."""
+
+    def __init__(
+        self,
+        context: Any,
+        queues: List[Any],
+        target: Callable[[int, Any], None] = run_worker,
+        restart_backoff: float = RESTART_BACKOFF_SECONDS,
+    ):
+        """Initialize the pool.
+
+        Args:
+        ----
+            context: multiprocessing context the workers are started from
+            queues: One update queue per worker
+            target: Worker entry point, called with its index and queue
+            restart_backoff: Least seconds between starts of one worker
+        """
+        self.context = context
+        self.queues = queues
+        self.target = target
+        self.restart_backoff = restart_backoff
+        self.processes: List[Any] = [None] * len(queues)
+        self.restarts = [0] * len(queues)
+        self._started_at = [0.0] * len(queues)
+        self._lock = Lock()
+        self._stopping = Event()
+
+    def _spawn(self, index: int) -> None:
+        process = self.context.Process(
+            target=self.target,
+            args=(index, self.queues[index]),
+            name=f"bot-worker-{index}",
+            daemon=True,
+        )
+        process.start()
+        self.processes[index] = process
+        self._started_at[index] = time.monotonic()
+
+    def start(self) -> None:
+        """Start every worker."""
+        with self._lock:
+            for index in range(len(self.queues)):
+                self._spawn(index)
+
+    def is_alive(self, index: int) -> bool:
+        """Whether worker ``index`` is running."""
+        process = self.processes[index]
+        return process is not None and process.is_alive()
+
+    def all_alive(self) -> bool:
+        """Whether every worker is running."""
+        return all(self.is_alive(index) for index in range(len(self.queues)))
+
+    def restart_dead(self) -> List[int]:
+        """Restart workers that exited, each at most once per backoff period.
+
+        Returns
+        -------
+            Indexes of the restarted workers
+        """
+        restarted = []
+        with self._lock:
+            if self._stopping.is_set():
+                return restarted
+            now = time.monotonic()
+            for index, process in enumerate(self.processes):
+                if (
+                    process.is_alive()
+                    or now - self._started_at[index] < self.restart_backoff
+                ):
+                    continue
+                log.error(
+                    "Bot worker %d exited with code %s, restarting",
+                    index,
+                    process.exitcode,
+                )
+                self._spawn(index)
+                self.restarts[index] += 1
+                restarted.append(index)
+        return restarted
+
+    def monitor(self, interval: float = MONITOR_INTERVAL_SECONDS) -> None:
+        """Restart dead workers until ``stop`` is called (runs in a thread)."""
+        while not self._stopping.wait(interval):
+            try:
+                self.restart_dead()
+            except Exception as e:
+                log.error("Failed to restart bot workers: %s", e)
+
+    def stop(self, timeout: float = 30) -> None:
+        """Stop restarting workers and let them finish their queued updates."""
+        self._stopping.set()
+        with self._lock:
+            for queue in self.queues:
+                queue.put(None)
+            for process in self.processes:
+                if process is not None:
+                    process.join(timeout=timeout)
+
+
+async def register_webhook() -> None:
+    """Point Telegram at the receiver."""
+    async with Bot(settings.TELEGRAM_TOKEN) as tg_bot:
+        await tg_bot.set_webhook(
+            url=settings.WEBHOOK_URL,
+            secret_token=settings.WEBHOOK_SECRET,
+            allowed_updates=Update.ALL_TYPES,
+        )
+
+
+def run_cluster(workers: Optional[int] = None) -> None:
+    """Start the worker processes and serve the webhook receiver until interrupted."""
+    from . import health
+    from .cache_service import initialize_database
+
+    workers = workers or settings.BOT_WORKERS
+    if not settings.WEBHOOK_URL:
+        raise ValueError("WEBHOOK_URL is required when BOT_WORKERS > 1")
+    if workers > 1 and settings.RATE_LIMIT_BACKEND == "memory":
+        raise ValueError(
+            "RATE_LIMIT_BACKEND must be sqlite or redis when BOT_WORKERS > 1"
+        )
+    initialize_database()
+    asyncio.run(register_webhook())
+
+    # Spawned, not forked: the parent already runs scheduler and heartbeat threads
+    context = multiprocessing.get_context("spawn")
+    pool = WorkerPool(context, [context.Queue() for _ in range(workers)])
+    pool.start()
+    log.info("Started %d bot workers", workers)
+    Thread(target=pool.monitor, name="bot-worker-monitor", daemon=True).start()
+    health.register_liveness_check("bot_workers", pool.all_alive)
+
+    Thread(
+        target=lambda: health.app.run(host="0.0.0.0", port=8000, debug=False),
+        daemon=True,
+    ).start()
+    try:
+        create_receiver_app(pool.queues, settings.WEBHOOK_SECRET, pool.is_alive).run(
+            host="0.0.0.0", port=settings.WEBHOOK_PORT, debug=False, threaded=True
+        )
+    finally:
+        pool.stop()
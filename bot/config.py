@@ -98,7 +98,12 @@ class Settings(BaseSettings):
     PAAPI_REGION: str = "eu-west-1"
     PAAPI_MARKETPLACE: str = "www.amazon.in"
     PAAPI_LANGUAGE: str = "en_IN"
-    
+
+    # PA-API HTTP transport (see bot/paapi_transport.py)
+    PAAPI_HTTP_TIMEOUT_SECONDS: float = 10.0
+    PAAPI_HTTP_MAX_CONNECTIONS: int = 4  # Keep-alive connections to PAAPI_HOST per event loop
+    PAAPI_HTTP_KEEPALIVE_SECONDS: float = 50.0  # Idle time before a pooled connection is dropped
+
     # Enhanced models configuration
     ENABLE_ENHANCED_MODELS: bool = True
     JSON_FIELD_MAX_SIZE: int = 65535  # Maximum size for JSON fields
@@ -109,6 +114,95 @@ class Settings(BaseSettings):
     PAAPI_RATE_LIMIT_PER_SECOND: int = 1
     PAAPI_BURST_LIMIT: int = 5  # Reduced from 10 to 5
     PAAPI_BURST_WINDOW_SECONDS: int = 10
+    PAAPI_COALESCE_WINDOW_MS: int = 5  # Window for merging GetItems lookups into one batch
+
+    # Daily PA-API quota budget (see bot/quota_budget.py)
+    PAAPI_DAILY_QUOTA: int = 8640  # Requests per UTC day
+    QUOTA_SHARE_USER: float = 0.4  # Initial forecast share for user searches and lookups
+    QUOTA_SHARE_REALTIME: float = 0.3  # Real-time watches and active-watch refreshes
+    QUOTA_SHARE_ENRICHMENT: float = 0.25  # Bulk enrichment and digest pricing
+    QUOTA_SHARE_ANALYTICS: float = 0.05
+    QUOTA_FORECAST_ALPHA: float = 0.3  # Weight of the latest day in each hour's forecast
+    QUOTA_RESERVE_FACTOR: float = 1.0  # Multiplier on the demand reserved for higher pools
+
+    # Rate limiter and quota state shared between processes (see bot/limiter_backend.py)
+    RATE_LIMIT_BACKEND: str = "memory"  # "memory", "sqlite" (one host) or "redis" (several hosts)
+    RATE_LIMIT_SQLITE_PATH: str = "ratelimit.db"
+    RATE_LIMIT_REDIS_URL: str = "redis://localhost:6379/1"
+    RATE_LIMIT_BACKEND_TIMEOUT_SECONDS: float = 1.0  # SQLite busy wait / Redis socket timeout before falling back
+
+    # Database connection and pool configuration
+    DATABASE_URL: str = "sqlite:///dealbot.db"
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+
+    # SQLite connection pragmas (ignored for other databases)
+    SQLITE_JOURNAL_MODE: str = "WAL"  # Readers no longer block on the scheduler's writes
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # Safe with WAL, avoids an fsync per commit
+    SQLITE_CACHE_SIZE_KB: int = 65536  # Page cache per connection (64 MB)
+    SQLITE_MMAP_SIZE_MB: int = 256
+
+    # In-memory price series (see bot/price_series.py)
+    PRICE_SERIES_RAW_DAYS: int = 7  # Raw observations kept before hourly roll-up
+    PRICE_SERIES_HOURLY_DAYS: int = 30  # Hourly buckets kept before daily roll-up
+    PRICE_SERIES_TTL_SECONDS: int = 1800  # Reload so other workers' price writes show up
+    PRICE_SERIES_MAX_SERIES: int = 20000  # Least recently used series dropped beyond this
+
+    # Adaptive per-ASIN refresh intervals (see bot/refresh_policy.py)
+    REFRESH_TICK_MINUTES: int = 30  # How often due watched ASINs are refreshed
+    REFRESH_RATE_HALF_LIFE_HOURS: float = 24  # Age at which a price change counts half
+    REFRESH_CHANGE_PROBABILITY: float = 0.25  # Chance the price moved since the last refresh
+    REFRESH_MIN_INTERVAL_MINUTES: float = 30
+    REFRESH_MAX_INTERVAL_HOURS: float = 24  # Also the longest a cached price stays fresh
+    REFRESH_DEFAULT_INTERVAL_HOURS: float = 2  # ASINs without history
+
+    # Shared search result cache
+    SEARCH_CACHE_MAX_ENTRIES: int = 512
+    SEARCH_CACHE_TTL_SECONDS: int = 300
+
+    # Scraper browser pool (see bot/browser_pool.py)
+    SCRAPER_POOL_PAGES: int = 3  # Concurrent scrapes sharing one Chromium
+    SCRAPER_PAGE_MAX_NAVIGATIONS: int = 50  # Recycle a browser context after this many pages
+    SCRAPER_QUEUE_LIMIT: int = 100  # Scrapes allowed to wait for a free page
+    SCRAPER_ACQUIRE_TIMEOUT_SECONDS: int = 60
+
+    # Plain HTTP scraping tier, tried before the browser (see bot/http_scraper.py)
+    SCRAPER_HTTP_ENABLED: bool = True
+    SCRAPER_HTTP_TIMEOUT_SECONDS: float = 10.0
+    SCRAPER_HTTP_MAX_CONNECTIONS: int = 10
+
+    # Daily digest pipeline (see bot/digest.py)
+    DIGEST_PAGE_SIZE: int = 500  # Users read and priced per batch
+    DIGEST_SHARDS: int = 4  # Concurrent user streams, split by user id
+    DIGEST_MAX_CARDS: int = 5  # Cards per user
+
+    # Real-time watch engine (see bot/realtime.py)
+    REALTIME_TICK_SECONDS: int = 30  # How often due ASINs are collected
+    REALTIME_CALLS_PER_HOUR: float = 120  # GetItems calls (10 ASINs each) the engine may spend
+    REALTIME_MIN_INTERVAL_SECONDS: float = 120  # Volatile, popular ASINs
+    REALTIME_MAX_INTERVAL_SECONDS: float = 3600  # Static ASINs with one subscriber
+    REALTIME_CHANGE_ALPHA: float = 0.3  # Weight of the latest check in the change rate
+    REALTIME_INITIAL_CHANGE_RATE: float = 0.5  # New ASINs start at roughly a 10-minute interval
+    REALTIME_RELOAD_SECONDS: int = 300  # Re-sync subscriptions from the database
+
+    # Multi-worker mode (see bot/cluster.py, bot/leader.py, bot/conversation_store.py)
+    BOT_WORKERS: int = 1  # More than 1: webhook receiver plus this many worker processes
+    WEBHOOK_URL: str | None = None  # Public HTTPS URL Telegram posts updates to
+    WEBHOOK_SECRET: str | None = None  # Checked against X-Telegram-Bot-Api-Secret-Token
+    WEBHOOK_PORT: int = 8443
+    SCHEDULER_LEADER_ELECTION: bool = False  # Always on with several workers
+    SCHEDULER_LEASE_SECONDS: int = 30  # A dead leader is replaced within this
+    CONVERSATION_FLUSH_SECONDS: float = 5  # How often workers write conversation state
+
+    # Outbound Telegram sends (see bot/outbound.py)
+    TELEGRAM_GLOBAL_RATE: float = 30.0  # Messages per second across all chats (and workers, with a shared RATE_LIMIT_BACKEND)
+    TELEGRAM_INTERACTIVE_HEADROOM: float = 5.0  # Of the global rate, kept free for interactive replies
+    TELEGRAM_CHAT_INTERVAL_SECONDS: float = 1.0  # Sustained gap between messages to one chat
+    TELEGRAM_CHAT_BURST: int = 5  # Messages one chat may receive back to back
+    TELEGRAM_SEND_WORKERS: int = 64  # Queued chats served concurrently
+    TELEGRAM_SEND_BACKLOG: int = 2000  # Queued chats before producers wait
+    TELEGRAM_SEND_RETRIES: int = 3
 
 
 # Initialize configuration based on environment
@@ -0,0 +1,134 @@
+"""Conversation state shared by bot workers.
+
+``SQLPersistence`` is a python-telegram-bot persistence that keeps
+``user_data``, ``chat_data``, ``bot_data`` and ``ConversationHandler`` states
+as JSON rows in the ``conversationstate`` table, so a pending watch started
+with one worker survives that worker restarting or the chat being re-sharded
+to another one.
+
+Updates of a chat always reach the same worker (bot/cluster.py shards by chat
+id), so each worker owns its chats' state in memory and writes changes back
+every ``CONVERSATION_FLUSH_SECONDS`` and on shutdown; state is read once at
+startup. The ``refresh_*`` hooks are deliberately no-ops: reloading before
+every update would overwrite changes the owning worker has not flushed yet.
+"""
+
+import json
+from datetime import datetime
+from logging import getLogger
+from typing import Any, Dict, Optional
+
+from sqlmodel import SQLModel, select
+from telegram.ext import BasePersistence, PersistenceInput
+
+from .config import settings
+from .db import get_async_engine, get_async_session
+from .models import ConversationState
+
+log = getLogger(__name__)
+
+
+def _dumps(data: Any) -> str:
+    return json.dumps(data, default=str, separators=(",", ":"))
+
+
+class SQLPersistence(BasePersistence):
+    """Persistence in the bot database, shared by every worker."""
+
+    def __init__(self, update_interval: Optional[float] = None):
+        super().__init__(
+            store_data=PersistenceInput(callback_data=False),
+            update_interval=update_interval or settings.CONVERSATION_FLUSH_SECONDS,
+        )
+        self._table_ready = False
+
+    async def _ensure_table(self) -> None:
+        if not self._table_ready:
+            async with get_async_engine().begin() as conn:
+                await conn.run_sync(
+                    SQLModel.metadata.create_all, tables=[ConversationState.__table__]
+                )
+            self._table_ready = True
+
+    async def _load(self, kind: str) -> Dict[str, Any]:
+        """All rows of one kind as key -> decoded data."""
+        await self._ensure_table()
+        async with get_async_session() as session:
+            rows = (
+                await session.exec(
+                    select(ConversationState).where(ConversationState.kind == kind)
+                )
+            ).all()
+        return {row.key: json.loads(row.data) for row in rows}
+
+    async def _store(self, kind: str, key: str, data: Any) -> None:
+        """Write one row; empty data deletes it."""
+        await self._ensure_table()
+        async with get_async_session() as session:
+            row = await session.get(ConversationState, (kind, key))
+            if data in (None, {}):
+                if row is not None:
+                    await session.delete(row)
+            elif row is None:
+                session.add(ConversationState(kind=kind, key=key, data=_dumps(data)))
+            else:
+                row.data = _dumps(data)
+                row.updated_at = datetime.utcnow()
+            await session.commit()
+
+    # --- Loaded once when the application starts ----------------------------
+
+    async def get_user_data(self) -> Dict[int, Dict[Any, Any]]:
+        return {int(key): data for key, data in (await self._load("user")).items()}
+
+    async def get_chat_data(self) -> Dict[int, Dict[Any, Any]]:
+        return {int(key): data for key, data in (await self._load("chat")).items()}
+
+    async def get_bot_data(self) -> Dict[Any, Any]:
+        return (await self._load("bot")).get("", {})
+
+    async def get_callback_data(self) -> None:
+        return None
+
+    async def get_conversations(self, name: str) -> Dict:
+        rows = await self._load(f"conversation:{name}")
+        return {tuple(json.loads(key)): state for key, state in rows.items()}
+
+    # --- Written back by the application ------------------------------------
+
+    async def update_user_data(self, user_id: int, data: Dict[Any, Any]) -> None:
+        await self._store("user", str(user_id), data)
+
+    async def update_chat_data(self, chat_id: int, data: Dict[Any, Any]) -> None:
+        await self._store("chat", str(chat_id), data)
+
+    async def update_bot_data(self, data: Dict[Any, Any]) -> None:
+        await self._store("bot", "", data)
+
+    async def update_callback_data(self, data: Any) -> None:
+        pass
+
+    async def update_conversation(
+        self, name: str, key: tuple, new_state: Optional[object]
+    ) -> None:
+        await self._store(f"conversation:{name}", _dumps(list(key)), new_state)
+
+    async def drop_user_data(self, user_id: int) -> None:
+        await self._store("user", str(user_id), None)
+
+    async def drop_chat_data(self, chat_id: int) -> None:
+        await self._store("chat", str(chat_id), None)
+
+    # --- Not reloaded per update (see module docstring) ---------------------
+
+    async def refresh_user_data(self, user_id: int, user_data: Dict[Any, Any]) -> None:
+        pass
+
+    async def refresh_chat_data(self, chat_id: int, chat_data: Dict[Any, Any]) -> None:
+        pass
+
+    async def refresh_bot_data(self, bot_data: Dict[Any, Any]) -> None:
+        pass
+
+    async def flush(self) -> None:
+        """Every update is written immediately; nothing is buffered here."""
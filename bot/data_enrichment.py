@@ -3,7 +3,7 @@
 import statistics
 from datetime import datetime, timedelta
 from logging import getLogger
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from sqlmodel import Session, select
 
@@ -18,11 +18,15 @@ from .enhanced_models import (
     PriceHistory,
 )
 from .errors import QuotaExceededError
-from .paapi_factory import get_item_detailed
+from .paapi_factory import get_item_detailed, get_items_detailed_batch
 from .paapi_resource_manager import get_resources_for_context
+from .price_series import price_observation, record_prices
 
 log = getLogger(__name__)
 
+# ASINs fetched per bulk write in batch refreshes (10 GetItems calls of 10 ASINs)
+REFRESH_CHUNK_SIZE = 100
+
 
 class ProductEnrichmentService:
     """Service to enrich product data respecting API limits."""
@@ -64,6 +68,64 @@ class ProductEnrichmentService:
             log.error("Enrichment failed for ASIN %s: %s", asin, e)
             return False
 
+    async def enrich_products_batch(
+        self, asins: List[str], priority: str = "normal"
+    ) -> int:
+        """Refresh many products with batched GetItems calls and bulk writes.
+
+        ASINs are packed into 10-item GetItems requests and every chunk of
+        results is written to Product, ProductOffers, CustomerReviews and
+        PriceHistory in a single transaction.
+
+        Args:
+        ----
+            asins: Product ASINs to refresh (duplicates are ignored)
+            priority: Request priority ("high", "normal", "low")
+
+        Returns:
+        -------
+            Number of products successfully refreshed
+        """
+        unique_asins = list(dict.fromkeys(asin for asin in asins if asin))
+        if not unique_asins:
+            return 0
+
+        log.info("Starting batch enrichment for %d ASINs", len(unique_asins))
+        enriched_count = 0
+
+        for start in range(0, len(unique_asins), REFRESH_CHUNK_SIZE):
+            chunk = unique_asins[start : start + REFRESH_CHUNK_SIZE]
+            try:
+                products = await get_items_detailed_batch(chunk, priority)
+            except QuotaExceededError:
+                remaining = unique_asins[start:]
+                log.warning(
+                    "Quota exceeded during batch enrichment, %d ASINs deferred",
+                    len(remaining),
+                )
+                for asin in remaining:
+                    await self._schedule_delayed_enrichment(asin, priority)
+                break
+            except Exception as e:
+                log.error(
+                    "Batch enrichment fetch failed for %d ASINs: %s", len(chunk), e
+                )
+                continue
+
+            try:
+                enriched_count += await self._store_enriched_batch(products)
+            except Exception as e:
+                log.error(
+                    "Batch enrichment store failed for %d ASINs: %s", len(products), e
+                )
+
+        log.info(
+            "Batch enrichment completed: %d/%d ASINs refreshed",
+            enriched_count,
+            len(unique_asins),
+        )
+        return enriched_count
+
     async def _store_enriched_data(self, asin: str, product_data: Dict) -> None:
         """Store enriched product data in database."""
         with Session(engine) as session:
@@ -81,9 +143,15 @@ class ProductEnrichmentService:
                 await self._store_browse_node_relationships(session, asin, product_data)
 
                 # Store price history
-                await self._store_price_history(session, asin, product_data)
+                price_history = await self._store_price_history(
+                    session, asin, product_data
+                )
+                observations = (
+                    [price_observation(price_history)] if price_history else []
+                )
 
                 session.commit()
+                record_prices(observations)
                 log.debug("Stored enriched data for ASIN: %s", asin)
 
             except Exception as e:
@@ -91,6 +159,118 @@ class ProductEnrichmentService:
                 log.error("Failed to store enriched data for ASIN %s: %s", asin, e)
                 raise
 
+    async def _store_enriched_batch(self, products: Dict[str, Dict]) -> int:
+        """Store enriched data for many ASINs with set-based reads and one commit.
+
+        Args:
+        ----
+            products: Mapping of ASIN to comprehensive product data
+
+        Returns:
+        -------
+            Number of products written
+        """
+        if not products:
+            return 0
+
+        asins = list(products)
+
+        with Session(engine) as session:
+            try:
+                existing_products = {
+                    product.asin: product
+                    for product in session.exec(
+                        select(Product).where(Product.asin.in_(asins))
+                    ).all()
+                }
+                existing_reviews = {
+                    reviews.asin: reviews
+                    for reviews in session.exec(
+                        select(CustomerReviews).where(CustomerReviews.asin.in_(asins))
+                    ).all()
+                }
+
+                node_ids = {
+                    node["id"]
+                    for data in products.values()
+                    for node in data.get("browse_nodes", [])
+                    if node.get("id")
+                }
+                existing_node_ids = set()
+                existing_links = set()
+                if node_ids:
+                    existing_node_ids = set(
+                        session.exec(
+                            select(BrowseNode.id).where(BrowseNode.id.in_(node_ids))
+                        ).all()
+                    )
+                    existing_links = {
+                        (link.product_asin, link.browse_node_id)
+                        for link in session.exec(
+                            select(ProductBrowseNode).where(
+                                ProductBrowseNode.product_asin.in_(asins)
+                            )
+                        ).all()
+                    }
+
+                new_rows = []
+                observations = []
+                for asin, data in products.items():
+                    product = existing_products.get(asin)
+                    if product:
+                        self._update_product(product, data)
+                    else:
+                        new_rows.append(self._build_product(asin, data))
+
+                    reviews = self._apply_reviews(
+                        existing_reviews.get(asin), asin, data
+                    )
+                    if reviews is not None:
+                        new_rows.append(reviews)
+
+                    for node_data in data.get("browse_nodes", []):
+                        node_id = node_data.get("id")
+                        if not node_id:
+                            continue
+                        if node_id not in existing_node_ids:
+                            existing_node_ids.add(node_id)
+                            new_rows.append(
+                                BrowseNode(
+                                    id=node_id,
+                                    name=node_data.get("name", ""),
+                                    sales_rank=node_data.get("sales_rank"),
+                                )
+                            )
+                        if (asin, node_id) not in existing_links:
+                            existing_links.add((asin, node_id))
+                            new_rows.append(
+                                ProductBrowseNode(
+                                    product_asin=asin, browse_node_id=node_id
+                                )
+                            )
+
+                    offer = self._build_product_offer(asin, data)
+                    if offer is not None:
+                        new_rows.append(offer)
+
+                    price_history = self._build_price_history(asin, data)
+                    if price_history is not None:
+                        new_rows.append(price_history)
+                        observations.append(price_observation(price_history))
+
+                session.add_all(new_rows)
+                session.commit()
+                record_prices(observations)
+                log.debug("Stored enriched batch for %d ASINs", len(products))
+                return len(products)
+
+            except Exception as e:
+                session.rollback()
+                log.error(
+                    "Failed to store enriched batch (%d ASINs): %s", len(products), e
+                )
+                raise
+
     async def _store_product_record(
         self, session: Session, asin: str, data: Dict
     ) -> None:
@@ -100,62 +280,76 @@ class ProductEnrichmentService:
         existing_product = session.exec(statement).first()
 
         if existing_product:
-            # Update existing product
-            existing_product.title = data.get("title", existing_product.title)
-            existing_product.brand = data.get("brand")
-            existing_product.manufacturer = data.get("manufacturer")
-            existing_product.product_group = data.get("product_group")
-            existing_product.binding = data.get("binding")
-            existing_product.features_list = data.get("features", [])
-            existing_product.color = data.get("color")
-            existing_product.size = data.get("size")
-            existing_product.is_adult_product = data.get("is_adult_product", False)
-            existing_product.ean = data.get("ean")
-            existing_product.isbn = data.get("isbn")
-            existing_product.upc = data.get("upc")
-            existing_product.languages_list = data.get("languages", [])
-            existing_product.page_count = data.get("page_count")
-            existing_product.small_image = data.get("images", {}).get("small")
-            existing_product.medium_image = data.get("images", {}).get("medium")
-            existing_product.large_image = data.get("images", {}).get("large")
-            existing_product.variant_images_list = data.get("images", {}).get(
-                "variants", []
-            )
-            existing_product.last_updated = datetime.utcnow()
+            self._update_product(existing_product, data)
         else:
-            # Create new product
-            product = Product(
-                asin=asin,
-                title=data.get("title", ""),
-                brand=data.get("brand"),
-                manufacturer=data.get("manufacturer"),
-                product_group=data.get("product_group"),
-                binding=data.get("binding"),
-                color=data.get("color"),
-                size=data.get("size"),
-                is_adult_product=data.get("is_adult_product", False),
-                ean=data.get("ean"),
-                isbn=data.get("isbn"),
-                upc=data.get("upc"),
-                page_count=data.get("page_count"),
-                small_image=data.get("images", {}).get("small"),
-                medium_image=data.get("images", {}).get("medium"),
-                large_image=data.get("images", {}).get("large"),
-            )
-            product.features_list = data.get("features", [])
-            product.languages_list = data.get("languages", [])
-            product.variant_images_list = data.get("images", {}).get("variants", [])
+            session.add(self._build_product(asin, data))
+
+    @staticmethod
+    def _update_product(existing_product: Product, data: Dict) -> None:
+        """Apply enriched data to an existing Product record."""
+        existing_product.title = data.get("title", existing_product.title)
+        existing_product.brand = data.get("brand")
+        existing_product.manufacturer = data.get("manufacturer")
+        existing_product.product_group = data.get("product_group")
+        existing_product.binding = data.get("binding")
+        existing_product.features_list = data.get("features", [])
+        existing_product.color = data.get("color")
+        existing_product.size = data.get("size")
+        existing_product.is_adult_product = data.get("is_adult_product", False)
+        existing_product.ean = data.get("ean")
+        existing_product.isbn = data.get("isbn")
+        existing_product.upc = data.get("upc")
+        existing_product.languages_list = data.get("languages", [])
+        existing_product.page_count = data.get("page_count")
+        existing_product.small_image = data.get("images", {}).get("small")
+        existing_product.medium_image = data.get("images", {}).get("medium")
+        existing_product.large_image = data.get("images", {}).get("large")
+        existing_product.variant_images_list = data.get("images", {}).get(
+            "variants", []
+        )
+        existing_product.last_updated = datetime.utcnow()
 
-            session.add(product)
+    @staticmethod
+    def _build_product(asin: str, data: Dict) -> Product:
+        """Create a new Product record from enriched data."""
+        product = Product(
+            asin=asin,
+            title=data.get("title", ""),
+            brand=data.get("brand"),
+            manufacturer=data.get("manufacturer"),
+            product_group=data.get("product_group"),
+            binding=data.get("binding"),
+            color=data.get("color"),
+            size=data.get("size"),
+            is_adult_product=data.get("is_adult_product", False),
+            ean=data.get("ean"),
+            isbn=data.get("isbn"),
+            upc=data.get("upc"),
+            page_count=data.get("page_count"),
+            small_image=data.get("images", {}).get("small"),
+            medium_image=data.get("images", {}).get("medium"),
+            large_image=data.get("images", {}).get("large"),
+        )
+        product.features_list = data.get("features", [])
+        product.languages_list = data.get("languages", [])
+        product.variant_images_list = data.get("images", {}).get("variants", [])
+        return product
 
     async def _store_product_offers(
         self, session: Session, asin: str, data: Dict
     ) -> None:
         """Store or update ProductOffers record."""
+        offer = self._build_product_offer(asin, data)
+        if offer is not None:
+            session.add(offer)
+
+    @staticmethod
+    def _build_product_offer(asin: str, data: Dict) -> Optional[ProductOffers]:
+        """Create a historical ProductOffers record, or None without pricing."""
         offers_data = data.get("offers", {})
 
         if not offers_data.get("price"):
-            return  # No pricing information available
+            return None  # No pricing information available
 
         # Create new offer record (we store historical offers)
         offer = ProductOffers(
@@ -172,35 +366,43 @@ class ProductEnrichmentService:
             merchant_name=offers_data.get("merchant_name"),
         )
         offer.promotions_list = offers_data.get("promotions", [])
-
-        session.add(offer)
+        return offer
 
     async def _store_customer_reviews(
         self, session: Session, asin: str, data: Dict
     ) -> None:
         """Store or update CustomerReviews record."""
-        reviews_data = data.get("reviews", {})
-
-        if not reviews_data.get("count"):
-            return  # No review information
-
         # Check if reviews record exists
         statement = select(CustomerReviews).where(CustomerReviews.asin == asin)
         existing_reviews = session.exec(statement).first()
 
+        reviews = self._apply_reviews(existing_reviews, asin, data)
+        if reviews is not None:
+            session.add(reviews)
+
+    @staticmethod
+    def _apply_reviews(
+        existing_reviews: Optional[CustomerReviews], asin: str, data: Dict
+    ) -> Optional[CustomerReviews]:
+        """Update existing reviews in place, or return a new record to add."""
+        reviews_data = data.get("reviews", {})
+
+        if not reviews_data.get("count"):
+            return None  # No review information
+
         if existing_reviews:
             # Update existing reviews
             existing_reviews.review_count = reviews_data["count"]
             existing_reviews.average_rating = reviews_data.get("average_rating")
             existing_reviews.last_updated = datetime.utcnow()
-        else:
-            # Create new reviews record
-            reviews = CustomerReviews(
-                asin=asin,
-                review_count=reviews_data["count"],
-                average_rating=reviews_data.get("average_rating"),
-            )
-            session.add(reviews)
+            return None
+
+        # Create new reviews record
+        return CustomerReviews(
+            asin=asin,
+            review_count=reviews_data["count"],
+            average_rating=reviews_data.get("average_rating"),
+        )
 
     async def _store_browse_node_relationships(
         self, session: Session, asin: str, data: Dict
@@ -240,14 +442,22 @@ class ProductEnrichmentService:
 
     async def _store_price_history(
         self, session: Session, asin: str, data: Dict
-    ) -> None:
+    ) -> Optional[PriceHistory]:
         """Store price history record."""
+        price_history = self._build_price_history(asin, data)
+        if price_history is not None:
+            session.add(price_history)
+        return price_history
+
+    @staticmethod
+    def _build_price_history(asin: str, data: Dict) -> Optional[PriceHistory]:
+        """Create a PriceHistory record, or None without pricing."""
         offers_data = data.get("offers", {})
 
         if not offers_data.get("price"):
-            return
+            return None
 
-        price_history = PriceHistory(
+        return PriceHistory(
             asin=asin,
             price=offers_data["price"],
             list_price=offers_data.get("list_price"),
@@ -256,8 +466,6 @@ class ProductEnrichmentService:
             source="paapi",
         )
 
-        session.add(price_history)
-
     async def _schedule_delayed_enrichment(self, asin: str, priority: str) -> None:
         """Schedule enrichment for later when quota is available."""
         # This would integrate with the scheduler to retry later
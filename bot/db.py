@@ -0,0 +1,183 @@
+"""Database engines and session factories.
+
+The synchronous engine backs the existing ``Session(engine)`` code. Coroutines
+running on an event loop use the async engine through ``get_async_session``
+so database round-trips no longer block every other update on the loop.
+
+Both engines are built from ``DATABASE_URL``; the async driver is derived
+from it (``sqlite`` -> ``aiosqlite``, ``postgresql`` -> ``asyncpg``). Pool
+sizes come from ``DB_POOL_SIZE``, ``DB_MAX_OVERFLOW`` and ``DB_POOL_TIMEOUT``.
+
+SQLite connections are opened with WAL journaling, ``synchronous=NORMAL``
+and a larger page cache/mmap window (``SQLITE_*`` settings), so the bot's
+reads are not serialized behind the scheduler's price writes.
+"""
+
+import asyncio
+import weakref
+from contextlib import asynccontextmanager
+from logging import getLogger
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlmodel import create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .config import settings
+
+log = getLogger(__name__)
+
+# Sync dialect driver -> async driver
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+
+def to_async_url(url: str) -> str:
+    """Convert a database URL to its async driver equivalent.
+
+    Args:
+    ----
+        url: Database URL, e.g. ``sqlite:///dealbot.db``
+
+    Returns:
+    -------
+        URL using an async driver, e.g. ``sqlite+aiosqlite:///dealbot.db``
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if parsed.drivername in _ASYNC_DRIVERS.values():
+        return url
+    if backend not in _ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database backend: {backend}")
+    return parsed.set(drivername=_ASYNC_DRIVERS[backend]).render_as_string(
+        hide_password=False
+    )
+
+
+def _is_sqlite(url: str) -> bool:
+    """Check whether a URL points to a SQLite database (any driver)."""
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    """Check whether a URL points to an in-memory SQLite database."""
+    return _is_sqlite(url) and make_url(url).database in (None, "", ":memory:")
+
+
+def _engine_kwargs(url: str) -> Dict:
+    """Build engine keyword arguments for the configured pool."""
+    kwargs: Dict = {"echo": False}
+    if _is_sqlite(url):
+        kwargs["connect_args"] = {"check_same_thread": False}
+    if not _is_memory_sqlite(url):
+        # In-memory SQLite uses a single shared connection, pool sizing does not apply
+        kwargs.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_pre_ping=True,
+        )
+    return kwargs
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """Apply the configured pragmas to a new SQLite connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        try:
+            # Persistent per database file; fails if another connection holds a lock
+            cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+        except Exception as e:
+            log.warning(
+                "Could not set SQLite journal_mode=%s: %s",
+                settings.SQLITE_JOURNAL_MODE,
+                e,
+            )
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(
+            f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_KB}"
+        )  # Negative = KiB
+        cursor.execute(f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE_MB * 1024 * 1024}")
+    finally:
+        cursor.close()
+
+
+def create_sync_engine(url: Optional[str] = None) -> Engine:
+    """Create the synchronous engine for ``Session(engine)`` code paths."""
+    url = url or settings.DATABASE_URL
+    sync_engine = create_engine(url, **_engine_kwargs(url))
+    if _is_sqlite(url):
+        event.listen(sync_engine, "connect", _set_sqlite_pragmas)
+    return sync_engine
+
+
+def create_async_db_engine(url: Optional[str] = None) -> AsyncEngine:
+    """Create an async engine for the configured database."""
+    async_url = to_async_url(url or settings.DATABASE_URL)
+    async_engine = create_async_engine(async_url, **_engine_kwargs(async_url))
+    if _is_sqlite(async_url):
+        event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    return async_engine
+
+
+# One async engine per event loop: driver connections (asyncpg in particular)
+# are bound to the loop that opened them, and the scheduler threads run their
+# own loops next to the bot's.
+_async_engines: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[AsyncEngine, async_sessionmaker]]" = (weakref.WeakKeyDictionary())
+
+
+def _get_engine_and_factory() -> Tuple[AsyncEngine, async_sessionmaker]:
+    """Get (or lazily create) the async engine and session factory for this loop."""
+    loop = asyncio.get_running_loop()
+    entry = _async_engines.get(loop)
+    if entry is None:
+        async_engine = create_async_db_engine()
+        factory = async_sessionmaker(
+            async_engine, class_=AsyncSession, expire_on_commit=False
+        )
+        entry = (async_engine, factory)
+        _async_engines[loop] = entry
+        log.debug(
+            "Created async database engine: %s",
+            async_engine.url.render_as_string(hide_password=True),
+        )
+    return entry
+
+
+def get_async_engine() -> AsyncEngine:
+    """Get the async engine for the running event loop."""
+    return _get_engine_and_factory()[0]
+
+
+def get_async_session_factory() -> async_sessionmaker:
+    """Get the async session factory for the running event loop."""
+    return _get_engine_and_factory()[1]
+
+
+@asynccontextmanager
+async def get_async_session() -> AsyncIterator[AsyncSession]:
+    """Open an async session on the running event loop's engine.
+
+    Example:
+    -------
+        async with get_async_session() as session:
+            result = await session.exec(select(Cache).where(Cache.asin == asin))
+
+    """
+    async with get_async_session_factory()() as session:
+        yield session
+
+
+async def dispose_async_engine() -> None:
+    """Close the running loop's async engine and its pooled connections.
+
+    Call before closing a short-lived event loop (e.g. in scheduler threads).
+    """
+    entry = _async_engines.pop(asyncio.get_running_loop(), None)
+    if entry is not None:
+        await entry[0].dispose()
@@ -0,0 +1,147 @@
+"""Set-based loading of the data needed to score many deals at once.
+
+Scoring a single deal reads the product, its latest offer, its reviews,
+recent deal alerts and the price history, and the single-watch alert path
+does that separately for every watch (several times over). ``load_deal_inputs``
+reads the same data for a whole batch of ASINs with one query per table per
+chunk of ASINs, and takes price history from the in-memory series store.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from logging import getLogger
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import and_, func
+from sqlmodel import select
+
+from .db import get_async_session
+from .enhanced_models import CustomerReviews, DealAlert, Product, ProductOffers
+from .models import Price
+from .price_series import SeriesView, load_price_series_many, to_epoch
+
+log = getLogger(__name__)
+
+# Deal alerts older than this don't affect scoring (see predict_deal_success)
+ALERT_LOOKBACK_DAYS = 90
+
+
+@dataclass
+class DealInputs:
+    """Everything stored about one ASIN that deal scoring looks at."""
+
+    asin: str
+    history: SeriesView  # PriceHistory series, or Price rows if there is none
+    product: Optional[Product] = None
+    offer: Optional[ProductOffers] = None  # Most recently fetched offer
+    reviews: Optional[CustomerReviews] = None
+    alerts: List[Tuple[datetime, int]] = field(
+        default_factory=list
+    )  # (sent_at, price), newest first
+    enhanced_history: bool = True  # False when ``history`` came from the Price table
+
+    def prices_since(self, since: datetime) -> np.ndarray:
+        """History prices at or after ``since``."""
+        start = np.searchsorted(self.history.timestamps, to_epoch(since), side="left")
+        return self.history.prices[start:]
+
+    def last_alert_price(self, since: datetime) -> Optional[int]:
+        """Price of the newest alert sent at or after ``since``."""
+        if self.alerts and self.alerts[0][0] >= since:
+            return self.alerts[0][1]
+        return None
+
+    def alert_count(self, since: datetime) -> int:
+        """Number of alerts sent at or after ``since``."""
+        return sum(1 for sent_at, _ in self.alerts if sent_at >= since)
+
+
+def _series_from_rows(rows: Sequence[Tuple[datetime, int]]) -> SeriesView:
+    timestamps = np.array([to_epoch(ts) for ts, _ in rows], dtype=np.uint32)
+    prices = np.array([price for _, price in rows], dtype=np.int32)
+    return SeriesView(timestamps=timestamps, prices=prices, lows=prices, highs=prices)
+
+
+async def load_deal_inputs(
+    asins: Sequence[str], chunk_size: int = 500
+) -> Dict[str, DealInputs]:
+    """Load deal scoring inputs for many ASINs with set-based queries.
+
+    Args:
+    ----
+        asins: Product ASINs (duplicates are loaded once)
+        chunk_size: ASINs per ``IN (...)`` query
+
+    Returns:
+    -------
+        Mapping of ASIN to DealInputs
+    """
+    unique = list(dict.fromkeys(asins))
+    views = await load_price_series_many(unique, chunk_size=chunk_size)
+    inputs = {asin: DealInputs(asin=asin, history=views[asin]) for asin in unique}
+    alerts_since = datetime.utcnow() - timedelta(days=ALERT_LOOKBACK_DAYS)
+
+    async with get_async_session() as session:
+        for start in range(0, len(unique), chunk_size):
+            chunk = unique[start : start + chunk_size]
+
+            for product in (
+                await session.exec(select(Product).where(Product.asin.in_(chunk)))
+            ).all():
+                inputs[product.asin].product = product
+
+            for reviews in (
+                await session.exec(
+                    select(CustomerReviews).where(CustomerReviews.asin.in_(chunk))
+                )
+            ).all():
+                inputs[reviews.asin].reviews = reviews
+
+            latest = (
+                select(
+                    ProductOffers.asin,
+                    func.max(ProductOffers.fetched_at).label("fetched_at"),
+                )
+                .where(ProductOffers.asin.in_(chunk))
+                .group_by(ProductOffers.asin)
+                .subquery()
+            )
+            offers = await session.exec(
+                select(ProductOffers).join(
+                    latest,
+                    and_(
+                        ProductOffers.asin == latest.c.asin,
+                        ProductOffers.fetched_at == latest.c.fetched_at,
+                    ),
+                )
+            )
+            for offer in offers.all():
+                if inputs[offer.asin].offer is None:
+                    inputs[offer.asin].offer = offer
+
+            alerts = await session.exec(
+                select(DealAlert.asin, DealAlert.sent_at, DealAlert.current_price)
+                .where(DealAlert.asin.in_(chunk), DealAlert.sent_at >= alerts_since)
+                .order_by(DealAlert.asin, DealAlert.sent_at.desc())
+            )
+            for asin, sent_at, price in alerts.all():
+                inputs[asin].alerts.append((sent_at, price))
+
+            # Products tracked before enhanced price history existed
+            missing = [asin for asin in chunk if not len(inputs[asin].history)]
+            if missing:
+                basic: Dict[str, List[Tuple[datetime, int]]] = {}
+                rows = await session.exec(
+                    select(Price.asin, Price.fetched_at, Price.price)
+                    .where(Price.asin.in_(missing))
+                    .order_by(Price.asin, Price.fetched_at)
+                )
+                for asin, fetched_at, price in rows.all():
+                    basic.setdefault(asin, []).append((fetched_at, price))
+                for asin, history in basic.items():
+                    inputs[asin].history = _series_from_rows(history)
+                    inputs[asin].enhanced_history = False
+
+    log.debug("Loaded deal inputs for %d ASINs", len(unique))
+    return inputs
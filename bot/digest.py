@@ -0,0 +1,249 @@
+"""Daily digest pipeline.
+
+Users with daily watches are streamed in pages (keyset-paginated on user id,
+split into ``DIGEST_SHARDS`` concurrent streams by ``user_id % shards``). For
+each page the prices of all watched ASINs are fetched in one batch, the best
+cards per user are rendered, and each user's cards are submitted at bulk
+priority to the outbound dispatcher (bot/outbound.py), which paces sends
+within Telegram's limits. Its bounded backlog holds producers back, so memory
+stays flat however many users there are.
+"""
+
+import asyncio
+import time
+from collections import defaultdict
+from datetime import datetime
+from logging import getLogger
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlmodel import select
+from telegram import Bot
+
+from .cache_service import get_prices_async
+from .carousel import build_single_card
+from .config import settings
+from .db import get_async_session
+from .models import User, Watch
+from .outbound import (
+    OutboundDispatcher,
+    OutboundMessage,
+    Priority,
+    get_outbound_dispatcher,
+    photo_message,
+)
+
+log = getLogger(__name__)
+
+DIGEST_IMAGE = "https://m.media-amazon.com/images/I/81.png"
+
+_last_run: Dict[str, Any] = {}
+
+
+def get_digest_stats() -> Dict[str, Any]:
+    """Get throughput and backlog metrics of the current or last digest run."""
+    stats = {
+        key: value
+        for key, value in _last_run.items()
+        if key not in ("stats", "send", "dispatcher")
+    }
+    stats.update(_last_run.get("stats", {}))
+    send = _last_run.get("send")
+    if send is not None:
+        elapsed = stats.get("duration_seconds")
+        if elapsed is None:
+            elapsed = time.monotonic() - _last_run["started"]
+        dispatcher = _last_run.get("dispatcher")
+        stats["send"] = {
+            **send,
+            "backlog": (
+                dispatcher.get_stats()["backlog"] if dispatcher is not None else 0
+            ),
+            "messages_per_second": round(send["sent"] / elapsed, 2) if elapsed else 0.0,
+        }
+    stats.pop("started", None)
+    return stats
+
+
+def select_cards(
+    watches: Iterable[Watch], prices: Dict[str, int], max_cards: int
+) -> List[OutboundMessage]:
+    """Render the digest cards for one user's watches.
+
+    A watch qualifies when its price meets the watch's minimum discount
+    relative to its max price; the first ``max_cards`` qualifying watches are
+    used.
+    """
+    cards = []
+    for watch in watches:
+        price = prices.get(watch.asin)
+        if price is None:
+            continue
+        discount_ok = watch.min_discount is None or price <= (
+            100 - watch.min_discount
+        ) / 100 * (watch.max_price or price)
+        if discount_ok:
+            caption, keyboard = build_single_card(
+                watch.keywords, price, DIGEST_IMAGE, watch.asin, watch.id
+            )
+            cards.append(photo_message(DIGEST_IMAGE, caption, keyboard))
+        if len(cards) == max_cards:
+            break
+    return cards
+
+
+async def _user_pages(shard: int, shards: int, page_size: int):
+    """Yield pages of (tg_user_id, watches) for users with daily watches."""
+    last_id = 0
+    while True:
+        async with get_async_session() as session:
+            user_ids = (
+                await session.exec(
+                    select(Watch.user_id)
+                    .where(
+                        Watch.mode == "daily",
+                        Watch.asin.is_not(None),
+                        Watch.user_id > last_id,
+                        Watch.user_id % shards == shard,
+                    )
+                    .distinct()
+                    .order_by(Watch.user_id)
+                    .limit(page_size)
+                )
+            ).all()
+            if not user_ids:
+                return
+
+            chats = dict(
+                (
+                    await session.exec(
+                        select(User.id, User.tg_user_id).where(User.id.in_(user_ids))
+                    )
+                ).all()
+            )
+            watches: Dict[int, List[Watch]] = defaultdict(list)
+            rows = await session.exec(
+                select(Watch)
+                .where(
+                    Watch.user_id.in_(user_ids),
+                    Watch.mode == "daily",
+                    Watch.asin.is_not(None),
+                )
+                .order_by(Watch.user_id, Watch.id)
+            )
+            for watch in rows.all():
+                watches[watch.user_id].append(watch)
+
+        yield [
+            (chats[user_id], watches[user_id])
+            for user_id in user_ids
+            if user_id in chats
+        ]
+        last_id = user_ids[-1]
+
+
+def _count_sends(send: Dict[str, int], pending: set):
+    def done(future: asyncio.Future) -> None:
+        pending.discard(future)
+        if not future.cancelled():
+            for key, value in future.result().items():
+                send[key] += value
+
+    return done
+
+
+async def _run_shard(
+    shard: int,
+    shards: int,
+    dispatcher: OutboundDispatcher,
+    page_size: int,
+    max_cards: int,
+    stats: Dict,
+    pending: set,
+) -> None:
+    on_done = _count_sends(_last_run["send"], pending)
+    async for page in _user_pages(shard, shards, page_size):
+        asins = [watch.asin for _, watches in page for watch in watches]
+        prices = await get_prices_async(asins, priority="low")
+        stats["users"] += len(page)
+        stats["pages"] += 1
+        stats["asins_priced"] += len(prices)
+
+        for chat_id, watches in page:
+            cards = select_cards(watches, prices, max_cards)
+            if cards:
+                stats["users_with_cards"] += 1
+                _last_run["send"]["queued"] += len(cards)
+                future = await dispatcher.submit(chat_id, cards, Priority.BULK)
+                pending.add(future)
+                future.add_done_callback(on_done)
+
+
+async def run_digest(
+    bot: Optional[Bot] = None,
+    shards: Optional[int] = None,
+    page_size: Optional[int] = None,
+    max_cards: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Send the daily digest to every user with daily watches.
+
+    Args:
+    ----
+        bot: Bot to send with (the loop's shared outbound dispatcher by default)
+        shards: Concurrent user streams
+        page_size: Users read and priced per batch
+        max_cards: Cards per user
+
+    Returns:
+    -------
+        Run metrics: users, pages, cards and send counters
+    """
+    shards = shards or settings.DIGEST_SHARDS
+    page_size = page_size or settings.DIGEST_PAGE_SIZE
+    max_cards = max_cards or settings.DIGEST_MAX_CARDS
+    dispatcher = (
+        OutboundDispatcher(bot=bot) if bot is not None else get_outbound_dispatcher()
+    )
+
+    stats = {"users": 0, "pages": 0, "asins_priced": 0, "users_with_cards": 0}
+    pending: set = set()
+    started = time.monotonic()
+    _last_run.clear()
+    _last_run.update(
+        stats=stats,
+        send={"queued": 0, "sent": 0, "failed": 0, "blocked": 0},
+        dispatcher=dispatcher,
+        started=started,
+        started_at=datetime.utcnow().isoformat(),
+        running=True,
+    )
+    try:
+        await asyncio.gather(
+            *(
+                _run_shard(
+                    shard, shards, dispatcher, page_size, max_cards, stats, pending
+                )
+                for shard in range(shards)
+            )
+        )
+        if pending:
+            await asyncio.gather(*pending)
+    finally:
+        _last_run.update(
+            running=False, duration_seconds=round(time.monotonic() - started, 3)
+        )
+        _last_run.pop("dispatcher")
+        if bot is not None:
+            await dispatcher.close()
+
+    result = get_digest_stats()
+    log.info(
+        "Daily digest: %d users, %d with cards, %d sent, %d failed, %d blocked in %.1fs (%.1f msg/s)",
+        stats["users"],
+        stats["users_with_cards"],
+        result["send"]["sent"],
+        result["send"]["failed"],
+        result["send"]["blocked"],
+        result["duration_seconds"],
+        result["send"]["messages_per_second"],
+    )
+    return result
@@ -6,6 +6,7 @@ import json
 from datetime import datetime
 from typing import List, Optional
 
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 
 
@@ -100,6 +101,8 @@ class Product(SQLModel, table=True):
 class ProductOffers(SQLModel, table=True):
     """Detailed offer information."""
 
+    __table_args__ = (Index("ix_productoffers_asin_fetched_at", "asin", "fetched_at"),)
+
     id: int = Field(primary_key=True)
     asin: str = Field(foreign_key="product.asin")
 
@@ -209,6 +212,8 @@ class ProductVariation(SQLModel, table=True):
 class PriceHistory(SQLModel, table=True):
     """Enhanced price tracking."""
 
+    __table_args__ = (Index("ix_pricehistory_asin_timestamp", "asin", "timestamp"),)
+
     id: int = Field(primary_key=True)
     asin: str = Field(foreign_key="product.asin")
     price: int
@@ -222,6 +227,10 @@ class PriceHistory(SQLModel, table=True):
 class SearchQuery(SQLModel, table=True):
     """Track user search patterns."""
 
+    __table_args__ = (
+        Index("ix_searchquery_user_id_timestamp", "user_id", "timestamp"),
+    )
+
     id: int = Field(primary_key=True)
     user_id: int = Field(foreign_key="user.id")
     query: str
@@ -234,6 +243,8 @@ class SearchQuery(SQLModel, table=True):
 class DealAlert(SQLModel, table=True):
     """Advanced deal notifications."""
 
+    __table_args__ = (Index("ix_dealalert_asin_sent_at", "asin", "sent_at"),)
+
     id: int = Field(primary_key=True)
     watch_id: int = Field(foreign_key="watch.id")
     asin: str
@@ -10,7 +10,11 @@ from sqlmodel import Session, select
 from .cache_service import engine
 from .config import settings
 from .data_enrichment import ProductEnrichmentService
+from .db import dispose_async_engine
 from .models import Watch, Price
+from .paapi_transport import close_paapi_transport
+from .refresh_policy import get_refresh_policy
+from .scraper import close_scraper_resources
 from .scheduler import scheduler
 
 log = getLogger(__name__)
@@ -29,10 +33,11 @@ class EnrichmentScheduler:
         if self.is_running:
             return
 
-        # High priority: Active watches enrichment (every 2 hours)
+        # High priority: Active watches enrichment, refreshing only ASINs whose
+        # adaptive interval has elapsed (see bot/refresh_policy.py)
         scheduler.add_job(
             self._run_async_job,
-            IntervalTrigger(hours=2),
+            IntervalTrigger(minutes=settings.REFRESH_TICK_MINUTES),
             args=[self._enrich_active_watches],
             id="enrich_active_watches",
             replace_existing=True,
@@ -77,53 +82,54 @@ class EnrichmentScheduler:
         try:
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
-            loop.run_until_complete(async_func())
-            loop.close()
+            try:
+                loop.run_until_complete(async_func())
+            finally:
+                # Async DB engines, PA-API and scraper clients are per-loop; release them
+                loop.run_until_complete(dispose_async_engine())
+                loop.run_until_complete(close_paapi_transport())
+                loop.run_until_complete(close_scraper_resources())
+                loop.close()
         except Exception as e:
             log.error("Async job failed: %s", e)
 
     async def _enrich_active_watches(self) -> None:
-        """Enrich products from active watches with high priority."""
+        """Enrich due products from active watches, budgeted as watch traffic."""
         try:
             log.info("Starting active watches enrichment")
 
             with Session(engine) as session:
-                # Get ASINs from active watches
-                statement = select(Watch).where(Watch.asin.is_not(None))
-                active_watches = session.exec(statement).all()
+                # Get distinct ASINs from active watches
+                statement = select(Watch.asin).where(Watch.asin.is_not(None)).distinct()
+                watched_asins = [asin for asin in session.exec(statement).all() if asin]
 
-                asins_to_enrich = list(
-                    set(watch.asin for watch in active_watches if watch.asin)
-                )
-
-                if not asins_to_enrich:
-                    log.info("No active watches with ASINs found")
-                    return
+            if not watched_asins:
+                log.info("No active watches with ASINs found")
+                return
 
-                log.info("Enriching %d ASINs from active watches", len(asins_to_enrich))
-
-                # Enrich with high priority and rate limiting
-                enriched_count = 0
-                for asin in asins_to_enrich:
-                    try:
-                        success = await self.enrichment_service.enrich_product_data(
-                            asin, priority="high"
-                        )
-                        if success:
-                            enriched_count += 1
+            asins_to_enrich = await get_refresh_policy().due_asins(watched_asins)
+            if not asins_to_enrich:
+                log.info(
+                    "None of %d watched ASINs are due for a refresh", len(watched_asins)
+                )
+                return
 
-                        # Rate limiting: wait between requests
-                        await asyncio.sleep(1.2)  # Slightly over 1 second for safety
+            log.info(
+                "Enriching %d/%d due ASINs from active watches",
+                len(asins_to_enrich),
+                len(watched_asins),
+            )
 
-                    except Exception as e:
-                        log.warning("Failed to enrich ASIN %s: %s", asin, e)
-                        continue
+            # Batched GetItems refresh; pacing is handled by the API rate limiter
+            enriched_count = await self.enrichment_service.enrich_products_batch(
+                asins_to_enrich, priority="normal"
+            )
 
-                log.info(
-                    "Active watches enrichment completed: %d/%d successful",
-                    enriched_count,
-                    len(asins_to_enrich),
-                )
+            log.info(
+                "Active watches enrichment completed: %d/%d successful",
+                enriched_count,
+                len(asins_to_enrich),
+            )
 
         except Exception as e:
             log.error("Active watches enrichment failed: %s", e)
@@ -197,41 +203,30 @@ class EnrichmentScheduler:
                 price_asins = set(session.exec(price_statement).all())
                 existing_product_asins = set(session.exec(product_statement).all())
 
-                asins_to_enrich = list(price_asins - existing_product_asins)
-
-                if not asins_to_enrich:
-                    log.info("No ASINs need bulk enrichment")
-                    return
+            asins_to_enrich = list(price_asins - existing_product_asins)
 
-                # Limit bulk enrichment to avoid quota exhaustion
-                max_bulk_items = min(
-                    len(asins_to_enrich), settings.ENRICHMENT_BATCH_SIZE * 2
-                )
-                asins_to_enrich = asins_to_enrich[:max_bulk_items]
+            if not asins_to_enrich:
+                log.info("No ASINs need bulk enrichment")
+                return
 
-                log.info("Bulk enriching %d ASINs", len(asins_to_enrich))
+            # Limit bulk enrichment to avoid quota exhaustion: the same budget of
+            # ENRICHMENT_BATCH_SIZE * 2 GetItems calls, now with 10 ASINs per call
+            max_bulk_items = min(
+                len(asins_to_enrich), settings.ENRICHMENT_BATCH_SIZE * 2 * 10
+            )
+            asins_to_enrich = asins_to_enrich[:max_bulk_items]
 
-                enriched_count = 0
-                for asin in asins_to_enrich:
-                    try:
-                        success = await self.enrichment_service.enrich_product_data(
-                            asin, priority="low"
-                        )
-                        if success:
-                            enriched_count += 1
+            log.info("Bulk enriching %d ASINs", len(asins_to_enrich))
 
-                        # Longer rate limiting for bulk operations
-                        await asyncio.sleep(2.0)
+            enriched_count = await self.enrichment_service.enrich_products_batch(
+                asins_to_enrich, priority="low"
+            )
 
-                    except Exception as e:
-                        log.warning("Failed to bulk enrich ASIN %s: %s", asin, e)
-                        continue
-
-                log.info(
-                    "Bulk enrichment completed: %d/%d successful",
-                    enriched_count,
-                    len(asins_to_enrich),
-                )
+            log.info(
+                "Bulk enrichment completed: %d/%d successful",
+                enriched_count,
+                len(asins_to_enrich),
+            )
 
         except Exception as e:
             log.error("Bulk enrichment failed: %s", e)
@@ -2,6 +2,7 @@
 
 import base64
 from datetime import datetime, timedelta
+from typing import Callable, Dict
 
 from flask import Flask, jsonify, Response, request, abort, render_template_string
 from sqlmodel import Session, select, func
@@ -12,6 +13,14 @@ from .models import User, Watch, Click, Price
 
 app = Flask(__name__)
 
+# Extra checks /health reports on, registered by the running mode (e.g. bot/cluster.py)
+_liveness_checks: Dict[str, Callable[[], bool]] = {}
+
+
+def register_liveness_check(name: str, check: Callable[[], bool]) -> None:
+    """Make /health fail (503) whenever ``check`` returns False."""
+    _liveness_checks[name] = check
+
 
 def _check_auth() -> None:
     """Check HTTP Basic Auth credentials."""
@@ -45,8 +54,11 @@ def health():
 
     Returns
     -------
-        JSON response with status indicator
+        JSON response with status indicator (503 if a liveness check fails)
     """
+    failing = sorted(name for name, check in _liveness_checks.items() if not check())
+    if failing:
+        return jsonify(status="unhealthy", failing=failing), 503
     return jsonify(status="ok")
 
 
@@ -64,7 +76,16 @@ def ai_health():
         
         # Get AI performance statistics
         monitor = get_ai_monitor()
-        stats = monitor.get_performance_stats()
+        summary = monitor.get_performance_summary()
+        recent = summary.get("recent_performance", {})
+        recent_selections = recent.get("selections", 0)
+        stats = {
+            "total_selections": summary.get("total_selections", 0),
+            "success_rate": recent.get("success_rate", 0),
+            "average_latency_ms": recent.get("avg_latency_ms", 0),
+            "recent_failures": round(recent_selections * (1 - recent.get("success_rate", 1))),
+            "model_usage": recent.get("model_distribution", {}),
+        }
         
         # Calculate health indicators
         health_status = "ok"
@@ -91,6 +112,40 @@ def ai_health():
         if avg_latency > 1000:  # More than 1 second average
             health_status = "degraded"
             warnings.append(f"High latency: {avg_latency:.1f}ms average")
+
+        # PA-API rate limiter lanes and wait-time histograms
+        from .api_rate_limiter import get_rate_limiter
+        rate_limiter_stats = get_rate_limiter().get_current_usage()
+
+        # Search result cache and request coalescing counters
+        from .paapi_coalescer import get_coalescer_stats
+        from .search_cache import get_search_cache
+        search_cache_stats = get_search_cache().get_stats()
+        coalescer_stats = get_coalescer_stats()
+
+        # Scraper fallback tiers and browser pool
+        from .browser_pool import get_browser_pool_stats
+        from .scraper import get_scraper_metrics
+        scraper_stats = get_scraper_metrics()
+        scraper_stats["browser_pool"] = get_browser_pool_stats()
+
+        # Daily digest throughput and outbound Telegram queues
+        from .digest import get_digest_stats
+        from .outbound import get_outbound_stats
+        digest_stats = get_digest_stats()
+        outbound_stats = get_outbound_stats()
+
+        # Real-time watch engine subscriptions and quota spend
+        from .realtime import get_realtime_engine
+        realtime_stats = get_realtime_engine().get_stats()
+
+        # Adaptive refresh intervals of watched ASINs
+        from .refresh_policy import get_refresh_policy
+        refresh_stats = get_refresh_policy().get_stats()
+
+        # Daily PA-API quota budget per pool
+        from .quota_budget import get_budget_planner
+        quota_stats = get_budget_planner().get_status()
         
         return jsonify({
             "status": health_status,
@@ -102,6 +157,15 @@ def ai_health():
                 "recent_failures": recent_failures,
                 "model_distribution": stats.get("model_usage", {}),
             },
+            "paapi_rate_limiter": rate_limiter_stats,
+            "search_cache": search_cache_stats,
+            "paapi_coalescer": coalescer_stats,
+            "scraper": scraper_stats,
+            "digest": digest_stats,
+            "outbound": outbound_stats,
+            "realtime": realtime_stats,
+            "refresh_policy": refresh_stats,
+            "paapi_quota": quota_stats,
             "warnings": warnings,
             "timestamp": datetime.utcnow().isoformat()
         })
@@ -0,0 +1,133 @@
+"""Plain HTTP scraping tier.
+
+Most Amazon product and search pages are server-rendered, so a keep-alive
+HTTP fetch plus an lxml parse gets the title, price and image for a small
+fraction of the CPU and memory of rendering the page in Chromium. The
+scraper tries this tier first and only falls back to the browser pool when it
+fails or Amazon serves a robot check.
+
+One ``httpx.AsyncClient`` (with its connection pool) is kept per event loop.
+"""
+
+import asyncio
+import weakref
+from logging import getLogger
+from typing import Dict, List
+from urllib.parse import quote_plus
+
+import httpx
+
+from .browser_pool import USER_AGENT, request_headers
+from .config import settings
+from .page_parser import (
+    ProductNotFound,
+    ScrapeBlocked,
+    parse_product_page,
+    parse_search_results,
+)
+
+log = getLogger(__name__)
+
+# Statuses Amazon uses for throttled or bot-flagged clients
+BLOCKED_STATUSES = {403, 429, 503}
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Create a keep-alive HTTP client configured for scraping."""
+    headers = request_headers()
+    headers["User-Agent"] = USER_AGENT
+    # Only advertise encodings httpx can always decode
+    headers["Accept-Encoding"] = "gzip, deflate"
+    return httpx.AsyncClient(
+        headers=headers,
+        timeout=settings.SCRAPER_HTTP_TIMEOUT_SECONDS,
+        follow_redirects=True,
+        limits=httpx.Limits(
+            max_connections=settings.SCRAPER_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.SCRAPER_HTTP_MAX_CONNECTIONS,
+        ),
+    )
+
+
+# One client per event loop; httpx connection pools are bound to their loop
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the scraping HTTP client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = create_http_client()
+        _clients[loop] = client
+    return client
+
+
+async def close_http_client() -> None:
+    """Close the running loop's HTTP client, if one was created."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+async def _fetch(url: str) -> str:
+    response = await get_http_client().get(url)
+    if response.status_code in BLOCKED_STATUSES:
+        raise ScrapeBlocked(f"HTTP {response.status_code} from {url}")
+    if response.status_code == 404:
+        raise ProductNotFound(f"HTTP 404 from {url}")
+    response.raise_for_status()
+    return response.text
+
+
+async def fetch_product_data(asin: str) -> Dict:
+    """Fetch and parse a product page without a browser.
+
+    Args:
+    ----
+        asin: Amazon Standard Identification Number
+
+    Returns:
+    -------
+        Dictionary with price (in paise), title, and image URL
+
+    Raises:
+    ------
+        ScrapeBlocked: If Amazon served a captcha or throttling response
+        ProductNotFound: If the product page does not exist
+        ValueError: If the page has no price (it may need JavaScript)
+
+    """
+    html = await _fetch(f"https://www.amazon.in/dp/{asin}")
+    # Parsing a full product page takes tens of milliseconds; keep it off the loop
+    data = await asyncio.to_thread(parse_product_page, html, asin)
+    if data["price"] is None:
+        raise ValueError(f"No price in static HTML for ASIN: {asin}")
+    return data
+
+
+async def fetch_search_results(search_query: str, max_results: int = 20) -> List[Dict]:
+    """Fetch and parse a search results page without a browser.
+
+    Args:
+    ----
+        search_query: Search keywords for Amazon
+        max_results: Maximum number of results to return
+
+    Returns:
+    -------
+        List of dictionaries with title, price, image, asin
+
+    Raises:
+    ------
+        ScrapeBlocked: If Amazon served a captcha or throttling response
+        ValueError: If no results could be read from the page
+
+    """
+    html = await _fetch(f"https://www.amazon.in/s?k={quote_plus(search_query)}")
+    products = await asyncio.to_thread(parse_search_results, html, max_results)
+    if not products:
+        raise ValueError(f"No results in static HTML for search: {search_query}")
+    return products
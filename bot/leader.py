@@ -0,0 +1,170 @@
+"""Leader election for the job scheduler.
+
+Every bot process imports bot/scheduler.py and so builds the same jobs. In
+multi-worker mode (``BOT_WORKERS > 1`` or ``SCHEDULER_LEADER_ELECTION``) the
+scheduler starts paused and a ``LeaderElector`` thread competes for a lease
+row in the ``schedulerlock`` table:
+
+* The row is taken with a single conditional ``UPDATE`` (holder is us, or the
+  lease has expired) or, if it does not exist yet, an ``INSERT`` that only one
+  process can win.
+* The leader renews the lease every third of ``SCHEDULER_LEASE_SECONDS`` and
+  resumes its scheduler; everyone else keeps theirs paused. If renewing fails
+  (lost the row, database unreachable) the process pauses immediately.
+* A leader that exits releases the row so a follower takes over at its next
+  heartbeat instead of waiting for the lease to run out.
+
+Jobs therefore run in one process at a time, and a crashed leader is replaced
+within one lease.
+"""
+
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from logging import getLogger
+from typing import Callable, Optional
+
+from sqlalchemy import delete, insert, or_, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlmodel import SQLModel
+
+from .config import settings
+from .models import SchedulerLock
+
+log = getLogger(__name__)
+
+SCHEDULER_LOCK_NAME = "scheduler"
+
+
+class LeaderElector:
+    """Holds or competes for a named lease row in the database."""
+
+    def __init__(
+        self,
+        db_engine: Engine,
+        name: str = SCHEDULER_LOCK_NAME,
+        lease_seconds: Optional[float] = None,
+        holder: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.engine = db_engine
+        self.name = name
+        self.lease_seconds = lease_seconds or settings.SCHEDULER_LEASE_SECONDS
+        self.holder = (
+            holder or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        )
+        self.is_leader = False
+        self._clock = clock
+        self._on_elected: Optional[Callable[[], None]] = None
+        self._on_demoted: Optional[Callable[[], None]] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        SQLModel.metadata.create_all(db_engine, tables=[SchedulerLock.__table__])
+
+    def try_acquire(self) -> bool:
+        """Take or renew the lease; False if another live holder has it."""
+        table = SchedulerLock.__table__
+        now = datetime.utcfromtimestamp(self._clock())
+        expires_at = now + timedelta(seconds=self.lease_seconds)
+
+        with self.engine.begin() as conn:
+            result = conn.execute(
+                update(table)
+                .where(table.c.name == self.name)
+                .where(or_(table.c.holder == self.holder, table.c.expires_at < now))
+                .values(holder=self.holder, expires_at=expires_at)
+            )
+            if result.rowcount == 1:
+                return True
+
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(
+                    insert(table).values(
+                        name=self.name, holder=self.holder, expires_at=expires_at
+                    )
+                )
+            return True
+        except IntegrityError:
+            return False  # The row exists and someone else holds it
+
+    def release(self) -> None:
+        """Give up the lease if we hold it."""
+        table = SchedulerLock.__table__
+        with self.engine.begin() as conn:
+            conn.execute(
+                delete(table).where(
+                    table.c.name == self.name, table.c.holder == self.holder
+                )
+            )
+        self._set_leader(False)
+
+    def heartbeat(self) -> bool:
+        """Renew or compete for the lease and fire elected/demoted callbacks."""
+        try:
+            acquired = self.try_acquire()
+        except SQLAlchemyError as e:
+            log.warning("Leader election for %s failed: %s", self.name, e)
+            acquired = False
+        self._set_leader(acquired)
+        return acquired
+
+    def _set_leader(self, leader: bool) -> None:
+        if leader == self.is_leader:
+            return
+        self.is_leader = leader
+        log.info(
+            "%s %s leadership of %s",
+            self.holder,
+            "took" if leader else "lost",
+            self.name,
+        )
+        callback = self._on_elected if leader else self._on_demoted
+        if callback is not None:
+            callback()
+
+    def start(
+        self, on_elected: Callable[[], None], on_demoted: Callable[[], None]
+    ) -> None:
+        """Run heartbeats in a daemon thread until ``stop``."""
+        self._on_elected = on_elected
+        self._on_demoted = on_demoted
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name=f"leader-{self.name}", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self) -> None:
+        interval = self.lease_seconds / 3
+        self.heartbeat()
+        while not self._stop.wait(interval):
+            self.heartbeat()
+
+    def stop(self) -> None:
+        """Stop heartbeats and release the lease."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        try:
+            self.release()
+        except SQLAlchemyError as e:
+            log.warning("Could not release %s lease: %s", self.name, e)
+
+
+_leader_elector: Optional[LeaderElector] = None
+
+
+def get_leader_elector() -> LeaderElector:
+    """Get the process-wide scheduler leader elector."""
+    global _leader_elector
+    if _leader_elector is None:
+        from .cache_service import engine
+
+        _leader_elector = LeaderElector(engine)
+    return _leader_elector
@@ -0,0 +1,566 @@
+"""Shared state for rate limiters and quota counters.
+
+The PA-API rate limiter, the quota manager, the quota budget planner and the
+user/admin rate limiters keep their state in a ``LimiterBackend`` so that
+several processes (bot, scheduler, admin app, extra workers) share one
+account's 1 TPS / 8640 TPD limits, and a restart does not reset the day's
+counters. Every operation is atomic in the backing store:
+
+* ``take_token``: token bucket, refilled lazily from the last update time
+* ``hit_window``: sliding window log of recent hits
+* ``incr`` / ``get_many`` / ``set``: counters that expire at a given time
+
+Three implementations are selected by ``RATE_LIMIT_BACKEND``:
+
+* ``memory``: process-local dictionaries (single-process deployments, tests)
+* ``sqlite``: a SQLite file (``RATE_LIMIT_SQLITE_PATH``) shared by every
+  process on the host; each operation is one ``BEGIN IMMEDIATE`` transaction
+* ``redis``: Lua scripts against ``RATE_LIMIT_REDIS_URL`` for processes on
+  several hosts
+
+Times are wall-clock epoch seconds supplied by the caller, so processes
+sharing a backend need roughly synchronised clocks.
+
+Operations block for up to ``RATE_LIMIT_BACKEND_TIMEOUT_SECONDS`` (SQLite busy
+wait, Redis socket timeout) and then raise one of ``LIMITER_BACKEND_ERRORS``;
+callers on an event loop run them in a worker thread and fall back to local
+state when the shared store is unavailable.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import contextmanager
+from logging import getLogger
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import redis
+
+from .config import settings
+
+log = getLogger(__name__)
+
+# Hits older than this are purged from the SQLite window log at startup
+_WINDOW_RETENTION_SECONDS = 86400
+
+# Raised by the SQLite and Redis backends when the shared store is busy or down
+LIMITER_BACKEND_ERRORS = (sqlite3.Error, redis.RedisError)
+
+
+def _refill(
+    tokens: float, updated: float, rate: float, capacity: float, now: float
+) -> float:
+    """Tokens in a bucket after refilling it from ``updated`` to ``now``."""
+    return min(float(capacity), tokens + max(0.0, now - updated) * rate)
+
+
+class LimiterBackend(ABC):
+    """Atomic limiter primitives; subclasses share them between processes."""
+
+    @abstractmethod
+    def take_token(self, key: str, rate: float, capacity: float, now: float) -> float:
+        """Take one token from a bucket.
+
+        Args:
+        ----
+            key: Bucket name
+            rate: Tokens added per second
+            capacity: Bucket size (also the initial fill)
+            now: Current epoch time
+
+        Returns:
+        -------
+            0.0 if a token was taken, otherwise seconds until one is available
+        """
+
+    @abstractmethod
+    def return_token(self, key: str, rate: float, capacity: float, now: float) -> None:
+        """Put an unused token back into a bucket."""
+
+    @abstractmethod
+    def available_tokens(
+        self, key: str, rate: float, capacity: float, now: float
+    ) -> float:
+        """Tokens currently in a bucket."""
+
+    @abstractmethod
+    def hit_window(
+        self, key: str, limit: int, window: float, now: float
+    ) -> Tuple[bool, int, float]:
+        """Record a hit in a sliding window unless ``limit`` hits are already in it.
+
+        Returns
+        -------
+            (allowed, hits in the window including this one if allowed,
+            time of the oldest hit in the window)
+        """
+
+    @abstractmethod
+    def count_window(self, key: str, window: float, now: float) -> int:
+        """Hits in a sliding window."""
+
+    @abstractmethod
+    def incr(
+        self, key: str, amount: int = 1, expires_at: Optional[float] = None
+    ) -> int:
+        """Add to a counter and return its new value."""
+
+    @abstractmethod
+    def set(self, key: str, value: int, expires_at: Optional[float] = None) -> None:
+        """Overwrite a counter."""
+
+    @abstractmethod
+    def get_many(self, keys: Sequence[str]) -> List[int]:
+        """Current values of counters (0 if missing or expired)."""
+
+    def get(self, key: str) -> int:
+        """Current value of a counter (0 if missing or expired)."""
+        return self.get_many([key])[0]
+
+    @abstractmethod
+    def delete(self, keys: Iterable[str]) -> None:
+        """Remove buckets, windows and counters."""
+
+
+class MemoryLimiterBackend(LimiterBackend):
+    """Process-local backend."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._windows: Dict[str, deque] = {}
+        self._counters: Dict[str, Tuple[int, Optional[float]]] = {}
+
+    def take_token(self, key: str, rate: float, capacity: float, now: float) -> float:
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (float(capacity), now))
+            tokens = _refill(tokens, updated, rate, capacity, now)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                return 0.0
+            self._buckets[key] = (tokens, now)
+            return (1 - tokens) / rate
+
+    def return_token(self, key: str, rate: float, capacity: float, now: float) -> None:
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (float(capacity), now))
+            self._buckets[key] = (
+                min(float(capacity), _refill(tokens, updated, rate, capacity, now) + 1),
+                now,
+            )
+
+    def available_tokens(
+        self, key: str, rate: float, capacity: float, now: float
+    ) -> float:
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (float(capacity), now))
+            return _refill(tokens, updated, rate, capacity, now)
+
+    def _trim(self, key: str, window: float, now: float) -> deque:
+        hits = self._windows.setdefault(key, deque())
+        while hits and hits[0] <= now - window:
+            hits.popleft()
+        return hits
+
+    def hit_window(
+        self, key: str, limit: int, window: float, now: float
+    ) -> Tuple[bool, int, float]:
+        with self._lock:
+            hits = self._trim(key, window, now)
+            allowed = len(hits) < limit
+            if allowed:
+                hits.append(now)
+            return allowed, len(hits), hits[0] if hits else now
+
+    def count_window(self, key: str, window: float, now: float) -> int:
+        with self._lock:
+            return len(self._trim(key, window, now))
+
+    def _value(self, key: str, now: float) -> int:
+        value, expires_at = self._counters.get(key, (0, None))
+        if expires_at is not None and expires_at <= now:
+            return 0
+        return value
+
+    def incr(
+        self, key: str, amount: int = 1, expires_at: Optional[float] = None
+    ) -> int:
+        with self._lock:
+            value = self._value(key, time.time()) + amount
+            self._counters[key] = (value, expires_at)
+            return value
+
+    def set(self, key: str, value: int, expires_at: Optional[float] = None) -> None:
+        with self._lock:
+            self._counters[key] = (value, expires_at)
+
+    def get_many(self, keys: Sequence[str]) -> List[int]:
+        now = time.time()
+        with self._lock:
+            return [self._value(key, now) for key in keys]
+
+    def delete(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._buckets.pop(key, None)
+                self._windows.pop(key, None)
+                self._counters.pop(key, None)
+
+
+class SQLiteLimiterBackend(LimiterBackend):
+    """Backend in a SQLite file shared by the processes on one host."""
+
+    def __init__(self, path: str, timeout: Optional[float] = None):
+        self.path = path
+        self.timeout = (
+            settings.RATE_LIMIT_BACKEND_TIMEOUT_SECONDS if timeout is None else timeout
+        )
+        self._local = threading.local()
+        with self._transaction() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS limiter_bucket "
+                "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS limiter_hit (key TEXT NOT NULL, ts REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_limiter_hit_key_ts ON limiter_hit (key, ts)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS limiter_counter "
+                "(key TEXT PRIMARY KEY, value INTEGER NOT NULL, expires_at REAL)"
+            )
+            now = time.time()
+            conn.execute("DELETE FROM limiter_counter WHERE expires_at <= ?", (now,))
+            conn.execute(
+                "DELETE FROM limiter_hit WHERE ts <= ?",
+                (now - _WINDOW_RETENTION_SECONDS,),
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        """Connection of the current thread (reopened after a fork)."""
+        pid, conn = getattr(self._local, "conn", (None, None))
+        if conn is None or pid != os.getpid():
+            conn = sqlite3.connect(
+                self.path, timeout=self.timeout, isolation_level=None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = (os.getpid(), conn)
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        """Run statements in one write transaction, serialised across processes."""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _bucket(
+        self,
+        conn: sqlite3.Connection,
+        key: str,
+        rate: float,
+        capacity: float,
+        now: float,
+    ) -> float:
+        row = conn.execute(
+            "SELECT tokens, updated FROM limiter_bucket WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return float(capacity)
+        return _refill(row[0], row[1], rate, capacity, now)
+
+    def _store_bucket(
+        self, conn: sqlite3.Connection, key: str, tokens: float, now: float
+    ) -> None:
+        conn.execute(
+            "INSERT OR REPLACE INTO limiter_bucket (key, tokens, updated) VALUES (?, ?, ?)",
+            (key, tokens, now),
+        )
+
+    def take_token(self, key: str, rate: float, capacity: float, now: float) -> float:
+        with self._transaction() as conn:
+            tokens = self._bucket(conn, key, rate, capacity, now)
+            if tokens >= 1:
+                self._store_bucket(conn, key, tokens - 1, now)
+                return 0.0
+            self._store_bucket(conn, key, tokens, now)
+            return (1 - tokens) / rate
+
+    def return_token(self, key: str, rate: float, capacity: float, now: float) -> None:
+        with self._transaction() as conn:
+            tokens = self._bucket(conn, key, rate, capacity, now)
+            self._store_bucket(conn, key, min(float(capacity), tokens + 1), now)
+
+    def available_tokens(
+        self, key: str, rate: float, capacity: float, now: float
+    ) -> float:
+        row = (
+            self._connection()
+            .execute("SELECT tokens, updated FROM limiter_bucket WHERE key = ?", (key,))
+            .fetchone()
+        )
+        return (
+            float(capacity)
+            if row is None
+            else _refill(row[0], row[1], rate, capacity, now)
+        )
+
+    def hit_window(
+        self, key: str, limit: int, window: float, now: float
+    ) -> Tuple[bool, int, float]:
+        with self._transaction() as conn:
+            conn.execute(
+                "DELETE FROM limiter_hit WHERE key = ? AND ts <= ?", (key, now - window)
+            )
+            count, oldest = conn.execute(
+                "SELECT count(*), min(ts) FROM limiter_hit WHERE key = ?", (key,)
+            ).fetchone()
+            allowed = count < limit
+            if allowed:
+                conn.execute(
+                    "INSERT INTO limiter_hit (key, ts) VALUES (?, ?)", (key, now)
+                )
+                count += 1
+            return allowed, count, oldest if oldest is not None else now
+
+    def count_window(self, key: str, window: float, now: float) -> int:
+        return (
+            self._connection()
+            .execute(
+                "SELECT count(*) FROM limiter_hit WHERE key = ? AND ts > ?",
+                (key, now - window),
+            )
+            .fetchone()[0]
+        )
+
+    def incr(
+        self, key: str, amount: int = 1, expires_at: Optional[float] = None
+    ) -> int:
+        with self._transaction() as conn:
+            conn.execute(
+                "DELETE FROM limiter_counter WHERE key = ? AND expires_at <= ?",
+                (key, time.time()),
+            )
+            conn.execute(
+                "INSERT INTO limiter_counter (key, value, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = value + excluded.value, expires_at = excluded.expires_at",
+                (key, amount, expires_at),
+            )
+            return conn.execute(
+                "SELECT value FROM limiter_counter WHERE key = ?", (key,)
+            ).fetchone()[0]
+
+    def set(self, key: str, value: int, expires_at: Optional[float] = None) -> None:
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO limiter_counter (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at),
+            )
+
+    def get_many(self, keys: Sequence[str]) -> List[int]:
+        if not keys:
+            return []
+        placeholders = ",".join("?" * len(keys))
+        rows = (
+            self._connection()
+            .execute(
+                f"SELECT key, value FROM limiter_counter WHERE key IN ({placeholders}) "
+                "AND (expires_at IS NULL OR expires_at > ?)",
+                (*keys, time.time()),
+            )
+            .fetchall()
+        )
+        values = dict(rows)
+        return [values.get(key, 0) for key in keys]
+
+    def delete(self, keys: Iterable[str]) -> None:
+        keys = list(keys)
+        with self._transaction() as conn:
+            for table in ("limiter_bucket", "limiter_hit", "limiter_counter"):
+                conn.executemany(
+                    f"DELETE FROM {table} WHERE key = ?", [(key,) for key in keys]
+                )
+
+
+# Token bucket: KEYS[1] bucket hash; ARGV rate, capacity, now, mode (take/return/peek)
+_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local mode = ARGV[4]
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+if mode == 'peek' then
+    return tostring(tokens)
+end
+local wait = 0
+if mode == 'return' then
+    tokens = math.min(capacity, tokens + 1)
+elseif tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+return tostring(wait)
+"""
+
+# Sliding window log: KEYS[1] sorted set; ARGV limit, window, now, member
+_WINDOW_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+local count = redis.call('ZCARD', KEYS[1])
+local allowed = 0
+if count < limit then
+    redis.call('ZADD', KEYS[1], now, ARGV[4])
+    count = count + 1
+    allowed = 1
+end
+redis.call('EXPIRE', KEYS[1], math.ceil(window) + 1)
+local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+return {allowed, count, oldest[2] or tostring(now)}
+"""
+
+# Counter: KEYS[1]; ARGV amount, expiry epoch ('' for none)
+_INCR_SCRIPT = """
+local value = redis.call('INCRBY', KEYS[1], ARGV[1])
+if ARGV[2] ~= '' then
+    redis.call('EXPIREAT', KEYS[1], ARGV[2])
+end
+return value
+"""
+
+
+class RedisLimiterBackend(LimiterBackend):
+    """Backend in Redis, shared by processes on any host."""
+
+    def __init__(self, client: "redis.Redis", prefix: str = "limiter:"):
+        self.client = client
+        self.prefix = prefix
+        self._bucket_script = client.register_script(_BUCKET_SCRIPT)
+        self._window_script = client.register_script(_WINDOW_SCRIPT)
+        self._incr_script = client.register_script(_INCR_SCRIPT)
+
+    def _bucket(
+        self, key: str, rate: float, capacity: float, now: float, mode: str
+    ) -> float:
+        return float(
+            self._bucket_script(
+                keys=[f"{self.prefix}bucket:{key}"], args=[rate, capacity, now, mode]
+            )
+        )
+
+    def take_token(self, key: str, rate: float, capacity: float, now: float) -> float:
+        return self._bucket(key, rate, capacity, now, "take")
+
+    def return_token(self, key: str, rate: float, capacity: float, now: float) -> None:
+        self._bucket(key, rate, capacity, now, "return")
+
+    def available_tokens(
+        self, key: str, rate: float, capacity: float, now: float
+    ) -> float:
+        return self._bucket(key, rate, capacity, now, "peek")
+
+    def hit_window(
+        self, key: str, limit: int, window: float, now: float
+    ) -> Tuple[bool, int, float]:
+        allowed, count, oldest = self._window_script(
+            keys=[f"{self.prefix}window:{key}"],
+            args=[limit, window, now, uuid.uuid4().hex],
+        )
+        return bool(allowed), int(count), float(oldest)
+
+    def count_window(self, key: str, window: float, now: float) -> int:
+        return self.client.zcount(
+            f"{self.prefix}window:{key}", f"({now - window}", "+inf"
+        )
+
+    def incr(
+        self, key: str, amount: int = 1, expires_at: Optional[float] = None
+    ) -> int:
+        expiry = "" if expires_at is None else int(expires_at) + 1
+        return int(
+            self._incr_script(
+                keys=[f"{self.prefix}counter:{key}"], args=[amount, expiry]
+            )
+        )
+
+    def set(self, key: str, value: int, expires_at: Optional[float] = None) -> None:
+        name = f"{self.prefix}counter:{key}"
+        if expires_at is None:
+            self.client.set(name, value)
+        else:
+            self.client.set(name, value, exat=int(expires_at) + 1)
+
+    def get_many(self, keys: Sequence[str]) -> List[int]:
+        if not keys:
+            return []
+        values = self.client.mget([f"{self.prefix}counter:{key}" for key in keys])
+        return [int(value) if value is not None else 0 for value in values]
+
+    def delete(self, keys: Iterable[str]) -> None:
+        names = [
+            f"{self.prefix}{kind}:{key}"
+            for key in keys
+            for kind in ("bucket", "window", "counter")
+        ]
+        if names:
+            self.client.delete(*names)
+
+
+def create_limiter_backend(kind: str) -> LimiterBackend:
+    """Build the backend named by ``RATE_LIMIT_BACKEND`` ("memory", "sqlite" or "redis").
+
+    If Redis is unreachable the SQLite file is used instead, which still
+    shares state between processes on this host.
+    """
+    if kind == "memory":
+        return MemoryLimiterBackend()
+    if kind == "sqlite":
+        return SQLiteLimiterBackend(settings.RATE_LIMIT_SQLITE_PATH)
+    if kind == "redis":
+        try:
+            timeout = settings.RATE_LIMIT_BACKEND_TIMEOUT_SECONDS
+            client = redis.Redis.from_url(
+                settings.RATE_LIMIT_REDIS_URL,
+                socket_connect_timeout=timeout,
+                socket_timeout=timeout,
+            )
+            client.ping()
+            return RedisLimiterBackend(client)
+        except (redis.ConnectionError, redis.TimeoutError) as e:
+            log.warning(
+                "Redis not available for rate limiting, falling back to SQLite: %s", e
+            )
+            return SQLiteLimiterBackend(settings.RATE_LIMIT_SQLITE_PATH)
+    raise ValueError(f"Unknown rate limit backend: {kind}")
+
+
+_limiter_backend: Optional[LimiterBackend] = None
+_limiter_backend_lock = threading.Lock()
+
+
+def get_limiter_backend() -> LimiterBackend:
+    """Get the process-wide limiter backend."""
+    global _limiter_backend
+    with _limiter_backend_lock:
+        if _limiter_backend is None:
+            _limiter_backend = create_limiter_backend(settings.RATE_LIMIT_BACKEND)
+        return _limiter_backend
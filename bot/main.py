@@ -8,6 +8,9 @@ from telegram.ext import ApplicationBuilder
 from bot import health
 from bot.config import settings
 from bot.handlers import setup_handlers
+from bot.outbound import close_outbound_dispatcher, get_outbound_dispatcher
+from bot.paapi_transport import close_paapi_transport, get_paapi_transport
+from bot.scraper import close_scraper_resources
 
 # Configure logging
 logging.basicConfig(
@@ -17,11 +20,48 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+async def startup(app) -> None:
+    """Bind per-loop resources (outbound sender, PA-API connections) on the bot's loop."""
+    get_outbound_dispatcher(app.bot)
+    if settings.PAAPI_ACCESS_KEY:
+        # Connect to PA-API now so the first search does not pay for TCP and TLS setup
+        await get_paapi_transport().warm_up()
+
+
+async def shutdown(app) -> None:
+    """Release per-loop resources when the bot stops."""
+    await close_outbound_dispatcher()
+    await close_scraper_resources()
+    await close_paapi_transport()
+
+
+def build_application(persistence=None):
+    """Create the Telegram application with all handlers."""
+    builder = (
+        ApplicationBuilder()
+        .token(settings.TELEGRAM_TOKEN)
+        .connection_pool_size(settings.TELEGRAM_SEND_WORKERS)
+        .post_init(startup)
+        .post_shutdown(shutdown)
+    )
+    if persistence is not None:
+        builder = builder.persistence(persistence)
+    app = builder.build()
+    setup_handlers(app)
+    return app
+
+
 def main():
     """Main entry point for the bot application."""
+    if settings.BOT_WORKERS > 1:
+        # Webhook receiver plus sharded worker processes (see bot/cluster.py)
+        from bot.cluster import run_cluster
+
+        run_cluster()
+        return
+
     # Create Telegram application
-    app = ApplicationBuilder().token(settings.TELEGRAM_TOKEN).build()
-    setup_handlers(app)
+    app = build_application()
 
     # Start Flask health server in background thread
     health_thread = Thread(
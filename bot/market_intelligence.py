@@ -3,11 +3,14 @@
 import statistics
 from datetime import datetime, timedelta
 from logging import getLogger
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 
+import numpy as np
 from sqlmodel import Session, select
 
 from .cache_service import engine
+from .db import get_async_session
+from .deal_context import DealInputs
 from .enhanced_models import (
     Product,
     ProductOffers,
@@ -15,9 +18,58 @@ from .enhanced_models import (
     PriceHistory,
 )
 from .models import Price
+from .price_analytics import (
+    PriceMatrix,
+    analyze_matrix,
+    analyze_series_batch,
+    drop_probability,
+    percentile_metrics,
+    row,
+    seasonal_metrics,
+    trend_metrics,
+)
+from .price_series import SeriesView, load_price_series, load_price_series_many
 
 log = getLogger(__name__)
 
+# Days of history per analysis timeframe
+TIMEFRAME_DAYS = {"1month": 30, "3months": 90, "1year": 365}
+
+
+def _trend_result(trend: Dict, index: int = 0) -> Dict:
+    """Format one row of ``trend_metrics`` output."""
+    result = row(trend, index)
+    if result["direction"] == "insufficient_data":
+        return {"direction": "insufficient_data", "strength": 0}
+    return result
+
+
+def _percentile_result(percentiles: Dict, index: int = 0) -> Dict:
+    """Format one row of ``percentile_metrics`` output."""
+    result = row(percentiles, index)
+    result["is_good_deal"] = (
+        result["current_percentile"] <= 25
+    )  # Bottom 25% is good deal
+    result["is_excellent_deal"] = (
+        result["current_percentile"] <= 10
+    )  # Bottom 10% is excellent
+    return result
+
+
+def _seasonal_result(seasonal: Dict, index: int = 0) -> Dict:
+    """Format one row of ``seasonal_metrics`` output."""
+    result = row(seasonal, index)
+    if result["pattern"] != "seasonal_detected":
+        return {"pattern": result["pattern"]}
+    result["monthly_averages"] = {
+        month: average
+        for month, average in enumerate(result["monthly_averages"], start=1)
+        if average == average  # Skip months without data (NaN)
+    }
+    if result["current_month_avg"] != result["current_month_avg"]:
+        result["current_month_avg"] = None
+    return result
+
 
 class MarketIntelligence:
     """Advanced market analysis and deal quality assessment."""
@@ -39,35 +91,31 @@ class MarketIntelligence:
             Dict with comprehensive price trend analysis
         """
         try:
-            end_date = datetime.utcnow()
-
-            # Set date range based on timeframe
-            if timeframe == "1month":
-                start_date = end_date - timedelta(days=30)
-            elif timeframe == "3months":
-                start_date = end_date - timedelta(days=90)
-            elif timeframe == "1year":
-                start_date = end_date - timedelta(days=365)
-            else:
-                start_date = end_date - timedelta(days=90)  # Default to 3 months
+            start_date = datetime.utcnow() - timedelta(
+                days=TIMEFRAME_DAYS.get(timeframe, 90)
+            )
 
-            with Session(engine) as session:
-                # First try enhanced price history
-                statement = (
-                    select(PriceHistory)
-                    .where(
-                        PriceHistory.asin == asin, PriceHistory.timestamp >= start_date
-                    )
-                    .order_by(PriceHistory.timestamp)
+            # First try enhanced price history (in-memory series)
+            series = await load_price_series(asin, since=start_date)
+
+            if len(series):
+                async with get_async_session() as session:
+                    discount_rows = (
+                        await session.exec(
+                            select(
+                                PriceHistory.timestamp, PriceHistory.discount_percentage
+                            ).where(
+                                PriceHistory.asin == asin,
+                                PriceHistory.timestamp >= start_date,
+                            )
+                        )
+                    ).all()
+
+                return await self._analyze_enhanced_price_history(
+                    asin, series, timeframe, discount_rows
                 )
 
-                enhanced_history = session.exec(statement).all()
-
-                if enhanced_history:
-                    return await self._analyze_enhanced_price_history(
-                        enhanced_history, timeframe
-                    )
-
+            async with get_async_session() as session:
                 # Fallback to basic price history from existing Price model
                 statement = (
                     select(Price)
@@ -75,78 +123,88 @@ class MarketIntelligence:
                     .order_by(Price.fetched_at)
                 )
 
-                basic_history = session.exec(statement).all()
+                basic_history = (await session.exec(statement)).all()
 
-                if not basic_history:
-                    return {
-                        "error": "No price history available",
-                        "asin": asin,
-                        "timeframe": timeframe,
-                    }
+            if not basic_history:
+                return {
+                    "error": "No price history available",
+                    "asin": asin,
+                    "timeframe": timeframe,
+                }
 
-                return await self._analyze_basic_price_history(basic_history, timeframe)
+            return await self._analyze_basic_price_history(basic_history, timeframe)
 
         except Exception as e:
             log.error("Failed to analyze price trends for %s: %s", asin, e)
             return {"error": str(e), "asin": asin, "timeframe": timeframe}
 
+    async def analyze_price_trends_batch(
+        self, asins: Sequence[str], timeframe: str = "3months"
+    ) -> Dict[str, Dict]:
+        """Analyze price trends for many products in one vectorized pass.
+
+        Args:
+        ----
+            asins: Product ASINs to analyze
+            timeframe: Analysis timeframe ("1month", "3months", "1year")
+
+        Returns:
+        -------
+            Mapping of ASIN to price metrics, trend, percentiles, seasonal
+            patterns and drop probability (ASINs without history are omitted)
+        """
+        start_date = datetime.utcnow() - timedelta(
+            days=TIMEFRAME_DAYS.get(timeframe, 90)
+        )
+        views = await load_price_series_many(asins, since=start_date)
+        return analyze_series_batch(
+            {asin: (view.timestamps, view.prices) for asin, view in views.items()}
+        )
+
     async def _analyze_enhanced_price_history(
-        self, price_history: List[PriceHistory], timeframe: str
+        self,
+        asin: str,
+        series: SeriesView,
+        timeframe: str,
+        discount_rows: Sequence[Tuple[datetime, Optional[int]]] = (),
     ) -> Dict:
         """Analyze enhanced price history with detailed metrics."""
         try:
-            if not price_history:
+            if not len(series):
                 return {"error": "No price history available"}
 
-            prices = [p.price for p in price_history]
-
-            # Calculate basic metrics
-            current_price = prices[-1]
-            min_price = min(prices)
-            max_price = max(prices)
-            avg_price = statistics.mean(prices)
-            median_price = statistics.median(prices)
-            price_volatility = statistics.stdev(prices) if len(prices) > 1 else 0
-
-            # Calculate trend metrics
-            timestamps = [p.timestamp for p in price_history]
-            trend_analysis = await self._calculate_trend_direction(prices, timestamps)
-
-            # Calculate price percentiles
-            price_percentiles = await self._calculate_price_percentiles(
-                prices, current_price
+            analysis = analyze_matrix(
+                PriceMatrix.from_series([(series.timestamps, series.prices)])
             )
+            metrics = row(analysis["price_metrics"], 0)
 
-            # Detect seasonal patterns
-            seasonal_patterns = await self._detect_seasonal_patterns(price_history)
-
-            # Calculate drop probability
-            drop_probability = await self._calculate_drop_probability(prices)
-
-            # Analyze discount patterns
-            discount_analysis = await self._analyze_discount_patterns(price_history)
+            current_price = int(metrics["current"])
+            min_price = int(metrics["min"])
+            max_price = int(metrics["max"])
+            avg_price = metrics["mean"]
+            drop_probability = float(analysis["drop_probability"][0])
 
             return {
-                "asin": price_history[0].asin,
+                "asin": asin,
                 "timeframe": timeframe,
-                "data_points": len(price_history),
+                "data_points": len(series),
                 "price_metrics": {
                     "current_price": current_price,
                     "min_price": min_price,
                     "max_price": max_price,
                     "average_price": avg_price,
-                    "median_price": median_price,
+                    "median_price": metrics["median"],
                     "price_range": max_price - min_price,
-                    "volatility": price_volatility,
-                    "volatility_percentage": (
-                        (price_volatility / avg_price) * 100 if avg_price > 0 else 0
-                    ),
+                    "volatility": metrics["volatility"],
+                    "volatility_percentage": metrics["volatility_percentage"],
                 },
-                "trend_analysis": trend_analysis,
-                "price_percentiles": price_percentiles,
-                "seasonal_patterns": seasonal_patterns,
+                "trend_analysis": _trend_result(analysis["trend"]),
+                "price_percentiles": _percentile_result(analysis["percentiles"]),
+                "seasonal_patterns": _seasonal_result(analysis["seasonal"]),
                 "drop_probability": drop_probability,
-                "discount_analysis": discount_analysis,
+                "discount_analysis": await self._analyze_discount_patterns(
+                    discount_rows
+                ),
                 "deal_recommendation": await self._generate_deal_recommendation(
                     current_price, min_price, max_price, avg_price, drop_probability
                 ),
@@ -236,64 +294,108 @@ class MarketIntelligence:
                         "factors": {},
                     }
 
-                # Calculate individual scoring factors
-                factors = {}
-
-                # Price factor (40% weight) - based on historical price comparison
-                factors["price_score"] = await self._calculate_price_factor(
-                    current_price, price_history
-                )
-
-                # Review factor (25% weight) - based on customer reviews
-                factors["review_score"] = await self._calculate_review_factor(
-                    session, asin
-                )
+                review_score = await self._calculate_review_factor(session, asin)
 
-                # Availability factor (20% weight) - based on stock and shipping
-                factors["availability_score"] = (
-                    await self._calculate_availability_factor(current_offer)
+                return await self._score_deal(
+                    current_price, price_history, product, current_offer, review_score
                 )
 
-                # Discount factor (10% weight) - based on list price discount
-                factors["discount_score"] = await self._calculate_discount_factor(
-                    current_offer
-                )
+        except Exception as e:
+            log.error("Failed to calculate deal quality for %s: %s", asin, e)
+            return {"score": 0.0, "error": str(e), "factors": {}}
 
-                # Brand factor (5% weight) - based on brand reputation
-                factors["brand_score"] = await self._calculate_brand_factor(product)
+    async def calculate_deal_quality_from_inputs(
+        self, inputs: DealInputs, current_price: int
+    ) -> Dict:
+        """Calculate deal quality from preloaded data (see ``deal_context.load_deal_inputs``).
 
-                # Calculate weighted final score
-                final_score = (
-                    factors["price_score"] * 0.40
-                    + factors["review_score"] * 0.25
-                    + factors["availability_score"] * 0.20
-                    + factors["discount_score"] * 0.10
-                    + factors["brand_score"] * 0.05
-                )
+        Same scoring as ``calculate_deal_quality`` without any queries, for
+        scoring many deals in one pass.
 
-                # Determine deal quality category
-                if final_score >= 85:
-                    quality = "excellent"
-                elif final_score >= 70:
-                    quality = "good"
-                elif final_score >= 50:
-                    quality = "average"
-                else:
-                    quality = "poor"
+        Args:
+        ----
+            inputs: Stored product, offer, review and price data for the ASIN
+            current_price: Current price in paise
 
+        Returns:
+        -------
+            Dict with deal quality score and factors
+        """
+        try:
+            if not len(inputs.history):
                 return {
-                    "score": min(100.0, max(0.0, final_score)),
-                    "quality": quality,
-                    "factors": factors,
-                    "recommendations": await self._generate_deal_recommendations(
-                        final_score, factors, current_price
-                    ),
+                    "score": 50.0,
+                    "reason": "No historical data available",
+                    "factors": {},
                 }
+            return await self._score_deal(
+                current_price,
+                inputs.history.prices,
+                inputs.product,
+                inputs.offer,
+                self._review_factor(inputs.reviews),
+            )
 
         except Exception as e:
-            log.error("Failed to calculate deal quality for %s: %s", asin, e)
+            log.error("Failed to calculate deal quality for %s: %s", inputs.asin, e)
             return {"score": 0.0, "error": str(e), "factors": {}}
 
+    async def _score_deal(
+        self,
+        current_price: int,
+        price_history: Sequence,
+        product: Optional[Product],
+        offer: Optional[ProductOffers],
+        review_score: float,
+    ) -> Dict:
+        """Combine the weighted deal quality factors into a score."""
+        factors = {}
+
+        # Price factor (40% weight) - based on historical price comparison
+        factors["price_score"] = await self._calculate_price_factor(
+            current_price, price_history
+        )
+
+        # Review factor (25% weight) - based on customer reviews
+        factors["review_score"] = review_score
+
+        # Availability factor (20% weight) - based on stock and shipping
+        factors["availability_score"] = await self._calculate_availability_factor(offer)
+
+        # Discount factor (10% weight) - based on list price discount
+        factors["discount_score"] = await self._calculate_discount_factor(offer)
+
+        # Brand factor (5% weight) - based on brand reputation
+        factors["brand_score"] = await self._calculate_brand_factor(product)
+
+        # Calculate weighted final score
+        final_score = (
+            factors["price_score"] * 0.40
+            + factors["review_score"] * 0.25
+            + factors["availability_score"] * 0.20
+            + factors["discount_score"] * 0.10
+            + factors["brand_score"] * 0.05
+        )
+
+        # Determine deal quality category
+        if final_score >= 85:
+            quality = "excellent"
+        elif final_score >= 70:
+            quality = "good"
+        elif final_score >= 50:
+            quality = "average"
+        else:
+            quality = "poor"
+
+        return {
+            "score": min(100.0, max(0.0, final_score)),
+            "quality": quality,
+            "factors": factors,
+            "recommendations": await self._generate_deal_recommendations(
+                final_score, factors, current_price
+            ),
+        }
+
     async def predict_price_movement(
         self, asin: str, prediction_days: int = 30
     ) -> Dict:
@@ -491,43 +593,10 @@ class MarketIntelligence:
     ) -> Dict:
         """Calculate trend direction and strength."""
         try:
-            if len(prices) < 5:
-                return {"direction": "insufficient_data", "strength": 0}
-
-            # Calculate moving averages
-            short_ma = statistics.mean(prices[-5:])
-            medium_ma = statistics.mean(prices[-10:]) if len(prices) >= 10 else short_ma
-
-            # Determine trend direction
-            if short_ma > medium_ma * 1.02:  # 2% threshold
-                direction = "increasing"
-            elif short_ma < medium_ma * 0.98:
-                direction = "decreasing"
-            else:
-                direction = "stable"
-
-            # Calculate trend strength (0-100)
-            strength = (
-                min(100, abs((short_ma - medium_ma) / medium_ma) * 100)
-                if medium_ma > 0
-                else 0
+            return _trend_result(
+                trend_metrics(PriceMatrix.from_series([(timestamps, prices)]))
             )
 
-            # Calculate recent change
-            recent_change_pct = (
-                ((prices[-1] - prices[-5]) / prices[-5]) * 100
-                if len(prices) >= 5
-                else 0
-            )
-
-            return {
-                "direction": direction,
-                "strength": strength,
-                "recent_change_percent": recent_change_pct,
-                "short_term_ma": short_ma,
-                "medium_term_ma": medium_ma,
-            }
-
         except Exception as e:
             log.error("Failed to calculate trend direction: %s", e)
             return {"direction": "error", "strength": 0}
@@ -537,28 +606,10 @@ class MarketIntelligence:
     ) -> Dict:
         """Calculate price percentiles for current price."""
         try:
-            sorted_prices = sorted(prices)
-            n = len(sorted_prices)
-
-            # Find percentile of current price
-            rank = sum(1 for p in sorted_prices if p <= current_price)
-            percentile = (rank / n) * 100
-
-            # Calculate key percentiles
-            p25 = sorted_prices[int(n * 0.25)] if n > 4 else sorted_prices[0]
-            p50 = sorted_prices[int(n * 0.5)] if n > 2 else sorted_prices[0]
-            p75 = sorted_prices[int(n * 0.75)] if n > 4 else sorted_prices[-1]
-            p90 = sorted_prices[int(n * 0.9)] if n > 10 else sorted_prices[-1]
-
-            return {
-                "current_percentile": percentile,
-                "p25": p25,
-                "p50_median": p50,
-                "p75": p75,
-                "p90": p90,
-                "is_good_deal": percentile <= 25,  # Bottom 25% is good deal
-                "is_excellent_deal": percentile <= 10,  # Bottom 10% is excellent
-            }
+            matrix = PriceMatrix.from_series([(range(len(prices)), prices)])
+            return _percentile_result(
+                percentile_metrics(matrix, current=[current_price])
+            )
 
         except Exception as e:
             log.error("Failed to calculate price percentiles: %s", e)
@@ -569,46 +620,15 @@ class MarketIntelligence:
     ) -> Dict:
         """Detect seasonal pricing patterns."""
         try:
-            if len(price_history) < 30:
-                return {"pattern": "insufficient_data"}
-
-            # Group by month to find seasonal patterns
-            monthly_prices = {}
-            for record in price_history:
-                month = record.timestamp.month
-                if month not in monthly_prices:
-                    monthly_prices[month] = []
-                monthly_prices[month].append(record.price)
-
-            # Calculate average price per month
-            monthly_averages = {}
-            for month, prices in monthly_prices.items():
-                monthly_averages[month] = statistics.mean(prices)
-
-            if len(monthly_averages) < 3:
-                return {"pattern": "insufficient_seasonal_data"}
-
-            # Find best and worst months
-            best_month = min(monthly_averages, key=monthly_averages.get)
-            worst_month = max(monthly_averages, key=monthly_averages.get)
-
-            current_month = datetime.utcnow().month
-            current_month_avg = monthly_averages.get(current_month)
-
-            return {
-                "pattern": "seasonal_detected",
-                "best_month": best_month,
-                "worst_month": worst_month,
-                "best_month_avg": monthly_averages[best_month],
-                "worst_month_avg": monthly_averages[worst_month],
-                "current_month_avg": current_month_avg,
-                "seasonal_variance": (
-                    monthly_averages[worst_month] - monthly_averages[best_month]
-                )
-                / monthly_averages[best_month]
-                * 100,
-                "monthly_averages": monthly_averages,
-            }
+            matrix = PriceMatrix.from_series(
+                [
+                    (
+                        [p.timestamp for p in price_history],
+                        [p.price for p in price_history],
+                    )
+                ]
+            )
+            return _seasonal_result(seasonal_metrics(matrix))
 
         except Exception as e:
             log.error("Failed to detect seasonal patterns: %s", e)
@@ -617,53 +637,29 @@ class MarketIntelligence:
     async def _calculate_drop_probability(self, prices: List[int]) -> float:
         """Calculate probability of price drop."""
         try:
-            if len(prices) < 10:
-                return 0.5  # Neutral probability
-
-            current_price = prices[-1]
-            drops = 0
-            total_comparisons = 0
-
-            # Look for similar price points and check if they dropped
-            for i in range(len(prices) - 1):
-                if abs(prices[i] - current_price) / current_price < 0.05:  # Within 5%
-                    total_comparisons += 1
-                    if i + 1 < len(prices) and prices[i + 1] < prices[i]:
-                        drops += 1
-
-            if total_comparisons > 0:
-                return drops / total_comparisons
-
-            # Fallback: check recent trend
-            if len(prices) >= 5:
-                recent_trend = statistics.mean(prices[-3:]) - statistics.mean(
-                    prices[-6:-3]
-                )
-                if recent_trend < 0:
-                    return 0.7  # Recent downward trend
-                else:
-                    return 0.3  # Recent upward trend
-
-            return 0.5
+            matrix = PriceMatrix.from_series([(range(len(prices)), prices)])
+            return float(drop_probability(matrix)[0])
 
         except Exception as e:
             log.error("Failed to calculate drop probability: %s", e)
             return 0.5
 
     async def _analyze_discount_patterns(
-        self, price_history: List[PriceHistory]
+        self, discount_rows: Sequence[Tuple[datetime, Optional[int]]]
     ) -> Dict:
-        """Analyze discount patterns and frequency."""
-        try:
-            discounts = []
-            discount_periods = []
+        """Analyze discount patterns and frequency.
 
-            for record in price_history:
-                if record.discount_percentage and record.discount_percentage > 0:
-                    discounts.append(record.discount_percentage)
-                    discount_periods.append(record.timestamp)
+        Args:
+        ----
+            discount_rows: ``(timestamp, discount_percentage)`` per price observation
+        """
+        try:
+            discounts = np.array(
+                [discount or 0 for _, discount in discount_rows], dtype=float
+            )
+            discounted = discounts > 0
 
-            if not discounts:
+            if not discounted.any():
                 return {
                     "avg_discount": 0,
                     "max_discount": 0,
@@ -671,23 +667,17 @@ class MarketIntelligence:
                     "last_discount_days_ago": None,
                 }
 
-            avg_discount = statistics.mean(discounts)
-            max_discount = max(discounts)
-            discount_frequency = len(discounts) / len(price_history)
-
-            # Days since last discount
-            last_discount_days = (
-                (datetime.utcnow() - max(discount_periods)).days
-                if discount_periods
-                else None
+            discount_frequency = float(discounted.mean())
+            last_discount = max(
+                ts for (ts, _), hit in zip(discount_rows, discounted) if hit
             )
 
             return {
-                "avg_discount": avg_discount,
-                "max_discount": max_discount,
+                "avg_discount": float(discounts[discounted].mean()),
+                "max_discount": int(discounts[discounted].max()),
                 "discount_frequency": discount_frequency,
-                "total_discount_periods": len(discounts),
-                "last_discount_days_ago": last_discount_days,
+                "total_discount_periods": int(discounted.sum()),
+                "last_discount_days_ago": (datetime.utcnow() - last_discount).days,
                 "discount_prediction": (
                     "likely" if discount_frequency > 0.3 else "unlikely"
                 ),
@@ -788,20 +778,20 @@ class MarketIntelligence:
     ) -> float:
         """Calculate price factor for deal quality based on historical prices."""
         try:
-            if not price_history:
+            if not len(price_history):
                 return 50.0  # Neutral score if no history
 
-            # Extract prices from either enhanced or basic history
+            # Extract prices from either enhanced or basic history (or a price array)
             if hasattr(price_history[0], "price"):
-                prices = [p.price for p in price_history]
+                prices = np.fromiter((p.price for p in price_history), dtype=np.int64)
             else:
-                prices = price_history
+                prices = np.asarray(price_history)
 
             if len(prices) < 2:
                 return 50.0
 
             # Calculate percentile of current price (lower price = higher score)
-            better_prices = sum(1 for p in prices if p > current_price)
+            better_prices = int(np.count_nonzero(prices > current_price))
             percentile = (better_prices / len(prices)) * 100
 
             # Score based on percentile (inverted - lower price is better)
@@ -823,34 +813,38 @@ class MarketIntelligence:
     async def _calculate_review_factor(self, session: Session, asin: str) -> float:
         """Calculate review factor for deal quality based on customer reviews."""
         try:
-            reviews = session.get(CustomerReviews, asin)
-            if not reviews:
-                return 50.0  # Neutral score if no reviews
+            return self._review_factor(session.get(CustomerReviews, asin))
 
-            if not reviews.average_rating or reviews.review_count == 0:
-                return 50.0
+        except Exception as e:
+            log.error("Failed to calculate review factor: %s", e)
+            return 50.0
 
-            # Base score from rating (1-5 scale converted to 0-100)
-            rating_score = (reviews.average_rating / 5.0) * 100
+    @staticmethod
+    def _review_factor(reviews: Optional[CustomerReviews]) -> float:
+        """Score customer reviews (rating weighted by how many reviews back it)."""
+        if not reviews:
+            return 50.0  # Neutral score if no reviews
 
-            # Adjust based on review count (more reviews = more reliable)
-            if reviews.review_count >= 1000:
-                reliability_multiplier = 1.2  # High confidence
-            elif reviews.review_count >= 100:
-                reliability_multiplier = 1.1  # Good confidence
-            elif reviews.review_count >= 10:
-                reliability_multiplier = 1.0  # Moderate confidence
-            else:
-                reliability_multiplier = 0.8  # Low confidence
+        if not reviews.average_rating or reviews.review_count == 0:
+            return 50.0
+
+        # Base score from rating (1-5 scale converted to 0-100)
+        rating_score = (reviews.average_rating / 5.0) * 100
 
-            final_score = rating_score * reliability_multiplier
+        # Adjust based on review count (more reviews = more reliable)
+        if reviews.review_count >= 1000:
+            reliability_multiplier = 1.2  # High confidence
+        elif reviews.review_count >= 100:
+            reliability_multiplier = 1.1  # Good confidence
+        elif reviews.review_count >= 10:
+            reliability_multiplier = 1.0  # Moderate confidence
+        else:
+            reliability_multiplier = 0.8  # Low confidence
 
-            # Cap at 100
-            return min(100.0, final_score)
+        final_score = rating_score * reliability_multiplier
 
-        except Exception as e:
-            log.error("Failed to calculate review factor: %s", e)
-            return 50.0
+        # Cap at 100
+        return min(100.0, final_score)
 
     async def _calculate_availability_factor(
         self, offer: Optional[ProductOffers]
@@ -0,0 +1,117 @@
+"""Migration 002: Composite indexes and SQLite tuning for time-range queries.
+
+Trend analysis, price pattern detection and alert urgency all filter by
+ASIN plus a timestamp range and order by timestamp, which used to be a full
+table scan. This migration adds composite indexes for those queries, the
+per-user lookups on watches and searches and the latest-offer lookup used
+by batch deal scoring, switches SQLite to WAL journaling and refreshes the
+planner statistics.
+
+The indexes are also declared on the models, so new databases created with
+``create_all`` get them without running this migration.
+"""
+
+import asyncio
+from logging import getLogger
+
+from sqlalchemy import inspect, text
+
+from ..cache_service import engine
+from ..config import settings
+from ..enhanced_models import DealAlert, PriceHistory, ProductOffers, SearchQuery
+from ..models import Price, Watch
+
+log = getLogger(__name__)
+
+# Tables whose model-declared indexes this migration creates
+INDEXED_TABLES = [PriceHistory, Price, DealAlert, Watch, SearchQuery, ProductOffers]
+
+
+class Migration002:
+    """Migration to add time-range query indexes and enable WAL."""
+
+    def __init__(self):
+        self.engine = engine
+
+    async def upgrade(self) -> bool:
+        """Apply the migration (create indexes, enable WAL)."""
+        try:
+            log.info("Starting Migration 002: Query indexes")
+
+            await self._create_indexes()
+
+            if self.engine.dialect.name == "sqlite":
+                await self._tune_sqlite()
+
+            log.info("Migration 002 completed successfully")
+            return True
+
+        except Exception as e:
+            log.error("Migration 002 failed: %s", e)
+            return False
+
+    async def downgrade(self) -> bool:
+        """Rollback the migration (drop indexes, restore rollback journal)."""
+        try:
+            log.info("Rolling back Migration 002: Query indexes")
+
+            for table in INDEXED_TABLES:
+                for index in table.__table__.indexes:
+                    index.drop(self.engine, checkfirst=True)
+                    log.info("Dropped index: %s", index.name)
+
+            if self.engine.dialect.name == "sqlite":
+                with self.engine.connect() as conn:
+                    conn.execute(text("PRAGMA journal_mode=DELETE"))
+
+            log.info("Migration 002 rollback completed")
+            return True
+
+        except Exception as e:
+            log.error("Migration 002 rollback failed: %s", e)
+            return False
+
+    async def _create_indexes(self) -> None:
+        """Create the composite indexes declared on the models."""
+        inspector = inspect(self.engine)
+        for table in INDEXED_TABLES:
+            if not inspector.has_table(table.__tablename__):
+                log.warning(
+                    "Table %s does not exist, skipping its indexes", table.__tablename__
+                )
+                continue
+            for index in table.__table__.indexes:
+                index.create(self.engine, checkfirst=True)
+                log.info("Created index: %s", index.name)
+
+    async def _tune_sqlite(self) -> None:
+        """Enable WAL (persistent per file) and refresh planner statistics."""
+        with self.engine.connect() as conn:
+            mode = conn.execute(
+                text(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+            ).scalar()
+            log.info("SQLite journal_mode: %s", mode)
+            # Let the planner see the new indexes' selectivity
+            conn.execute(text("ANALYZE"))
+            conn.commit()
+
+
+async def run_migration_002():
+    """Run Migration 002."""
+    migration = Migration002()
+    success = await migration.upgrade()
+    if not success:
+        raise RuntimeError("Migration 002 failed")
+
+
+async def rollback_migration_002():
+    """Rollback Migration 002."""
+    migration = Migration002()
+    success = await migration.downgrade()
+    if not success:
+        raise RuntimeError("Migration 002 rollback failed")
+
+
+if __name__ == "__main__":
+    # Run migration when executed directly
+    asyncio.run(run_migration_002())
@@ -2,6 +2,7 @@
 
 from datetime import datetime
 
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 
 
@@ -24,6 +25,8 @@ class User(SQLModel, table=True):
 class Watch(SQLModel, table=True):
     """Watch model for price monitoring requests."""
 
+    __table_args__ = (Index("ix_watch_user_id_created", "user_id", "created"),)
+
     id: int = Field(primary_key=True)
     user_id: int = Field(foreign_key="user.id")
     asin: str | None = None
@@ -38,6 +41,8 @@ class Watch(SQLModel, table=True):
 class Price(SQLModel, table=True):
     """Price model for storing price history."""
 
+    __table_args__ = (Index("ix_price_asin_fetched_at", "asin", "fetched_at"),)
+
     id: int = Field(primary_key=True)
     watch_id: int = Field(foreign_key="watch.id")
     asin: str
@@ -53,3 +58,22 @@ class Click(SQLModel, table=True):
     watch_id: int = Field(foreign_key="watch.id")
     asin: str
     clicked_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class SchedulerLock(SQLModel, table=True):
+    """Lease electing the one process that runs scheduled jobs."""
+
+    name: str = Field(primary_key=True)
+    holder: str  # host:pid:nonce of the current leader
+    expires_at: datetime
+
+
+class ConversationState(SQLModel, table=True):
+    """Conversation data shared by bot workers (see bot/conversation_store.py)."""
+
+    kind: str = Field(
+        primary_key=True
+    )  # "user", "chat", "bot" or "conversation:<name>"
+    key: str = Field(primary_key=True)
+    data: str  # JSON
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,667 @@
+"""Central outbound Telegram dispatcher.
+
+Every message the bot sends goes through ``OutboundDispatcher`` so that
+Telegram's limits (about 30 messages per second per bot, one per second per
+chat) are respected across interactive replies, alerts and bulk digests:
+
+* Token buckets for the global rate and for each chat are shared by every
+  event loop in the process, so scheduler threads and the bot's own loop
+  draw from the same budget. Background sends are held to a lower rate,
+  leaving ``TELEGRAM_INTERACTIVE_HEADROOM`` messages per second free for
+  interactive replies. With a shared limiter backend (``RATE_LIMIT_BACKEND``
+  ``sqlite`` or ``redis``) the global rate is also drawn from one bucket by
+  every worker process; the per-chat limits stay local, as each chat is
+  served by a single worker.
+* ``send`` delivers immediately in the caller's task (interactive replies);
+  ``submit`` queues alerts and bulk sends in a priority queue drained by
+  workers, and waits while the backlog is full.
+* A ``RetryAfter`` flood wait pauses the global bucket for every sender and
+  the message is retried.
+* ``carousel_messages`` coalesces product cards into one media group plus a
+  single keyboard message instead of one message per card;
+  ``combined_text_messages`` is the text-only fallback when the media group
+  is rejected.
+
+One dispatcher (with its own pooled ``Bot`` for sends addressed by chat id)
+is kept per event loop.
+"""
+
+import asyncio
+import itertools
+import threading
+import time
+import weakref
+from collections import deque
+from dataclasses import dataclass, field
+from enum import IntEnum
+from logging import getLogger
+from typing import Any, Deque, Dict, List, Optional, Sequence, Union
+
+from telegram import (
+    Bot,
+    Chat,
+    InlineKeyboardButton,
+    InlineKeyboardMarkup,
+    InputMediaPhoto,
+)
+from telegram.error import (
+    BadRequest,
+    Forbidden,
+    NetworkError,
+    RetryAfter,
+    TelegramError,
+)
+from telegram.request import HTTPXRequest
+
+from .config import settings
+from .limiter_backend import (
+    LIMITER_BACKEND_ERRORS,
+    LimiterBackend,
+    MemoryLimiterBackend,
+    get_limiter_backend,
+)
+
+log = getLogger(__name__)
+
+# Telegram accepts at most 10 items per media group
+MEDIA_GROUP_LIMIT = 10
+TEXT_LIMIT = 4096  # Characters in one text message
+TELEGRAM_BUCKET_KEY = "telegram:global"  # Bot-wide bucket in the limiter backend
+
+
+class Priority(IntEnum):
+    """Outbound message priority; lower values are served first."""
+
+    INTERACTIVE = 0
+    ALERT = 1
+    BULK = 2
+
+
+@dataclass
+class OutboundMessage:
+    """One Bot API send: the method name and its arguments (without chat_id)."""
+
+    method: str
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+
+
+def text_message(
+    text: str, reply_markup=None, parse_mode: Optional[str] = None
+) -> OutboundMessage:
+    """Build a text message."""
+    return OutboundMessage(
+        "send_message",
+        {"text": text, "reply_markup": reply_markup, "parse_mode": parse_mode},
+    )
+
+
+def photo_message(
+    photo: str, caption: str, reply_markup=None, parse_mode: Optional[str] = None
+) -> OutboundMessage:
+    """Build a photo message."""
+    return OutboundMessage(
+        "send_photo",
+        {
+            "photo": photo,
+            "caption": caption,
+            "reply_markup": reply_markup,
+            "parse_mode": parse_mode,
+        },
+    )
+
+
+def card_message(card: Dict, parse_mode: Optional[str] = "Markdown") -> OutboundMessage:
+    """Build the message for one product card: a photo if it has an image URL, else text."""
+    image = card.get("image") or ""
+    if image.startswith("http"):
+        return photo_message(image, card["caption"], card.get("keyboard"), parse_mode)
+    return text_message(card["caption"], card.get("keyboard"), parse_mode)
+
+
+def _merge_keyboards(cards: Sequence[Dict]) -> Optional[InlineKeyboardMarkup]:
+    rows = []
+    for number, card in enumerate(cards, 1):
+        keyboard = card.get("keyboard")
+        if keyboard is None:
+            continue
+        for row in keyboard.inline_keyboard:
+            rows.append([_numbered(button, number) for button in row])
+    return InlineKeyboardMarkup(rows) if rows else None
+
+
+def _numbered(button: InlineKeyboardButton, number: int) -> InlineKeyboardButton:
+    data = button.to_dict()
+    data["text"] = f"{number}. {button.text}"
+    return InlineKeyboardButton(**data)
+
+
+def carousel_messages(
+    cards: Sequence[Dict],
+    parse_mode: Optional[str] = "Markdown",
+    footer: str = "👇 Pick a product:",
+) -> List[OutboundMessage]:
+    """Coalesce product cards into media groups plus one keyboard message.
+
+    Cards with image URLs become one media group (per 10 cards) with their
+    captions; their buttons, numbered by card, are merged into a single
+    message after it. With fewer than two photo cards, each card is sent on
+    its own.
+
+    Args:
+    ----
+        cards: Product cards with ``caption`` and optional ``image`` and ``keyboard``
+        parse_mode: Caption parse mode
+        footer: Text of the keyboard message
+
+    Returns:
+    -------
+        Messages to send in order
+    """
+    photos = [card for card in cards if (card.get("image") or "").startswith("http")]
+    if len(photos) < 2:
+        return [card_message(card, parse_mode) for card in cards]
+
+    messages = []
+    for start in range(0, len(photos), MEDIA_GROUP_LIMIT):
+        chunk = photos[start : start + MEDIA_GROUP_LIMIT]
+        media = [
+            InputMediaPhoto(
+                media=card["image"], caption=card["caption"], parse_mode=parse_mode
+            )
+            for card in chunk
+        ]
+        messages.append(OutboundMessage("send_media_group", {"media": media}))
+
+    keyboard = _merge_keyboards(photos)
+    if keyboard is not None:
+        messages.append(text_message(footer, keyboard))
+    # Text-only cards keep their own messages
+    messages.extend(
+        card_message(card, parse_mode) for card in cards if card not in photos
+    )
+    return messages
+
+
+def combined_text_messages(
+    cards: Sequence[Dict], parse_mode: Optional[str] = "Markdown"
+) -> List[OutboundMessage]:
+    """Combine product cards into one numbered text message with all their buttons.
+
+    Used when a carousel's media group is rejected. Captions are only split
+    over several messages if together they exceed Telegram's text limit; the
+    merged keyboard goes on the last one.
+
+    Args:
+    ----
+        cards: Product cards with ``caption`` and optional ``keyboard``
+        parse_mode: Text parse mode
+
+    Returns:
+    -------
+        Messages to send in order (one unless the captions are too long)
+    """
+    texts = [""]
+    for number, card in enumerate(cards, 1):
+        entry = f"{number}. {card['caption']}"
+        if texts[-1] and len(texts[-1]) + 2 + len(entry) > TEXT_LIMIT:
+            texts.append("")
+        texts[-1] = f"{texts[-1]}\n\n{entry}" if texts[-1] else entry
+
+    keyboard = _merge_keyboards(cards)
+    return [
+        text_message(
+            text, keyboard if i == len(texts) - 1 else None, parse_mode=parse_mode
+        )
+        for i, text in enumerate(texts)
+    ]
+
+
+class TokenBucket:
+    """Thread-safe token bucket that hands out reservations.
+
+    ``reserve`` always takes a token, letting the balance go negative, and
+    returns how long the caller must wait for it; callers are therefore
+    served in reservation order.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def reserve(self) -> float:
+        """Take a token and return the seconds to wait before using it."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def pause(self, seconds: float) -> None:
+        """Hold back all reservations for ``seconds`` (a flood wait)."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, 0) - seconds * self.rate
+
+    @property
+    def idle(self) -> bool:
+        """Whether the bucket has refilled completely."""
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens >= self.capacity
+
+
+class RateLimits:
+    """Global, background and per-chat buckets shared by all dispatchers."""
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        interactive_headroom: Optional[float] = None,
+        chat_interval: Optional[float] = None,
+        chat_burst: Optional[int] = None,
+        backend: Optional[LimiterBackend] = None,
+    ):
+        rate = rate or settings.TELEGRAM_GLOBAL_RATE
+        headroom = (
+            settings.TELEGRAM_INTERACTIVE_HEADROOM
+            if interactive_headroom is None
+            else interactive_headroom
+        )
+        chat_interval = (
+            settings.TELEGRAM_CHAT_INTERVAL_SECONDS
+            if chat_interval is None
+            else chat_interval
+        )
+        self.rate = rate
+        self.global_bucket = TokenBucket(rate, rate)
+        # Shares the global rate with other processes; the local bucket still carries flood waits
+        self.backend = backend
+        background_rate = max(rate - headroom, rate * 0.1)
+        self.background_bucket = TokenBucket(background_rate, background_rate)
+        self.chat_rate = 1.0 / chat_interval if chat_interval > 0 else float("inf")
+        self.chat_burst = chat_burst or settings.TELEGRAM_CHAT_BURST
+        self._chats: Dict[Any, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def _chat_bucket(self, chat_id) -> Optional[TokenBucket]:
+        if self.chat_rate == float("inf"):
+            return None
+        with self._lock:
+            bucket = self._chats.get(chat_id)
+            if bucket is None:
+                if len(self._chats) >= 10000:
+                    # Forget chats whose budget has fully recovered
+                    self._chats = {
+                        key: b for key, b in self._chats.items() if not b.idle
+                    }
+                bucket = self._chats[chat_id] = TokenBucket(
+                    self.chat_rate, self.chat_burst
+                )
+            return bucket
+
+    async def acquire(self, chat_id, priority: Priority) -> None:
+        """Wait until one message to ``chat_id`` may be sent."""
+        chat_bucket = self._chat_bucket(chat_id)
+        buckets = [chat_bucket] if chat_bucket is not None else []
+        if priority != Priority.INTERACTIVE:
+            buckets.append(self.background_bucket)
+        buckets.append(self.global_bucket)
+        for bucket in buckets:
+            delay = bucket.reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        if self.backend is not None:
+            await self._take_shared_token()
+
+    async def _take_shared_token(self) -> None:
+        """Wait for a token from the bot-wide bucket in the limiter backend."""
+        while True:
+            try:
+                wait = await asyncio.to_thread(
+                    self.backend.take_token,
+                    TELEGRAM_BUCKET_KEY,
+                    self.rate,
+                    self.rate,
+                    time.time(),
+                )
+            except LIMITER_BACKEND_ERRORS as e:
+                # The local global bucket already paced this message
+                log.warning(
+                    "Limiter backend unavailable, using the local Telegram rate: %s", e
+                )
+                return
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Apply a flood wait to every sender."""
+        self.global_bucket.pause(seconds)
+        self.background_bucket.pause(seconds)
+
+
+_rate_limits: Optional[RateLimits] = None
+
+
+def get_rate_limits() -> RateLimits:
+    """Get the process-wide outbound rate limits."""
+    global _rate_limits
+    if _rate_limits is None:
+        backend = get_limiter_backend()
+        # A process-local backend would only duplicate the local global bucket
+        shared = not isinstance(backend, MemoryLimiterBackend)
+        _rate_limits = RateLimits(backend=backend if shared else None)
+    return _rate_limits
+
+
+Target = Union[int, Chat]
+
+
+@dataclass(order=True)
+class _Job:
+    priority: int
+    seq: int
+    target: Any = field(compare=False)
+    messages: List[OutboundMessage] = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    queued_at: float = field(compare=False, default_factory=time.monotonic)
+
+
+class OutboundDispatcher:
+    """Rate-limited sender for one event loop."""
+
+    def __init__(
+        self,
+        bot: Optional[Bot] = None,
+        limits: Optional[RateLimits] = None,
+        workers: Optional[int] = None,
+        max_backlog: Optional[int] = None,
+        max_retries: Optional[int] = None,
+    ):
+        """Initialize the dispatcher.
+
+        Args:
+        ----
+            bot: Bot for sends addressed by chat id (a pooled one is created on first use)
+            limits: Rate limits (the process-wide ones by default)
+            workers: Queued chats served concurrently
+            max_backlog: Queued alert and bulk jobs before ``submit`` waits
+            max_retries: Attempts per message after flood waits or network errors
+        """
+        self._bot = bot
+        self._owns_bot = False
+        self.limits = limits or get_rate_limits()
+        self.workers = workers or settings.TELEGRAM_SEND_WORKERS
+        self.max_retries = (
+            settings.TELEGRAM_SEND_RETRIES if max_retries is None else max_retries
+        )
+        self._backlog = asyncio.Semaphore(max_backlog or settings.TELEGRAM_SEND_BACKLOG)
+        self._queue: "asyncio.PriorityQueue[_Job]" = asyncio.PriorityQueue()
+        self._chat_locks: Dict[Any, asyncio.Lock] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._seq = itertools.count()
+        self.stats = {priority.name.lower(): _counters() for priority in Priority}
+        self._waits: Dict[str, Deque[float]] = {
+            priority.name.lower(): deque(maxlen=500) for priority in Priority
+        }
+
+    @property
+    def bot(self) -> Bot:
+        """Bot used for sends addressed by chat id."""
+        if self._bot is None:
+            # One connection per worker instead of PTB's default single connection
+            self._bot = Bot(
+                token=settings.TELEGRAM_TOKEN,
+                request=HTTPXRequest(connection_pool_size=self.workers),
+            )
+            self._owns_bot = True
+        return self._bot
+
+    async def send(
+        self,
+        target: Target,
+        messages: Sequence[OutboundMessage],
+        priority: Priority = Priority.INTERACTIVE,
+        bot: Optional[Bot] = None,
+    ) -> List[Any]:
+        """Send messages to one chat now, in order, within the rate limits.
+
+        Args:
+        ----
+            target: Chat id, or a ``Chat`` (sent through its own bot)
+            messages: Messages to send
+            priority: Priority for rate limiting
+            bot: Bot for a chat id target instead of the dispatcher's
+
+        Returns:
+        -------
+            The Bot API results, one per message
+
+        Raises:
+        ------
+            TelegramError: If a message could not be delivered
+        """
+        results = []
+        for message in messages:
+            results.append(await self._deliver(target, message, priority, bot))
+        return results
+
+    async def submit(
+        self,
+        target: Target,
+        messages: Sequence[OutboundMessage],
+        priority: Priority = Priority.BULK,
+    ) -> asyncio.Future:
+        """Queue messages for one chat, waiting while the backlog is full.
+
+        Returns
+        -------
+            Future resolving to the chat's sent/failed/blocked counts
+
+        """
+        if not self._tasks:
+            self.start()
+        await self._backlog.acquire()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(
+            _Job(priority, next(self._seq), target, list(messages), future)
+        )
+        self.stats[priority.name.lower()]["queued"] += len(messages)
+        return future
+
+    def start(self) -> None:
+        """Start the queue workers."""
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def close(self) -> None:
+        """Stop the workers and close the bot's connections if the dispatcher created it."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._owns_bot and self._bot is not None:
+            await self._bot.shutdown()
+            self._bot = None
+            self._owns_bot = False
+
+    def _chat_lock(self, chat_id) -> asyncio.Lock:
+        lock = self._chat_locks.get(chat_id)
+        if lock is None:
+            if len(self._chat_locks) >= 10000:
+                self._chat_locks = {
+                    key: lock for key, lock in self._chat_locks.items() if lock.locked()
+                }
+            lock = self._chat_locks[chat_id] = asyncio.Lock()
+        return lock
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            name = Priority(job.priority).name.lower()
+            self._waits[name].append((time.monotonic() - job.queued_at) * 1000)
+            counts = {"sent": 0, "failed": 0, "blocked": 0}
+            try:
+                # Keep one chat's jobs in order
+                async with self._chat_lock(_chat_id(job.target)):
+                    for index, message in enumerate(job.messages):
+                        try:
+                            await self._deliver(
+                                job.target, message, Priority(job.priority)
+                            )
+                            counts["sent"] += 1
+                        except Forbidden:
+                            # The user blocked the bot; the rest would fail the same way
+                            counts["blocked"] += len(job.messages) - index
+                            self.stats[name]["blocked"] += len(job.messages) - index
+                            break
+                        except Exception:
+                            counts["failed"] += 1
+            except asyncio.CancelledError:
+                job.future.cancel()
+                raise
+            finally:
+                self._backlog.release()
+                self._queue.task_done()
+            if not job.future.done():
+                job.future.set_result(counts)
+
+    async def _deliver(
+        self,
+        target: Target,
+        message: OutboundMessage,
+        priority: Priority,
+        bot: Optional[Bot] = None,
+    ) -> Any:
+        name = priority.name.lower()
+        chat_id = _chat_id(target)
+        for attempt in range(self.max_retries + 1):
+            await self.limits.acquire(chat_id, priority)
+            try:
+                if isinstance(target, int):
+                    sender = bot or self.bot
+                    result = await getattr(sender, message.method)(
+                        chat_id=target, **message.kwargs
+                    )
+                else:
+                    result = await getattr(target, message.method)(**message.kwargs)
+                self.stats[name]["sent"] += 1
+                return result
+            except RetryAfter as e:
+                # Flood wait applies to the whole bot: hold every sender back
+                self.stats[name]["flood_waits"] += 1
+                self.limits.pause(_seconds(e.retry_after))
+                log.warning(
+                    "Telegram flood wait of %ss (chat %s)", e.retry_after, chat_id
+                )
+                error: TelegramError = e
+            except Forbidden:
+                log.info("Chat %s blocked the bot", chat_id)
+                raise
+            except BadRequest as e:
+                # A NetworkError subclass, but retrying can't fix it
+                self.stats[name]["failed"] += 1
+                log.error(
+                    "Telegram rejected %s to chat %s: %s", message.method, chat_id, e
+                )
+                raise
+            except NetworkError as e:
+                log.warning("Network error sending to chat %s: %s", chat_id, e)
+                error = e
+                await asyncio.sleep(min(2**attempt, 30))
+            except TelegramError as e:
+                self.stats[name]["failed"] += 1
+                log.error(
+                    "Failed to send %s to chat %s: %s", message.method, chat_id, e
+                )
+                raise
+            if attempt < self.max_retries:
+                self.stats[name]["retries"] += 1
+
+        self.stats[name]["failed"] += 1
+        log.error(
+            "Giving up on %s to chat %s after %d attempts",
+            message.method,
+            chat_id,
+            self.max_retries + 1,
+        )
+        raise error
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-priority counters, queue wait percentiles and backlog."""
+        stats: Dict[str, Any] = {
+            "backlog": self._queue.qsize(),
+            "workers": len(self._tasks),
+        }
+        for name, counters in self.stats.items():
+            waits = sorted(self._waits[name])
+            stats[name] = {
+                **counters,
+                "wait_p50_ms": round(waits[len(waits) // 2], 1) if waits else 0.0,
+                "wait_p95_ms": (
+                    round(waits[int(len(waits) * 0.95) - 1], 1) if waits else 0.0
+                ),
+            }
+        return stats
+
+
+def _counters() -> Dict[str, int]:
+    return {
+        "queued": 0,
+        "sent": 0,
+        "failed": 0,
+        "blocked": 0,
+        "retries": 0,
+        "flood_waits": 0,
+    }
+
+
+def _chat_id(target: Target):
+    return target if isinstance(target, int) else target.id
+
+
+def _seconds(retry_after) -> float:
+    # int in python-telegram-bot 21, timedelta in later releases
+    return (
+        retry_after.total_seconds()
+        if hasattr(retry_after, "total_seconds")
+        else float(retry_after)
+    )
+
+
+# One dispatcher per event loop; queues and HTTP pools are bound to their loop
+_dispatchers: (
+    "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, OutboundDispatcher]"
+) = weakref.WeakKeyDictionary()
+
+
+def get_outbound_dispatcher(bot: Optional[Bot] = None) -> OutboundDispatcher:
+    """Get the running loop's dispatcher, creating it (with ``bot`` if given) on first use."""
+    loop = asyncio.get_running_loop()
+    dispatcher = _dispatchers.get(loop)
+    if dispatcher is None:
+        dispatcher = OutboundDispatcher(bot=bot)
+        _dispatchers[loop] = dispatcher
+    return dispatcher
+
+
+async def close_outbound_dispatcher() -> None:
+    """Close the running loop's dispatcher, if one was created."""
+    dispatcher = _dispatchers.pop(asyncio.get_running_loop(), None)
+    if dispatcher is not None:
+        await dispatcher.close()
+
+
+def get_outbound_stats() -> Dict[str, Any]:
+    """Get stats of every live dispatcher, keyed by loop."""
+    return {
+        f"loop_{index}": d.get_stats()
+        for index, d in enumerate(list(_dispatchers.values()))
+    }
@@ -8,7 +8,8 @@ format and providing enhanced resource requests for technical specifications.
 
 Key Components:
 1. Enhanced PA-API Resource Requests (AI_SEARCH_RESOURCES, AI_GETITEMS_RESOURCES)
-2. PA-API Response Transformer (transform_paapi_to_ai_format)
+2. PA-API Response Transformer (decoded ProductRecords read as AI-format
+   products, transform_paapi_to_ai_format for SDK model objects)
 3. AI-Enhanced Search Function (search_products_with_ai_analysis)
 4. Performance monitoring and caching support
 
@@ -34,13 +35,13 @@ from paapi5_python_sdk.models.condition import Condition
 
 from .config import settings
 from .errors import QuotaExceededError
+from .paapi_decoder import decode_search_response
+from .paapi_transport import get_paapi_transport
+from .product_record import ProductRecord
+from .search_cache import get_search_cache, make_search_key
 
 log = getLogger(__name__)
 
-# Simple cache to prevent duplicate AI search requests
-_ai_search_cache = {}
-_ai_cache_ttl = 300  # 5 minutes cache
-
 # Recursion prevention
 _ai_search_call_stack = set()
 _ai_recursion_lock = asyncio.Lock()
@@ -442,8 +443,8 @@ async def search_products_with_ai_analysis(
     -------
         Dict containing:
         {
-            "products": List[Dict],  # AI-compatible format
-            "raw_paapi_response": Any,  # Original PA-API response
+            "products": List[ProductRecord],  # Read as AI-compatible products
+            "raw_paapi_response": List[ProductRecord],  # Decoded PA-API items
             "ai_analysis_enabled": bool,
             "processing_time_ms": float,
             "metadata": Dict[str, Any]
@@ -501,22 +502,21 @@ async def search_products_with_ai_analysis(
         log.debug(f"🔍 AI SEARCH ENTRY: {call_signature} (depth={recursion_depth})")
 
     # Check cache first to prevent duplicate requests
-    cache_key = f"{keywords}_{search_index}_{item_count}_{enable_ai_analysis}"
-    current_time = time.time()
-
-    if cache_key in _ai_search_cache:
-        cached_data, cache_time = _ai_search_cache[cache_key]
-        if current_time - cache_time < _ai_cache_ttl:
-            log.info(f"📋 AI search cache hit for: '{keywords}'")
-            # Clean up call signature from stack before returning cached result
-            async with _ai_recursion_lock:
-                if call_signature in _ai_search_call_stack:
-                    _ai_search_call_stack.remove(call_signature)
-                    log.debug(f"🧹 AI SEARCH CACHE CLEANUP: Removed {call_signature} from call stack")
-            return cached_data
-        else:
-            # Remove expired cache entry
-            del _ai_search_cache[cache_key]
+    search_cache = get_search_cache()
+    cache_key = make_search_key(
+        "ai_search", keywords, search_index=search_index, item_count=item_count,
+        enable_ai_analysis=enable_ai_analysis, min_price=min_price, max_price=max_price,
+    )
+
+    cached_data = search_cache.get(cache_key)
+    if cached_data is not None:
+        log.info(f"📋 AI search cache hit for: '{keywords}'")
+        # Clean up call signature from stack before returning cached result
+        async with _ai_recursion_lock:
+            if call_signature in _ai_search_call_stack:
+                _ai_search_call_stack.remove(call_signature)
+                log.debug(f"🧹 AI SEARCH CACHE CLEANUP: Removed {call_signature} from call stack")
+        return cached_data
 
     # Choose appropriate resources based on AI analysis flag
     resources = AI_SEARCH_RESOURCES if enable_ai_analysis else DEFAULT_SEARCH_RESOURCES
@@ -532,15 +532,6 @@ async def search_products_with_ai_analysis(
         log.info(f"🔍 AI SEARCH DEBUG: Current call stack size: {len(_ai_search_call_stack)}")
         log.info(f"🔍 AI SEARCH DEBUG: Call stack: {list(_ai_search_call_stack)}")
 
-        # Import the PA-API client to perform actual search
-        log.debug("🔍 AI SEARCH DEBUG: Importing PA-API client...")
-        from .paapi_official import create_official_paapi_client
-
-        # Create PA-API client
-        log.debug("🔍 AI SEARCH DEBUG: Creating PA-API client...")
-        paapi_client = create_official_paapi_client()
-        log.debug("🔍 AI SEARCH DEBUG: PA-API client created successfully")
-
         # Perform the actual search with enhanced resources
         log.info(f"🔍 AI SEARCH DEBUG: Calling search_items_advanced with recursion_depth={recursion_depth + 1}")
         log.info("🔍 AI SEARCH DEBUG: Price filters being passed to PA-API:")
@@ -549,14 +540,11 @@ async def search_products_with_ai_analysis(
 
         # FIXED: Use lower-level API call to prevent recursion
         # Instead of calling search_items_advanced (which would call this function again),
-        # call the PA-API SDK directly
+        # send SearchItems through the shared PA-API transport directly
         from paapi5_python_sdk.models.search_items_request import SearchItemsRequest
         from paapi5_python_sdk.models.partner_type import PartnerType
         from paapi5_python_sdk.models.condition import Condition
 
-        # Get the official SDK client from paapi_client
-        api_client = paapi_client.api if hasattr(paapi_client, 'api') else paapi_client
-
         # Create SearchItemsRequest directly (avoiding recursion)
         search_request = SearchItemsRequest(
             partner_tag=settings.PAAPI_TAG,
@@ -576,39 +564,15 @@ async def search_products_with_ai_analysis(
         if max_price is not None:
             search_request.max_price = max_price
 
-        # Execute the API call directly (no recursion)
-        response = api_client.search_items(search_request)
-        search_results = response.search_result.items if hasattr(response, 'search_result') and response.search_result else []
-        log.info(f"🔍 AI SEARCH DEBUG: Direct PA-API call returned {len(search_results) if search_results else 0} results")
-
-        # Transform PA-API results to AI-compatible format
-        log.debug("🔍 AI SEARCH DEBUG: Starting result transformation...")
-        ai_products = []
-        for i, result in enumerate(search_results):
-            try:
-                # Handle PA-API SDK Item objects vs dictionaries
-                if hasattr(result, 'asin'):  # PA-API SDK Item object
-                    asin = getattr(result, 'asin', 'unknown')
-                    log.debug(f"🔍 AI SEARCH DEBUG: Transforming PA-API Item {i+1}/{len(search_results)}: {asin}")
-
-                    # Convert PA-API Item to dictionary for transformation
-                    item_dict = paapi_item_to_dict(result)
-                    mock_item = create_mock_paapi_item_from_result(item_dict)
-                else:  # Dictionary format
-                    asin = result.get('asin', 'unknown')
-                    log.debug(f"🔍 AI SEARCH DEBUG: Transforming dict result {i+1}/{len(search_results)}: {asin}")
-                    mock_item = create_mock_paapi_item_from_result(result)
-
-                ai_product = await transform_paapi_to_ai_format(mock_item)
-                ai_products.append(ai_product)
-                log.debug(f"🔍 AI SEARCH DEBUG: Successfully transformed result {i+1}")
-            except Exception as e:
-                log.warning(f"🔍 AI SEARCH DEBUG: Failed to transform search result {i+1}: {e}")
-                # Include original result as fallback
-                ai_products.append(result)
-
-        paapi_response = search_results
-        log.info(f"🔍 AI SEARCH DEBUG: Transformation complete. {len(ai_products)} AI products created")
+        # Pooled keep-alive request (no recursion, no per-search client), with
+        # the raw body decoded once (see bot/paapi_decoder.py)
+        records = decode_search_response(await get_paapi_transport().search_items(search_request))
+        log.info(f"🔍 AI SEARCH DEBUG: Direct PA-API call returned {len(records)} results")
+
+        # Records read as AI-format products (see bot/product_record.py), so
+        # they are the products themselves - no per-product dict is built
+        ai_products = records
+        paapi_response = records
 
         processing_time = (time.time() - start_time) * 1000  # Convert to milliseconds
 
@@ -633,7 +597,7 @@ async def search_products_with_ai_analysis(
         log.info(f"✅ AI search completed: {len(ai_products)} products in {processing_time:.1f}ms (depth={recursion_depth})")
 
         # Cache the successful result
-        _ai_search_cache[cache_key] = (result, current_time)
+        search_cache.set(cache_key, result)
 
         return result
 
@@ -676,7 +640,11 @@ async def execute_search_request(
     item_count: int,
     resources: List[Any]
 ) -> Any:
-    """Execute PA-API SearchItems request with proper error handling."""
+    """Execute PA-API SearchItems request with proper error handling.
+
+    ``paapi_client`` is accepted for existing callers; the request is sent through
+    the shared PA-API transport.
+    """
     try:
         # FIXED: Use direct PA-API call to avoid recursion
         from paapi5_python_sdk.models.search_items_request import SearchItemsRequest
@@ -684,9 +652,6 @@ async def execute_search_request(
         from paapi5_python_sdk.models.condition import Condition
         from .config import settings
 
-        # Get the official SDK client
-        api_client = paapi_client.api if hasattr(paapi_client, 'api') else paapi_client
-
         # Create SearchItemsRequest directly
         search_request = SearchItemsRequest(
             partner_tag=settings.PAAPI_TAG,
@@ -700,87 +665,26 @@ async def execute_search_request(
             resources=resources
         )
 
-        # Execute the API call directly
-        response = api_client.search_items(search_request)
-
-        # Extract items from the response
-        if hasattr(response, 'search_result') and response.search_result:
-            search_results = response.search_result.items
-        else:
-            search_results = []
-
-        # Return the items directly
-        return search_results
+        return decode_search_response(await get_paapi_transport().search_items(search_request))
         
     except Exception as e:
         log.error(f"PA-API search request failed: {e}")
         raise
 
 
-def paapi_item_to_dict(item) -> Dict[str, Any]:
-    """Convert PA-API SDK Item object to dictionary format for transformation."""
-    try:
-        item_dict = {}
-
-        # Basic item info
-        item_dict['asin'] = getattr(item, 'asin', '')
-
-        # Title
-        if hasattr(item, 'item_info') and item.item_info:
-            if hasattr(item.item_info, 'title') and item.item_info.title:
-                item_dict['title'] = getattr(item.item_info.title, 'display_value', '')
-
-        # Price information
-        if hasattr(item, 'offers') and item.offers:
-            if hasattr(item.offers, 'listings') and item.offers.listings:
-                for listing in item.offers.listings:
-                    if hasattr(listing, 'price') and listing.price:
-                        if hasattr(listing.price, 'amount'):
-                            amount = getattr(listing.price, 'amount', 0)
-                            if amount:
-                                # Convert to paise for consistency
-                                item_dict['price'] = int(float(amount) * 100)
-                        break  # Use first valid price
-
-        # Images
-        if hasattr(item, 'images') and item.images:
-            if hasattr(item.images, 'primary') and item.images.primary:
-                if hasattr(item.images.primary, 'large') and item.images.primary.large:
-                    item_dict['image_url'] = getattr(item.images.primary.large, 'url', '')
-                elif hasattr(item.images.primary, 'medium') and item.images.primary.medium:
-                    item_dict['image_url'] = getattr(item.images.primary.medium, 'url', '')
-
-        # Brand
-        if hasattr(item, 'item_info') and item.item_info:
-            if hasattr(item.item_info, 'by_line_info') and item.item_info.by_line_info:
-                if hasattr(item.item_info.by_line_info, 'brand') and item.item_info.by_line_info.brand:
-                    item_dict['brand'] = getattr(item.item_info.by_line_info.brand, 'display_value', '')
-
-        # Features/Bullet points
-        if hasattr(item, 'item_info') and item.item_info:
-            if hasattr(item.item_info, 'features') and item.item_info.features:
-                if hasattr(item.item_info.features, 'display_values'):
-                    item_dict['features'] = item.item_info.features.display_values or []
-
-        # Rating
-        if hasattr(item, 'customer_reviews') and item.customer_reviews:
-            if hasattr(item.customer_reviews, 'star_rating') and item.customer_reviews.star_rating:
-                item_dict['rating'] = getattr(item.customer_reviews.star_rating, 'display_value', '')
-
-        # Review count
-        if hasattr(item, 'customer_reviews') and item.customer_reviews:
-            if hasattr(item.customer_reviews, 'count'):
-                item_dict['review_count'] = getattr(item.customer_reviews, 'count', 0)
-
-        return item_dict
-
-    except Exception as e:
-        log.warning(f"Failed to convert PA-API Item to dict: {e}")
-        return {'asin': getattr(item, 'asin', 'unknown'), 'title': 'Unknown Product'}
+def ai_format_from_result(result: Dict[str, Any]) -> ProductRecord:
+    """AI-compatible product for an already fetched result (search or batch dict, or a record)."""
+    if isinstance(result, ProductRecord):
+        return result
+    return ProductRecord.from_dict(result)
 
 
 def create_mock_paapi_item_from_result(result: Dict) -> Any:
-    """Create a mock PA-API item from search result for transformation."""
+    """Create a mock PA-API item from search result for transformation.
+
+    Kept for callers of ``transform_paapi_to_ai_format``; the bot itself uses
+    ``ai_format_from_result``.
+    """
     class MockItem:
         def __init__(self, data):
             self.asin = data.get("asin", "")
@@ -862,7 +766,7 @@ async def get_items_with_ai_analysis(
     asins: List[str],
     enable_ai_analysis: bool = True,
     priority: str = "normal"
-) -> Dict[str, Dict]:
+) -> Dict[str, ProductRecord]:
     """
     Get detailed product information with AI analysis for multiple ASINs.
     
@@ -874,7 +778,7 @@ async def get_items_with_ai_analysis(
         
     Returns:
     -------
-        Dict mapping ASIN to AI-compatible product data
+        Dict mapping ASIN to its product record (read as AI-compatible product data)
     """
     start_time = time.time()
     
@@ -887,29 +791,16 @@ async def get_items_with_ai_analysis(
         # Import here to avoid circular imports
         from .paapi_official import create_official_paapi_client
         
-        # Create PA-API client
+        # Cheap to create: the client shares the process-wide PA-API transport
         paapi_client = create_official_paapi_client()
         
-        # Use existing batch functionality with enhanced transformation
-        batch_results = await paapi_client.get_items_batch(asins, priority=priority)
-        
-        # Transform results to AI format
-        ai_results = {}
-        for asin, product_data in batch_results.items():
-            try:
-                # Convert existing result to mock PA-API format for transformation
-                mock_item = create_mock_paapi_item_from_result(product_data)
-                ai_product = await transform_paapi_to_ai_format(mock_item)
-                ai_results[asin] = ai_product
-            except Exception as e:
-                log.warning(f"Failed to transform item {asin}: {e}")
-                # Include original data as fallback
-                ai_results[asin] = product_data
+        # Decoded records straight from GetItems (no detour through get_items_batch)
+        records = await paapi_client.get_item_records(asins, priority=priority)
         
         processing_time = (time.time() - start_time) * 1000
-        log.info(f"AI GetItems completed: {len(ai_results)} products in {processing_time:.1f}ms")
+        log.info(f"AI GetItems completed: {len(records)} products in {processing_time:.1f}ms")
         
-        return ai_results
+        return records
         
     except Exception as e:
         log.error(f"AI GetItems failed for {len(asins)} ASINs: {e}")
@@ -0,0 +1,233 @@
+"""Single-flight request coalescing for PA-API calls.
+
+Identical GetItems/SearchItems/GetBrowseNodes requests that are already in
+flight are shared instead of being sent again, and single-ASIN GetItems
+lookups that arrive within a few milliseconds of each other are merged into
+one 10-ASIN GetItems batch. When many users open the same deal at once this
+turns dozens of quota-consuming calls into one.
+
+The coalescer sits underneath ``paapi_factory``; callers keep using the
+factory functions unchanged.
+"""
+
+import asyncio
+import weakref
+from logging import getLogger
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set
+
+from .api_rate_limiter import priority_lane
+from .config import settings
+
+log = getLogger(__name__)
+
+# PA-API maximum number of ASINs per GetItems request
+GETITEMS_MAX_BATCH = 10
+
+BatchFetcher = Callable[[List[str], str], Awaitable[Dict[str, Dict]]]
+
+
+class PaapiRequestCoalescer:
+    """Merge duplicate and near-simultaneous PA-API requests on one event loop."""
+
+    def __init__(
+        self,
+        batch_window_ms: Optional[float] = None,
+        max_batch_size: int = GETITEMS_MAX_BATCH,
+    ):
+        """Initialize the coalescer.
+
+        Args:
+        ----
+            batch_window_ms: How long to hold a GetItems lookup open for other
+                            ASINs to join it (defaults to PAAPI_COALESCE_WINDOW_MS)
+            max_batch_size: Maximum ASINs per merged GetItems call
+        """
+        if batch_window_ms is None:
+            batch_window_ms = settings.PAAPI_COALESCE_WINDOW_MS
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch_size = max_batch_size
+
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self._asin_futures: Dict[str, asyncio.Future] = (
+            {}
+        )  # Pending or in-flight GetItems lookups
+        self._pending_asins: List[str] = []
+        self._pending_priorities: List[str] = []
+        self._pending_fetcher: Optional[BatchFetcher] = None
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._batch_tasks: Set[asyncio.Task] = (
+            set()
+        )  # Keep running batch tasks referenced
+
+        self.stats = {
+            "requests": 0,
+            "coalesced": 0,
+            "item_lookups": 0,
+            "item_lookups_coalesced": 0,
+            "batches": 0,
+            "batched_asins": 0,
+        }
+
+    async def run(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``call`` once for all concurrent callers using the same key.
+
+        Args:
+        ----
+            key: Hashable identity of the request (operation plus parameters)
+            call: Zero-argument coroutine function performing the request
+
+        Returns:
+        -------
+            The shared result of the single underlying request. List and dict
+            results are shallow-copied so callers can't trip over each other.
+        """
+        self.stats["requests"] += 1
+        future = self._in_flight.get(key)
+
+        if future is None:
+            future = asyncio.ensure_future(call())
+            self._in_flight[key] = future
+            future.add_done_callback(lambda done, key=key: self._forget(key, done))
+        else:
+            self.stats["coalesced"] += 1
+            log.debug("Coalesced PA-API request with in-flight call: %s", key)
+
+        # Shield so one caller giving up does not cancel the call for everyone else
+        result = await asyncio.shield(future)
+        if isinstance(result, (list, dict)):
+            return result.copy()
+        return result
+
+    def _forget(self, key: Hashable, future: asyncio.Future) -> None:
+        """Drop a finished request from the in-flight table."""
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+
+    async def get_item(
+        self, asin: str, priority: str, fetch_batch: BatchFetcher
+    ) -> Dict:
+        """Look up one ASIN, merging it with other lookups into a GetItems batch.
+
+        Args:
+        ----
+            asin: ASIN to fetch
+            priority: Request priority; a batch uses the highest of its members
+            fetch_batch: Coroutine function fetching ``{asin: data}`` for a batch
+
+        Returns:
+        -------
+            Comprehensive product data for the ASIN, copied for each caller
+
+        Raises:
+        ------
+            ValueError: When PA-API returned no item for the ASIN
+            QuotaExceededError: When PA-API quota is exceeded
+        """
+        self.stats["item_lookups"] += 1
+        future = self._asin_futures.get(asin)
+
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._asin_futures[asin] = future
+            self._pending_asins.append(asin)
+            self._pending_priorities.append(priority)
+            if self._pending_fetcher is None:
+                self._pending_fetcher = fetch_batch
+
+            if len(self._pending_asins) >= self.max_batch_size:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.batch_window, self._flush)
+        else:
+            self.stats["item_lookups_coalesced"] += 1
+            log.debug("Coalesced GetItems lookup for ASIN %s", asin)
+
+        # Every waiter on the ASIN gets the same result object; hand out copies
+        return dict(await asyncio.shield(future))
+
+    def _flush(self) -> None:
+        """Send the pending ASINs as one GetItems batch."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending_asins:
+            return
+
+        asins = self._pending_asins
+        priority = min(self._pending_priorities, key=priority_lane)
+        fetch_batch = self._pending_fetcher
+        self._pending_asins = []
+        self._pending_priorities = []
+        self._pending_fetcher = None
+
+        self.stats["batches"] += 1
+        self.stats["batched_asins"] += len(asins)
+        log.debug(
+            "Flushing coalesced GetItems batch: %d ASINs (priority: %s)",
+            len(asins),
+            priority,
+        )
+        task = asyncio.ensure_future(self._fetch_batch(asins, priority, fetch_batch))
+        self._batch_tasks.add(task)
+        task.add_done_callback(self._batch_tasks.discard)
+
+    async def _fetch_batch(
+        self, asins: List[str], priority: str, fetch_batch: BatchFetcher
+    ) -> None:
+        """Fetch a merged batch and resolve every waiting lookup."""
+        try:
+            results = await fetch_batch(asins, priority)
+        except asyncio.CancelledError:
+            for asin in asins:
+                future = self._asin_futures.pop(asin, None)
+                if future is not None:
+                    future.cancel()
+            raise
+        except Exception as exc:
+            for asin in asins:
+                future = self._asin_futures.pop(asin, None)
+                if future is not None and not future.done():
+                    future.set_exception(exc)
+            return
+
+        for asin in asins:
+            future = self._asin_futures.pop(asin, None)
+            if future is None or future.done():
+                continue
+            if asin in results:
+                future.set_result(results[asin])
+            else:
+                future.set_exception(ValueError(f"No item found for ASIN: {asin}"))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get coalescing statistics."""
+        stats = dict(self.stats)
+        stats["in_flight"] = len(self._in_flight)
+        stats["pending_asins"] = len(self._pending_asins)
+        return stats
+
+
+# One coalescer per event loop; futures cannot be shared across loops
+_coalescers: (
+    "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, PaapiRequestCoalescer]"
+) = weakref.WeakKeyDictionary()
+
+
+def get_request_coalescer() -> PaapiRequestCoalescer:
+    """Get the request coalescer for the running event loop."""
+    loop = asyncio.get_running_loop()
+    coalescer = _coalescers.get(loop)
+    if coalescer is None:
+        coalescer = PaapiRequestCoalescer()
+        _coalescers[loop] = coalescer
+    return coalescer
+
+
+def get_coalescer_stats() -> Dict[str, int]:
+    """Get coalescing statistics summed over all live event loops."""
+    totals: Dict[str, int] = {}
+    for coalescer in list(_coalescers.values()):
+        for name, value in coalescer.get_stats().items():
+            totals[name] = totals.get(name, 0) + value
+    return totals
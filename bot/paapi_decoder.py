@@ -0,0 +1,266 @@
+"""Single-pass decoder for PA-API response bodies.
+
+The SDK turns a response into generated model objects (one per JSON node,
+every attribute behind a property), which the bot then walked again with
+``hasattr``/``getattr`` probes to build its own dictionaries - and the AI
+bridge converted those into mock objects only to walk them a third time.
+
+The client now asks the SDK for the raw body (``_preload_content=False``)
+and this module decodes it once: ``json.loads`` followed by one pass over
+each item that reads the fields the bot uses straight into a
+``ProductRecord`` (bot/product_record.py). Both ``Offers`` (SearchItems) and
+``OffersV2`` (GetItems) listings are understood, falling back to the offer
+summaries' lowest price when no listing is returned.
+
+``scripts/benchmark_paapi_decoding.py`` compares this against the old chain
+on the recorded responses in tests/fixtures/paapi/.
+"""
+
+import json
+from logging import getLogger
+from typing import Any, Dict, List, Optional, Union
+
+from .product_record import ProductRecord
+
+log = getLogger(__name__)
+
+Body = Union[bytes, str, Dict[str, Any]]
+
+_DIMENSION_KEYS = ("Height", "Length", "Width")
+
+
+def _paise(amount: Any) -> Optional[int]:
+    """Convert a rupee amount from the response to paise."""
+    if not amount:
+        return None
+    return int(round(float(amount) * 100))
+
+
+def _display(node: Optional[Dict[str, Any]], key: str) -> Any:
+    """``DisplayValue`` of a single-valued attribute, or None."""
+    if node:
+        attribute = node.get(key)
+        if attribute:
+            return attribute.get("DisplayValue")
+    return None
+
+
+def _first_display(node: Optional[Dict[str, Any]], key: str) -> Optional[str]:
+    """First entry of a multi-valued attribute, or None."""
+    if node:
+        attribute = node.get(key)
+        if attribute and attribute.get("DisplayValues"):
+            return attribute["DisplayValues"][0]
+    return None
+
+
+def _technical_details(technical_info: Dict[str, Any]) -> Dict[str, str]:
+    details = {}
+    for key, attribute in technical_info.items():
+        if not isinstance(attribute, dict):
+            continue
+        values = attribute.get("DisplayValues")
+        value = (
+            ", ".join(str(v) for v in values)
+            if values
+            else attribute.get("DisplayValue")
+        )
+        if value not in (None, ""):
+            details[attribute.get("Label") or key] = str(value)
+    return details
+
+
+def _decode_item_info(record: ProductRecord, info: Dict[str, Any]) -> None:
+    title = info.get("Title")
+    if title:
+        record.title = title.get("DisplayValue") or ""
+
+    by_line = info.get("ByLineInfo")
+    if by_line:
+        record.brand = _display(by_line, "Brand")
+        record.manufacturer = _display(by_line, "Manufacturer")
+
+    features = info.get("Features")
+    if features and features.get("DisplayValues"):
+        record.features = features["DisplayValues"]
+
+    manufacture = info.get("ManufactureInfo")
+    if manufacture:
+        record.model = _display(manufacture, "Model")
+
+    product = info.get("ProductInfo")
+    if product:
+        record.color = _display(product, "Color")
+        record.size = _display(product, "Size")
+        record.is_adult_product = bool(_display(product, "IsAdultProduct"))
+        dimensions = product.get("ItemDimensions")
+        if dimensions:
+            sides = [dimensions[key] for key in _DIMENSION_KEYS if key in dimensions]
+            if sides:
+                record.dimensions = " x ".join(
+                    str(side.get("DisplayValue")) for side in sides
+                )
+                record.dimensions += f" {sides[0].get('Unit', '')}".rstrip()
+            weight = dimensions.get("Weight")
+            if weight:
+                record.weight = (
+                    f"{weight.get('DisplayValue')} {weight.get('Unit', '')}".rstrip()
+                )
+
+    technical = info.get("TechnicalInfo")
+    if technical:
+        record.technical_details = _technical_details(technical)
+
+    external_ids = info.get("ExternalIds")
+    if external_ids:
+        record.ean = _first_display(external_ids, "EANs")
+        record.isbn = _first_display(external_ids, "ISBNs")
+        record.upc = _first_display(external_ids, "UPCs")
+
+
+def _decode_listing_v2(record: ProductRecord, listing: Dict[str, Any]) -> None:
+    """First ``OffersV2`` listing (GetItems)."""
+    price = listing.get("Price")
+    if price:
+        money = price.get("Money")
+        if money:
+            record.price = _paise(money.get("Amount"))
+            record.currency = money.get("Currency")
+        basis = price.get("SavingBasis")
+        if basis and basis.get("Money"):
+            record.list_price = _paise(basis["Money"].get("Amount"))
+        savings = price.get("Savings")
+        if savings:
+            if savings.get("Money"):
+                record.savings = _paise(savings["Money"].get("Amount"))
+            record.savings_percent = savings.get("Percentage")
+    availability = listing.get("Availability")
+    if availability:
+        record.availability = availability.get("Message")
+    condition = listing.get("Condition")
+    if condition:
+        record.condition = condition.get("Value")
+    merchant = listing.get("MerchantInfo")
+    if merchant:
+        record.merchant = merchant.get("Name")
+
+
+def _decode_offers(record: ProductRecord, offers: Dict[str, Any]) -> None:
+    """``Offers`` (SearchItems): first listing, else the lowest summary price."""
+    listings = offers.get("Listings")
+    if listings:
+        listing = listings[0]
+        price = listing.get("Price")
+        if price:
+            record.price = _paise(price.get("Amount"))
+            record.currency = price.get("Currency")
+            savings = price.get("Savings")
+            if savings:
+                record.savings = _paise(savings.get("Amount"))
+                record.savings_percent = savings.get("Percentage")
+        basis = listing.get("SavingBasis")
+        if basis:
+            record.list_price = _paise(basis.get("Amount"))
+        availability = listing.get("Availability")
+        if availability:
+            record.availability = availability.get("Message")
+        condition = listing.get("Condition")
+        if condition:
+            record.condition = condition.get("Value")
+        merchant = listing.get("MerchantInfo")
+        if merchant:
+            record.merchant = merchant.get("Name")
+        delivery = listing.get("DeliveryInfo")
+        if delivery:
+            record.prime = bool(delivery.get("IsPrimeEligible"))
+            record.free_shipping = bool(delivery.get("IsFreeShippingEligible"))
+
+    if record.price is None:
+        for summary in offers.get("Summaries") or ():
+            lowest = summary.get("LowestPrice")
+            if lowest and lowest.get("Amount"):
+                record.price = _paise(lowest["Amount"])
+                record.currency = lowest.get("Currency")
+                break
+
+
+def decode_item(raw: Dict[str, Any]) -> ProductRecord:
+    """Decode one item of a SearchItems/GetItems response."""
+    record = ProductRecord(
+        raw.get("ASIN") or "", detail_page_url=raw.get("DetailPageURL") or ""
+    )
+
+    info = raw.get("ItemInfo")
+    if info:
+        _decode_item_info(record, info)
+
+    offers_v2 = raw.get("OffersV2")
+    if offers_v2 and offers_v2.get("Listings"):
+        _decode_listing_v2(record, offers_v2["Listings"][0])
+    offers = raw.get("Offers")
+    if offers and record.price is None:
+        _decode_offers(record, offers)
+
+    images = raw.get("Images")
+    primary = images.get("Primary") if images else None
+    if primary:
+        for size, node in primary.items():
+            if size == "Large":
+                record.image_large = node.get("URL")
+            elif size == "Medium":
+                record.image_medium = node.get("URL")
+            elif size == "Small":
+                record.image_small = node.get("URL")
+
+    reviews = raw.get("CustomerReviews")
+    if reviews:
+        record.review_count = reviews.get("Count")
+        star_rating = reviews.get("StarRating")
+        if star_rating:
+            record.rating = star_rating.get("Value")
+
+    browse = raw.get("BrowseNodeInfo")
+    if browse:
+        record.categories = [
+            {
+                "id": node.get("Id"),
+                "name": node.get("DisplayName"),
+                "is_root": node.get("IsRoot", False),
+            }
+            for node in browse.get("BrowseNodes") or ()
+        ]
+        rank = browse.get("WebsiteSalesRank")
+        if rank:
+            record.sales_rank = rank.get("SalesRank")
+
+    return record
+
+
+def _decode(body: Body, result_key: str) -> List[ProductRecord]:
+    payload = json.loads(body) if isinstance(body, (bytes, str)) else body
+    for error in payload.get("Errors") or ():
+        log.warning("PA-API reported %s: %s", error.get("Code"), error.get("Message"))
+
+    result = payload.get(result_key)
+    if not result:
+        return []
+
+    records = []
+    for raw in result.get("Items") or ():
+        try:
+            records.append(decode_item(raw))
+        except (AttributeError, TypeError, ValueError) as e:
+            log.warning(
+                "Skipping undecodable PA-API item %s: %s", raw.get("ASIN", "unknown"), e
+            )
+    return records
+
+
+def decode_search_response(body: Body) -> List[ProductRecord]:
+    """Products of a SearchItems response body, in result order."""
+    return _decode(body, "SearchResult")
+
+
+def decode_get_items_response(body: Body) -> List[ProductRecord]:
+    """Products of a GetItems response body, in result order."""
+    return _decode(body, "ItemsResult")
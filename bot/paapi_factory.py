@@ -7,6 +7,8 @@ Legacy amazon-paapi support has been removed due to reliability issues.
 from logging import getLogger
 from typing import Protocol
 
+from .paapi_coalescer import get_request_coalescer
+
 log = getLogger(__name__)
 
 
@@ -24,6 +26,12 @@ class PaapiClientProtocol(Protocol):
     ):
         """Get detailed product information for multiple ASINs efficiently."""
         ...
+
+    async def get_items_detailed_batch(
+        self, asins: list[str], priority: str = "normal"
+    ):
+        """Get comprehensive product information for many ASINs in 10-item batches."""
+        ...
         
     async def search_items_advanced(
         self,
@@ -71,21 +79,43 @@ async def get_paapi_client() -> PaapiClientProtocol:
     return OfficialPaapiClient()
 
 
-# Convenience functions for backward compatibility
+async def _fetch_items_detailed_batch(asins: list[str], priority: str):
+    """Fetch a coalesced GetItems batch with the active PA-API client."""
+    client = await get_paapi_client()
+    return await client.get_items_detailed_batch(asins, priority)
+
+
+# Convenience functions for backward compatibility.
+# All calls go through the request coalescer, so identical in-flight requests
+# share one PA-API call and single-ASIN lookups are merged into GetItems batches.
 async def get_item_detailed(
     asin: str, resources=None, priority: str = "normal"
 ):
     """Get detailed product information using the active PA-API client."""
-    client = await get_paapi_client()
-    return await client.get_item_detailed(asin, resources, priority)
+    coalescer = get_request_coalescer()
+    return await coalescer.get_item(asin, priority, _fetch_items_detailed_batch)
 
 
 async def get_items_batch(
     asins: list[str], resources=None, priority: str = "normal"
 ):
     """Get detailed product information for multiple ASINs efficiently using the active PA-API client."""
-    client = await get_paapi_client()
-    return await client.get_items_batch(asins, resources, priority)
+    async def call():
+        client = await get_paapi_client()
+        return await client.get_items_batch(asins, resources, priority)
+
+    key = ("get_items_batch", frozenset(asins), tuple(resources) if resources else None)
+    return await get_request_coalescer().run(key, call)
+
+
+async def get_items_detailed_batch(
+    asins: list[str], priority: str = "normal"
+):
+    """Get comprehensive product information for many ASINs using batched GetItems calls."""
+    async def call():
+        return await _fetch_items_detailed_batch(asins, priority)
+
+    return await get_request_coalescer().run(("get_items_detailed_batch", frozenset(asins)), call)
 
 
 async def search_items_advanced(
@@ -107,30 +137,42 @@ async def search_items_advanced(
     enable_ai_analysis=None,
 ):
     """Search for products using the active PA-API client."""
-    client = await get_paapi_client()
-    return await client.search_items_advanced(
-        keywords=keywords,
-        title=title,
-        brand=brand,
-        search_index=search_index,
-        min_price=min_price,
-        max_price=max_price,
-        min_reviews_rating=min_reviews_rating,
-        min_savings_percent=min_savings_percent,
-        merchant=merchant,
-        condition=condition,
-        item_count=item_count,
-        item_page=item_page,
-        sort_by=sort_by,
-        browse_node_id=browse_node_id,
-        priority=priority,
-        enable_ai_analysis=enable_ai_analysis,
+    async def call():
+        client = await get_paapi_client()
+        return await client.search_items_advanced(
+            keywords=keywords,
+            title=title,
+            brand=brand,
+            search_index=search_index,
+            min_price=min_price,
+            max_price=max_price,
+            min_reviews_rating=min_reviews_rating,
+            min_savings_percent=min_savings_percent,
+            merchant=merchant,
+            condition=condition,
+            item_count=item_count,
+            item_page=item_page,
+            sort_by=sort_by,
+            browse_node_id=browse_node_id,
+            priority=priority,
+            enable_ai_analysis=enable_ai_analysis,
+        )
+
+    # Priority is deliberately not part of the key: a duplicate is a duplicate
+    key = (
+        "search_items_advanced", keywords, title, brand, search_index, min_price, max_price,
+        min_reviews_rating, min_savings_percent, merchant, condition, item_count, item_page,
+        sort_by, browse_node_id, enable_ai_analysis,
     )
+    return await get_request_coalescer().run(key, call)
 
 
 async def get_browse_nodes_hierarchy(
     browse_node_id: int, priority: str = "normal"
 ):
     """Get browse nodes hierarchy using the active PA-API client."""
-    client = await get_paapi_client()
-    return await client.get_browse_nodes_hierarchy(browse_node_id, priority)
+    async def call():
+        client = await get_paapi_client()
+        return await client.get_browse_nodes_hierarchy(browse_node_id, priority)
+
+    return await get_request_coalescer().run(("get_browse_nodes_hierarchy", browse_node_id), call)
@@ -3,14 +3,18 @@
 This module provides a parallel implementation using the official paapi5-python-sdk
 to replace the current third-party amazon-paapi implementation. Built according
 to the migration roadmap in paapi_corrections.md.
+
+Requests are built with the SDK's request models but sent through the shared
+async transport (bot/paapi_transport.py) rather than the SDK's own HTTP
+client, and responses are decoded by bot/paapi_decoder.py.
 """
 
 import asyncio
-import time
+import json
+from collections import deque
 from logging import getLogger
 from typing import Dict, List, Optional
 
-from paapi5_python_sdk.api.default_api import DefaultApi
 from paapi5_python_sdk.models.condition import Condition
 from paapi5_python_sdk.models.get_items_request import GetItemsRequest
 from paapi5_python_sdk.models.get_items_resource import GetItemsResource
@@ -25,7 +29,10 @@ from paapi5_python_sdk.rest import ApiException
 from .api_rate_limiter import acquire_api_permission
 from .config import settings
 from .errors import QuotaExceededError
+from .paapi_decoder import decode_get_items_response, decode_search_response
 from .paapi_resource_manager import get_resource_manager
+from .paapi_transport import get_paapi_transport
+from .product_record import ProductRecord
 
 log = getLogger(__name__)
 
@@ -50,19 +57,11 @@ class OfficialPaapiClient:
         ]):
             raise ValueError("PA-API credentials must be configured")
             
-        self.api = DefaultApi(
-            access_key=settings.PAAPI_ACCESS_KEY,
-            secret_key=settings.PAAPI_SECRET_KEY,
-            host=settings.PAAPI_HOST,  # "webservices.amazon.in"
-            region=settings.PAAPI_REGION,  # "eu-west-1" 
-        )
+        # Process-wide keep-alive transport to settings.PAAPI_HOST, shared by all clients
+        self.transport = get_paapi_transport()
         
         # Initialize resource manager
         self.resource_manager = get_resource_manager()
-
-        # Client-side filtering variables
-        self._client_side_min_price = None
-        self._client_side_max_price = None
         
     async def get_item_detailed(
         self, asin: str, resources: Optional[List[str]] = None, priority: str = "normal"
@@ -86,7 +85,7 @@ class OfficialPaapiClient:
         await acquire_api_permission(priority)
 
         try:
-            result = await asyncio.to_thread(self._sync_get_item_detailed, asin)
+            result = await self._fetch_item_detailed(asin)
             return result
         except ApiException as exc:
             if exc.status in [503, 429]:
@@ -169,7 +168,7 @@ class OfficialPaapiClient:
             await acquire_api_permission(priority)
             
             try:
-                batch_result = await asyncio.to_thread(self._sync_get_items_batch, batch_asins)
+                batch_result = await self._fetch_items_batch(batch_asins)
                 results.update(batch_result)
                 
                 log.info("Batch %d/%d completed successfully, got %d results", 
@@ -193,197 +192,50 @@ class OfficialPaapiClient:
         
         return results
 
-    def _sync_get_items_batch(self, asins: List[str]) -> Dict[str, Dict]:
-        """Synchronous batch GetItems PA-API call using official SDK."""
+    async def _fetch_items_batch(self, asins: List[str]) -> Dict[str, Dict]:
+        """One batch GetItems call, as per-ASIN batch dicts."""
         if not asins:
             return {}
-            
-        # Get appropriate resources from resource manager
-        resources = self.resource_manager.get_detailed_resources("get_items")
-        
-        # Create the request object with proper marketplace configuration
-        get_items_request = GetItemsRequest(
-            partner_tag=settings.PAAPI_TAG,
-            partner_type=PartnerType.ASSOCIATES,
-            marketplace=settings.PAAPI_MARKETPLACE,  # "www.amazon.in"
-            condition=Condition.NEW,
-            item_ids=asins,  # List of ASINs
-            resources=resources
-        )
-        
-        # Make the API call
-        response = self.api.get_items(get_items_request)
-        
-        # Extract data and convert to expected format
-        results = {}
-        
-        if hasattr(response, 'items_result') and response.items_result:
-            items = response.items_result.items or []
-            log.info("Official PA-API batch call returned %d items for %d requested ASINs", 
-                    len(items), len(asins))
-                    
-            for item in items:
-                try:
-                    asin = item.asin
-                    
-                    # Extract comprehensive product information
-                    product_data = {
-                        "asin": asin,
-                        "title": getattr(item.item_info.title, 'display_value', '') if hasattr(item, 'item_info') and item.item_info and hasattr(item.item_info, 'title') else '',
-                        "price": None,
-                        "list_price": None,
-                        "savings_amount": None,
-                        "savings_percent": None,
-                        "image_url": None,
-                        "rating": None,
-                        "review_count": None,
-                        "brand": None,
-                        "model": None,
-                        "color": None,
-                        "size": None,
-                        "weight": None,
-                        "dimensions": None,
-                        "features": [],
-                        "specifications": {},
-                        "availability": None,
-                        "prime": False,
-                        "free_shipping": False,
-                        "url": None
-                    }
-                    
-                    # Extract pricing information
-                    if hasattr(item, 'offers') and item.offers and hasattr(item.offers, 'listings') and item.offers.listings:
-                        listing = item.offers.listings[0]  # Get primary offer
-                        
-                        # Current price
-                        if hasattr(listing, 'price') and listing.price:
-                            price_info = listing.price
-                            if hasattr(price_info, 'amount') and price_info.amount:
-                                product_data["price"] = int(float(price_info.amount) * 100)  # Convert to paise
-                        
-                        # List price and savings
-                        if hasattr(listing, 'saving_basis') and listing.saving_basis:
-                            saving_basis = listing.saving_basis
-                            if hasattr(saving_basis, 'amount') and saving_basis.amount:
-                                product_data["list_price"] = int(float(saving_basis.amount) * 100)  # Convert to paise
-                                
-                                # Calculate savings
-                                if product_data["price"]:
-                                    product_data["savings_amount"] = product_data["list_price"] - product_data["price"]
-                                    if product_data["list_price"] > 0:
-                                        product_data["savings_percent"] = int((product_data["savings_amount"] / product_data["list_price"]) * 100)
-                        
-                        # Availability
-                        if hasattr(listing, 'availability') and listing.availability:
-                            product_data["availability"] = getattr(listing.availability, 'message', '')
-                        
-                        # Prime and shipping
-                        if hasattr(listing, 'delivery_info') and listing.delivery_info:
-                            delivery = listing.delivery_info
-                            product_data["prime"] = getattr(delivery, 'is_prime_eligible', False)
-                            product_data["free_shipping"] = getattr(delivery, 'is_free_shipping_eligible', False)
-                    
-                    # Extract images
-                    if hasattr(item, 'images') and item.images:
-                        primary_image = item.images.primary
-                        if hasattr(primary_image, 'large') and primary_image.large:
-                            product_data["image_url"] = primary_image.large.url
-                        elif hasattr(primary_image, 'medium') and primary_image.medium:
-                            product_data["image_url"] = primary_image.medium.url
-                    
-                    # Extract customer reviews
-                    if hasattr(item, 'customer_reviews') and item.customer_reviews:
-                        reviews = item.customer_reviews
-                        if hasattr(reviews, 'star_rating') and reviews.star_rating:
-                            product_data["rating"] = getattr(reviews.star_rating, 'value', None)
-                        if hasattr(reviews, 'count') and reviews.count:
-                            product_data["review_count"] = reviews.count
-                    
-                    # Extract item info details
-                    if hasattr(item, 'item_info') and item.item_info:
-                        info = item.item_info
-                        
-                        # Brand
-                        if hasattr(info, 'by_line_info') and info.by_line_info:
-                            brand_info = info.by_line_info
-                            if hasattr(brand_info, 'brand') and brand_info.brand:
-                                product_data["brand"] = getattr(brand_info.brand, 'display_value', '')
-                        
-                        # Model
-                        if hasattr(info, 'model_number') and info.model_number:
-                            product_data["model"] = getattr(info.model_number, 'display_value', '')
-                        
-                        # Color  
-                        if hasattr(info, 'color') and info.color:
-                            product_data["color"] = getattr(info.color, 'display_value', '')
-                        
-                        # Size
-                        if hasattr(info, 'size') and info.size:
-                            product_data["size"] = getattr(info.size, 'display_value', '')
-                        
-                        # Features
-                        if hasattr(info, 'features') and info.features and hasattr(info.features, 'display_values'):
-                            product_data["features"] = info.features.display_values or []
-                        
-                        # Technical specifications
-                        if hasattr(info, 'technical_details') and info.technical_details:
-                            tech_details = info.technical_details
-                            if hasattr(tech_details, 'display_values'):
-                                for detail in (tech_details.display_values or []):
-                                    if hasattr(detail, 'label') and hasattr(detail, 'value'):
-                                        product_data["specifications"][detail.label] = detail.value
-                        
-                        # Product dimensions
-                        if hasattr(info, 'product_dimensions') and info.product_dimensions:
-                            product_data["dimensions"] = getattr(info.product_dimensions, 'display_value', '')
-                        
-                        # Item weight
-                        if hasattr(info, 'item_weight') and info.item_weight:
-                            product_data["weight"] = getattr(info.item_weight, 'display_value', '')
-                    
-                    # Product URL
-                    if hasattr(item, 'detail_page_url'):
-                        product_data["url"] = item.detail_page_url
-                    
-                    results[asin] = product_data
-                    log.debug("Processed batch item %s: %s", asin, product_data["title"][:50])
-                    
-                except Exception as item_error:
-                    log.warning("Failed to process batch item %s: %s", getattr(item, 'asin', 'unknown'), item_error)
-                    continue
-        
+
+        records = await self._fetch_item_records(asins)
+        log.info("Official PA-API batch call returned %d items for %d requested ASINs",
+                len(records), len(asins))
+        results = {record.asin: record.to_batch_dict() for record in records}
+
         # Log any ASINs that weren't found
-        found_asins = set(results.keys())
-        missing_asins = set(asins) - found_asins
+        missing_asins = set(asins) - set(results)
         if missing_asins:
-            log.warning("Batch processing: %d ASINs not found in response: %s", 
+            log.warning("Batch processing: %d ASINs not found in response: %s",
                        len(missing_asins), list(missing_asins))
-        
+
         return results
 
-    def _sync_get_item_detailed(self, asin: str) -> Dict:
-        """Synchronous detailed PA-API call using official SDK."""
-        # Get appropriate resources from resource manager
+    async def _fetch_item_records(self, asins: List[str]) -> List[ProductRecord]:
+        """GetItems call decoded straight from the response body (see bot/paapi_decoder.py)."""
         resources = self.resource_manager.get_detailed_resources("get_items")
-        
-        # Create the request object with proper marketplace configuration
+
         get_items_request = GetItemsRequest(
             partner_tag=settings.PAAPI_TAG,
             partner_type=PartnerType.ASSOCIATES,
             marketplace=settings.PAAPI_MARKETPLACE,  # "www.amazon.in"
             condition=Condition.NEW,
-            item_ids=[asin],
+            item_ids=asins,
             resources=resources
         )
 
+        return decode_get_items_response(await self.transport.get_items(get_items_request))
+
+    async def _fetch_search_records(self, request: SearchItemsRequest) -> List[ProductRecord]:
+        """SearchItems call decoded straight from the response body."""
+        return decode_search_response(await self.transport.search_items(request))
+
+    async def _fetch_item_detailed(self, asin: str) -> Dict:
+        """One detailed GetItems call for a single ASIN."""
         try:
-            response = self.api.get_items(get_items_request)
-            
-            if not response.items_result or not response.items_result.items:
+            records = await self._fetch_item_records([asin])
+            if not records:
                 raise ValueError(f"No item found for ASIN: {asin}")
-
-            item = response.items_result.items[0]
-            return self._extract_comprehensive_data(item)
+            return records[0].to_detailed_dict()
 
         except ApiException as e:
             log.error("Official PA-API detailed call failed for ASIN %s: Status %s, Body: %s", asin, e.status, e.body)
@@ -393,6 +245,87 @@ class OfficialPaapiClient:
             log.error("Official PA-API detailed call failed for ASIN %s: %s", asin, e)
             raise
 
+    async def get_items_detailed_batch(
+        self, asins: List[str], priority: str = "normal"
+    ) -> Dict[str, Dict]:
+        """Get comprehensive product information for many ASINs via batched GetItems.
+
+        Returns the same per-item structure as ``get_item_detailed`` so the result
+        can be stored by the enrichment service, but packs up to 10 ASINs into
+        each GetItems call and only acquires one rate limiter token per batch.
+
+        Args:
+        ----
+            asins: List of ASINs to fetch (duplicates are ignored)
+            priority: Request priority for rate limiting
+
+        Returns:
+        -------
+            Dict mapping ASIN to comprehensive product data. ASINs that were not
+            returned by PA-API (or whose batch failed) are absent from the dict.
+
+        Raises:
+        ------
+            QuotaExceededError: When PA-API quota is exceeded
+        """
+        records = await self.get_item_records(asins, priority)
+        return {asin: record.to_detailed_dict() for asin, record in records.items()}
+
+    async def get_item_records(
+        self, asins: List[str], priority: str = "normal"
+    ) -> Dict[str, ProductRecord]:
+        """Batched GetItems returning the decoded product record per ASIN.
+
+        Args:
+        ----
+            asins: List of ASINs to fetch (duplicates are ignored)
+            priority: Request priority for rate limiting
+
+        Returns:
+        -------
+            Dict mapping ASIN to ``ProductRecord``. ASINs that were not returned
+            by PA-API (or whose batch failed) are absent from the dict.
+
+        Raises:
+        ------
+            QuotaExceededError: When PA-API quota is exceeded
+        """
+        if not asins:
+            return {}
+
+        unique_asins = list(dict.fromkeys(asins))
+        batch_size = 10  # PA-API maximum per GetItems request
+        batches = [unique_asins[i:i + batch_size] for i in range(0, len(unique_asins), batch_size)]
+
+        log.info("Detailed batch refresh: %d ASINs in %d GetItems call(s)",
+                len(unique_asins), len(batches))
+
+        results = {}
+        for batch_idx, batch_asins in enumerate(batches):
+            await acquire_api_permission(priority)
+
+            try:
+                records = await self._fetch_item_records(batch_asins)
+                results.update((record.asin, record) for record in records)
+            except ApiException as exc:
+                if exc.status in [503, 429]:
+                    log.warning("PA-API quota exceeded for detailed batch %d: %s", batch_idx + 1, batch_asins)
+                    raise QuotaExceededError(f"PA-API quota exceeded for batch {batch_idx + 1}") from exc
+                log.error("PA-API error for detailed batch %d (%s): %s", batch_idx + 1, batch_asins, exc)
+                log.error("Request ID: %s", exc.headers.get("x-amzn-RequestId", "N/A"))
+                continue
+            except Exception as exc:
+                log.error("Unexpected PA-API error for detailed batch %d (%s): %s", batch_idx + 1, batch_asins, exc)
+                continue
+
+        missing_asins = set(unique_asins) - set(results)
+        if missing_asins:
+            log.warning("Detailed batch: %d ASINs not found in response: %s",
+                       len(missing_asins), sorted(missing_asins))
+        log.info("Detailed batch refresh completed: %d/%d ASINs returned",
+                len(results), len(unique_asins))
+        return results
+
     async def search_items_advanced(
         self,
         keywords: Optional[str] = None,
@@ -511,11 +444,8 @@ class OfficialPaapiClient:
             except Exception as e:
                 log.warning(f"AI search failed, falling back to standard search: {e}")
 
-        await acquire_api_permission(priority)
-
         try:
-            result = await asyncio.to_thread(
-                self._sync_search_items,
+            result = await self._search_items_paginated(
                 keywords=keywords,
                 title=title,
                 brand=brand,
@@ -528,6 +458,7 @@ class OfficialPaapiClient:
                 item_count=item_count,
                 item_page=item_page,
                 browse_node_id=browse_node_id,
+                priority=priority,
             )
             return result
         except ApiException as exc:
@@ -802,7 +733,84 @@ class OfficialPaapiClient:
             log.debug("Phase 4 Query Enhancement: No enhancement needed for '%s'", original_keywords)
             return None
 
-    def _sync_search_items(
+    def _build_search_keywords(
+        self,
+        keywords: Optional[str],
+        title: Optional[str],
+        brand: Optional[str],
+        min_price: Optional[int],
+        max_price: Optional[int],
+        search_index: str,
+    ) -> str:
+        """Combine search terms, applying Phase 4 query enhancement to the keywords."""
+        # Phase 4: Smart Query Enhancement - Enhance keywords based on budget and criteria
+        enhanced_keywords = self._enhance_search_query(keywords, title, brand, min_price, max_price, search_index)
+
+        search_terms = []
+        if enhanced_keywords:
+            search_terms.append(enhanced_keywords)
+        elif keywords:  # Fallback to original if enhancement fails
+            search_terms.append(keywords)
+        if title:
+            search_terms.append(title)
+        if brand:
+            search_terms.append(brand)
+
+        return " ".join(search_terms)
+
+    def _build_search_request(
+        self,
+        final_keywords: str,
+        search_index: str,
+        api_condition,
+        resources: List,
+        page: int,
+        items_for_page: int,
+        min_price: Optional[int],
+        max_price: Optional[int],
+        browse_node_id: Optional[int],
+    ) -> SearchItemsRequest:
+        """Build the SearchItems request for a single result page."""
+        search_items_request = SearchItemsRequest(
+            partner_tag=settings.PAAPI_TAG,
+            partner_type=PartnerType.ASSOCIATES,
+            marketplace=settings.PAAPI_MARKETPLACE,  # "www.amazon.in"
+            keywords=final_keywords,
+            search_index=search_index,
+            condition=api_condition,
+            item_count=items_for_page,  # Max 10 per request (Amazon limit)
+            item_page=page,
+            resources=resources
+        )
+
+        # Browse node ID helps target specific categories for more relevant results
+        if browse_node_id is not None:
+            search_items_request.browse_node_id = str(browse_node_id)
+
+        # PA-API expects prices in paise for INR, which is what we receive
+        if min_price is not None:
+            search_items_request.min_price = min_price
+        if max_price is not None:
+            search_items_request.max_price = max_price
+
+        return search_items_request
+
+    @staticmethod
+    def _matches_price_filter(item: Dict, min_price: Optional[int], max_price: Optional[int]) -> bool:
+        """Check a search result against the requested price range (all values in paise)."""
+        if min_price is None and max_price is None:
+            return True
+
+        item_price = item.get("price")
+        if not item_price:
+            return False  # Items without price data cannot satisfy a price filter
+        if min_price is not None and item_price < min_price:
+            return False
+        if max_price is not None and item_price > max_price:
+            return False
+        return True
+
+    async def _search_items_paginated(
         self,
         keywords: Optional[str] = None,
         title: Optional[str] = None,
@@ -816,552 +824,140 @@ class OfficialPaapiClient:
         item_count: int = 30,
         item_page: int = 1,
         browse_node_id: Optional[int] = None,
+        priority: str = "normal",
     ) -> List[Dict]:
-        """Synchronous search using official SDK."""
-        # Phase 4: Smart Query Enhancement - Enhance keywords based on budget and criteria
-        enhanced_keywords = self._enhance_search_query(keywords, title, brand, min_price, max_price, search_index)
+        """Fetch SearchItems pages as the shared rate limiter allows.
+
+        Every page acquires its own rate limiter token and is dispatched to a
+        worker thread as soon as the token is granted, so page round-trips
+        overlap instead of being serialized behind fixed sleeps. Pages are
+        consumed in order, and no further pages are scheduled once enough
+        results pass the price filter or Amazon runs out of results.
+
+        Returns:
+        -------
+            Up to ``item_count`` product dictionaries matching the price filter
+        """
+        final_keywords = self._build_search_keywords(keywords, title, brand, min_price, max_price, search_index)
 
-        # Combine search terms
-        search_terms = []
-        if enhanced_keywords:
-            search_terms.append(enhanced_keywords)
-        elif keywords:  # Fallback to original if enhancement fails
-            search_terms.append(keywords)
-        if title:
-            search_terms.append(title)
-        if brand:
-            search_terms.append(brand)
-        
-        final_keywords = " ".join(search_terms)
-        
-        # Map condition
         condition_map = {
             "New": Condition.NEW,
             "Used": Condition.USED,
             "Refurbished": Condition.REFURBISHED,
         }
         api_condition = condition_map.get(condition, Condition.NEW)
-        
+
         # Force refresh resource manager to ensure latest resources are used
         from .paapi_resource_manager import force_refresh_resources
         force_refresh_resources()
-        
-        # Get appropriate resources from resource manager
+
         resources = self.resource_manager.get_detailed_resources("search_items")
         log.info("Using SearchItems resources: %s", [str(r) for r in resources])
-        
-        # Amazon PA-API has a hard limit of 10 items per SearchItems request
-        # To get more items, we need to use pagination
-        max_items_per_request = 10
-        all_items = []
 
-        # Phase 3: Dynamic Search Depth - Determine optimal pagination depth
+        # Amazon PA-API returns at most 10 items per SearchItems page and 10 pages per query
+        max_items_per_request = 10
         max_pages = self._calculate_search_depth(final_keywords, search_index, min_price, max_price, item_count)
-        pages_needed = min(max_pages, (item_count + max_items_per_request - 1) // max_items_per_request)
+        first_page = max(1, item_page)
+        last_page = min(first_page + max_pages - 1, 10)
 
-        log.info("Phase 3 Extended Search: Using %d pages (max allowed: %d) for search: %s",
-                pages_needed, max_pages, final_keywords)
-        
-        for page in range(1, pages_needed + 1):
-            items_for_this_page = min(max_items_per_request, item_count - len(all_items))
-            if items_for_this_page <= 0:
-                break
-                
-            # Create the search request for this page
-            search_items_request = SearchItemsRequest(
-                partner_tag=settings.PAAPI_TAG,
-                partner_type=PartnerType.ASSOCIATES,
-                marketplace=settings.PAAPI_MARKETPLACE,  # "www.amazon.in"
-                keywords=final_keywords,
-                search_index=search_index,
-                condition=api_condition,
-                item_count=items_for_this_page,  # Max 10 per request (Amazon limit)
-                item_page=page,
-                resources=resources
-            )
-        
-            # Add browse node filtering if specified
-            # Browse node ID helps target specific categories for more relevant results
-            if browse_node_id is not None:
-                search_items_request.browse_node_id = str(browse_node_id)
-                log.info("Applied browse node filter: %s (ID: %s)", browse_node_id, search_items_request.browse_node_id)
-
-            # Add price filters if specified (convert paise to rupees)
-            # Note: PA-API expects price in currency units (rupees for INR)
-            # min_price and max_price are in paise, so divide by 100 to get rupees
-            #
-            # IMPORTANT: PA-API SearchItems has a limitation where it cannot handle
-            # both min_price and max_price simultaneously. When both are provided,
-            # the API may ignore them or return unfiltered results.
-            # Workaround: Prefer min_price when both are specified.
-
-            if min_price is not None and max_price is not None:
-                # CRITICAL FIX: PA-API expects prices in paise/cents, not rupees!
-                # Input is already in paise, send directly to PA-API
-                log.info("TESTING: Sending both min_price (%d paise = ₹%.2f) and max_price (%d paise = ₹%.2f) to PA-API",
-                        min_price, min_price/100, max_price, max_price/100)
+        log.info("PA-API SearchItems: keywords='%s', pages %d-%d, min_price=%s, max_price=%s, search_index='%s'",
+                final_keywords, first_page, last_page, min_price, max_price, search_index)
 
-                # Send both filters directly to PA-API (prices already in paise)
-                search_items_request.min_price = min_price
-                search_items_request.max_price = max_price
+        all_items: List[Dict] = []
+        matched_items: List[Dict] = []
+        in_flight = deque()  # (page, items requested, task) in page order
+        next_page = first_page
+        exhausted = False
 
-                log.debug("SearchItemsRequest.min_price set to: %d paise", min_price)
-                log.debug("SearchItemsRequest.max_price set to: %d paise", max_price)
+        def expected_matches_in_flight() -> float:
+            # Estimate from the match rate observed so far (optimistic before the first page)
+            match_rate = len(matched_items) / len(all_items) if all_items else 1.0
+            return sum(requested for _, requested, _ in in_flight) * match_rate
 
-                # Clear client-side filters - let PA-API handle both
-                self._client_side_min_price = None
-                self._client_side_max_price = None
+        def consume(page: int, requested: int, task: asyncio.Task) -> bool:
+            """Merge a finished page; returns False when pagination should stop."""
+            try:
+                records = task.result()
+            except Exception as exc:
+                if page == first_page:
+                    raise
+                log.warning("SearchItems page %d failed (%s), returning %d items from previous pages",
+                           page, exc, len(matched_items))
+                return False
+
+            if not records:
+                log.info("No items found for search page %d: %s", page, final_keywords)
+                return False
+
+            page_items = [record.to_search_dict() for record in records]
+            all_items.extend(page_items)
+            matched_items.extend(
+                item for item in page_items if self._matches_price_filter(item, min_price, max_price)
+            )
+            log.info("Retrieved %d items from page %d, %d/%d matching so far",
+                    len(page_items), page, len(matched_items), item_count)
 
-            elif min_price is not None:
-                # Send min_price in paise (PA-API expects cents/paise)
-                search_items_request.min_price = min_price
-                log.info("Applied min_price filter: ₹%.2f (sending %d paise to PA-API)", min_price/100, min_price)
-                log.debug("SearchItemsRequest.min_price set to: %d paise", min_price)
+            # A short page means Amazon has no further results for this query
+            return len(page_items) >= requested
 
-            elif max_price is not None:
-                # Send max_price in paise (PA-API expects cents/paise)
-                search_items_request.max_price = max_price
-                log.info("Applied max_price filter: ₹%.2f (sending %d paise to PA-API)", max_price/100, max_price)
-                log.debug("SearchItemsRequest.max_price set to: %d paise", max_price)
-
-            # Debug: Log all search parameters being sent to API
-            log.info("📡 FINAL PA-API CALL PARAMETERS:")
-            log.info("   keywords='%s'", final_keywords)
-            log.info("   min_price=%s (%s)", getattr(search_items_request, 'min_price', None),
-                     f"₹{getattr(search_items_request, 'min_price', 0)/100:.0f}" if getattr(search_items_request, 'min_price', None) else "None")
-            log.info("   max_price=%s (%s)", getattr(search_items_request, 'max_price', None),
-                     f"₹{getattr(search_items_request, 'max_price', 0)/100:.0f}" if getattr(search_items_request, 'max_price', None) else "None")
-            log.info("   search_index='%s'", search_index)
-            log.info("   item_count=%d", items_for_this_page)
-
-            log.info("PA-API SearchItems parameters: keywords='%s', min_price=%s, max_price=%s, search_index='%s'",
-                    final_keywords,
-                    getattr(search_items_request, 'min_price', None),
-                    getattr(search_items_request, 'max_price', None),
-                    search_index)
-            
-            # Add review rating filter if specified
-            # TODO: Implement review rating filtering when available in SDK
-            
-            # Add savings percent filter if specified
-            # TODO: Implement savings filtering when available in SDK
+        try:
+            while True:
+                # Merge pages that have already completed, strictly in page order
+                while not exhausted and in_flight and in_flight[0][2].done():
+                    exhausted = not consume(*in_flight.popleft())
+                if exhausted or len(matched_items) >= item_count:
+                    break
 
-            try:
-                log.info("Making PA-API SearchItems request for page %d/%d (items %d-%d)", 
-                        page, pages_needed, len(all_items) + 1, len(all_items) + items_for_this_page)
-                        
-                response = self.api.search_items(search_items_request)
-                
-                if not response.search_result or not response.search_result.items:
-                    log.info("No items found for search page %d: %s", page, final_keywords)
-                    break  # No more items available
+                remaining = item_count - len(matched_items)
+                if next_page <= last_page and expected_matches_in_flight() < remaining:
+                    # One rate limiter token per page; the page runs while we wait for the next token
+                    await acquire_api_permission(priority)
+                    request = self._build_search_request(
+                        final_keywords, search_index, api_condition, resources, next_page,
+                        max_items_per_request, min_price, max_price, browse_node_id,
+                    )
+                    task = asyncio.create_task(self._fetch_search_records(request))
+                    in_flight.append((next_page, max_items_per_request, task))
+                    next_page += 1
+                    continue
 
-                page_items = []
-                for item in response.search_result.items:
-                    page_items.append(self._extract_search_data(item))
-                
-                all_items.extend(page_items)
-                log.info("Retrieved %d items from page %d, total so far: %d", 
-                        len(page_items), page, len(all_items))
-                
-                # Phase 3: Dynamic rate limiting based on search depth
-                # Amazon PA-API is very strict about rate limits for SearchItems requests
-                if page < pages_needed:  # Don't wait after the last request
-                    import time
-
-                    # Calculate dynamic delay based on search depth
-                    if pages_needed <= 3:
-                        delay = 2.5  # Standard delay for normal searches
-                        delay_reason = "standard search"
-                    elif pages_needed <= 5:
-                        delay = 3.5  # Longer delay for extended searches
-                        delay_reason = "extended search"
-                    else:
-                        delay = 4.5  # Maximum delay for deep searches
-                        delay_reason = "deep search"
-
-                    time.sleep(delay)
-                    log.info("Phase 3 Rate Limiting: Applied %.1fs delay for %s (page %d/%d)",
-                            delay, delay_reason, page, pages_needed)
-
-            except ApiException as e:
-                log.error("Official PA-API search failed on page %d: Status %s, Body: %s", page, e.status, e.body)
-                log.error("Request ID: %s", e.headers.get("x-amzn-RequestId", "N/A"))
-                if page == 1:  # If first page fails, raise error
-                    raise
-                else:  # If later pages fail, return what we have so far
-                    log.warning("Page %d failed, returning %d items from previous pages", page, len(all_items))
+                if not in_flight:
                     break
-            except Exception as e:
-                log.error("Official PA-API search failed on page %d: %s", page, e)
-                if page == 1:  # If first page fails, raise error
-                    raise
-                else:  # If later pages fail, return what we have so far
-                    log.warning("Page %d failed, returning %d items from previous pages", page, len(all_items))
-                    break
-        
-        log.info("Pagination complete: Retrieved %d total items from %d pages", len(all_items), pages_needed)
-
-        # Log price analysis of retrieved products
-        if all_items:
-            prices = []
-            for item in all_items:
-                # Extract price using the same object-based logic as the main processing
-                price_amount = None
-                if hasattr(item, 'offers') and item.offers and hasattr(item.offers, 'listings') and item.offers.listings:
-                    listing = item.offers.listings[0]  # Get primary offer
-                    if hasattr(listing, 'price') and listing.price:
-                        price_info = listing.price
-                        if hasattr(price_info, 'amount') and price_info.amount:
-                            price_amount = float(price_info.amount)
-
-                if price_amount:
-                    prices.append(price_amount / 100)  # Convert paise to rupees
-
-            if prices:
-                min_found = min(prices)
-                max_found = max(prices)
-                avg_price = sum(prices) / len(prices)
-
-                log.info("💰 PRODUCT PRICE ANALYSIS:")
-                log.info("   Found %d products with prices", len(prices))
-                log.info("   Price range: ₹%.0f - ₹%.2f", min_found, max_found)
-                log.info("   Average price: ₹%.2f", avg_price)
-                log.info("   Requested range: %s - %s",
-                        f"₹{min_price/100:.0f}" if min_price else "No min",
-                        f"₹{max_price/100:.0f}" if max_price else "No max")
-
-                # Check if any products are within the requested range
-                if min_price and max_price:
-                    in_range = [p for p in prices if min_price/100 <= p <= max_price/100]
-                    log.info("   Products in requested range (₹%.0f-%.0f): %d/%d",
-                            min_price/100, max_price/100, len(in_range), len(prices))
-                    if len(in_range) == 0:
-                        log.warning("⚠️  NO PRODUCTS FOUND IN REQUESTED PRICE RANGE!")
-            else:
-                log.warning("⚠️  No price information found in retrieved products")
-        else:
-            log.warning("⚠️  No products retrieved from PA-API")
 
-        # Apply client-side filtering if needed
-        if self._client_side_min_price is not None or self._client_side_max_price is not None:
-            original_count = len(all_items)
-            filtered_items = []
-            filtered_out_min = 0
-            filtered_out_max = 0
-            no_price_data = 0
-
-            print(f"\n🔍 CLIENT-SIDE FILTERING DEBUG:")
-            print(f"  Original items: {original_count}")
-            print(f"  Min price filter: ₹{self._client_side_min_price or 0:.2f}")
-            print(f"  Max price filter: ₹{self._client_side_max_price or 0:.2f}")
-            print(f"  Sample item prices:")
-
-            # Show first 3 item prices for debugging
-            for i, item in enumerate(all_items[:3]):
-                price = item.get('price', 0)
-                title = item.get('title', 'N/A')[:30]
-                print(f"    {i+1}. ₹{price} - {title}")
-
-            log.info("Starting client-side filtering: %d items to process", original_count)
-            log.info("Filters: min_price=₹%.2f, max_price=₹%.2f",
-                    self._client_side_min_price or 0, self._client_side_max_price or 0)
-
-            for item in all_items:
-                item_price = item.get('price', 0)
-                item_title = item.get('title', 'N/A')[:30]
-
-                # Skip items with no price data
-                if item_price is None or item_price == 0:
-                    no_price_data += 1
-                    log.debug("Skipping item with no price: %s", item_title)
-                    continue
+                # Nothing more to schedule until the oldest page comes back
+                await asyncio.wait({in_flight[0][2]})
+        finally:
+            # Pages still in flight are no longer needed; their worker threads finish on their own
+            for _, _, task in in_flight:
+                task.cancel()
 
-                # CRITICAL: Price comparison bug found!
-                # item_price is in paise (e.g., 267500 for ₹2675)
-                # but _client_side_min_price and _client_side_max_price are in rupees (e.g., 100000 for ₹100,000)
-                # We need to convert filter values to paise OR convert item prices to rupees
-                
-                # Convert filter values from rupees to paise for comparison
-                min_price_paise = self._client_side_min_price * 100 if self._client_side_min_price is not None else None
-                max_price_paise = self._client_side_max_price * 100 if self._client_side_max_price is not None else None
-
-                # Apply min_price filter if set (comparing paise to paise)
-                if min_price_paise is not None and item_price < min_price_paise:
-                    filtered_out_min += 1
-                    log.debug("Filtering out item below min_price: ₹%.2f < ₹%.2f (%s)",
-                            item_price/100, min_price_paise/100, item_title)
-                    continue  # Skip items below minimum price
-
-                # Apply max_price filter if set (comparing paise to paise)
-                if max_price_paise is not None and item_price > max_price_paise:
-                    filtered_out_max += 1
-                    log.debug("Filtering out item above max_price: ₹%.2f > ₹%.2f (%s)",
-                            item_price/100, max_price_paise/100, item_title)
-                    continue  # Skip items above maximum price
-
-                filtered_items.append(item)
-                log.debug("Item passed filters: ₹%.2f (%s)", item_price, item_title)
-
-            all_items = filtered_items
-
-            log.info("Client-side filtering completed:")
-            log.info("  Original items: %d", original_count)
-            log.info("  No price data: %d", no_price_data)
-            log.info("  Filtered out (below min): %d", filtered_out_min)
-            log.info("  Filtered out (above max): %d", filtered_out_max)
-            log.info("  Final items: %d", len(all_items))
-
-            # Reset the filters for next search
-            self._client_side_min_price = None
-            self._client_side_max_price = None
-
-        return all_items
-
-    def _extract_comprehensive_data(self, item) -> Dict:
-        """Extract comprehensive data from official SDK item response.
-        
-        This method maps the official SDK response structure to our expected format,
-        ensuring compatibility with existing code that uses the data.
-        """
-        data = {
-            "asin": item.asin if item.asin else "",
-            "title": "",
-            "brand": None,
-            "manufacturer": None,
-            "product_group": None,
-            "binding": None,
-            "features": [],
-            "color": None,
-            "size": None,
-            "item_dimensions": None,
-            "item_weight": None,
-            "is_adult_product": False,
-            "technical_details": {},
-            "ean": None,
-            "isbn": None,
-            "upc": None,
-            "languages": [],
-            "page_count": None,
-            "publication_date": None,
-            "images": {"small": "", "medium": "", "large": "", "variants": []},
-            "offers": {
-                "price": None,
-                "list_price": None,
-                "savings": None,
-                "savings_percent": None,
-                "availability": "Unknown",
-                "condition": "New",
-                "merchant": "Amazon.in",
-                "prime": False,
-                "shipping": None,
-            },
-            "reviews": {
-                "rating": None,
-                "count": None,
-            },
-            "categories": [],
-            "rank": None,
-            "detail_page_url": "",
-        }
+        log.info("Pagination complete: %d pages requested, %d items retrieved, %d matching",
+                next_page - first_page, len(all_items), len(matched_items))
+        self._log_price_analysis(all_items, min_price, max_price)
 
-        # Extract basic item information
-        if item.item_info:
-            if item.item_info.title:
-                data["title"] = item.item_info.title.display_value or ""
-                
-            if item.item_info.by_line_info:
-                data["brand"] = item.item_info.by_line_info.brand.display_value if item.item_info.by_line_info.brand else None
-                data["manufacturer"] = item.item_info.by_line_info.manufacturer.display_value if item.item_info.by_line_info.manufacturer else None
-                
-            if item.item_info.features:
-                data["features"] = item.item_info.features.display_values if item.item_info.features.display_values else []
-                
-            if item.item_info.product_info:
-                data["color"] = item.item_info.product_info.color.display_value if hasattr(item.item_info.product_info, 'color') and item.item_info.product_info.color else None
-                data["size"] = item.item_info.product_info.size.display_value if hasattr(item.item_info.product_info, 'size') and item.item_info.product_info.size else None
-                data["item_weight"] = item.item_info.product_info.item_weight.display_value if hasattr(item.item_info.product_info, 'item_weight') and item.item_info.product_info.item_weight else None
-                data["is_adult_product"] = item.item_info.product_info.is_adult_product.display_value if hasattr(item.item_info.product_info, 'is_adult_product') and item.item_info.product_info.is_adult_product else False
-                
-            if item.item_info.technical_info:
-                # TODO: Extract technical details based on available fields
-                pass
-                
-            if item.item_info.external_ids:
-                data["ean"] = item.item_info.external_ids.ean.display_value if hasattr(item.item_info.external_ids, 'ean') and item.item_info.external_ids.ean else None
-                data["isbn"] = item.item_info.external_ids.isbn.display_value if hasattr(item.item_info.external_ids, 'isbn') and item.item_info.external_ids.isbn else None
-                data["upc"] = item.item_info.external_ids.upc.display_value if hasattr(item.item_info.external_ids, 'upc') and item.item_info.external_ids.upc else None
-
-        # Extract pricing information from offersV2
-        log.debug(f"DEBUG PRICE EXTRACTION: item.offers_v2 exists: {hasattr(item, 'offers_v2')}")
-        if hasattr(item, 'offers_v2'):
-            log.debug(f"DEBUG PRICE EXTRACTION: item.offers_v2 is None: {item.offers_v2 is None}")
-            if item.offers_v2:
-                log.debug(f"DEBUG PRICE EXTRACTION: offers_v2 type: {type(item.offers_v2)}")
-                log.debug(f"DEBUG PRICE EXTRACTION: offers_v2.listings exists: {hasattr(item.offers_v2, 'listings')}")
-                if hasattr(item.offers_v2, 'listings'):
-                    log.debug(f"DEBUG PRICE EXTRACTION: listings is None: {item.offers_v2.listings is None}")
-                    if item.offers_v2.listings:
-                        log.debug(f"DEBUG PRICE EXTRACTION: listings type: {type(item.offers_v2.listings)}")
-                        log.debug(f"DEBUG PRICE EXTRACTION: listings length: {len(item.offers_v2.listings)}")
-
-        if item.offers_v2 and item.offers_v2.listings:
-
-            if item.offers_v2.listings:
-                offer = item.offers_v2.listings[0]  # Take the first offer
-                log.debug(f"DEBUG PRICE EXTRACTION: first offer type: {type(offer)}")
-                log.debug(f"DEBUG PRICE EXTRACTION: first offer content: {offer}")
-            else:
-                offer = None
-            
-            # Offers are returned as dictionaries in the response
-            if isinstance(offer, dict):
-                # Extract price
-                if 'Price' in offer and 'Money' in offer['Price']:
-                    # Convert to paise (multiply by 100)
-                    data["offers"]["price"] = int(offer['Price']['Money']['Amount'] * 100)
-                    
-                # Extract list price (savings basis)
-                if 'Price' in offer and 'SavingBasis' in offer['Price'] and 'Money' in offer['Price']['SavingBasis']:
-                    data["offers"]["list_price"] = int(offer['Price']['SavingBasis']['Money']['Amount'] * 100)
-                    
-                # Extract savings information
-                if 'Price' in offer and 'Savings' in offer['Price']:
-                    savings = offer['Price']['Savings']
-                    if 'Money' in savings:
-                        data["offers"]["savings"] = int(savings['Money']['Amount'] * 100)
-                    if 'Percentage' in savings:
-                        data["offers"]["savings_percent"] = savings['Percentage']
-                        
-                # Extract availability
-                if 'Availability' in offer and 'Message' in offer['Availability']:
-                    data["offers"]["availability"] = offer['Availability']['Message']
-                    
-                # Extract condition
-                if 'Condition' in offer and 'Value' in offer['Condition']:
-                    data["offers"]["condition"] = offer['Condition']['Value']
-                    
-                # Extract merchant info
-                if 'MerchantInfo' in offer and 'Name' in offer['MerchantInfo']:
-                    data["offers"]["merchant"] = offer['MerchantInfo']['Name']
-            else:
-                # Fallback for object-style access (in case the structure changes)
-                if hasattr(offer, 'price') and offer.price and hasattr(offer.price, 'money'):
-                    data["offers"]["price"] = int(offer.price.money.amount * 100)
-                    
-                if hasattr(offer, 'price') and offer.price and hasattr(offer.price, 'saving_basis') and offer.price.saving_basis and hasattr(offer.price.saving_basis, 'money'):
-                    data["offers"]["list_price"] = int(offer.price.saving_basis.money.amount * 100)
-
-        # Extract images
-        if item.images and item.images.primary:
-            if item.images.primary.small:
-                data["images"]["small"] = item.images.primary.small.url
-            if item.images.primary.medium:
-                data["images"]["medium"] = item.images.primary.medium.url
-            if item.images.primary.large:
-                data["images"]["large"] = item.images.primary.large.url
-                
-        # Extract customer reviews
-        if item.customer_reviews:
-            if item.customer_reviews.star_rating:
-                data["reviews"]["rating"] = item.customer_reviews.star_rating.value
-            if item.customer_reviews.count:
-                data["reviews"]["count"] = item.customer_reviews.count
-
-        # Extract categories from browse node info
-        if item.browse_node_info and item.browse_node_info.browse_nodes:
-            for node in item.browse_node_info.browse_nodes:
-                data["categories"].append({
-                    "id": node.id,
-                    "name": node.display_name,
-                    "is_root": node.is_root if hasattr(node, 'is_root') else False,
-                })
-
-        # Set detail page URL
-        if item.detail_page_url:
-            data["detail_page_url"] = item.detail_page_url
-
-        # Map offers data to main data fields for backward compatibility
-        if data["offers"]["price"]:
-            data["price"] = data["offers"]["price"]
-        if data["offers"]["availability"]:
-            data["availability"] = data["offers"]["availability"]
-        if data["offers"]["price"]:
-            data["currency"] = "INR"  # India marketplace always uses INR
-        
-        # Map primary image to main image_url field
-        if data["images"]["large"]:
-            data["image_url"] = data["images"]["large"]
-        elif data["images"]["medium"]:
-            data["image_url"] = data["images"]["medium"]
-        elif data["images"]["small"]:
-            data["image_url"] = data["images"]["small"]
-
-        return data
-
-    def _extract_search_data(self, item) -> Dict:
-        """Extract data from search result item (simplified version)."""
-        data = {
-            "asin": item.asin if item.asin else "",
-            "title": "",
-            "price": None,
-            "list_price": None,
-            "savings_percent": None,
-            "rating": None,
-            "review_count": None,
-            "image_url": "",
-            "detail_page_url": item.detail_page_url if item.detail_page_url else "",
-        }
+        return matched_items[:item_count]
 
-        # Extract title
-        if item.item_info and item.item_info.title:
-            data["title"] = item.item_info.title.display_value or ""
+    @staticmethod
+    def _log_price_analysis(items: List[Dict], min_price: Optional[int], max_price: Optional[int]) -> None:
+        """Log the price spread of retrieved products against the requested range."""
+        if not items:
+            log.warning("⚠️  No products retrieved from PA-API")
+            return
 
-        # Extract pricing from offers (use the same logic as detailed extraction)
-        if hasattr(item, 'offers') and item.offers and hasattr(item.offers, 'listings') and item.offers.listings:
-            listing = item.offers.listings[0]  # Get primary offer
-            
-            # Current price
-            if hasattr(listing, 'price') and listing.price:
-                price_info = listing.price
-                if hasattr(price_info, 'amount') and price_info.amount:
-                    data["price"] = int(float(price_info.amount) * 100)  # Convert to paise
-            
-            # List price and savings
-            if hasattr(listing, 'saving_basis') and listing.saving_basis:
-                saving_basis = listing.saving_basis
-                if hasattr(saving_basis, 'amount') and saving_basis.amount:
-                    data["list_price"] = int(float(saving_basis.amount) * 100)  # Convert to paise
-                    
-                    # Calculate savings percentage
-                    if data["price"] and data["list_price"] > 0:
-                        savings_amount = data["list_price"] - data["price"]
-                        data["savings_percent"] = int((savings_amount / data["list_price"]) * 100)
-
-        # Fallback: Try alternate offer structure if main offers didn't work
-        if data["price"] is None and hasattr(item, 'offers') and item.offers:
-            if hasattr(item.offers, 'summaries') and item.offers.summaries:
-                for summary in item.offers.summaries:
-                    if hasattr(summary, 'lowest_price') and summary.lowest_price:
-                        if hasattr(summary.lowest_price, 'amount') and summary.lowest_price.amount:
-                            data["price"] = int(float(summary.lowest_price.amount) * 100)
-                            break
-
-        # Extract reviews
-        if item.customer_reviews:
-            if item.customer_reviews.star_rating:
-                data["rating"] = item.customer_reviews.star_rating.value
-            if item.customer_reviews.count:
-                data["review_count"] = item.customer_reviews.count
-
-        # Extract image
-        if item.images and item.images.primary:
-            if item.images.primary.medium:
-                data["image_url"] = item.images.primary.medium.url
-            elif item.images.primary.large:
-                data["image_url"] = item.images.primary.large.url
-
-        return data
+        prices = [item["price"] / 100 for item in items if item.get("price")]
+        if not prices:
+            log.warning("⚠️  No price information found in retrieved products")
+            return
+
+        log.info("💰 PRODUCT PRICE ANALYSIS: %d priced products, range ₹%.0f - ₹%.0f, average ₹%.2f",
+                len(prices), min(prices), max(prices), sum(prices) / len(prices))
+
+        if min_price and max_price:
+            in_range = [p for p in prices if min_price / 100 <= p <= max_price / 100]
+            log.info("   Products in requested range (₹%.0f-%.0f): %d/%d",
+                    min_price / 100, max_price / 100, len(in_range), len(prices))
+            if not in_range:
+                log.warning("⚠️  NO PRODUCTS FOUND IN REQUESTED PRICE RANGE!")
 
     async def get_browse_nodes_hierarchy(
         self, browse_node_id: int, priority: str = "normal"
@@ -1384,7 +980,7 @@ class OfficialPaapiClient:
         await acquire_api_permission(priority)
 
         try:
-            result = await asyncio.to_thread(self._sync_get_browse_nodes, browse_node_id)
+            result = await self._fetch_browse_nodes(browse_node_id)
             return result
         except ApiException as exc:
             if exc.status in [503, 429]:
@@ -1397,8 +993,8 @@ class OfficialPaapiClient:
             log.error("Unexpected PA-API browse node error: %s", exc)
             raise
 
-    def _sync_get_browse_nodes(self, browse_node_id: int) -> Dict:
-        """Synchronous browse nodes implementation using official SDK."""
+    async def _fetch_browse_nodes(self, browse_node_id: int) -> Dict:
+        """One GetBrowseNodes call, decoded from the response body."""
         # Get appropriate resources from resource manager
         resources = self.resource_manager.get_resources_for_context("browse_nodes")
         
@@ -1412,25 +1008,25 @@ class OfficialPaapiClient:
         )
 
         try:
-            response = self.api.get_browse_nodes(get_browse_nodes_request)
-            
-            if not response.browse_nodes_result or not response.browse_nodes_result.browse_nodes:
+            body = await self.transport.get_browse_nodes(get_browse_nodes_request)
+            nodes = (json.loads(body).get("BrowseNodesResult") or {}).get("BrowseNodes")
+            if not nodes:
                 raise ValueError(f"No browse node found for ID: {browse_node_id}")
 
-            node = response.browse_nodes_result.browse_nodes[0]
+            node = nodes[0]
+            ancestor = node.get("Ancestor")
             
             return {
-                "id": node.id,
-                "name": node.display_name,
+                "id": node.get("Id"),
+                "name": node.get("DisplayName"),
                 "children": [
-                    {"id": child.id, "name": child.display_name}
-                    for child in (node.children or [])
+                    {"id": child.get("Id"), "name": child.get("DisplayName")}
+                    for child in (node.get("Children") or [])
                 ],
                 "ancestors": [
-                    {"id": ancestor.id, "name": ancestor.display_name}
-                    for ancestor in (node.ancestor if isinstance(node.ancestor, list) else [node.ancestor] if node.ancestor else [])
-                ],
-                "sales_rank": getattr(node, "sales_rank", None),
+                    {"id": ancestor.get("Id"), "name": ancestor.get("DisplayName")}
+                ] if ancestor else [],
+                "sales_rank": node.get("SalesRank"),
             }
 
         except ApiException as e:
@@ -0,0 +1,195 @@
+"""Pooled async HTTP transport for PA-API operations.
+
+The SDK's ``DefaultApi`` sends every call through its own ``ApiClient``: a
+``multiprocessing`` thread pool and a urllib3 pool manager (four pools) per
+instance, with the bot calling the blocking SDK from worker threads. Building
+a client per search or per batch also meant a fresh TCP connection and TLS
+handshake to ``webservices.amazon.in`` for almost every request.
+
+``PaapiTransport`` replaces that path. It signs requests itself (same
+headers and SigV4 signature as the SDK, see bot/paapi_signer.py) and posts
+them with an ``httpx.AsyncClient`` holding a keep-alive HTTP/1.1 pool to the
+PA-API host, so requests are natively async and reuse established TLS connections. One transport is shared
+by the process (``get_paapi_transport``); it keeps one client per event loop
+because httpx connection pools are bound to their loop, and all clients share
+one SSL context so the CA bundle is loaded once. ``warm_up`` opens a
+connection at startup, ahead of the first real request.
+
+Request models are still the SDK's, and HTTP errors are raised as the SDK's
+``ApiException`` so callers keep their handling of throttling statuses.
+"""
+
+import asyncio
+import datetime
+import json
+import ssl
+import weakref
+from logging import getLogger
+from typing import Any, Optional
+
+import httpx
+from paapi5_python_sdk.rest import ApiException
+
+from .config import settings
+from .paapi_signer import PaapiSigner
+
+log = getLogger(__name__)
+
+OPERATION_PATHS = {
+    "GetBrowseNodes": "/paapi5/getbrowsenodes",
+    "GetItems": "/paapi5/getitems",
+    "GetVariations": "/paapi5/getvariations",
+    "SearchItems": "/paapi5/searchitems",
+}
+
+_PRIMITIVES = (str, int, float, bool, bytes)
+
+
+def serialize_request(obj: Any) -> Any:
+    """JSON payload of an SDK request model (``ApiClient.sanitize_for_serialization``)."""
+    if obj is None or isinstance(obj, _PRIMITIVES):
+        return obj
+    if isinstance(obj, (list, tuple)):
+        return [serialize_request(item) for item in obj]
+    if isinstance(obj, (datetime.datetime, datetime.date)):
+        return obj.isoformat()
+    if not isinstance(obj, dict):
+        obj = {
+            obj.attribute_map[attr]: getattr(obj, attr)
+            for attr in obj.swagger_types
+            if getattr(obj, attr) is not None
+        }
+    return {key: serialize_request(value) for key, value in obj.items()}
+
+
+_ssl_context: Optional[ssl.SSLContext] = None
+
+
+def _get_ssl_context() -> ssl.SSLContext:
+    global _ssl_context
+    if _ssl_context is None:
+        _ssl_context = httpx.create_ssl_context()
+    return _ssl_context
+
+
+class PaapiTransport:
+    """Signs PA-API operations and posts them over a shared keep-alive pool."""
+
+    def __init__(
+        self,
+        access_key: Optional[str] = None,
+        secret_key: Optional[str] = None,
+        host: Optional[str] = None,
+        region: Optional[str] = None,
+    ):
+        self.access_key = access_key or settings.PAAPI_ACCESS_KEY
+        self.secret_key = secret_key or settings.PAAPI_SECRET_KEY
+        self.host = host or settings.PAAPI_HOST
+        self.region = region or settings.PAAPI_REGION
+        self.signer = PaapiSigner(
+            self.access_key, self.secret_key, self.host, self.region
+        )
+        # One client per event loop; httpx connection pools are bound to their loop
+        self._clients: (
+            "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]"
+        ) = weakref.WeakKeyDictionary()
+
+    def _create_client(self) -> httpx.AsyncClient:
+        connections = settings.PAAPI_HTTP_MAX_CONNECTIONS
+        return httpx.AsyncClient(
+            base_url=f"https://{self.host}",
+            http1=True,
+            http2=False,
+            verify=_get_ssl_context(),
+            timeout=settings.PAAPI_HTTP_TIMEOUT_SECONDS,
+            limits=httpx.Limits(
+                max_connections=connections,
+                max_keepalive_connections=connections,
+                keepalive_expiry=settings.PAAPI_HTTP_KEEPALIVE_SECONDS,
+            ),
+        )
+
+    def get_client(self) -> httpx.AsyncClient:
+        """HTTP client for the running event loop."""
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None or client.is_closed:
+            client = self._create_client()
+            self._clients[loop] = client
+        return client
+
+    async def close(self) -> None:
+        """Close the running loop's client, if one was created."""
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    async def warm_up(self) -> None:
+        """Open a pooled connection (TCP + TLS) before the first operation needs it."""
+        try:
+            await self.get_client().head("/")
+        except httpx.HTTPError as e:
+            log.debug("PA-API connection warm-up failed: %s", e)
+
+    async def call(self, operation: str, request: Any) -> bytes:
+        """Run one PA-API operation and return the raw response body.
+
+        Args:
+        ----
+            operation: Operation name, e.g. ``"SearchItems"``
+            request: SDK request model (or an already serialized dict)
+
+        Returns:
+        -------
+            Response body bytes, for bot/paapi_decoder.py
+
+        Raises:
+        ------
+            ApiException: For non-2xx responses, with status, body and headers
+            httpx.HTTPError: For connection failures and timeouts
+
+        """
+        path = OPERATION_PATHS[operation]
+        payload = serialize_request(request)
+        # Same serialization as the SDK, so PA-API receives identical bytes
+        body = json.dumps(payload).encode("utf-8")
+        headers = self.signer.sign(operation, path, body)
+
+        response = await self.get_client().post(path, content=body, headers=headers)
+        if not 200 <= response.status_code < 300:
+            exc = ApiException(
+                status=response.status_code, reason=response.reason_phrase
+            )
+            exc.body = response.content
+            exc.headers = response.headers
+            raise exc
+        return response.content
+
+    async def search_items(self, request: Any) -> bytes:
+        """SearchItems response body."""
+        return await self.call("SearchItems", request)
+
+    async def get_items(self, request: Any) -> bytes:
+        """GetItems response body."""
+        return await self.call("GetItems", request)
+
+    async def get_browse_nodes(self, request: Any) -> bytes:
+        """GetBrowseNodes response body."""
+        return await self.call("GetBrowseNodes", request)
+
+
+_transport: Optional[PaapiTransport] = None
+
+
+def get_paapi_transport() -> PaapiTransport:
+    """Get the process-wide PA-API transport."""
+    global _transport
+    if _transport is None:
+        _transport = PaapiTransport()
+    return _transport
+
+
+async def close_paapi_transport() -> None:
+    """Close the running loop's PA-API connections."""
+    if _transport is not None:
+        await _transport.close()
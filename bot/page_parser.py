@@ -0,0 +1,301 @@
+"""Amazon product and search page parsing with lxml.
+
+Both scraper tiers read prices with the selectors defined here: the HTTP tier
+parses the fetched HTML directly, and the browser tier parses the DOM after
+Chromium has rendered it. Selectors are compiled to XPath once at import.
+"""
+
+import re
+from logging import getLogger
+from typing import Callable, Dict, List, Optional
+
+from cssselect import GenericTranslator
+from lxml import etree
+from lxml import html as lxml_html
+
+log = getLogger(__name__)
+
+DEFAULT_IMAGE = "https://m.media-amazon.com/images/I/81.png"
+
+PRODUCT_TITLE_SELECTORS = [
+    "#productTitle",
+    "h1[data-automation-id='title']",
+    "h1.a-size-large.a-spacing-none.a-color-base",
+    "span#productTitle",
+    "h1 span.a-size-large",
+    ".product-title",
+    "h1.a-size-base-plus",
+    "[data-testid='product-title']",
+]
+
+PRODUCT_IMAGE_SELECTORS = [
+    "#landingImage",
+    "img[data-old-hires]",
+    ".a-dynamic-image",
+    "#imgBlkFront",
+    ".a-spacing-small img",
+    "img.a-dynamic-image.a-stretch-horizontal",
+    "div[data-asin] img",
+    ".imageThumbnail img",
+]
+
+# Amazon changes these frequently; earlier entries win
+PRODUCT_PRICE_SELECTORS = [
+    # Current price selectors (2024/2025)
+    "span.a-price.a-text-price.a-size-medium.a-color-base span.a-price-whole",
+    ".a-price.a-text-price .a-price-whole",
+    "#corePrice_feature_div span.a-price-whole",
+    "span[class*='a-price-whole']",
+    ".a-price-whole",
+    # Deal/offer price selectors
+    "#corePrice_desktop .a-offscreen",
+    ".a-price.a-text-price.a-size-medium.a-color-base .a-offscreen",
+    # Legacy selectors
+    "#priceblock_dealprice",
+    "#priceblock_ourprice",
+    ".a-price-range .a-price-whole",
+    # Alternative formats
+    "span[aria-label*='₹']",
+    "[data-testid='price-current-price'] .a-price-whole",
+    ".a-price.a-text-normal .a-price-whole",
+]
+
+PRODUCT_MRP_SELECTORS = [
+    ".a-price.a-text-price .a-offscreen",
+    "span.a-price.a-text-price.a-size-base .a-offscreen",
+    "span[aria-label*='M.R.P']",
+    ".a-text-strike .a-offscreen",
+    "span.a-price-was .a-offscreen",
+]
+
+# Selectors the browser tier waits for before reading the page
+PRODUCT_READY_SELECTOR = "#productTitle, #corePrice_feature_div, .a-price-whole"
+
+SEARCH_RESULT_SELECTORS = [
+    "[data-component-type='s-search-result']",
+    ".s-result-item[data-asin]",
+    ".s-result-item",
+    ".sg-col-inner .s-widget-container",
+]
+
+SEARCH_TITLE_SELECTORS = [
+    "h2 a span",
+    "h2 span",
+    ".a-size-medium",
+    ".a-size-base-plus",
+    "[data-cy='title-recipe-title']",
+    "a .a-text-normal",
+]
+
+SEARCH_PRICE_SELECTORS = [
+    ".a-price-whole",
+    ".a-price .a-offscreen",
+    ".a-price-symbol + .a-price-whole",
+    "[data-cy='price-recipe-price']",
+    ".a-size-base.a-color-price",
+]
+
+SEARCH_IMAGE_SELECTORS = [
+    "img.s-image",
+    ".a-dynamic-image",
+    "img[data-src]",
+    "img[src]",
+]
+
+_SEARCH_PRICE_PATTERN = re.compile(r"[\d,]+(?:\.\d{2})?")
+
+
+class ScrapeBlocked(ValueError):
+    """Amazon served a captcha or robot check instead of the page."""
+
+
+class ProductNotFound(ValueError):
+    """Amazon served its "Looking for something?" page for the ASIN."""
+
+
+def _compile(selectors: List[str]) -> List[Callable]:
+    # "descendant::" so that scoped lookups exclude the element itself,
+    # matching Playwright's element.locator(...)
+    translator = GenericTranslator()
+    return [
+        etree.XPath(translator.css_to_xpath(selector, prefix="descendant::"))
+        for selector in selectors
+    ]
+
+
+_PRODUCT_TITLE = _compile(PRODUCT_TITLE_SELECTORS)
+_PRODUCT_IMAGE = _compile(PRODUCT_IMAGE_SELECTORS)
+_PRODUCT_PRICE = _compile(PRODUCT_PRICE_SELECTORS)
+_PRODUCT_MRP = _compile(PRODUCT_MRP_SELECTORS)
+_SEARCH_RESULT = _compile(SEARCH_RESULT_SELECTORS)
+_SEARCH_TITLE = _compile(SEARCH_TITLE_SELECTORS)
+_SEARCH_PRICE = _compile(SEARCH_PRICE_SELECTORS)
+_SEARCH_IMAGE = _compile(SEARCH_IMAGE_SELECTORS)
+_CAPTCHA_FORM = _compile(["form[action*='validateCaptcha']"])[0]
+_NOT_FOUND = etree.XPath("//*[contains(text(), 'Looking for something?')]")
+
+
+def _document(html: str):
+    return lxml_html.document_fromstring(html)
+
+
+def _first_text(root, selectors: List[Callable]) -> Optional[str]:
+    for selector in selectors:
+        for element in selector(root)[:1]:
+            text = element.text_content().strip()
+            if text:
+                return text
+    return None
+
+
+def _first_image(root, selectors: List[Callable], attributes) -> Optional[str]:
+    for selector in selectors:
+        for element in selector(root)[:1]:
+            for attribute in attributes:
+                url = element.get(attribute)
+                if url and url.startswith("http"):
+                    return url
+    return None
+
+
+def parse_rupees(text: Optional[str]) -> Optional[int]:
+    """Convert a displayed rupee amount ("₹1,299.", "M.R.P.: ₹2,499.00") to paise."""
+    if not text:
+        return None
+    clean = (
+        text.replace(",", "")
+        .replace("₹", "")
+        .replace("Rs.", "")
+        .replace("M.R.P.:", "")
+        .strip()
+    )
+    try:
+        return int(float(clean) * 100)
+    except ValueError:
+        return None
+
+
+def check_blocked(root) -> None:
+    """Raise ``ScrapeBlocked`` if the document is a captcha page."""
+    if _CAPTCHA_FORM(root):
+        raise ScrapeBlocked("Captcha required")
+
+
+def parse_product_page(html: str, asin: str) -> Dict:
+    """Extract product data from an Amazon product page.
+
+    Args:
+    ----
+        html: Page HTML
+        asin: Amazon Standard Identification Number
+
+    Returns:
+    -------
+        Dictionary with asin, title, price and mrp (in paise or None), image and url
+
+    Raises:
+    ------
+        ScrapeBlocked: If the page is a captcha
+        ProductNotFound: If Amazon has no page for the ASIN
+
+    """
+    root = _document(html)
+    try:
+        check_blocked(root)
+    except ScrapeBlocked:
+        raise ScrapeBlocked(f"Captcha required for ASIN: {asin}") from None
+    if _NOT_FOUND(root):
+        raise ProductNotFound(f"Product not found for ASIN: {asin}")
+
+    title = _first_text(root, _PRODUCT_TITLE)
+    image_url = _first_image(
+        root, _PRODUCT_IMAGE, ("data-old-hires", "src", "data-src")
+    )
+
+    price = None
+    for selector in _PRODUCT_PRICE:
+        for element in selector(root):
+            text = element.text_content().strip()
+            if not text:
+                continue
+            # Only accept text that looks like a bare price
+            try:
+                float(text.replace(",", "").replace("₹", ""))
+            except ValueError:
+                continue
+            price = parse_rupees(text)
+            break
+        if price is not None:
+            break
+
+    mrp_text = _first_text(root, _PRODUCT_MRP)
+    mrp = parse_rupees(mrp_text)
+    if mrp_text and mrp is None:
+        log.warning("Could not parse MRP '%s' for ASIN: %s", mrp_text, asin)
+
+    return {
+        "asin": asin,
+        "title": title or f"Product {asin}",
+        "price": price,
+        "mrp": mrp,
+        "image": image_url or DEFAULT_IMAGE,
+        "url": f"https://www.amazon.in/dp/{asin}",
+    }
+
+
+def parse_search_results(html: str, max_results: int = 20) -> List[Dict]:
+    """Extract products from an Amazon search results page.
+
+    Args:
+    ----
+        html: Page HTML
+        max_results: Maximum number of result containers to read
+
+    Returns:
+    -------
+        List of dictionaries with asin, title, price (in paise or None) and image
+
+    Raises:
+    ------
+        ScrapeBlocked: If the page is a captcha
+
+    """
+    root = _document(html)
+    check_blocked(root)
+
+    containers = []
+    for selector in _SEARCH_RESULT:
+        containers = selector(root)
+        if containers:
+            break
+
+    products = []
+    for container in containers[:max_results]:
+        asin = container.get("data-asin")
+        if not asin:
+            continue
+        title = _first_text(container, _SEARCH_TITLE)
+        if not title:
+            continue
+
+        price = None
+        for selector in _SEARCH_PRICE:
+            for element in selector(container)[:1]:
+                match = _SEARCH_PRICE_PATTERN.search(
+                    element.text_content().replace("₹", "").replace(",", "")
+                )
+                if match:
+                    price = int(float(match.group()) * 100)
+            if price is not None:
+                break
+
+        products.append(
+            {
+                "asin": asin,
+                "title": title,
+                "price": price,
+                "image": _first_image(container, _SEARCH_IMAGE, ("src", "data-src"))
+                or DEFAULT_IMAGE,
+            }
+        )
+    return products
@@ -5,7 +5,7 @@ import statistics
 from collections import defaultdict, Counter
 from datetime import datetime, timedelta
 from logging import getLogger
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 
 import numpy as np
 import pandas as pd
@@ -17,6 +17,7 @@ from sklearn.preprocessing import StandardScaler
 from sqlmodel import Session, select, func
 
 from .cache_service import engine
+from .deal_context import ALERT_LOOKBACK_DAYS, DealInputs
 from .enhanced_models import (
     Product,
     ProductOffers,
@@ -132,30 +133,75 @@ class PredictiveEngine:
                     .where(DealAlert.sent_at >= datetime.utcnow() - timedelta(days=90))
                 ).all()
                 
-                # Calculate historical metrics
-                historical_metrics = self._calculate_historical_deal_metrics(
-                    price_history, deal_alerts, proposed_price
+                return self.predict_deal_success_from_history(
+                    product, [p.price for p in price_history], len(deal_alerts), proposed_price
                 )
-                
-                # Predict using ML model if available, otherwise use heuristics
-                if self.deal_success_model:
-                    features = self._extract_deal_features(product, historical_metrics, proposed_price)
-                    success_probability = self.deal_success_model.predict_proba([features])[0][1]
-                else:
-                    success_probability = self._heuristic_deal_success(historical_metrics, proposed_price)
-                
-                return {
-                    "success_probability": float(success_probability),
-                    "confidence": self._calculate_prediction_confidence(historical_metrics),
-                    "historical_metrics": historical_metrics,
-                    "recommendation": self._generate_deal_recommendation(success_probability),
-                    "optimal_price_range": self._suggest_optimal_price_range(historical_metrics),
-                }
-                
+
         except Exception as e:
             log.error("Error predicting deal success for ASIN %s: %s", asin, e)
             return {"success_probability": 0.5, "confidence": "low", "error": str(e)}
     
+    def predict_deal_success_from_history(
+        self, product: Product, prices: Sequence[int], deal_count: int, proposed_price: int
+    ) -> Dict:
+        """Predict deal success from already loaded data.
+
+        Args:
+        ----
+            product: Product row
+            prices: Prices from the last 180 days, oldest first
+            deal_count: Deal alerts sent for the product in the last 90 days
+            proposed_price: Proposed deal price in paise
+
+        Returns:
+        -------
+            Dict with success probability and analysis
+        """
+        historical_metrics = self._historical_metrics_from_prices(prices, deal_count, proposed_price)
+
+        # Predict using ML model if available, otherwise use heuristics
+        if self.deal_success_model:
+            features = self._extract_deal_features(product, historical_metrics, proposed_price)
+            success_probability = self.deal_success_model.predict_proba([features])[0][1]
+        else:
+            success_probability = self._heuristic_deal_success(historical_metrics, proposed_price)
+
+        return {
+            "success_probability": float(success_probability),
+            "confidence": self._calculate_prediction_confidence(historical_metrics),
+            "historical_metrics": historical_metrics,
+            "recommendation": self._generate_deal_recommendation(success_probability),
+            "optimal_price_range": self._suggest_optimal_price_range(historical_metrics),
+        }
+
+    def predict_deal_success_from_inputs(self, inputs: DealInputs, proposed_price: int) -> Dict:
+        """Predict deal success from batch-loaded deal inputs (see ``load_deal_inputs``).
+
+        Args:
+        ----
+            inputs: Deal inputs for the product
+            proposed_price: Proposed deal price in paise
+
+        Returns:
+        -------
+            Dict with success probability and analysis
+        """
+        if inputs.product is None:
+            return {"success_probability": 0.5, "confidence": "low", "reason": "No product data"}
+        try:
+            now = datetime.utcnow()
+            # Only enhanced price history counts, as in predict_deal_success
+            prices = inputs.prices_since(now - timedelta(days=180)) if inputs.enhanced_history else []
+            return self.predict_deal_success_from_history(
+                inputs.product,
+                prices,
+                inputs.alert_count(now - timedelta(days=ALERT_LOOKBACK_DAYS)),
+                proposed_price,
+            )
+        except Exception as e:
+            log.error("Error predicting deal success for ASIN %s: %s", inputs.asin, e)
+            return {"success_probability": 0.5, "confidence": "low", "error": str(e)}
+
     async def predict_inventory_alerts(self, asin: str) -> Dict:
         """Predict optimal timing for inventory alerts based on stock patterns and user behavior.
         
@@ -593,11 +639,19 @@ class PredictiveEngine:
         proposed_price: int
     ) -> Dict:
         """Calculate historical metrics for deal success prediction."""
-        if not price_history:
+        return self._historical_metrics_from_prices(
+            [p.price for p in price_history], len(deal_alerts), proposed_price
+        )
+
+    def _historical_metrics_from_prices(
+        self, prices: Sequence[int], deal_count: int, proposed_price: int
+    ) -> Dict:
+        """Calculate deal success metrics from a price list and alert count."""
+        if not len(prices):
             return {"insufficient_data": True}
-        
-        prices = [p.price for p in price_history]
-        
+
+        prices = [int(p) for p in prices]
+
         metrics = {
             "avg_price": statistics.mean(prices),
             "min_price": min(prices),
@@ -605,7 +659,7 @@ class PredictiveEngine:
             "price_volatility": statistics.stdev(prices) if len(prices) > 1 else 0,
             "proposed_vs_avg": proposed_price / statistics.mean(prices) if prices else 1,
             "proposed_vs_min": proposed_price / min(prices) if prices else 1,
-            "historical_deals": len(deal_alerts),
+            "historical_deals": deal_count,
             "recent_trend": self._calculate_price_trend(prices[-10:] if len(prices) > 10 else prices)
         }
         
@@ -0,0 +1,329 @@
+"""Vectorized price analytics.
+
+Metrics are computed on a ``PriceMatrix``: one row per ASIN with prices
+right-aligned and left-padded with NaN. "The last N prices" is then a column
+slice, and every metric is a handful of NumPy reductions over all rows at
+once, so the nightly analysis covers every tracked product in a few calls
+instead of looping over Python lists per ASIN.
+
+Thresholds and result shapes match the ``MarketIntelligence`` helpers that
+delegate here.
+"""
+
+import warnings
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+SECONDS_PER_DAY = 86400.0
+
+# Moving-average / fitted-change threshold for calling a trend (2%)
+TREND_THRESHOLD = 0.02
+# Prices within this fraction of the current price count as "similar" points
+SIMILAR_PRICE_BAND = 0.05
+# Minimum matrix width, so fixed windows like "last 10 prices" always exist
+MIN_WIDTH = 10
+
+
+class PriceMatrix:
+    """Right-aligned, NaN-padded price and timestamp matrix."""
+
+    __slots__ = ("prices", "timestamps", "counts")
+
+    def __init__(self, prices: np.ndarray, timestamps: np.ndarray, counts: np.ndarray):
+        self.prices = prices
+        self.timestamps = timestamps
+        self.counts = counts
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    @classmethod
+    def from_series(cls, series: Sequence[Tuple[Sequence, Sequence]]) -> "PriceMatrix":
+        """Build a matrix from ``(timestamps, prices)`` pairs in time order.
+
+        Timestamps are epoch seconds (or ``datetime64``).
+        """
+        counts = np.array([len(prices) for _, prices in series], dtype=np.int64)
+        width = max(int(counts.max()) if len(counts) else 0, MIN_WIDTH)
+        prices = np.full((len(series), width), np.nan)
+        timestamps = np.full((len(series), width), np.nan)
+        for row, (ts, values) in enumerate(series):
+            n = len(values)
+            if n:
+                prices[row, width - n :] = values
+                timestamps[row, width - n :] = (
+                    np.asarray(ts).astype("datetime64[s]").astype(np.int64)
+                )
+        return cls(prices, timestamps, counts)
+
+    @property
+    def current(self) -> np.ndarray:
+        """Latest price per row (NaN for empty rows)."""
+        return self.prices[:, -1]
+
+    def last(self, n: int) -> np.ndarray:
+        """The last ``n`` columns (NaN where a row has fewer points)."""
+        return self.prices[:, -n:]
+
+
+def _nan_reduce(func, values: np.ndarray, **kwargs) -> np.ndarray:
+    """Apply a nan-aware reduction without warnings for all-NaN rows."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return func(values, axis=1, **kwargs)
+
+
+def price_metrics(matrix: PriceMatrix) -> Dict[str, np.ndarray]:
+    """Current/min/max/mean/median price and volatility per row."""
+    prices = matrix.prices
+    mean = _nan_reduce(np.nanmean, prices)
+    std = np.where(matrix.counts > 1, _nan_reduce(np.nanstd, prices, ddof=1), 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        volatility_pct = np.where(mean > 0, std / mean * 100, 0.0)
+    return {
+        "current": matrix.current,
+        "min": _nan_reduce(np.nanmin, prices),
+        "max": _nan_reduce(np.nanmax, prices),
+        "mean": mean,
+        "median": _nan_reduce(np.nanmedian, prices),
+        "volatility": std,
+        "volatility_percentage": volatility_pct,
+    }
+
+
+def trend_slope(matrix: PriceMatrix) -> np.ndarray:
+    """Least-squares price slope per row, in paise per day."""
+    x = matrix.timestamps / SECONDS_PER_DAY
+    y = matrix.prices
+    x_centered = x - _nan_reduce(np.nanmean, x)[:, None]
+    y_centered = y - _nan_reduce(np.nanmean, y)[:, None]
+    numerator = np.nansum(x_centered * y_centered, axis=1)
+    denominator = np.nansum(x_centered * x_centered, axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(denominator > 0, numerator / denominator, 0.0)
+
+
+def trend_metrics(matrix: PriceMatrix) -> Dict[str, np.ndarray]:
+    """Trend direction and strength per row.
+
+    With 10+ points the 5-point moving average is compared to the 10-point
+    one. Below that both windows cover the same points, so the change fitted
+    by the regression slope across the window is used instead.
+    """
+    counts = matrix.counts
+    short_ma = _nan_reduce(np.nanmean, matrix.last(5))
+    medium_ma = np.where(
+        counts >= 10, _nan_reduce(np.nanmean, matrix.last(10)), short_ma
+    )
+
+    slope = trend_slope(matrix)
+    span_days = (
+        _nan_reduce(np.nanmax, matrix.timestamps)
+        - _nan_reduce(np.nanmin, matrix.timestamps)
+    ) / SECONDS_PER_DAY
+    mean = _nan_reduce(np.nanmean, matrix.prices)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ma_change = np.where(medium_ma > 0, (short_ma - medium_ma) / medium_ma, 0.0)
+        fitted_change = np.where(mean > 0, slope * span_days / mean, 0.0)
+        change = np.where(counts >= 10, ma_change, fitted_change)
+
+        first_of_last5 = matrix.prices[:, -5]
+        recent_change_pct = np.where(
+            first_of_last5 > 0,
+            (matrix.current - first_of_last5) / first_of_last5 * 100,
+            0.0,
+        )
+
+    direction = np.select(
+        [counts < 5, change > TREND_THRESHOLD, change < -TREND_THRESHOLD],
+        ["insufficient_data", "increasing", "decreasing"],
+        default="stable",
+    )
+    return {
+        "direction": direction,
+        "strength": np.where(counts < 5, 0.0, np.minimum(100.0, np.abs(change) * 100)),
+        "recent_change_percent": recent_change_pct,
+        "short_term_ma": short_ma,
+        "medium_term_ma": medium_ma,
+        "slope_per_day": slope,
+    }
+
+
+def percentile_metrics(
+    matrix: PriceMatrix, current: Optional[np.ndarray] = None
+) -> Dict[str, np.ndarray]:
+    """Percentile rank of the current price and key percentiles per row."""
+    current = matrix.current if current is None else np.asarray(current, dtype=float)
+    counts = matrix.counts
+    with np.errstate(invalid="ignore"):
+        rank = np.sum(matrix.prices <= current[:, None], axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        percentile = np.where(counts > 0, rank / counts * 100, 50.0)
+
+    # NaN sorts last, so valid prices are left-aligned after sorting
+    ordered = np.sort(matrix.prices, axis=1)
+    last_index = np.maximum(counts - 1, 0)
+
+    def pick(quantile: float, min_count: int, fallback_index: np.ndarray) -> np.ndarray:
+        index = np.where(
+            counts > min_count, (counts * quantile).astype(np.int64), fallback_index
+        )
+        return np.take_along_axis(ordered, index[:, None], axis=1)[:, 0]
+
+    first_index = np.zeros_like(counts)
+    return {
+        "current_percentile": percentile,
+        "p25": pick(0.25, 4, first_index),
+        "p50_median": pick(0.5, 2, first_index),
+        "p75": pick(0.75, 4, last_index),
+        "p90": pick(0.9, 10, last_index),
+    }
+
+
+def seasonal_metrics(
+    matrix: PriceMatrix, current_month: Optional[int] = None
+) -> Dict[str, np.ndarray]:
+    """Average price per calendar month and the cheapest/most expensive month.
+
+    ``monthly_averages`` has shape ``(rows, 12)`` with NaN for months without
+    data; month numbers in the result are 1-12.
+    """
+    current_month = current_month or datetime.utcnow().month
+    rows, width = matrix.prices.shape
+    valid = ~np.isnan(matrix.prices)
+
+    months = np.zeros((rows, width), dtype=np.int64)
+    months[valid] = (
+        matrix.timestamps[valid]
+        .astype(np.int64)
+        .astype("datetime64[s]")
+        .astype("datetime64[M]")
+        .astype(np.int64)
+        % 12
+    )
+    row_index = np.broadcast_to(np.arange(rows)[:, None], (rows, width))
+
+    cells = row_index[valid] * 12 + months[valid]
+    sums = np.bincount(
+        cells, weights=matrix.prices[valid], minlength=rows * 12
+    ).reshape(rows, 12)
+    totals = np.bincount(cells, minlength=rows * 12).reshape(rows, 12)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        monthly = np.where(totals > 0, sums / totals, np.nan)
+
+    months_with_data = np.sum(totals > 0, axis=1)
+    has_months = months_with_data > 0
+    best = np.where(
+        has_months, np.argmin(np.where(totals > 0, monthly, np.inf), axis=1), 0
+    )
+    worst = np.where(
+        has_months, np.argmax(np.where(totals > 0, monthly, -np.inf), axis=1), 0
+    )
+    best_avg = np.take_along_axis(monthly, best[:, None], axis=1)[:, 0]
+    worst_avg = np.take_along_axis(monthly, worst[:, None], axis=1)[:, 0]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        variance = np.where(best_avg > 0, (worst_avg - best_avg) / best_avg * 100, 0.0)
+
+    return {
+        "pattern": np.select(
+            [matrix.counts < 30, months_with_data < 3],
+            ["insufficient_data", "insufficient_seasonal_data"],
+            default="seasonal_detected",
+        ),
+        "best_month": best + 1,
+        "worst_month": worst + 1,
+        "best_month_avg": best_avg,
+        "worst_month_avg": worst_avg,
+        "current_month_avg": monthly[:, current_month - 1],
+        "seasonal_variance": variance,
+        "monthly_averages": monthly,
+    }
+
+
+def drop_probability(matrix: PriceMatrix) -> np.ndarray:
+    """Probability that the price drops next, per row.
+
+    Among past points within 5% of the current price, the share that were
+    followed by a lower price. Without such points, the sign of the last three
+    versus the three before decides (0.7 falling, 0.3 rising). Rows with fewer
+    than 10 points get a neutral 0.5.
+    """
+    current = matrix.current[:, None]
+    previous, following = matrix.prices[:, :-1], matrix.prices[:, 1:]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        similar = np.abs(previous - current) / current < SIMILAR_PRICE_BAND
+        drops = np.sum(similar & (following < previous), axis=1)
+    comparisons = np.sum(similar, axis=1)
+
+    recent = _nan_reduce(np.nanmean, matrix.prices[:, -3:])
+    before = _nan_reduce(np.nanmean, matrix.prices[:, -6:-3])
+    fallback = np.where(recent - before < 0, 0.7, 0.3)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        probability = np.where(
+            comparisons > 0, drops / np.maximum(comparisons, 1), fallback
+        )
+    return np.where(matrix.counts < 10, 0.5, probability)
+
+
+def analyze_matrix(
+    matrix: PriceMatrix, current_month: Optional[int] = None
+) -> Dict[str, Dict[str, np.ndarray]]:
+    """Run every metric over a matrix in one pass."""
+    return {
+        "price_metrics": price_metrics(matrix),
+        "trend": trend_metrics(matrix),
+        "percentiles": percentile_metrics(matrix),
+        "seasonal": seasonal_metrics(matrix, current_month),
+        "drop_probability": drop_probability(matrix),
+    }
+
+
+def row(columns: Dict[str, np.ndarray], index: int) -> Dict:
+    """Extract one row of a metric dict as plain Python values."""
+    result = {}
+    for name, values in columns.items():
+        value = values[index]
+        if isinstance(value, np.ndarray):
+            result[name] = value.tolist()
+        elif isinstance(value, np.generic):
+            result[name] = value.item()
+        else:
+            result[name] = value
+    return result
+
+
+def analyze_series_batch(
+    series: Dict[str, Tuple[Sequence, Sequence]], chunk_size: int = 1000
+) -> Dict[str, Dict]:
+    """Analyze many price series, ``chunk_size`` rows per matrix.
+
+    Args:
+    ----
+        series: Mapping of ASIN to ``(timestamps, prices)`` in time order
+        chunk_size: Rows per matrix (bounds memory for long series)
+
+    Returns:
+    -------
+        Mapping of ASIN to its metric groups (see ``analyze_matrix``)
+    """
+    results: Dict[str, Dict] = {}
+    asins: List[str] = [asin for asin, (_, prices) in series.items() if len(prices)]
+    for start in range(0, len(asins), chunk_size):
+        chunk = asins[start : start + chunk_size]
+        analysis = analyze_matrix(
+            PriceMatrix.from_series([series[asin] for asin in chunk])
+        )
+        for index, asin in enumerate(chunk):
+            results[asin] = {
+                "data_points": len(series[asin][1]),
+                "price_metrics": row(analysis["price_metrics"], index),
+                "trend": row(analysis["trend"], index),
+                "percentiles": row(analysis["percentiles"], index),
+                "seasonal": row(analysis["seasonal"], index),
+                "drop_probability": float(analysis["drop_probability"][index]),
+            }
+    return results
@@ -0,0 +1,516 @@
+"""Compact per-ASIN price time series.
+
+Price observations are kept as packed NumPy arrays instead of ORM rows:
+epoch seconds as uint32 and paise as int32. Each series has three tiers:
+
+- raw: every observation from the last ``PRICE_SERIES_RAW_DAYS`` days
+- hourly: older observations rolled up into hourly low/high/last buckets
+- daily: hourly buckets older than ``PRICE_SERIES_HOURLY_DAYS`` rolled up per day
+
+Analytics read a ``SeriesView`` (plain NumPy arrays spanning all tiers), so a
+trend query is a ``searchsorted`` and a few slices instead of hydrating
+hundreds of ``PriceHistory`` objects. A year of daily-polled data costs about
+6 KB per ASIN, i.e. ~300 MB for 50k ASINs.
+
+The store mirrors the ``PriceHistory`` table. A series is loaded from the
+database on first use (one indexed column query) and then kept current by the
+code paths that write price history, via ``record``. Other workers write price
+history too, so a series is reloaded once it is ``PRICE_SERIES_TTL_SECONDS``
+old, and beyond ``PRICE_SERIES_MAX_SERIES`` the least recently used series are
+dropped.
+"""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from logging import getLogger
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from sqlmodel import select
+
+from .config import settings
+from .db import get_async_session
+from .enhanced_models import PriceHistory
+
+log = getLogger(__name__)
+
+RAW_DTYPE = np.dtype([("ts", "<u4"), ("price", "<i4")])
+BUCKET_DTYPE = np.dtype(
+    [("ts", "<u4"), ("low", "<i4"), ("high", "<i4"), ("last", "<i4")]
+)
+
+HOUR = 3600
+DAY = 86400
+
+# Compact a series once its oldest raw point is this far past the raw window,
+# so roll-ups happen about once a day per ASIN rather than on every append
+COMPACTION_SLACK_SECONDS = DAY
+
+Timestamp = Union[datetime, int, float]
+
+
+def to_epoch(timestamp: Timestamp) -> int:
+    """Convert a timestamp to epoch seconds (naive datetimes are taken as UTC)."""
+    if isinstance(timestamp, datetime):
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        return int(timestamp.timestamp())
+    return int(timestamp)
+
+
+def _rollup(buckets: np.ndarray, width: int) -> np.ndarray:
+    """Aggregate time-sorted buckets into ``width``-second buckets."""
+    if not len(buckets):
+        return np.empty(0, BUCKET_DTYPE)
+    starts_ts = buckets["ts"] - buckets["ts"] % width
+    starts = np.flatnonzero(np.concatenate(([True], starts_ts[1:] != starts_ts[:-1])))
+    ends = np.append(starts[1:], len(buckets)) - 1
+
+    result = np.empty(len(starts), BUCKET_DTYPE)
+    result["ts"] = starts_ts[starts]
+    result["low"] = np.minimum.reduceat(buckets["low"], starts)
+    result["high"] = np.maximum.reduceat(buckets["high"], starts)
+    result["last"] = buckets["last"][ends]
+    return result
+
+
+def _raw_as_buckets(raw: np.ndarray) -> np.ndarray:
+    buckets = np.empty(len(raw), BUCKET_DTYPE)
+    buckets["ts"] = raw["ts"]
+    buckets["low"] = buckets["high"] = buckets["last"] = raw["price"]
+    return buckets
+
+
+def _merge_buckets(existing: np.ndarray, new: np.ndarray, width: int) -> np.ndarray:
+    """Merge new buckets into a tier, combining buckets that share a start time."""
+    if not len(existing):
+        return _rollup(new, width)
+    combined = np.concatenate((existing, new))
+    if new["ts"][0] < existing["ts"][-1]:
+        # Late data for an older bucket; stable sort keeps arrival order within a bucket
+        combined = combined[np.argsort(combined["ts"], kind="stable")]
+    return _rollup(combined, width)
+
+
+@dataclass(frozen=True)
+class SeriesView:
+    """Read-only NumPy view of a price series, oldest first.
+
+    Raw observations have ``lows == highs == prices``; rolled-up buckets carry
+    the bucket's low, high and last price (``prices``) at the bucket start.
+    """
+
+    timestamps: np.ndarray  # uint32 epoch seconds
+    prices: np.ndarray  # int32 paise
+    lows: np.ndarray
+    highs: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def datetimes(self) -> np.ndarray:
+        """Timestamps as ``datetime64[s]`` (UTC)."""
+        return self.timestamps.astype("datetime64[s]")
+
+
+class PriceSeries:
+    """Append-only price series for a single ASIN."""
+
+    __slots__ = ("_raw", "_raw_len", "hourly", "daily")
+
+    def __init__(self):
+        self._raw = np.empty(8, RAW_DTYPE)
+        self._raw_len = 0
+        self.hourly = np.empty(0, BUCKET_DTYPE)
+        self.daily = np.empty(0, BUCKET_DTYPE)
+
+    @property
+    def raw(self) -> np.ndarray:
+        """Raw observations still inside the raw window."""
+        return self._raw[: self._raw_len]
+
+    def __len__(self) -> int:
+        return self._raw_len + len(self.hourly) + len(self.daily)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the series arrays."""
+        return self._raw.nbytes + self.hourly.nbytes + self.daily.nbytes
+
+    def append(self, ts: int, price: int) -> None:
+        """Add one observation."""
+        if self._raw_len == len(self._raw):
+            grown = np.empty(len(self._raw) * 2, RAW_DTYPE)
+            grown[: self._raw_len] = self._raw
+            self._raw = grown
+
+        raw = self._raw
+        position = self._raw_len
+        if position and ts < raw["ts"][position - 1]:
+            # Out-of-order observation: shift newer points right
+            position = int(
+                np.searchsorted(raw["ts"][: self._raw_len], ts, side="right")
+            )
+            raw[position + 1 : self._raw_len + 1] = raw[position : self._raw_len]
+        raw[position] = (ts, price)
+        self._raw_len += 1
+
+    def extend(self, timestamps: Sequence[int], prices: Sequence[int]) -> None:
+        """Add many observations at once (any order)."""
+        new = np.empty(len(timestamps), RAW_DTYPE)
+        new["ts"] = timestamps
+        new["price"] = prices
+        merged = np.concatenate((self.raw, new))
+        merged = merged[np.argsort(merged["ts"], kind="stable")]
+        self._raw = merged if len(merged) else np.empty(8, RAW_DTYPE)
+        self._raw_len = len(merged)
+
+    def needs_compaction(self, raw_cutoff: int) -> bool:
+        """Check whether the raw tier holds points well past the raw window."""
+        return (
+            bool(self._raw_len)
+            and int(self._raw["ts"][0]) < raw_cutoff - COMPACTION_SLACK_SECONDS
+        )
+
+    def compact(self, raw_cutoff: int, hourly_cutoff: int) -> int:
+        """Roll raw points older than ``raw_cutoff`` into hourly buckets and
+        hourly buckets older than ``hourly_cutoff`` into daily buckets.
+
+        Returns
+        -------
+            Number of raw points rolled up
+        """
+        raw = self.raw
+        rolled = int(np.searchsorted(raw["ts"], raw_cutoff, side="left"))
+        if rolled:
+            self.hourly = _merge_buckets(
+                self.hourly, _raw_as_buckets(raw[:rolled]), HOUR
+            )
+            remaining = raw[rolled:].copy()
+            self._raw = remaining if len(remaining) else np.empty(8, RAW_DTYPE)
+            self._raw_len = len(remaining)
+
+        expired = int(np.searchsorted(self.hourly["ts"], hourly_cutoff, side="left"))
+        if expired:
+            self.daily = _merge_buckets(self.daily, self.hourly[:expired], DAY)
+            self.hourly = self.hourly[expired:].copy()
+        return rolled
+
+    def view(self, since: Optional[int] = None) -> SeriesView:
+        """Build a view over all tiers, optionally starting at ``since``."""
+        daily, hourly, raw = self.daily, self.hourly, self.raw
+        if since is not None:
+            daily = daily[np.searchsorted(daily["ts"], since, side="left") :]
+            hourly = hourly[np.searchsorted(hourly["ts"], since, side="left") :]
+            raw = raw[np.searchsorted(raw["ts"], since, side="left") :]
+
+        return SeriesView(
+            timestamps=np.concatenate((daily["ts"], hourly["ts"], raw["ts"])),
+            prices=np.concatenate((daily["last"], hourly["last"], raw["price"])),
+            lows=np.concatenate((daily["low"], hourly["low"], raw["price"])),
+            highs=np.concatenate((daily["high"], hourly["high"], raw["price"])),
+        )
+
+
+class PriceSeriesStore:
+    """Thread-safe LRU collection of per-ASIN price series."""
+
+    def __init__(
+        self,
+        raw_days: Optional[int] = None,
+        hourly_days: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        max_series: Optional[int] = None,
+    ):
+        """Initialize the store.
+
+        Args:
+        ----
+            raw_days: Days of raw observations to keep (defaults to PRICE_SERIES_RAW_DAYS)
+            hourly_days: Days of hourly buckets to keep before rolling up to
+                         daily (defaults to PRICE_SERIES_HOURLY_DAYS)
+            ttl_seconds: Age at which a loaded series is reloaded from the
+                         database (defaults to PRICE_SERIES_TTL_SECONDS)
+            max_series: Series kept in memory (defaults to PRICE_SERIES_MAX_SERIES)
+        """
+        self.raw_days = (
+            raw_days if raw_days is not None else settings.PRICE_SERIES_RAW_DAYS
+        )
+        self.hourly_days = (
+            hourly_days
+            if hourly_days is not None
+            else settings.PRICE_SERIES_HOURLY_DAYS
+        )
+        self.ttl_seconds = (
+            ttl_seconds
+            if ttl_seconds is not None
+            else settings.PRICE_SERIES_TTL_SECONDS
+        )
+        self.max_series = (
+            max_series if max_series is not None else settings.PRICE_SERIES_MAX_SERIES
+        )
+        self._series: "OrderedDict[str, PriceSeries]" = OrderedDict()
+        self._loaded_at: Dict[str, float] = {}  # time.monotonic() of each load
+        # Points recorded while a series is being loaded from the database
+        self._pending: Dict[str, List[Tuple[int, int]]] = {}
+        self._lock = Lock()
+        self.evictions = 0
+
+    def __contains__(self, asin: str) -> bool:
+        """Check whether a series is loaded and not due for a reload."""
+        with self._lock:
+            return self._is_fresh(asin)
+
+    def _is_fresh(self, asin: str) -> bool:
+        """Check whether a series is loaded and younger than the TTL (lock must be held)."""
+        loaded_at = self._loaded_at.get(asin)
+        return loaded_at is not None and time.monotonic() - loaded_at < self.ttl_seconds
+
+    def _drop(self, asin: str) -> None:
+        """Forget a series (lock must be held)."""
+        self._series.pop(asin, None)
+        self._loaded_at.pop(asin, None)
+
+    def _cutoffs(self, now: Optional[Timestamp] = None) -> Tuple[int, int]:
+        now_ts = to_epoch(now) if now is not None else to_epoch(datetime.utcnow())
+        return now_ts - self.raw_days * DAY, now_ts - self.hourly_days * DAY
+
+    def record(
+        self, asin: str, price: int, timestamp: Optional[Timestamp] = None
+    ) -> bool:
+        """Record a newly stored price observation.
+
+        Only series already loaded (or loading) are updated; other ASINs are
+        read from the database, which already holds the point, on first use.
+
+        Returns
+        -------
+            True if a series was updated
+        """
+        ts = to_epoch(timestamp if timestamp is not None else datetime.utcnow())
+        with self._lock:
+            pending = self._pending.get(asin)
+            if pending is not None:
+                pending.append((ts, price))
+                return True
+
+            series = self._series.get(asin)
+            if series is None:
+                return False
+            series.append(ts, price)
+
+            raw_cutoff, hourly_cutoff = self._cutoffs()
+            if series.needs_compaction(raw_cutoff):
+                series.compact(raw_cutoff, hourly_cutoff)
+            return True
+
+    def begin_load(self, asin: str) -> None:
+        """Start buffering ``record`` calls for a series about to be (re)loaded."""
+        with self._lock:
+            if not self._is_fresh(asin):
+                self._drop(asin)
+                self._pending.setdefault(asin, [])
+
+    def finish_load(
+        self, asin: str, timestamps: Sequence[int], prices: Sequence[int]
+    ) -> None:
+        """Install a series loaded from the database.
+
+        Points recorded since ``begin_load`` that the query already returned
+        are dropped, the rest are added.
+        """
+        with self._lock:
+            pending = self._pending.pop(asin, [])
+            if asin in self._series:
+                return
+
+            loaded = set(zip(timestamps, prices))
+            extra = [point for point in pending if point not in loaded]
+
+            series = PriceSeries()
+            series.extend(
+                list(timestamps) + [ts for ts, _ in extra],
+                list(prices) + [price for _, price in extra],
+            )
+            series.compact(*self._cutoffs())
+            self._series[asin] = series
+            self._loaded_at[asin] = time.monotonic()
+            while len(self._series) > self.max_series:
+                oldest, _ = self._series.popitem(last=False)
+                del self._loaded_at[oldest]
+                self.evictions += 1
+
+    def abort_load(self, asin: str) -> None:
+        """Stop buffering after a failed load."""
+        with self._lock:
+            self._pending.pop(asin, None)
+
+    def view(
+        self, asin: str, since: Optional[Timestamp] = None
+    ) -> Optional[SeriesView]:
+        """Get a NumPy view of a loaded series, or None if it is not loaded or is stale."""
+        with self._lock:
+            if not self._is_fresh(asin):
+                return None
+            self._series.move_to_end(asin)
+            return self._series[asin].view(
+                to_epoch(since) if since is not None else None
+            )
+
+    def compact(self, now: Optional[Timestamp] = None) -> int:
+        """Downsample every series; returns the number of raw points rolled up."""
+        raw_cutoff, hourly_cutoff = self._cutoffs(now)
+        with self._lock:
+            return sum(
+                series.compact(raw_cutoff, hourly_cutoff)
+                for series in self._series.values()
+            )
+
+    def evict(self, asin: str) -> None:
+        """Drop a series from memory (it is reloaded on next use)."""
+        with self._lock:
+            self._drop(asin)
+
+    def clear(self) -> None:
+        """Drop all series."""
+        with self._lock:
+            self._series.clear()
+            self._loaded_at.clear()
+            self._pending.clear()
+
+    def get_stats(self) -> Dict:
+        """Get series counts and memory usage for monitoring."""
+        with self._lock:
+            series = list(self._series.values())
+        return {
+            "series": len(series),
+            "max_series": self.max_series,
+            "evictions": self.evictions,
+            "raw_points": sum(s._raw_len for s in series),
+            "hourly_buckets": sum(len(s.hourly) for s in series),
+            "daily_buckets": sum(len(s.daily) for s in series),
+            "memory_bytes": sum(s.nbytes for s in series),
+        }
+
+
+_price_series_store: Optional[PriceSeriesStore] = None
+
+
+def get_price_series_store() -> PriceSeriesStore:
+    """Get the process-wide price series store."""
+    global _price_series_store
+    if _price_series_store is None:
+        _price_series_store = PriceSeriesStore()
+    return _price_series_store
+
+
+async def load_price_series(asin: str, since: Optional[Timestamp] = None) -> SeriesView:
+    """Get a price series view, loading it from ``PriceHistory`` on first use.
+
+    Args:
+    ----
+        asin: Product ASIN
+        since: Only include points at or after this time
+
+    Returns:
+    -------
+        SeriesView (empty if the ASIN has no price history)
+    """
+    store = get_price_series_store()
+    view = store.view(asin, since)
+    if view is not None:
+        return view
+
+    store.begin_load(asin)
+    try:
+        async with get_async_session() as session:
+            rows = (
+                await session.exec(
+                    select(PriceHistory.timestamp, PriceHistory.price)
+                    .where(PriceHistory.asin == asin)
+                    .order_by(PriceHistory.timestamp)
+                )
+            ).all()
+    except Exception:
+        store.abort_load(asin)
+        raise
+
+    store.finish_load(
+        asin, [to_epoch(ts) for ts, _ in rows], [price for _, price in rows]
+    )
+    log.debug("Loaded price series for %s (%d points)", asin, len(rows))
+    return store.view(asin, since)
+
+
+async def load_price_series_many(
+    asins: Sequence[str], since: Optional[Timestamp] = None, chunk_size: int = 500
+) -> Dict[str, SeriesView]:
+    """Get views for many ASINs, loading missing series with one query per chunk.
+
+    Args:
+    ----
+        asins: Product ASINs
+        since: Only include points at or after this time
+        chunk_size: ASINs per ``IN (...)`` query
+
+    Returns:
+    -------
+        Mapping of ASIN to SeriesView (empty views for ASINs without history)
+    """
+    store = get_price_series_store()
+    views: Dict[str, Optional[SeriesView]] = {
+        asin: store.view(asin, since) for asin in dict.fromkeys(asins)
+    }
+    missing = [asin for asin, view in views.items() if view is None]
+
+    for start in range(0, len(missing), chunk_size):
+        chunk = missing[start : start + chunk_size]
+        for asin in chunk:
+            store.begin_load(asin)
+        try:
+            async with get_async_session() as session:
+                rows = (
+                    await session.exec(
+                        select(
+                            PriceHistory.asin,
+                            PriceHistory.timestamp,
+                            PriceHistory.price,
+                        )
+                        .where(PriceHistory.asin.in_(chunk))
+                        .order_by(PriceHistory.asin, PriceHistory.timestamp)
+                    )
+                ).all()
+        except Exception:
+            for asin in chunk:
+                store.abort_load(asin)
+            raise
+
+        loaded: Dict[str, Tuple[List[int], List[int]]] = {
+            asin: ([], []) for asin in chunk
+        }
+        for asin, ts, price in rows:
+            loaded[asin][0].append(to_epoch(ts))
+            loaded[asin][1].append(price)
+        for asin, (timestamps, prices) in loaded.items():
+            store.finish_load(asin, timestamps, prices)
+            # Viewed now, as later chunks may push the series out of the store
+            views[asin] = store.view(asin, since)
+        log.debug("Loaded price series for %d ASINs (%d points)", len(chunk), len(rows))
+
+    return views
+
+
+def price_observation(row: PriceHistory) -> Tuple[str, int, datetime]:
+    """Capture a ``PriceHistory`` row as ``(asin, price, timestamp)`` before commit expires it."""
+    return row.asin, row.price, row.timestamp
+
+
+def record_prices(observations: Iterable[Tuple[str, int, datetime]]) -> None:
+    """Mirror committed price observations into the series store."""
+    store = get_price_series_store()
+    for asin, price, timestamp in observations:
+        store.record(asin, price, timestamp)
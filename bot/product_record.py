@@ -0,0 +1,514 @@
+"""Compact product record decoded from PA-API responses.
+
+``ProductRecord`` is what bot/paapi_decoder.py produces for every item of a
+SearchItems or GetItems response: one slotted object per product, holding the
+values exactly once (the feature list and category list are the lists from
+the decoded JSON, not copies). Prices are integers in paise, like everywhere
+else in the bot.
+
+Records are what the AI search path hands around: the bridge returns them as
+its products, and the matching engine, multi-card selector and carousel read
+them directly. A record is a read-only ``Mapping`` over the AI product format
+(``record["price"]``, ``record.get("average_rating")``), so code written
+against product dictionaries keeps working without a dictionary being built
+per product; ``copy()`` gives a plain dict for callers that annotate a
+product. Derived values - ``price_rupees``, ``savings_pct`` and ``specs``
+(display specs parsed from the feature bullets) - are computed when first
+asked for, and ``derived`` holds per-record results of more expensive
+analysis (the matching engine's feature extraction), so repeated scoring of
+a cached search does not redo it.
+
+The ``to_*_dict`` methods build the dictionary shapes the existing callers
+consume (search results, batch GetItems results, the detailed enrichment
+structure and the AI bridge format), so each of those is a single cheap
+conversion from the record instead of another walk over the response.
+"""
+
+import re
+from collections.abc import Mapping
+from operator import attrgetter
+from typing import Any, Dict, Iterator, List, Optional
+
+_FIELDS = (
+    "asin",
+    "title",
+    "price",
+    "list_price",
+    "savings",
+    "savings_percent",
+    "currency",
+    "availability",
+    "condition",
+    "merchant",
+    "prime",
+    "free_shipping",
+    "image_small",
+    "image_medium",
+    "image_large",
+    "rating",
+    "review_count",
+    "brand",
+    "manufacturer",
+    "model",
+    "color",
+    "size",
+    "dimensions",
+    "weight",
+    "is_adult_product",
+    "features",
+    "technical_details",
+    "categories",
+    "sales_rank",
+    "ean",
+    "isbn",
+    "upc",
+    "detail_page_url",
+)
+
+_REFRESH_RATE = re.compile(r"(\d{2,3})\s*hz")
+_RESPONSE_TIME = re.compile(r"(\d{1,2})\s*ms")
+_SRGB = re.compile(r"(\d{2,3})\s*%\s*srgb")
+_SCREEN_SIZE = re.compile(r'(\d{1,2})\s*"?\s*inch')
+
+
+def parse_feature_specs(features: List[str]) -> Dict[str, Any]:
+    """Display specs (refresh rate, panel, resolution, ...) mentioned in feature bullets."""
+    specs: Dict[str, Any] = {}
+    for feature_text in features:
+        if not isinstance(feature_text, str):
+            continue
+        text_lower = feature_text.lower()
+
+        refresh_match = _REFRESH_RATE.search(text_lower)
+        if refresh_match and "refresh" in text_lower:
+            specs["refresh_rate"] = int(refresh_match.group(1))
+
+        response_match = _RESPONSE_TIME.search(text_lower)
+        if response_match and (
+            "response" in text_lower or "mbr" in text_lower or "gtg" in text_lower
+        ):
+            specs["response_time"] = int(response_match.group(1))
+
+        if "qhd" in text_lower or "1440p" in text_lower:
+            specs["resolution"] = "QHD"
+        elif "4k" in text_lower or "uhd" in text_lower:
+            specs["resolution"] = "4K UHD"
+        elif "1080p" in text_lower or "fhd" in text_lower:
+            specs["resolution"] = "FHD"
+
+        if "ips" in text_lower:
+            specs["panel_type"] = "IPS"
+        elif "va" in text_lower:
+            specs["panel_type"] = "VA"
+        elif "oled" in text_lower or "amoled" in text_lower:
+            specs["panel_type"] = "OLED"
+
+        if "hdr" in text_lower:
+            if "hdr400" in text_lower or "displayhdr 400" in text_lower:
+                specs["hdr_support"] = "HDR400"
+            elif "hdr10" in text_lower:
+                specs["hdr_support"] = "HDR10"
+            else:
+                specs["hdr_support"] = "HDR"
+
+        srgb_match = _SRGB.search(text_lower)
+        if srgb_match:
+            specs["color_accuracy"] = int(srgb_match.group(1))
+
+        size_match = _SCREEN_SIZE.search(text_lower)
+        if size_match:
+            specs["size"] = f'{size_match.group(1)}"'
+    return specs
+
+
+class ProductRecord(Mapping):
+    """One product from a PA-API response."""
+
+    __slots__ = _FIELDS + ("_specs", "_derived")
+
+    def __init__(
+        self,
+        asin: str,
+        title: str = "",
+        price: Optional[int] = None,
+        list_price: Optional[int] = None,
+        savings: Optional[int] = None,
+        savings_percent: Optional[int] = None,
+        currency: Optional[str] = None,
+        availability: Optional[str] = None,
+        condition: Optional[str] = None,
+        merchant: Optional[str] = None,
+        prime: bool = False,
+        free_shipping: bool = False,
+        image_small: Optional[str] = None,
+        image_medium: Optional[str] = None,
+        image_large: Optional[str] = None,
+        rating: Optional[float] = None,
+        review_count: Optional[int] = None,
+        brand: Optional[str] = None,
+        manufacturer: Optional[str] = None,
+        model: Optional[str] = None,
+        color: Optional[str] = None,
+        size: Optional[str] = None,
+        dimensions: Optional[str] = None,
+        weight: Optional[str] = None,
+        is_adult_product: bool = False,
+        features: Optional[List[str]] = None,
+        technical_details: Optional[Dict[str, str]] = None,
+        categories: Optional[List[Dict[str, Any]]] = None,
+        sales_rank: Optional[int] = None,
+        ean: Optional[str] = None,
+        isbn: Optional[str] = None,
+        upc: Optional[str] = None,
+        detail_page_url: str = "",
+    ):
+        self.asin = asin
+        self.title = title
+        self.price = price
+        self.list_price = list_price
+        self.savings = savings
+        self.savings_percent = savings_percent
+        self.currency = currency
+        self.availability = availability
+        self.condition = condition
+        self.merchant = merchant
+        self.prime = prime
+        self.free_shipping = free_shipping
+        self.image_small = image_small
+        self.image_medium = image_medium
+        self.image_large = image_large
+        self.rating = rating
+        self.review_count = review_count
+        self.brand = brand
+        self.manufacturer = manufacturer
+        self.model = model
+        self.color = color
+        self.size = size
+        self.dimensions = dimensions
+        self.weight = weight
+        self.is_adult_product = is_adult_product
+        self.features = features if features is not None else []
+        self.technical_details = (
+            technical_details if technical_details is not None else {}
+        )
+        self.categories = categories if categories is not None else []
+        self.sales_rank = sales_rank
+        self.ean = ean
+        self.isbn = isbn
+        self.upc = upc
+        self.detail_page_url = detail_page_url
+        self._specs = None
+        self._derived = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ProductRecord":
+        """Rebuild a record from any of the dictionary shapes below (or a hand-made product dict)."""
+        offers = data.get("offers") or {}
+        offers_info = data.get("offers_info") or {}
+        product_info = data.get("product_info") or {}
+        images = data.get("images") or {}
+        reviews = data.get("reviews") or {}
+        return cls(
+            asin=data.get("asin") or "",
+            title=data.get("title") or "",
+            price=data.get("price") or offers.get("price"),
+            list_price=data.get("list_price")
+            or offers.get("list_price")
+            or offers_info.get("list_price"),
+            savings=data.get("savings_amount")
+            or offers.get("savings")
+            or offers_info.get("savings_amount"),
+            savings_percent=(
+                data.get("savings_percent")
+                or offers.get("savings_percent")
+                or offers_info.get("savings_percent")
+            ),
+            currency=data.get("currency"),
+            availability=data.get("availability") or offers.get("availability"),
+            condition=offers.get("condition") or offers_info.get("condition"),
+            merchant=offers.get("merchant"),
+            prime=bool(
+                data.get("prime")
+                or offers.get("prime")
+                or offers_info.get("prime_eligible")
+            ),
+            free_shipping=bool(
+                data.get("free_shipping") or offers_info.get("free_shipping")
+            ),
+            image_small=images.get("small") or None,
+            image_medium=images.get("medium") or None,
+            image_large=images.get("large")
+            or data.get("image_url")
+            or data.get("image")
+            or None,
+            rating=data.get("rating")
+            or data.get("average_rating")
+            or reviews.get("rating"),
+            review_count=data.get("review_count")
+            or data.get("rating_count")
+            or reviews.get("count"),
+            brand=data.get("brand"),
+            manufacturer=data.get("manufacturer"),
+            model=data.get("model"),
+            color=data.get("color") or product_info.get("color"),
+            size=data.get("size") or product_info.get("size"),
+            dimensions=data.get("dimensions")
+            or data.get("item_dimensions")
+            or product_info.get("dimensions"),
+            weight=data.get("weight")
+            or data.get("item_weight")
+            or product_info.get("weight"),
+            features=list(data.get("features") or []),
+            technical_details=dict(
+                data.get("technical_details") or data.get("specifications") or {}
+            ),
+            categories=list(data.get("categories") or []),
+            sales_rank=data.get("rank") or data.get("sales_rank"),
+            detail_page_url=data.get("detail_page_url") or data.get("url") or "",
+        )
+
+    def __repr__(self) -> str:
+        return f"ProductRecord(asin={self.asin!r}, title={self.title[:40]!r}, price={self.price!r})"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ProductRecord):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in _FIELDS)
+
+    # --- Product mapping ---------------------------------------------------------
+
+    def __getitem__(self, key: str) -> Any:
+        return _VIEW[key](self)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_VIEW)
+
+    def __len__(self) -> int:
+        return len(_VIEW)
+
+    def __contains__(self, key: object) -> bool:
+        return key in _VIEW
+
+    def get(self, key: str, default: Any = None) -> Any:
+        getter = _VIEW.get(key)
+        return default if getter is None else getter(self)
+
+    def copy(self) -> Dict[str, Any]:
+        """Plain dictionary of the product view, for callers that add their own keys."""
+        return {key: getter(self) for key, getter in _VIEW.items()}
+
+    # --- Derived values --------------------------------------------------------
+
+    @property
+    def image_url(self) -> Optional[str]:
+        """Largest available primary image."""
+        return self.image_large or self.image_medium or self.image_small
+
+    @property
+    def price_rupees(self) -> Optional[float]:
+        """Price in rupees."""
+        return self.price / 100 if self.price else None
+
+    @property
+    def savings_pct(self) -> Optional[int]:
+        """Savings percentage as reported by Amazon, else computed from the list price."""
+        if self.savings_percent is not None:
+            return self.savings_percent
+        return self._discount_percent()
+
+    @property
+    def specs(self) -> Dict[str, Any]:
+        """Display specs parsed from the feature bullets, parsed on first use."""
+        if self._specs is None:
+            self._specs = parse_feature_specs(self.features)
+        return self._specs
+
+    @property
+    def derived(self) -> Dict[Any, Any]:
+        """Per-record cache for values computed from the product by other modules."""
+        if self._derived is None:
+            self._derived = {}
+        return self._derived
+
+    def _discount_percent(self) -> Optional[int]:
+        """Discount against the list price, computed from the two prices."""
+        if self.price and self.list_price:
+            return int((self.list_price - self.price) / self.list_price * 100)
+        return None
+
+    def _product_info(self) -> Dict[str, Any]:
+        product_info = {}
+        for key, value in (
+            ("color", self.color),
+            ("size", self.size),
+            ("dimensions", self.dimensions),
+            ("weight", self.weight),
+        ):
+            if value:
+                product_info[key] = value
+        return product_info
+
+    def _offers_info(self) -> Dict[str, Any]:
+        offers_info = {}
+        if self.prime or self.free_shipping:
+            offers_info["prime_eligible"] = self.prime
+            offers_info["free_shipping"] = self.free_shipping
+        if self.condition:
+            offers_info["condition"] = self.condition
+        if self.list_price:
+            offers_info["list_price"] = self.list_price
+            if self.price and self.list_price > self.price:
+                offers_info["savings_amount"] = self.list_price - self.price
+                offers_info["savings_percent"] = self._discount_percent()
+        return offers_info
+
+    def _ai_technical_details(self) -> Dict[str, str]:
+        if self.model and "Model" not in self.technical_details:
+            return {**self.technical_details, "Model": self.model}
+        return self.technical_details
+
+    # --- Legacy dictionary shapes ---------------------------------------------
+
+    def to_search_dict(self) -> Dict[str, Any]:
+        """Search result shape returned by ``search_items_advanced``."""
+        return {
+            "asin": self.asin,
+            "title": self.title,
+            "price": self.price,
+            "list_price": self.list_price,
+            "savings_percent": self._discount_percent(),
+            "rating": self.rating,
+            "review_count": self.review_count,
+            "image_url": self.image_medium or self.image_large or "",
+            "detail_page_url": self.detail_page_url,
+        }
+
+    def to_batch_dict(self) -> Dict[str, Any]:
+        """Per-ASIN shape returned by ``get_items_batch``."""
+        return {
+            "asin": self.asin,
+            "title": self.title,
+            "price": self.price,
+            "list_price": self.list_price,
+            "savings_amount": (
+                self.list_price - self.price if self.price and self.list_price else None
+            ),
+            "savings_percent": self._discount_percent(),
+            "image_url": self.image_large or self.image_medium,
+            "rating": self.rating,
+            "review_count": self.review_count,
+            "brand": self.brand,
+            "model": self.model,
+            "color": self.color,
+            "size": self.size,
+            "weight": self.weight,
+            "dimensions": self.dimensions,
+            "features": self.features,
+            "specifications": self.technical_details,
+            "availability": self.availability,
+            "prime": self.prime,
+            "free_shipping": self.free_shipping,
+            "url": self.detail_page_url or None,
+        }
+
+    def to_detailed_dict(self) -> Dict[str, Any]:
+        """Comprehensive shape returned by ``get_item_detailed`` and stored by enrichment."""
+        data = {
+            "asin": self.asin,
+            "title": self.title,
+            "brand": self.brand,
+            "manufacturer": self.manufacturer,
+            "product_group": None,
+            "binding": None,
+            "features": self.features,
+            "color": self.color,
+            "size": self.size,
+            "item_dimensions": self.dimensions,
+            "item_weight": self.weight,
+            "is_adult_product": self.is_adult_product,
+            "technical_details": self.technical_details,
+            "ean": self.ean,
+            "isbn": self.isbn,
+            "upc": self.upc,
+            "languages": [],
+            "page_count": None,
+            "publication_date": None,
+            "images": {
+                "small": self.image_small or "",
+                "medium": self.image_medium or "",
+                "large": self.image_large or "",
+                "variants": [],
+            },
+            "offers": {
+                "price": self.price,
+                "list_price": self.list_price,
+                "savings": self.savings,
+                "savings_percent": self.savings_percent,
+                "availability": self.availability or "Unknown",
+                "condition": self.condition or "New",
+                "merchant": self.merchant or "Amazon.in",
+                "prime": self.prime,
+                "shipping": None,
+            },
+            "reviews": {"rating": self.rating, "count": self.review_count},
+            "categories": self.categories,
+            "rank": self.sales_rank,
+            "detail_page_url": self.detail_page_url,
+        }
+        if self.price:
+            data["price"] = self.price
+            data["currency"] = self.currency or "INR"
+        data["availability"] = data["offers"]["availability"]
+        if self.image_url:
+            data["image_url"] = self.image_url
+        return data
+
+    def to_ai_dict(self, transformed_at: float = 0.0) -> Dict[str, Any]:
+        """AI-compatible shape produced by the PA-API AI bridge."""
+        ai_product = {key: _VIEW[key](self) for key in _AI_KEYS}
+        ai_product["ai_extraction_metadata"] = {
+            "transformed_at": transformed_at,
+            "source": "paapi_ai_bridge",
+            "version": "1.0.0",
+            "fields_extracted": [key for key, value in ai_product.items() if value],
+        }
+        return ai_product
+
+
+# Keys of the AI product format, in the order the bridge has always produced them
+_AI_KEYS = (
+    "asin",
+    "title",
+    "features",
+    "technical_details",
+    "price",
+    "image_url",
+    "brand",
+    "manufacturer",
+    "rating_count",
+    "average_rating",
+    "availability",
+    "product_info",
+    "offers_info",
+)
+
+# Product view of a record: the AI format plus the few fields consumers read directly
+_VIEW = {
+    "asin": attrgetter("asin"),
+    "title": attrgetter("title"),
+    "features": attrgetter("features"),
+    "technical_details": ProductRecord._ai_technical_details,
+    "price": attrgetter("price"),
+    "image_url": lambda record: record.image_large or record.image_medium,
+    "brand": attrgetter("brand"),
+    "manufacturer": attrgetter("manufacturer"),
+    "rating_count": attrgetter("review_count"),
+    "average_rating": attrgetter("rating"),
+    "availability": attrgetter("availability"),
+    "product_info": ProductRecord._product_info,
+    "offers_info": ProductRecord._offers_info,
+    "list_price": attrgetter("list_price"),
+    "savings_percent": attrgetter("savings_pct"),
+    "sales_rank": attrgetter("sales_rank"),
+    "detail_page_url": attrgetter("detail_page_url"),
+}
@@ -0,0 +1,263 @@
+"""Daily PA-API quota budget planner.
+
+The day's quota (``PAAPI_DAILY_QUOTA`` requests, reset at midnight UTC) is
+split across four pools that mirror the rate limiter's priority lanes:
+
+* ``user``: searches and lookups a user is waiting for (``high``)
+* ``realtime``: real-time watches and active-watch refreshes (``normal``)
+* ``enrichment``: bulk enrichment and digest pricing (``low``)
+* ``analytics``: reporting and analysis (``analytics``)
+
+Demand is forecast per pool and hour of day from recent traffic: every
+completed hour is folded into an exponentially weighted average for that hour
+(``QUOTA_FORECAST_ALPHA``). Until traffic has been seen, each pool's share
+(``QUOTA_SHARE_*``) is spread evenly over the day.
+
+Admission control reserves, for every pool, the forecast demand of all pools
+above it for the rest of the day (times ``QUOTA_RESERVE_FACTOR``). A request
+is admitted only if the quota left after those reservations is positive, so
+bulk work at 04:00 backs off as soon as it would eat into what the morning
+peak is expected to need. User requests are only refused once the daily quota
+itself is gone.
+
+Usage counters per day and hour live in the limiter backend
+(bot/limiter_backend.py), so processes sharing it spend one budget and a
+restart keeps the day's count. Backend calls are made outside the planner's
+lock; the rate limiter runs ``admit`` and ``record`` in a worker thread.
+"""
+
+import threading
+import time
+from logging import getLogger
+from typing import Callable, Dict, List, Optional
+
+from .config import settings
+from .limiter_backend import LIMITER_BACKEND_ERRORS, LimiterBackend, get_limiter_backend
+
+log = getLogger(__name__)
+
+HOUR = 3600
+DAY = 86400
+
+# Budget pools, indexed like the rate limiter's priority lanes
+POOLS = ("user", "realtime", "enrichment", "analytics")
+
+_PRIORITY_TO_POOL = {
+    "high": "user",
+    "user_triggered": "user",
+    "normal": "realtime",
+    "active_watch": "realtime",
+    "low": "enrichment",
+    "data_enrichment": "enrichment",
+    "analytics": "analytics",
+}
+
+
+def pool_for(priority: Optional[str]) -> str:
+    """Get the budget pool for a rate limiter priority (unknown maps to realtime)."""
+    return _PRIORITY_TO_POOL.get(str(priority).lower(), "realtime")
+
+
+class QuotaBudgetPlanner:
+    """Splits the daily PA-API quota across pools with forecast-based admission."""
+
+    def __init__(
+        self,
+        daily_quota: Optional[int] = None,
+        shares: Optional[Dict[str, float]] = None,
+        reserve_factor: Optional[float] = None,
+        forecast_alpha: Optional[float] = None,
+        clock: Callable[[], float] = time.time,
+        backend: Optional[LimiterBackend] = None,
+    ):
+        self.daily_quota = daily_quota or settings.PAAPI_DAILY_QUOTA
+        self.shares = shares or {
+            "user": settings.QUOTA_SHARE_USER,
+            "realtime": settings.QUOTA_SHARE_REALTIME,
+            "enrichment": settings.QUOTA_SHARE_ENRICHMENT,
+            "analytics": settings.QUOTA_SHARE_ANALYTICS,
+        }
+        self.reserve_factor = reserve_factor or settings.QUOTA_RESERVE_FACTOR
+        self.forecast_alpha = forecast_alpha or settings.QUOTA_FORECAST_ALPHA
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.backend = backend or get_limiter_backend()
+
+        # Expected requests per pool for each hour of the day (UTC)
+        self.forecast: Dict[str, List[float]] = {
+            pool: [self.shares.get(pool, 0.0) * self.daily_quota / 24] * 24
+            for pool in POOLS
+        }
+        now = clock()
+        self._day = int(now // DAY)
+        self._hour = int(now // HOUR)
+        self.rejected = dict.fromkeys(POOLS, 0)
+        # Shared usage as of the last admit/record/status call
+        self.used = dict.fromkeys(POOLS, 0)
+        self.hour_used = dict.fromkeys(POOLS, 0)
+
+    # --- Time keeping -------------------------------------------------------
+
+    def _day_key(self, day: int, pool: str) -> str:
+        return f"quota:day:{day}:{pool}"
+
+    def _hour_key(self, hour: int, pool: str) -> str:
+        return f"quota:hour:{hour}:{pool}"
+
+    def _sync(self, now: float) -> None:
+        """Fold finished hours into the forecast and load today's shared usage.
+
+        The backend is read without holding the lock. If it is unavailable
+        the last loaded usage is kept.
+        """
+        hour = int(now // HOUR)
+        day = int(now // DAY)
+        with self._lock:
+            last_hour = self._hour
+        try:
+            finished = None
+            if hour != last_hour:
+                finished = self.backend.get_many(
+                    [self._hour_key(last_hour, pool) for pool in POOLS]
+                )
+            values = self.backend.get_many(
+                [self._day_key(day, pool) for pool in POOLS]
+                + [self._hour_key(hour, pool) for pool in POOLS]
+            )
+        except LIMITER_BACKEND_ERRORS as e:
+            log.warning(
+                "Quota budget backend unavailable, using last known usage: %s", e
+            )
+            return
+
+        with self._lock:
+            # Another thread may have folded the same hours meanwhile
+            if finished is not None and self._hour == last_hour:
+                alpha = self.forecast_alpha
+                # Hours without any traffic are observed as zero demand
+                for elapsed in range(last_hour, min(hour, last_hour + 24)):
+                    for pool, observed in zip(POOLS, finished):
+                        observed = observed if elapsed == last_hour else 0
+                        forecast = self.forecast[pool]
+                        forecast[elapsed % 24] += alpha * (
+                            observed - forecast[elapsed % 24]
+                        )
+                self._hour = hour
+
+            if day > self._day:
+                self._day = day
+                self.rejected = dict.fromkeys(POOLS, 0)
+                log.info("Daily PA-API quota budget reset")
+
+            self.used = dict(zip(POOLS, values[: len(POOLS)]))
+            self.hour_used = dict(zip(POOLS, values[len(POOLS) :]))
+
+    # --- Forecasts ----------------------------------------------------------
+
+    def _forecast_remaining(self, pool: str, now: float) -> float:
+        """Requests the pool is expected to make for the rest of the UTC day."""
+        hour_of_day = int(now // HOUR) % 24
+        forecast = self.forecast[pool]
+        current = max(forecast[hour_of_day] - self.hour_used[pool], 0.0)
+        return current + sum(forecast[hour_of_day + 1 :])
+
+    def _headroom(self, pool: str, now: float) -> float:
+        """Quota left for ``pool`` after reserving what higher pools are expected to need."""
+        remaining = self.daily_quota - sum(self.used.values())
+        higher = POOLS[: POOLS.index(pool)]
+        reserved = self.reserve_factor * sum(
+            self._forecast_remaining(p, now) for p in higher
+        )
+        return remaining - reserved
+
+    # --- Admission ----------------------------------------------------------
+
+    def admit(self, priority: Optional[str] = None) -> bool:
+        """Check whether a request of this priority may spend quota now.
+
+        Rejections are counted; the caller should back off (raise
+        ``QuotaExceededError``) rather than wait.
+        """
+        pool = pool_for(priority)
+        now = self._clock()
+        self._sync(now)
+        with self._lock:
+            if sum(self.used.values()) >= self.daily_quota:
+                admitted = False
+            elif pool == "user":
+                admitted = True
+            else:
+                admitted = self._headroom(pool, now) >= 1
+            if not admitted:
+                self.rejected[pool] += 1
+            return admitted
+
+    def record(self, priority: Optional[str] = None, requests: int = 1) -> None:
+        """Count requests that were granted a rate limiter token."""
+        pool = pool_for(priority)
+        now = self._clock()
+        day, hour = int(now // DAY), int(now // HOUR)
+        try:
+            used = self.backend.incr(
+                self._day_key(day, pool), requests, (day + 2) * DAY
+            )
+            hour_used = self.backend.incr(
+                self._hour_key(hour, pool), requests, (hour + 25) * HOUR
+            )
+        except LIMITER_BACKEND_ERRORS as e:
+            log.warning("Quota budget backend unavailable, counting locally: %s", e)
+            with self._lock:
+                self.used[pool] += requests
+                self.hour_used[pool] += requests
+            return
+        with self._lock:
+            self.used[pool] = used
+            self.hour_used[pool] = hour_used
+
+    def remaining(self) -> int:
+        """Requests left in today's quota."""
+        self._sync(self._clock())
+        with self._lock:
+            return max(0, self.daily_quota - sum(self.used.values()))
+
+    def get_status(self) -> Dict:
+        """Get today's usage, remaining budget and forecasts per pool."""
+        now = self._clock()
+        self._sync(now)
+        with self._lock:
+            used = sum(self.used.values())
+            pools = {}
+            for pool in POOLS:
+                headroom = (
+                    self.daily_quota - used
+                    if pool == "user"
+                    else self._headroom(pool, now)
+                )
+                pools[pool] = {
+                    "used": self.used[pool],
+                    "share": self.shares.get(pool, 0.0),
+                    "forecast_remaining": round(self._forecast_remaining(pool, now), 1),
+                    "available": max(0, int(headroom)),
+                    "admitting": used < self.daily_quota and headroom >= 1,
+                    "rejected": self.rejected[pool],
+                }
+            return {
+                "daily_quota": self.daily_quota,
+                "used": used,
+                "remaining": max(0, self.daily_quota - used),
+                "reset_in_seconds": int((self._day + 1) * DAY - now),
+                "pools": pools,
+            }
+
+
+_budget_planner: Optional[QuotaBudgetPlanner] = None
+_budget_planner_lock = threading.Lock()
+
+
+def get_budget_planner() -> QuotaBudgetPlanner:
+    """Get the process-wide quota budget planner."""
+    global _budget_planner
+    with _budget_planner_lock:
+        if _budget_planner is None:
+            _budget_planner = QuotaBudgetPlanner()
+        return _budget_planner
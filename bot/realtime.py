@@ -0,0 +1,519 @@
+"""Event-driven real-time watch engine.
+
+Real-time watches used to get one 10-minute APScheduler job each, so every
+watch cost its own GetItems call whether or not the product ever changed.
+``RealtimeWatchEngine`` replaces those jobs with one scheduler tick:
+
+* Watches are deduplicated by ASIN; each ASIN is checked once for all of its
+  subscribers.
+* ASINs sit in a heap keyed on their next check time. The interval shrinks
+  with the product's observed volatility (an exponentially weighted rate of
+  "the price changed since the last check") and with its subscriber count,
+  between ``REALTIME_MIN_INTERVAL_SECONDS`` and ``REALTIME_MAX_INTERVAL_SECONDS``.
+* Due ASINs are refreshed in 10-item GetItems batches, at most
+  ``REALTIME_CALLS_PER_HOUR`` calls per hour. When more is due than the budget
+  allows, the most overdue ASINs go first and the rest wait, so intervals
+  stretch instead of the quota running out.
+* Price changes are fanned out to every watch on the ASIN: a ``Price`` row per
+  watch, the shared price cache, and an alert card when the watch's price
+  criteria are met and the price dropped.
+
+The engine keeps no event-loop state, so each scheduler tick can run on its
+own short-lived loop. Subscriptions are re-synced from the database every
+``REALTIME_RELOAD_SECONDS``, which picks up watches created or deleted by
+other processes.
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+import threading
+import time
+from datetime import datetime
+from logging import getLogger
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from sqlmodel import func, select
+
+from .config import settings
+from .db import get_async_session
+from .errors import QuotaExceededError
+from .models import Cache, Price, User, Watch
+
+log = getLogger(__name__)
+
+# PA-API maximum per GetItems request
+BATCH_SIZE = 10
+
+# (asin, old price or None, new price), prices in paise
+PriceChange = Tuple[str, Optional[int], int]
+Fetcher = Callable[[List[str]], Awaitable[Dict[str, Dict]]]
+Notifier = Callable[[Sequence[PriceChange]], Awaitable[None]]
+
+
+class _AsinState:
+    """Scheduling state of one watched ASIN."""
+
+    __slots__ = (
+        "asin",
+        "watch_ids",
+        "last_price",
+        "change_rate",
+        "interval",
+        "next_check",
+        "seq",
+    )
+
+    def __init__(self, asin: str, change_rate: float):
+        self.asin = asin
+        self.watch_ids: Set[int] = set()
+        self.last_price: Optional[int] = None
+        self.change_rate = change_rate
+        self.interval = 0.0
+        self.next_check = 0.0
+        self.seq = 0  # Heap entries with another seq are stale
+
+
+def refresh_interval(
+    change_rate: float,
+    subscribers: int,
+    min_interval: float,
+    max_interval: float,
+) -> float:
+    """Seconds until an ASIN's next check.
+
+    A product that never changes and has one subscriber is checked every
+    ``max_interval``; volatility (up to 10x) and more subscribers (log2) bring
+    that down to ``min_interval``.
+    """
+    demand = (1 + 9 * change_rate) * (1 + math.log2(max(subscribers, 1)))
+    return min(max(max_interval / demand, min_interval), max_interval)
+
+
+async def _fetch_prices(asins: List[str]) -> Dict[str, Dict]:
+    from .paapi_factory import get_items_detailed_batch
+
+    return await get_items_detailed_batch(asins, priority="normal")
+
+
+class RealtimeWatchEngine:
+    """Deduplicated, volatility-aware scheduler for real-time watches."""
+
+    def __init__(
+        self,
+        fetch: Optional[Fetcher] = None,
+        notify: Optional[Notifier] = None,
+        calls_per_hour: Optional[float] = None,
+        min_interval: Optional[float] = None,
+        max_interval: Optional[float] = None,
+        change_alpha: Optional[float] = None,
+        initial_change_rate: Optional[float] = None,
+        reload_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._fetch = fetch or _fetch_prices
+        self._notify = notify or fan_out_price_changes
+        self.calls_per_hour = (
+            calls_per_hour
+            if calls_per_hour is not None
+            else settings.REALTIME_CALLS_PER_HOUR
+        )
+        self.min_interval = min_interval or settings.REALTIME_MIN_INTERVAL_SECONDS
+        self.max_interval = max_interval or settings.REALTIME_MAX_INTERVAL_SECONDS
+        self.change_alpha = change_alpha or settings.REALTIME_CHANGE_ALPHA
+        self.initial_change_rate = (
+            initial_change_rate
+            if initial_change_rate is not None
+            else settings.REALTIME_INITIAL_CHANGE_RATE
+        )
+        self.reload_seconds = (
+            reload_seconds
+            if reload_seconds is not None
+            else settings.REALTIME_RELOAD_SECONDS
+        )
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._states: Dict[str, _AsinState] = {}
+        self._watch_asin: Dict[int, str] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._seq = itertools.count(1)
+
+        # About a minute of budget can be spent at once after an idle spell
+        self._capacity = max(1.0, self.calls_per_hour / 60)
+        self._tokens = self._capacity
+        self._refilled_at = clock()
+        self._loaded_at: Optional[float] = None
+
+        self.stats = {
+            "ticks": 0,
+            "calls": 0,
+            "asins_checked": 0,
+            "changes": 0,
+            "deferred": 0,
+            "failed": 0,
+        }
+
+    # --- Subscriptions ----------------------------------------------------
+
+    def add_watch(self, watch_id: int, asin: str) -> None:
+        """Subscribe a watch to its ASIN, scheduling the ASIN if it is new."""
+        with self._lock:
+            self._add(watch_id, asin, self._clock())
+
+    def remove_watch(self, watch_id: int) -> None:
+        """Unsubscribe a watch; an ASIN without subscribers is dropped."""
+        with self._lock:
+            self._remove(watch_id)
+
+    def sync_watches(
+        self,
+        watches: Iterable[Tuple[int, str]],
+        prices: Optional[Dict[str, int]] = None,
+    ) -> None:
+        """Replace all subscriptions with ``(watch_id, asin)`` pairs.
+
+        Args:
+        ----
+            watches: Every active real-time watch
+            prices: Last known prices, used as the baseline for new ASINs
+        """
+        watches = dict(watches)
+        prices = prices or {}
+        with self._lock:
+            now = self._clock()
+            for watch_id, asin in list(self._watch_asin.items()):
+                if watches.get(watch_id) != asin:
+                    self._remove(watch_id)
+            for watch_id, asin in watches.items():
+                self._add(watch_id, asin, now)
+            for asin, price in prices.items():
+                state = self._states.get(asin)
+                if state is not None and state.last_price is None:
+                    state.last_price = price
+
+    def _add(self, watch_id: int, asin: str, now: float) -> None:
+        if self._watch_asin.get(watch_id) == asin:
+            return
+        self._remove(watch_id)
+        state = self._states.get(asin)
+        if state is None:
+            state = self._states[asin] = _AsinState(asin, self.initial_change_rate)
+            state.watch_ids.add(watch_id)
+            self._schedule(state, now)  # New ASINs are checked right away
+        else:
+            state.watch_ids.add(watch_id)
+            # More subscribers may pull the next check forward
+            self._schedule(state, min(state.next_check, now + self._interval(state)))
+        self._watch_asin[watch_id] = asin
+
+    def _remove(self, watch_id: int) -> None:
+        asin = self._watch_asin.pop(watch_id, None)
+        if asin is None:
+            return
+        state = self._states[asin]
+        state.watch_ids.discard(watch_id)
+        if not state.watch_ids:
+            del self._states[asin]  # Its heap entry is now stale
+
+    # --- Scheduling -------------------------------------------------------
+
+    def _interval(self, state: _AsinState) -> float:
+        return refresh_interval(
+            state.change_rate,
+            len(state.watch_ids),
+            self.min_interval,
+            self.max_interval,
+        )
+
+    def _schedule(self, state: _AsinState, at: float) -> None:
+        state.next_check = at
+        state.seq = next(self._seq)
+        heapq.heappush(self._heap, (at, state.seq, state.asin))
+
+    def _pop_due(self, now: float, limit: int) -> List[str]:
+        """Pop up to ``limit`` due ASINs, most overdue first."""
+        due = []
+        while self._heap and len(due) < limit and self._heap[0][0] <= now:
+            _, seq, asin = heapq.heappop(self._heap)
+            state = self._states.get(asin)
+            if state is not None and state.seq == seq:
+                due.append(asin)
+        return due
+
+    def _count_due(self, now: float) -> int:
+        return sum(
+            1
+            for at, seq, asin in self._heap
+            if at <= now and asin in self._states and self._states[asin].seq == seq
+        )
+
+    def observe(
+        self, asin: str, price: int, now: Optional[float] = None
+    ) -> Optional[PriceChange]:
+        """Record a checked price and reschedule the ASIN.
+
+        Returns
+        -------
+            The price change, or None if the price is unchanged. The first
+            price seen for an ASIN is reported as a change from None.
+
+        """
+        with self._lock:
+            now = self._clock() if now is None else now
+            state = self._states.get(asin)
+            if state is None:
+                return None
+            previous = state.last_price
+            if previous is not None:
+                changed = 1.0 if price != previous else 0.0
+                state.change_rate += self.change_alpha * (changed - state.change_rate)
+            state.last_price = price
+            state.interval = self._interval(state)
+            self._schedule(state, now + state.interval)
+        if previous == price:
+            return None
+        return asin, previous, price
+
+    def _retry_later(self, asins: Iterable[str], now: float) -> None:
+        with self._lock:
+            for asin in asins:
+                state = self._states.get(asin)
+                if state is not None:
+                    self._schedule(
+                        state, now + (state.interval or self._interval(state))
+                    )
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self._refilled_at)
+        self._refilled_at = now
+        self._tokens = min(
+            self._capacity, self._tokens + elapsed * self.calls_per_hour / 3600
+        )
+
+    # --- Ticks ------------------------------------------------------------
+
+    async def reload(self) -> None:
+        """Re-sync subscriptions from the database, seeding prices for new ASINs.
+
+        A new ASIN starts from its cached price or, failing that, its latest
+        stored Price row, so a restart or leader failover does not treat the
+        next check of every ASIN as a first observation.
+        """
+        async with get_async_session() as session:
+            rows = (
+                await session.exec(
+                    select(Watch.id, Watch.asin).where(
+                        Watch.mode == "rt", Watch.asin.is_not(None)
+                    )
+                )
+            ).all()
+            asins = {asin for _, asin in rows}
+            new = [asin for asin in asins if asin not in self._states]
+            prices = {}
+            if new:
+                prices = dict(
+                    (
+                        await session.exec(
+                            select(Cache.asin, Cache.price).where(Cache.asin.in_(new))
+                        )
+                    ).all()
+                )
+            uncached = [asin for asin in new if asin not in prices]
+            if uncached:
+                latest = (
+                    select(Price.asin, func.max(Price.fetched_at).label("fetched_at"))
+                    .where(Price.asin.in_(uncached))
+                    .group_by(Price.asin)
+                    .subquery()
+                )
+                prices.update(
+                    (
+                        await session.exec(
+                            select(Price.asin, Price.price).join(
+                                latest,
+                                (Price.asin == latest.c.asin)
+                                & (Price.fetched_at == latest.c.fetched_at),
+                            )
+                        )
+                    ).all()
+                )
+        self.sync_watches(rows, prices)
+        self._loaded_at = self._clock()
+        log.info(
+            "Real-time engine synced %d watches on %d ASINs", len(rows), len(asins)
+        )
+
+    async def tick(self) -> List[PriceChange]:
+        """Check due ASINs within the budget and fan out any price changes.
+
+        Returns
+        -------
+            The price changes found in this tick
+
+        """
+        now = self._clock()
+        if self._loaded_at is None or now - self._loaded_at >= self.reload_seconds:
+            await self.reload()
+            now = self._clock()
+
+        with self._lock:
+            self._refill(now)
+            asins = self._pop_due(now, int(self._tokens) * BATCH_SIZE)
+            self.stats["ticks"] += 1
+            self.stats["deferred"] = self._count_due(now)
+
+        changes: List[PriceChange] = []
+        for start in range(0, len(asins), BATCH_SIZE):
+            batch = asins[start : start + BATCH_SIZE]
+            self._tokens -= 1
+            self.stats["calls"] += 1
+            try:
+                items = await self._fetch(batch)
+            except QuotaExceededError:
+                log.warning(
+                    "PA-API quota exceeded, deferring %d real-time ASINs",
+                    len(asins) - start,
+                )
+                self._tokens = 0.0
+                self._retry_later(asins[start:], self._clock())
+                break
+            except Exception as e:
+                log.error("Real-time refresh failed for %s: %s", batch, e)
+                self.stats["failed"] += len(batch)
+                self._retry_later(batch, self._clock())
+                continue
+
+            checked_at = self._clock()
+            missing = []
+            for asin in batch:
+                price = (items.get(asin) or {}).get("price")
+                if not price:
+                    missing.append(asin)
+                    continue
+                change = self.observe(asin, price, checked_at)
+                if change is not None:
+                    changes.append(change)
+            self.stats["asins_checked"] += len(batch) - len(missing)
+            self.stats["failed"] += len(missing)
+            self._retry_later(missing, checked_at)
+
+        if changes:
+            self.stats["changes"] += len(changes)
+            await self._notify(changes)
+        return changes
+
+    def get_stats(self) -> Dict:
+        """Get subscription, budget and throughput metrics."""
+        with self._lock:
+            intervals = [
+                state.interval for state in self._states.values() if state.interval
+            ]
+            return {
+                **self.stats,
+                "asins": len(self._states),
+                "watches": len(self._watch_asin),
+                "calls_per_hour": self.calls_per_hour,
+                "budget_tokens": round(self._tokens, 2),
+                "mean_interval_seconds": (
+                    round(sum(intervals) / len(intervals), 1) if intervals else None
+                ),
+            }
+
+
+def _alert_due(watch: Watch, old: Optional[int], new: int) -> bool:
+    """Alert on a drop that meets the watch's criteria.
+
+    A first price (no previous one known) is only a baseline; it alerts just
+    when the watch has a ``max_price`` that the price already meets.
+    """
+    if old is None:
+        return watch.max_price is not None and new <= watch.max_price
+    if new >= old:
+        return False
+    if watch.max_price is not None and new > watch.max_price:
+        return False
+    if watch.min_discount is not None:
+        return new <= (100 - watch.min_discount) / 100 * old
+    return True
+
+
+async def fan_out_price_changes(changes: Sequence[PriceChange]) -> None:
+    """Store price changes for every subscribed watch and send alert cards."""
+    from .carousel import build_single_card
+    from .digest import DIGEST_IMAGE
+    from .outbound import Priority, get_outbound_dispatcher, photo_message
+
+    by_asin = {asin: (old, new) for asin, old, new in changes}
+    now = datetime.utcnow()
+    alerts = []
+    async with get_async_session() as session:
+        rows = (
+            await session.exec(
+                select(Watch, User.tg_user_id)
+                .join(User, User.id == Watch.user_id)
+                .where(Watch.mode == "rt", Watch.asin.in_(list(by_asin)))
+            )
+        ).all()
+        for asin, (_, new) in by_asin.items():
+            await session.merge(Cache(asin=asin, price=new, fetched_at=now))
+        for watch, chat_id in rows:
+            old, new = by_asin[watch.asin]
+            session.add(
+                Price(
+                    watch_id=watch.id,
+                    asin=watch.asin,
+                    price=new,
+                    source="paapi",
+                    fetched_at=now,
+                )
+            )
+            if _alert_due(watch, old, new):
+                alerts.append((chat_id, watch, new))
+        await session.commit()
+
+    dispatcher = get_outbound_dispatcher()
+    pending = []
+    for chat_id, watch, price in alerts:
+        caption, keyboard = build_single_card(
+            watch.keywords, price, DIGEST_IMAGE, watch.asin, watch.id
+        )
+        pending.append(
+            await dispatcher.submit(
+                chat_id,
+                [photo_message(DIGEST_IMAGE, caption, keyboard)],
+                Priority.ALERT,
+            )
+        )
+    # Wait for delivery; the tick's loop (and its dispatcher) ends when we return
+    await asyncio.gather(*pending)
+    log.info(
+        "Fanned out %d price changes to %d watches, %d alerts",
+        len(changes),
+        len(rows),
+        len(alerts),
+    )
+
+
+_engine: Optional[RealtimeWatchEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_realtime_engine() -> RealtimeWatchEngine:
+    """Get the process-wide real-time watch engine."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = RealtimeWatchEngine()
+        return _engine
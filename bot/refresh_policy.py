@@ -0,0 +1,353 @@
+"""Adaptive per-ASIN refresh intervals.
+
+Instead of refreshing every watched product every 2 hours and trusting the
+price cache for a flat 24 hours, each ASIN gets a refresh interval learned
+from its own ``PriceHistory``:
+
+* ``change_rate`` estimates how often the price changes (changes per hour),
+  weighting recent observations exponentially
+  (``REFRESH_RATE_HALF_LIFE_HOURS``), so an ASIN that starts moving during a
+  sale event is picked up within a day, and one that settles down drifts back.
+  A weak prior at the default interval keeps new ASINs from swinging wildly.
+* Treating changes as a Poisson process, the interval is the time in which
+  the price changes with probability ``REFRESH_CHANGE_PROBABILITY``, clamped
+  to ``REFRESH_MIN_INTERVAL_MINUTES`` .. ``REFRESH_MAX_INTERVAL_HOURS``.
+
+``RefreshPolicy.due_asins`` picks the ASINs whose interval has elapsed since
+their last stored price (most overdue first) and the price cache uses the
+same interval as its TTL. Only the scheduler leader plans watched ASINs on
+every tick, so other worker processes plan the ASINs they read prices for
+themselves (``RefreshPolicy.ttls``), from the same shared price history. ``simulate_refresh`` replays recorded price history
+against any interval rule to compare detected-change latency with the number
+of lookups spent (see scripts/simulate_refresh_policy.py).
+"""
+
+import math
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from logging import getLogger
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .config import settings
+from .price_series import SeriesView, Timestamp, load_price_series_many, to_epoch
+
+log = getLogger(__name__)
+
+HOUR = 3600
+
+# Weight of the prior, in hours of observation at the default interval's rate
+PRIOR_HOURS = 2
+
+# TTL for ASINs whose history has not been planned yet
+DEFAULT_CACHE_TTL = timedelta(hours=24)
+
+# (observed timestamps, observed prices, now) -> seconds until the next refresh
+IntervalRule = Callable[[np.ndarray, np.ndarray, int], float]
+
+
+def change_rate(
+    timestamps: np.ndarray,
+    prices: np.ndarray,
+    now: int,
+    half_life_hours: float,
+    prior_rate: float = 0.0,
+    prior_hours: float = 0.0,
+    lows: Optional[np.ndarray] = None,
+    highs: Optional[np.ndarray] = None,
+) -> float:
+    """Exponentially weighted price change rate, in changes per hour.
+
+    Each gap between consecutive observations contributes its length as
+    exposure and 1 if the price differed, both weighted by
+    ``0.5 ** (age / half_life)``. A rolled-up bucket whose low and high differ
+    also counts as a change.
+
+    Args:
+    ----
+        timestamps: Observation times (epoch seconds), oldest first
+        prices: Observed prices
+        now: Reference time for ages
+        half_life_hours: Age at which an observation counts half
+        prior_rate: Rate assumed before any history (changes per hour)
+        prior_hours: Weight of the prior, in hours of exposure
+        lows, highs: Bucket bounds of a ``SeriesView``, if available
+
+    Returns:
+    -------
+        Estimated changes per hour
+    """
+    changes = 0.0
+    exposure = 0.0
+    if len(timestamps) > 1:
+        ts = np.asarray(timestamps, dtype=np.float64)
+        changed = np.diff(np.asarray(prices, dtype=np.int64)) != 0
+        if lows is not None and highs is not None:
+            changed |= (np.asarray(lows) != np.asarray(highs))[1:]
+        weights = 0.5 ** ((now - ts[1:]) / (half_life_hours * HOUR))
+        changes = float(np.sum(weights * changed))
+        exposure = float(np.sum(weights * np.diff(ts))) / HOUR
+    changes += prior_rate * prior_hours
+    exposure += prior_hours
+    return changes / exposure if exposure > 0 else prior_rate
+
+
+def interval_for_rate(
+    rate: float, probability: float, min_interval: float, max_interval: float
+) -> float:
+    """Seconds in which a price changing ``rate`` times per hour changes with ``probability``."""
+    if rate <= 0:
+        return max_interval
+    interval = -math.log(1 - probability) / rate * HOUR
+    return min(max(interval, min_interval), max_interval)
+
+
+@dataclass(frozen=True)
+class RefreshPlan:
+    """Refresh schedule of one ASIN."""
+
+    asin: str
+    rate: float  # Changes per hour
+    interval: float  # Seconds
+    last_refreshed: Optional[int]  # Epoch seconds of the latest stored price
+
+    def overdue(self, now: int) -> float:
+        """Elapsed intervals since the last refresh (>= 1 means due)."""
+        if self.last_refreshed is None:
+            return math.inf
+        return (now - self.last_refreshed) / self.interval
+
+
+class RefreshPolicy:
+    """Learns per-ASIN refresh intervals from stored price history."""
+
+    def __init__(
+        self,
+        half_life_hours: Optional[float] = None,
+        probability: Optional[float] = None,
+        min_interval: Optional[float] = None,
+        max_interval: Optional[float] = None,
+        default_interval: Optional[float] = None,
+    ):
+        self.half_life_hours = half_life_hours or settings.REFRESH_RATE_HALF_LIFE_HOURS
+        self.probability = probability or settings.REFRESH_CHANGE_PROBABILITY
+        self.min_interval = min_interval or settings.REFRESH_MIN_INTERVAL_MINUTES * 60
+        self.max_interval = max_interval or settings.REFRESH_MAX_INTERVAL_HOURS * HOUR
+        self.default_interval = (
+            default_interval or settings.REFRESH_DEFAULT_INTERVAL_HOURS * HOUR
+        )
+        # Rate at which the default interval would be chosen
+        self.prior_rate = -math.log(1 - self.probability) / (
+            self.default_interval / HOUR
+        )
+        self._intervals: Dict[str, float] = {}
+        self._planned_at: Dict[str, float] = {}  # time.monotonic() of each ASIN's plan
+
+    def interval(
+        self,
+        timestamps: np.ndarray,
+        prices: np.ndarray,
+        now: int,
+        lows=None,
+        highs=None,
+    ) -> float:
+        """Refresh interval in seconds for an observed series."""
+        rate = change_rate(
+            timestamps,
+            prices,
+            now,
+            self.half_life_hours,
+            self.prior_rate,
+            PRIOR_HOURS,
+            lows,
+            highs,
+        )
+        return interval_for_rate(
+            rate, self.probability, self.min_interval, self.max_interval
+        )
+
+    def plan_view(self, asin: str, view: SeriesView, now: int) -> RefreshPlan:
+        """Plan one ASIN from its price series."""
+        rate = change_rate(
+            view.timestamps,
+            view.prices,
+            now,
+            self.half_life_hours,
+            self.prior_rate,
+            PRIOR_HOURS,
+            view.lows,
+            view.highs,
+        )
+        interval = interval_for_rate(
+            rate, self.probability, self.min_interval, self.max_interval
+        )
+        self._intervals[asin] = interval
+        self._planned_at[asin] = time.monotonic()
+        last = int(view.timestamps[-1]) if len(view) else None
+        return RefreshPlan(asin, rate, interval, last)
+
+    async def plan(
+        self, asins: Sequence[str], now: Optional[Timestamp] = None
+    ) -> Dict[str, RefreshPlan]:
+        """Plan many ASINs, loading their price series as needed."""
+        now_ts = to_epoch(now) if now is not None else int(time.time())
+        since = now_ts - int(
+            self.half_life_hours * HOUR * 8
+        )  # Older points weigh < 0.4%
+        views = await load_price_series_many(asins, since)
+        return {
+            asin: self.plan_view(asin, view, now_ts) for asin, view in views.items()
+        }
+
+    async def due_asins(
+        self,
+        asins: Sequence[str],
+        now: Optional[Timestamp] = None,
+        limit: Optional[int] = None,
+    ) -> List[str]:
+        """ASINs whose refresh interval has elapsed, most overdue first.
+
+        ASINs without any stored price come first.
+        """
+        now_ts = to_epoch(now) if now is not None else int(time.time())
+        plans = await self.plan(asins, now_ts)
+        due = [plan for plan in plans.values() if plan.overdue(now_ts) >= 1]
+        due.sort(key=lambda plan: plan.overdue(now_ts), reverse=True)
+        if limit is not None:
+            due = due[:limit]
+        return [plan.asin for plan in due]
+
+    def ttl(self, asin: str) -> timedelta:
+        """How long a cached price for ``asin`` stays fresh."""
+        interval = self._intervals.get(asin)
+        if interval is None:
+            return DEFAULT_CACHE_TTL
+        return timedelta(seconds=interval)
+
+    async def ttls(self, asins: Sequence[str]) -> Dict[str, timedelta]:
+        """Cache TTLs for many ASINs, planning those this process has not planned lately.
+
+        ASINs are replanned after ``REFRESH_TICK_MINUTES``, as the leader does.
+        If planning fails the TTLs of earlier plans (or the default) are used.
+        """
+        cutoff = time.monotonic() - settings.REFRESH_TICK_MINUTES * 60
+        stale = [
+            asin
+            for asin in dict.fromkeys(asins)
+            if self._planned_at.get(asin, -math.inf) < cutoff
+        ]
+        if stale:
+            try:
+                await self.plan(stale)
+            except Exception as e:
+                log.warning(
+                    "Could not plan refresh intervals for %d ASINs: %s", len(stale), e
+                )
+        return {asin: self.ttl(asin) for asin in asins}
+
+    def get_stats(self) -> Dict:
+        """Get the distribution of planned intervals."""
+        intervals = sorted(self._intervals.values())
+        if not intervals:
+            return {"asins": 0}
+        return {
+            "asins": len(intervals),
+            "min_interval_hours": round(intervals[0] / HOUR, 2),
+            "median_interval_hours": round(intervals[len(intervals) // 2] / HOUR, 2),
+            "max_interval_hours": round(intervals[-1] / HOUR, 2),
+        }
+
+
+def simulate_refresh(
+    histories: Dict[str, Tuple[Sequence[int], Sequence[int]]],
+    rule: IntervalRule,
+    start: int,
+    end: int,
+    batch_size: int = 10,
+) -> Dict:
+    """Replay recorded price histories against a refresh interval rule.
+
+    The true price at any moment is the latest recorded price. Each ASIN is
+    first checked at ``start``; after every check ``rule`` sees only what the
+    checks so far observed and picks the next interval.
+
+    Args:
+    ----
+        histories: ASIN -> (timestamps, prices) of the recorded history
+        rule: Interval rule, e.g. ``RefreshPolicy.interval`` or a fixed interval
+        start, end: Replay window (epoch seconds)
+        batch_size: ASINs per GetItems call, for the call estimate
+
+    Returns:
+    -------
+        checks, estimated GetItems calls, true changes, detected changes,
+        missed changes (reverted or superseded before a check) and detection
+        latency percentiles in minutes
+    """
+    checks = 0
+    changes = 0
+    latencies: List[float] = []
+    for timestamps, prices in histories.values():
+        ts = np.asarray(timestamps, dtype=np.int64)
+        price = np.asarray(prices, dtype=np.int64)
+        if not len(ts):
+            continue
+        change_times = ts[1:][np.diff(price) != 0]
+        changes += int(np.count_nonzero((change_times > start) & (change_times <= end)))
+
+        seen_ts: List[int] = []
+        seen_price: List[int] = []
+        t = start
+        while t <= end:
+            index = np.searchsorted(ts, t, side="right") - 1
+            current = int(price[max(index, 0)])
+            checks += 1
+            if seen_price and current != seen_price[-1]:
+                first = change_times[
+                    np.searchsorted(change_times, seen_ts[-1], side="right")
+                ]
+                latencies.append(float(t - first))
+            seen_ts.append(t)
+            seen_price.append(current)
+            t += max(1, int(rule(np.array(seen_ts), np.array(seen_price), t)))
+
+    latencies.sort()
+
+    def percentile(q: float) -> Optional[float]:
+        if not latencies:
+            return None
+        return round(
+            latencies[min(len(latencies) - 1, int(len(latencies) * q))] / 60, 1
+        )
+
+    return {
+        "asins": len(histories),
+        "checks": checks,
+        "calls": math.ceil(checks / batch_size),
+        "changes": changes,
+        "detected": len(latencies),
+        "missed": changes - len(latencies),
+        "latency_mean_minutes": (
+            round(sum(latencies) / len(latencies) / 60, 1) if latencies else None
+        ),
+        "latency_p50_minutes": percentile(0.5),
+        "latency_p95_minutes": percentile(0.95),
+    }
+
+
+def fixed_interval(seconds: float) -> IntervalRule:
+    """Interval rule that always waits ``seconds``."""
+    return lambda timestamps, prices, now: seconds
+
+
+_refresh_policy: Optional[RefreshPolicy] = None
+
+
+def get_refresh_policy() -> RefreshPolicy:
+    """Get the process-wide refresh policy."""
+    global _refresh_policy
+    if _refresh_policy is None:
+        _refresh_policy = RefreshPolicy()
+    return _refresh_policy
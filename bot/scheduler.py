@@ -9,11 +9,9 @@ from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 from sqlmodel import Session, select
 from .cache_service import engine
-from .models import Watch, User, Price
-from .cache_service import get_price
-from .carousel import build_single_card
-from telegram import Bot
+from .models import Watch, User
 from .config import settings
+from .realtime import get_realtime_engine
 
 log = getLogger(__name__)
 
@@ -21,30 +19,50 @@ TZ = ZoneInfo(settings.TIMEZONE)
 
 scheduler = BackgroundScheduler(timezone=TZ)
 
+DIGEST_JOB_ID = "daily_digest"
+REALTIME_JOB_ID = "realtime_engine"
+
 # --- Job helpers -----------------------------------------------------------
 
 
+def schedule_digest() -> None:
+    """Schedule the single daily digest run that covers every daily watch."""
+    if scheduler.get_job(DIGEST_JOB_ID) is not None:
+        return
+    # 09:00 IST default until per-user time is added
+    scheduler.add_job(
+        digest_job,
+        CronTrigger(hour=9, minute=0),
+        id=DIGEST_JOB_ID,
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+    )
+
+
+def schedule_realtime() -> None:
+    """Schedule the single real-time engine tick that serves every real-time watch."""
+    if scheduler.get_job(REALTIME_JOB_ID) is not None:
+        return
+    scheduler.add_job(
+        realtime_job,
+        IntervalTrigger(seconds=settings.REALTIME_TICK_SECONDS),
+        id=REALTIME_JOB_ID,
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+    )
+
+
 def schedule_watch(watch: Watch) -> None:
-    """Attach either a daily-digest or 10-min real-time job for a watch."""
+    """Attach a watch to either the daily digest or the real-time engine."""
     if watch.mode == "daily":
-        # 09:00 IST default until per-user time is added
-        trig = CronTrigger(hour=9, minute=0)
-        scheduler.add_job(
-            digest_job,
-            trig,
-            args=[watch.user_id],
-            id=f"daily:{watch.user_id}",
-            replace_existing=True,
-        )
+        # Daily watches are picked up by the shared digest run
+        schedule_digest()
     else:
-        trig = IntervalTrigger(minutes=10)
-        scheduler.add_job(
-            realtime_job,
-            trig,
-            args=[watch.id],
-            id=f"rt:{watch.id}",
-            replace_existing=True,
-        )
+        if watch.asin:
+            get_realtime_engine().add_watch(watch.id, watch.asin)
+        schedule_realtime()
 
 
 # --- Job functions ---------------------------------------------------------
@@ -53,7 +71,9 @@ def schedule_watch(watch: Watch) -> None:
 def daily_market_analysis() -> None:
     """Perform daily market analysis for all tracked products."""
     try:
+        from .db import dispose_async_engine
         from .market_intelligence import MarketIntelligence
+        from .paapi_transport import close_paapi_transport
         import asyncio
         
         market_intel = MarketIntelligence()
@@ -64,19 +84,30 @@ def daily_market_analysis() -> None:
                 select(Watch.asin).where(Watch.asin.is_not(None)).distinct()
             ).all()
             
-            log.info("Starting daily market analysis for %d products", len(active_asins))
-            
-            # Run async analysis (simplified for now)
-            # In production, this would be more sophisticated
-            for asin in active_asins[:10]:  # Limit to avoid quota issues
-                try:
-                    # This would ideally be run in async context
-                    # For now, just log the analysis request
-                    log.info("Would analyze market trends for ASIN: %s", asin)
-                except Exception as e:
-                    log.error("Failed to analyze ASIN %s: %s", asin, e)
-                    
-            log.info("Daily market analysis completed")
+        log.info("Starting daily market analysis for %d products", len(active_asins))
+
+        async def analyze_all():
+            try:
+                return await market_intel.analyze_price_trends_batch(active_asins, "3months")
+            finally:
+                await close_paapi_transport()
+                await dispose_async_engine()
+
+        # Vectorized over all products; reads stored history only, no PA-API calls
+        results = asyncio.run(analyze_all())
+
+        decreasing = sum(1 for r in results.values() if r["trend"]["direction"] == "decreasing")
+        good_deals = sum(1 for r in results.values() if r["percentiles"]["current_percentile"] <= 25)
+        likely_drops = sum(1 for r in results.values() if r["drop_probability"] > 0.7)
+        log.info(
+            "Daily market analysis completed: %d/%d products analyzed, %d trending down, "
+            "%d at good-deal prices, %d likely to drop",
+            len(results),
+            len(active_asins),
+            decreasing,
+            good_deals,
+            likely_drops,
+        )
             
     except Exception as e:
         log.error("Daily market analysis failed: %s", e)
@@ -112,79 +143,71 @@ def weekly_trend_report() -> None:
         log.error("Weekly trend report generation failed: %s", e)
 
 
-def realtime_job(watch_id: int) -> None:
-    """Fetch latest price every 10 min, skipped 23:00-08:00 IST."""
-    # TEMPORARILY DISABLED to prevent API quota exhaustion during testing
-    log.info("Realtime job temporarily disabled for watch %d", watch_id)
-    return
-    
+def realtime_job() -> None:
+    """Run one real-time engine tick (see bot/realtime.py), skipped 23:00-08:00 IST."""
     now = datetime.now(TZ).time()
     if dtime(23, 0) <= now or now < dtime(8, 0):
         return  # quiet hours
-    with Session(engine) as s:
-        watch = s.get(Watch, watch_id)
-        if not watch or watch.mode != "rt":
-            return
-        price = get_price(watch.asin)
-        # store price history
-        s.add(Price(watch_id=watch.id, asin=watch.asin, price=price, source="paapi"))
-        s.commit()
-        _send_single_card(watch.user_id, watch.keywords, price, watch.asin, watch.id)
-
-
-def digest_job(user_id: int) -> None:
-    """Pick best 5 discounts across a user's watches and send a carousel."""
-    with Session(engine) as s:
-        user = s.exec(select(User).where(User.id == user_id)).one_or_none()
-        if not user:
-            return
-        cards: list[tuple[str, str, str]] = []  # (img, caption, kb)
-        for watch in user.watches:
-            price = get_price(watch.asin)
-            discount_ok = watch.min_discount is None or price <= (
-                100 - watch.min_discount
-            ) / 100 * (watch.max_price or price)
-            if discount_ok:
-                caption, kb = build_single_card(
-                    watch.keywords,
-                    price,
-                    "https://m.media-amazon.com/images/I/81.png",
-                    watch.asin,
-                    watch.id,
-                )
-                cards.append(
-                    ("https://m.media-amazon.com/images/I/81.png", caption, kb)
-                )
-            if len(cards) == 5:
-                break
-        if cards:
-            bot = Bot(token=settings.TELEGRAM_TOKEN)
-            for img, cap, kb in cards:
-                bot.send_photo(chat_id=user_id, photo=img, caption=cap, reply_markup=kb)
-
-
-# ---------------------------------------------------------------------------
-
-
-def _send_single_card(
-    user_id: int, title: str, price: int, asin: str, watch_id: int
-) -> None:
-    from telegram import Bot  # local import to avoid circulars at boot
-
-    bot = Bot(token=settings.TELEGRAM_TOKEN)
-    cap, kb = build_single_card(
-        title, price, "https://m.media-amazon.com/images/I/81.png", asin, watch_id
-    )
-    bot.send_photo(
-        chat_id=user_id,
-        photo="https://m.media-amazon.com/images/I/81.png",
-        caption=cap,
-        reply_markup=kb,
-    )
+    try:
+        from .db import dispose_async_engine
+        from .outbound import close_outbound_dispatcher
+        from .paapi_transport import close_paapi_transport
+        import asyncio
+
+        async def run():
+            try:
+                return await get_realtime_engine().tick()
+            finally:
+                # PA-API connections are bound to this tick's loop
+                await close_paapi_transport()
+                await close_outbound_dispatcher()
+                await dispose_async_engine()
+
+        asyncio.run(run())
 
+    except Exception as e:
+        log.error("Real-time engine tick failed: %s", e)
+
+
+def digest_job() -> None:
+    """Send the daily digest to all users (see bot/digest.py)."""
+    try:
+        from .db import dispose_async_engine
+        from .digest import run_digest
+        from .outbound import close_outbound_dispatcher
+        from .paapi_transport import close_paapi_transport
+        from .scraper import close_scraper_resources
+        import asyncio
+
+        async def run():
+            try:
+                return await run_digest()
+            finally:
+                await close_paapi_transport()
+                await close_outbound_dispatcher()
+                await close_scraper_resources()
+                await dispose_async_engine()
 
-# Start scheduler immediately on module import
-scheduler.start()
+        asyncio.run(run())
+
+    except Exception as e:
+        log.error("Daily digest failed: %s", e)
+
+
+# Start scheduler immediately on module import. With several processes, only
+# the elected leader runs jobs (see bot/leader.py); the others stay paused.
+if settings.SCHEDULER_LEADER_ELECTION or settings.BOT_WORKERS > 1:
+    import atexit
+    from .leader import get_leader_elector
+
+    scheduler.start(paused=True)
+    _elector = get_leader_elector()
+    _elector.start(on_elected=scheduler.resume, on_demoted=scheduler.pause)
+    atexit.register(_elector.stop)
+else:
+    scheduler.start()
+schedule_digest()
+schedule_realtime()
 
 # Initialize enrichment scheduler if enhanced models are enabled
 try:
@@ -1,15 +1,126 @@
-"""Playwright web scraper for fallback price fetching."""
+"""Web scraper for fallback price fetching.
 
+Scrapes run in two tiers. The HTTP tier (see bot/http_scraper.py) fetches
+the page over a keep-alive connection and parses it with lxml; only when that
+fails or Amazon serves a robot check does the page get rendered in headless
+Chromium from the shared browser pool (see bot/browser_pool.py). Both tiers
+use the selectors in bot/page_parser.py.
+
+Per-tier success, block and latency counters are reported on ``/health/ai``.
+"""
+
+import asyncio
+import time
+from collections import deque
 from logging import getLogger
 from pathlib import Path
-
-from playwright.async_api import async_playwright
+from threading import Lock
+from typing import Any, Deque, Dict, List
+from urllib.parse import quote_plus
+
+from .browser_pool import close_browser_pool, get_browser_pool
+from .config import settings
+from .http_scraper import close_http_client, fetch_product_data, fetch_search_results
+from .page_parser import (
+    PRODUCT_READY_SELECTOR,
+    ProductNotFound,
+    ScrapeBlocked,
+    parse_product_page,
+    parse_search_results,
+)
 
 log = getLogger(__name__)
 
+TIERS = ("http", "browser")
+
+
+class ScraperMetrics:
+    """Thread-safe per-tier outcome counters and latency samples."""
+
+    def __init__(self, samples: int = 500):
+        self._lock = Lock()
+        self._counts = {tier: {"success": 0, "blocked": 0, "failure": 0} for tier in TIERS}
+        self._latencies: Dict[str, Deque[float]] = {tier: deque(maxlen=samples) for tier in TIERS}
+        self.fallbacks = 0
+
+    def record(self, tier: str, outcome: str, seconds: float) -> None:
+        """Record one scrape attempt."""
+        with self._lock:
+            self._counts[tier][outcome] += 1
+            self._latencies[tier].append(seconds * 1000)
+
+    def record_fallback(self) -> None:
+        """Record a scrape that had to go to the browser tier."""
+        with self._lock:
+            self.fallbacks += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get counters, success rate and p50/p95 latency per tier."""
+        with self._lock:
+            stats: Dict[str, Any] = {"fallbacks": self.fallbacks}
+            for tier in TIERS:
+                counts = dict(self._counts[tier])
+                attempts = sum(counts.values())
+                latencies = sorted(self._latencies[tier])
+                stats[tier] = {
+                    **counts,
+                    "attempts": attempts,
+                    "success_rate": counts["success"] / attempts if attempts else 0.0,
+                    "p50_ms": latencies[len(latencies) // 2] if latencies else 0.0,
+                    "p95_ms": latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0,
+                }
+            return stats
+
+
+_metrics = ScraperMetrics()
+
+
+def get_scraper_metrics() -> Dict[str, Any]:
+    """Get per-tier scraper metrics."""
+    return _metrics.get_stats()
+
+
+async def close_scraper_resources() -> None:
+    """Close the running loop's HTTP client and browser pool."""
+    await close_http_client()
+    await close_browser_pool()
+
+
+async def _browser_product_data(asin: str) -> dict:
+    url = f"https://www.amazon.in/dp/{asin}"
+    async with get_browser_pool().page() as pooled:
+        page = pooled.page
+        await pooled.goto(url, timeout=60_000, wait_until="domcontentloaded")
+
+        # Wait for product content to load (Amazon uses a lot of dynamic loading)
+        try:
+            await page.wait_for_selector(PRODUCT_READY_SELECTOR, timeout=10_000)
+        except Exception as wait_error:
+            log.warning("Content load timeout for ASIN %s: %s", asin, wait_error)
+
+        html = await page.content()
+
+        # Save HTML for debugging
+        debug_path = Path(f"debug/{asin}.html")
+        debug_path.parent.mkdir(exist_ok=True)
+        debug_path.write_text(html, encoding="utf-8")
+        log.debug("Saved debug HTML to %s", debug_path)
+
+        # Parse while the page is checked out so a captcha recycles its context
+        return await asyncio.to_thread(parse_product_page, html, asin)
+
+
+async def _browser_search(search_query: str, max_results: int) -> List[dict]:
+    search_url = f"https://www.amazon.in/s?k={quote_plus(search_query)}"
+    async with get_browser_pool().page() as pooled:
+        await pooled.goto(search_url, wait_until="domcontentloaded", timeout=30000)
+        await pooled.page.wait_for_load_state("networkidle", timeout=20000)
+        html = await pooled.page.content()
+        return await asyncio.to_thread(parse_search_results, html, max_results)
+
 
 async def scrape_product_data(asin: str) -> dict:
-    """Scrape product data from Amazon page using Playwright.
+    """Scrape product data from the Amazon product page.
 
     Args:
     ----
@@ -24,451 +135,99 @@ async def scrape_product_data(asin: str) -> dict:
         ValueError: If data cannot be extracted
 
     """
-    url = f"https://www.amazon.in/dp/{asin}"
-
+    log.info("Scraping price for ASIN %s", asin)
+
+    if settings.SCRAPER_HTTP_ENABLED:
+        started = time.perf_counter()
+        try:
+            data = await fetch_product_data(asin)
+            _metrics.record("http", "success", time.perf_counter() - started)
+            log.debug("HTTP tier scraped ASIN %s", asin)
+            return data
+        except ProductNotFound:
+            _metrics.record("http", "failure", time.perf_counter() - started)
+            log.warning("Product not found page for ASIN %s", asin)
+            raise
+        except ScrapeBlocked as e:
+            _metrics.record("http", "blocked", time.perf_counter() - started)
+            log.info("HTTP tier blocked for ASIN %s (%s), using browser", asin, e)
+        except Exception as e:
+            _metrics.record("http", "failure", time.perf_counter() - started)
+            log.info("HTTP tier failed for ASIN %s (%s), using browser", asin, e)
+        _metrics.record_fallback()
+
+    started = time.perf_counter()
     try:
-        async with async_playwright() as pw:
-            browser = await pw.chromium.launch(
-                headless=True,
-                args=[
-                    "--no-sandbox",
-                    "--disable-blink-features=AutomationControlled",
-                    "--disable-web-security",
-                    "--disable-features=VizDisplayCompositor",
-                ]
-            )
-            
-            # Prepare headers with optional cookies
-            from bot.config import settings
-            
-            headers = {
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
-                "Accept-Language": "en-IN,en;q=0.9,hi;q=0.8",
-                "Accept-Encoding": "gzip, deflate, br",
-                "DNT": "1",
-                "Connection": "keep-alive",
-                "Upgrade-Insecure-Requests": "1",
-            }
-            
-            # Add cookies if available
-            amazon_cookies = getattr(settings, 'AMAZON_COOKIES', None)
-            if amazon_cookies:
-                headers["Cookie"] = amazon_cookies
-                log.debug("Using Amazon cookies for enhanced access")
-            
-            # Create context with realistic browser settings
-            context = await browser.new_context(
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                viewport={"width": 1920, "height": 1080},
-                locale="en-IN",
-                timezone_id="Asia/Kolkata",
-                permissions=["geolocation"],
-                geolocation={"latitude": 28.6139, "longitude": 77.2090},  # Delhi coordinates
-                extra_http_headers=headers
-            )
-            
-            page = await context.new_page()
-            
-            # Block unnecessary resources to speed up loading
-            await page.route("**/*.{png,jpg,jpeg,gif,svg,css,woff,woff2}", lambda route: route.abort())
-            
-            log.info("Scraping price for ASIN %s from %s", asin, url)
-            
-            # Add random delay and try to bypass bot detection
-            import asyncio
-            await asyncio.sleep(1 + (hash(asin) % 3))  # 1-4 second delay based on ASIN
-            
-            await page.goto(url, timeout=60_000, wait_until="domcontentloaded")
-            
-            # Wait for product content to load (Amazon uses a lot of dynamic loading)
-            try:
-                # Wait for any of the main product selectors to appear
-                await page.wait_for_selector(
-                    "#productTitle, #corePrice_feature_div, .a-price-whole", 
-                    timeout=10_000
-                )
-            except Exception as wait_error:
-                log.warning("Content load timeout for ASIN %s: %s", asin, wait_error)
-
-            # Save HTML for debugging
-            html = await page.content()
-            debug_path = Path(f"debug/{asin}.html")
-            debug_path.parent.mkdir(exist_ok=True)
-            debug_path.write_text(html, encoding="utf-8")
-            log.debug("Saved debug HTML to %s", debug_path)
-
-            # Check for captcha or error pages first
-            if await page.locator("form[action*='validateCaptcha']").count() > 0:
-                log.warning("Captcha detected for ASIN %s", asin)
-                raise ValueError(f"Captcha required for ASIN: {asin}")
-                
-            if await page.locator("text=Looking for something?").count() > 0:
-                log.warning("Product not found page for ASIN %s", asin)
-                raise ValueError(f"Product not found for ASIN: {asin}")
-            
-            # Extract product title with updated selectors
-            title_selectors = [
-                "#productTitle",
-                "h1[data-automation-id='title']",
-                "h1.a-size-large.a-spacing-none.a-color-base",
-                "span#productTitle",
-                "h1 span.a-size-large",
-                ".product-title",
-                "h1.a-size-base-plus",
-                "[data-testid='product-title']",
-            ]
-            
-            title = None
-            for selector in title_selectors:
-                try:
-                    title_element = page.locator(selector).first
-                    if await title_element.count() > 0:
-                        title = await title_element.text_content()
-                        if title and title.strip():
-                            title = title.strip()
-                            log.debug("Found title with selector %s: %s", selector, title[:50])
-                            break
-                except Exception as e:
-                    log.debug("Title selector %s failed: %s", selector, e)
-                    continue
-
-            # Extract product image with updated selectors
-            image_selectors = [
-                "#landingImage",
-                "img[data-old-hires]",
-                ".a-dynamic-image",
-                "#imgBlkFront", 
-                ".a-spacing-small img",
-                "img.a-dynamic-image.a-stretch-horizontal",
-                "div[data-asin] img",
-                ".imageThumbnail img",
-            ]
-            
-            image_url = None
-            for selector in image_selectors:
-                try:
-                    img_element = page.locator(selector).first
-                    if await img_element.count() > 0:
-                        # Try different attributes
-                        for attr in ["data-old-hires", "src", "data-src"]:
-                            image_url = await img_element.get_attribute(attr)
-                            if image_url and image_url.startswith("http"):
-                                log.debug("Found image with selector %s attr %s", selector, attr)
-                                break
-                        if image_url and image_url.startswith("http"):
-                            break
-                except Exception as e:
-                    log.debug("Image selector %s failed: %s", selector, e)
-                    continue
-
-            # Try multiple price selectors (Amazon changes them frequently)
-            price_selectors = [
-                # Current price selectors (2024/2025)
-                "span.a-price.a-text-price.a-size-medium.a-color-base span.a-price-whole",
-                ".a-price.a-text-price .a-price-whole",
-                "#corePrice_feature_div span.a-price-whole",
-                "span[class*='a-price-whole']",
-                ".a-price-whole",
-                
-                # Deal/offer price selectors  
-                "#corePrice_desktop .a-offscreen",
-                ".a-price.a-text-price.a-size-medium.a-color-base .a-offscreen",
-                
-                # Legacy selectors
-                "#priceblock_dealprice",
-                "#priceblock_ourprice", 
-                ".a-price-range .a-price-whole",
-                
-                # Alternative formats
-                "span[aria-label*='₹']",
-                "[data-testid='price-current-price'] .a-price-whole",
-                ".a-price.a-text-normal .a-price-whole",
-            ]
-
-            price_text = None
-            mrp_text = None
-            
-            # Try to find current price
-            for selector in price_selectors:
-                try:
-                    price_elements = page.locator(selector)
-                    count = await price_elements.count()
-                    if count > 0:
-                        for i in range(count):
-                            element = price_elements.nth(i)
-                            text = await element.text_content()
-                            if text and text.strip():
-                                # Clean the text and check if it looks like a price
-                                clean_text = text.strip().replace(",", "").replace("₹", "")
-                                try:
-                                    float(clean_text)
-                                    price_text = text.strip()
-                                    log.debug("Found price with selector %s: %s", selector, price_text)
-                                    break
-                                except ValueError:
-                                    continue
-                        if price_text:
-                            break
-                except Exception as e:
-                    log.debug("Price selector %s failed: %s", selector, e)
-                    continue
-            
-            # Try to find MRP/list price
-            mrp_selectors = [
-                ".a-price.a-text-price .a-offscreen", 
-                "span.a-price.a-text-price.a-size-base .a-offscreen",
-                "span[aria-label*='M.R.P']",
-                ".a-text-strike .a-offscreen",
-                "span.a-price-was .a-offscreen",
-            ]
-            
-            for selector in mrp_selectors:
-                try:
-                    mrp_element = page.locator(selector).first
-                    if await mrp_element.count() > 0:
-                        mrp_text = await mrp_element.text_content()
-                        if mrp_text and mrp_text.strip():
-                            log.debug("Found MRP with selector %s: %s", selector, mrp_text.strip())
-                            break
-                except Exception as e:
-                    log.debug("MRP selector %s failed: %s", selector, e)
-                    continue
-
-            await browser.close()
-
-            # Parse prices if found
-            price = None
-            mrp = None
-            
-            if price_text:
-                try:
-                    # Clean and convert current price
-                    price_clean = price_text.replace(",", "").replace("₹", "").replace("Rs.", "").strip()
-                    price_float = float(price_clean)
-                    price = int(price_float * 100)  # Convert to paise
-                    log.debug("Parsed current price: ₹%.2f", price_float)
-                except (ValueError, TypeError):
-                    log.warning("Could not parse price '%s' for ASIN: %s", price_text, asin)
-            
-            if mrp_text:
-                try:
-                    # Clean and convert MRP
-                    mrp_clean = mrp_text.replace(",", "").replace("₹", "").replace("Rs.", "").replace("M.R.P.:", "").strip()
-                    mrp_float = float(mrp_clean)
-                    mrp = int(mrp_float * 100)  # Convert to paise
-                    log.debug("Parsed MRP: ₹%.2f", mrp_float)
-                except (ValueError, TypeError):
-                    log.warning("Could not parse MRP '%s' for ASIN: %s", mrp_text, asin)
-
-            # Return available data with enhanced information
-            result = {
-                "asin": asin,
-                "title": title or f"Product {asin}",
-                "price": price,
-                "mrp": mrp,
-                "image": image_url or "https://m.media-amazon.com/images/I/81.png",
-                "url": url,
-            }
-            
-            log.info("Scraped data for ASIN %s: title=%s, price=%s, mrp=%s", 
-                    asin, title[:50] if title else None, 
-                    f"₹{price/100:.2f}" if price else None,
-                    f"₹{mrp/100:.2f}" if mrp else None)
-            return result
-
+        data = await _browser_product_data(asin)
+    except ScrapeBlocked:
+        _metrics.record("browser", "blocked", time.perf_counter() - started)
+        log.warning("Captcha detected for ASIN %s", asin)
+        raise
     except Exception as e:
+        _metrics.record("browser", "failure", time.perf_counter() - started)
         log.error("Scraping failed for ASIN %s: %s", asin, e)
         raise
+    _metrics.record("browser", "success", time.perf_counter() - started)
+
+    log.info(
+        "Scraped data for ASIN %s: title=%s, price=%s, mrp=%s",
+        asin,
+        data["title"][:50],
+        f"₹{data['price'] / 100:.2f}" if data["price"] else None,
+        f"₹{data['mrp'] / 100:.2f}" if data["mrp"] else None,
+    )
+    return data
 
 
 async def scrape_amazon_search(search_query: str, max_results: int = 20) -> list[dict]:
-    """Scrape Amazon search results for product data using Playwright.
-    
+    """Scrape Amazon search results for product data.
+
     Args:
     ----
         search_query: Search keywords for Amazon
         max_results: Maximum number of results to return
-        
+
     Returns:
     -------
-        List of dictionaries with title, price, image, asin
-        
+        List of dictionaries with title, price, image, asin (empty on failure)
+
     """
-    # Encode search query for URL
-    from urllib.parse import quote_plus
-    search_url = f"https://www.amazon.in/s?k={quote_plus(search_query)}"
-    
-    try:
-        async with async_playwright() as pw:
-            browser = await pw.chromium.launch(
-                headless=True,
-                args=[
-                    "--no-sandbox",
-                    "--disable-blink-features=AutomationControlled",
-                    "--disable-web-security",
-                    "--disable-features=VizDisplayCompositor",
-                ]
-            )
-            
-            # Prepare headers with optional cookies
-            from bot.config import settings
-            
-            headers = {
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
-                "Accept-Language": "en-IN,en;q=0.9,hi;q=0.8",
-                "Accept-Encoding": "gzip, deflate, br",
-                "DNT": "1",
-                "Connection": "keep-alive",
-                "Upgrade-Insecure-Requests": "1",
-            }
-            
-            # Add cookies if available
-            amazon_cookies = getattr(settings, 'AMAZON_COOKIES', None)
-            if amazon_cookies:
-                headers["Cookie"] = amazon_cookies
-                log.debug("Using Amazon cookies for enhanced search access")
-            
-            # Create context with realistic browser settings
-            context = await browser.new_context(
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                viewport={"width": 1920, "height": 1080},
-                geolocation={"longitude": 77.2090, "latitude": 28.6139},  # Delhi, India
-                permissions=["geolocation"],
-                extra_http_headers=headers,
-            )
-            
-            page = await context.new_page()
-            
-            log.info("Scraping Amazon search results for: %s", search_query)
-            await page.goto(search_url, wait_until="domcontentloaded", timeout=30000)
-            await page.wait_for_load_state("networkidle", timeout=20000)
-            
-            # Check for captcha or bot detection
-            if await page.locator("form[action*='validateCaptcha']").count() > 0:
-                log.warning("Captcha required for search: %s", search_query)
-                await browser.close()
-                return []
-                
-            # Find product containers - various selectors for different layouts
-            product_selectors = [
-                "[data-component-type='s-search-result']",
-                ".s-result-item[data-asin]",
-                ".s-result-item",
-                ".sg-col-inner .s-widget-container",
-            ]
-            
-            products = []
-            for selector in product_selectors:
-                product_elements = page.locator(selector)
-                if await product_elements.count() > 0:
-                    log.debug("Found products with selector: %s", selector)
-                    break
-            else:
-                log.warning("No products found for search: %s", search_query)
-                await browser.close()
-                return []
-            
-            # Extract product data
-            count = min(await product_elements.count(), max_results)
-            log.debug("Processing %d search results", count)
-            
-            for i in range(count):
-                try:
-                    product_elem = product_elements.nth(i)
-                    
-                    # Extract ASIN
-                    asin = await product_elem.get_attribute("data-asin")
-                    if not asin:
-                        continue
-                    
-                    # Extract title
-                    title_selectors = [
-                        "h2 a span",
-                        "h2 span",
-                        ".a-size-medium",
-                        ".a-size-base-plus",
-                        "[data-cy='title-recipe-title']",
-                        "a .a-text-normal",
-                    ]
-                    
-                    title = None
-                    for title_sel in title_selectors:
-                        try:
-                            title_elem = product_elem.locator(title_sel).first
-                            if await title_elem.count() > 0:
-                                title = await title_elem.text_content()
-                                if title and title.strip():
-                                    title = title.strip()
-                                    break
-                        except Exception:
-                            continue
-                    
-                    # Extract price
-                    price_selectors = [
-                        ".a-price-whole",
-                        ".a-price .a-offscreen",
-                        ".a-price-symbol + .a-price-whole",
-                        "[data-cy='price-recipe-price']",
-                        ".a-size-base.a-color-price",
-                    ]
-                    
-                    price = None
-                    for price_sel in price_selectors:
-                        try:
-                            price_elem = product_elem.locator(price_sel).first
-                            if await price_elem.count() > 0:
-                                price_text = await price_elem.text_content()
-                                if price_text:
-                                    # Extract numeric price
-                                    import re
-                                    price_match = re.search(r'[\d,]+(?:\.\d{2})?', price_text.replace('₹', '').replace(',', ''))
-                                    if price_match:
-                                        price_val = float(price_match.group())
-                                        price = int(price_val * 100)  # Convert to paise
-                                        break
-                        except Exception:
-                            continue
-                    
-                    # Extract image
-                    image_selectors = [
-                        "img.s-image",
-                        ".a-dynamic-image",
-                        "img[data-src]",
-                        "img[src]",
-                    ]
-                    
-                    image_url = None
-                    for img_sel in image_selectors:
-                        try:
-                            img_elem = product_elem.locator(img_sel).first
-                            if await img_elem.count() > 0:
-                                image_url = await img_elem.get_attribute("src") or await img_elem.get_attribute("data-src")
-                                if image_url and image_url.startswith("http"):
-                                    break
-                        except Exception:
-                            continue
-                    
-                    if title:  # Only add if we have at least a title
-                        products.append({
-                            "asin": asin,
-                            "title": title,
-                            "price": price,
-                            "image": image_url or "https://m.media-amazon.com/images/I/81.png",
-                        })
-                        
-                except Exception as e:
-                    log.debug("Error processing search result %d: %s", i, e)
-                    continue
-            
-            await browser.close()
-            
+    log.info("Scraping Amazon search results for: %s", search_query)
+
+    if settings.SCRAPER_HTTP_ENABLED:
+        started = time.perf_counter()
+        try:
+            products = await fetch_search_results(search_query, max_results)
+            _metrics.record("http", "success", time.perf_counter() - started)
             log.info("Successfully scraped %d products for search: %s", len(products), search_query)
             return products
-            
+        except ScrapeBlocked as e:
+            _metrics.record("http", "blocked", time.perf_counter() - started)
+            log.info("HTTP tier blocked for search '%s' (%s), using browser", search_query, e)
+        except Exception as e:
+            _metrics.record("http", "failure", time.perf_counter() - started)
+            log.info("HTTP tier failed for search '%s' (%s), using browser", search_query, e)
+        _metrics.record_fallback()
+
+    started = time.perf_counter()
+    try:
+        products = await _browser_search(search_query, max_results)
+    except ScrapeBlocked:
+        _metrics.record("browser", "blocked", time.perf_counter() - started)
+        log.warning("Captcha required for search: %s", search_query)
+        return []
     except Exception as e:
+        _metrics.record("browser", "failure", time.perf_counter() - started)
         log.error("Amazon search scraping failed for '%s': %s", search_query, e)
         return []
 
+    _metrics.record("browser", "success" if products else "failure", time.perf_counter() - started)
+    if not products:
+        log.warning("No products found for search: %s", search_query)
+    else:
+        log.info("Successfully scraped %d products for search: %s", len(products), search_query)
+    return products
+
 
 async def scrape_price(asin: str) -> int:
     """Scrape product price from Amazon page (compatibility function).
@@ -0,0 +1,186 @@
+"""Bounded, normalized cache for PA-API search results.
+
+Search results are cached under a key built from every filter that changes
+the result set (keywords, category, price range, rating/discount filters,
+page, ...), so two budget searches for the same product never share an
+entry. Keywords are normalized (case, token order, duplicates) and prices
+are rounded to three significant rupee digits, which lets "laptop under
+₹49,999" and "Laptop under ₹50,000" hit the same entry.
+
+Memory is bounded: entries expire after a TTL and the least recently used
+entry is evicted once the cache is full. Hit/miss/eviction counters are
+reported on ``/health/ai``.
+"""
+
+import re
+import time
+from collections import OrderedDict
+from logging import getLogger
+from threading import Lock
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from .config import settings
+
+log = getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r"[^\w₹.]+")
+
+
+def normalize_keywords(keywords: Optional[str]) -> str:
+    """Normalize search keywords so equivalent queries share a cache key.
+
+    Lowercases, strips punctuation, drops duplicate tokens and sorts the
+    remaining tokens, e.g. ``"Gaming  Monitor, gaming"`` -> ``"gaming monitor"``.
+    """
+    if not keywords:
+        return ""
+    tokens = {token for token in _TOKEN_PATTERN.split(keywords.lower()) if token}
+    return " ".join(sorted(tokens))
+
+
+def price_bucket(price: Optional[int]) -> Optional[int]:
+    """Round a price in paise to three significant rupee digits.
+
+    ``4999900`` (₹49,999) and ``5000000`` (₹50,000) both map to ``5000000``,
+    while the rounding error stays below 0.5% of the price.
+    """
+    if price is None:
+        return None
+    rupees = round(price / 100)
+    if rupees < 1000:
+        return rupees * 100
+    digits = len(str(rupees)) - 3
+    return round(rupees, -digits) * 100
+
+
+def make_search_key(namespace: str, keywords: Optional[str], **filters: Any) -> Tuple:
+    """Build a normalized cache key for a search.
+
+    Args:
+    ----
+        namespace: Name of the caller's result format (results are not interchangeable)
+        keywords: Search keywords
+        **filters: Every other parameter that affects the results. ``min_price``
+                   and ``max_price`` (paise) are bucketed, string values are
+                   lowercased, ``None`` values are dropped.
+
+    Returns:
+    -------
+        Hashable cache key
+    """
+    normalized = []
+    for name in sorted(filters):
+        value = filters[name]
+        if value is None:
+            continue
+        if name in ("min_price", "max_price"):
+            value = price_bucket(value)
+        elif isinstance(value, str):
+            value = value.strip().lower()
+        normalized.append((name, value))
+    return (namespace, normalize_keywords(keywords), tuple(normalized))
+
+
+class SearchResultCache:
+    """Thread-safe LRU cache with per-entry TTL."""
+
+    def __init__(
+        self, max_entries: Optional[int] = None, ttl_seconds: Optional[float] = None
+    ):
+        """Initialize the cache.
+
+        Args:
+        ----
+            max_entries: Maximum number of cached searches (defaults to SEARCH_CACHE_MAX_ENTRIES)
+            ttl_seconds: Lifetime of an entry (defaults to SEARCH_CACHE_TTL_SECONDS)
+        """
+        self.max_entries = (
+            max_entries
+            if max_entries is not None
+            else settings.SEARCH_CACHE_MAX_ENTRIES
+        )
+        self.ttl_seconds = (
+            ttl_seconds
+            if ttl_seconds is not None
+            else settings.SEARCH_CACHE_TTL_SECONDS
+        )
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for ``key``, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store ``value`` under ``key``, evicting the least recently used entries if full."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def purge_expired(self) -> int:
+        """Drop all expired entries and return how many were removed."""
+        with self._lock:
+            now = time.monotonic()
+            expired = [
+                key
+                for key, (expires_at, _) in self._entries.items()
+                if expires_at <= now
+            ]
+            for key in expired:
+                del self._entries[key]
+            self.expirations += len(expired)
+            return len(expired)
+
+    def clear(self) -> None:
+        """Remove all entries (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache counters for monitoring."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+_search_cache: Optional[SearchResultCache] = None
+
+
+def get_search_cache() -> SearchResultCache:
+    """Get the process-wide search result cache."""
+    global _search_cache
+    if _search_cache is None:
+        _search_cache = SearchResultCache()
+    return _search_cache
@@ -2,18 +2,24 @@
 
 from datetime import datetime, timedelta
 from logging import getLogger
-from typing import Dict, List
+from typing import Dict, List, Optional, Sequence, Tuple
 
+import numpy as np
+from sqlalchemy import insert
 from sqlmodel import Session, select
 from telegram import Bot, InlineKeyboardButton, InlineKeyboardMarkup
 
 from .cache_service import engine
 from .carousel import build_single_card
-from .config import settings
+from .db import get_async_session
+from .deal_context import DealInputs, load_deal_inputs
 from .enhanced_models import DealAlert
 from .market_intelligence import MarketIntelligence
 from .models import Watch
+from .outbound import Priority, get_outbound_dispatcher, text_message
 from .predictive_ai import predictive_engine
+from .price_analytics import PriceMatrix, price_metrics, trend_metrics
+from .price_series import to_epoch
 
 log = getLogger(__name__)
 
@@ -24,7 +30,8 @@ class SmartAlertEngine:
     def __init__(self):
         """Initialize smart alert engine."""
         self.market_intel = MarketIntelligence()
-        self.bot = Bot(token=settings.TELEGRAM_TOKEN)
+        # Alerts go through the outbound dispatcher's pooled bot unless one is set
+        self.bot: Optional[Bot] = None
 
     async def generate_enhanced_deal_alert(
         self, watch: Watch, current_data: Dict
@@ -63,42 +70,86 @@ class SmartAlertEngine:
                 watch.asin, current_data["price"]
             )
 
-            # Generate appropriate card based on quality
-            if deal_quality["score"] >= 80:
-                # High quality deal - use enhanced card
-                caption, keyboard = await self._build_premium_deal_card(
-                    watch, current_data, deal_quality, urgency, price_context
-                )
-            elif deal_quality["score"] >= 60:
-                # Good quality deal - use enhanced card with moderate emphasis
-                caption, keyboard = await self._build_good_deal_card(
-                    watch, current_data, deal_quality, urgency, price_context
-                )
-            else:
-                # Regular deal - use existing card with quality info
-                caption, keyboard = await self._build_standard_deal_card(
-                    watch, current_data, deal_quality, urgency
-                )
+            caption, keyboard = await self._build_deal_card(
+                watch, current_data, deal_quality, urgency, price_context
+            )
 
             # Store alert in database for analytics
             await self._store_deal_alert(watch, current_data, deal_quality)
 
-            return {
-                "caption": caption,
-                "keyboard": keyboard,
-                "quality_score": deal_quality["score"],
-                "quality_category": deal_quality.get("quality", "unknown"),
-                "urgency": urgency,
-                "price_context": price_context,
-                "recommendations": deal_quality.get("recommendations", []),
-                "ai_prediction": deal_prediction,
-            }
+            return self._alert_result(
+                caption, keyboard, deal_quality, urgency, price_context, deal_prediction
+            )
 
         except Exception as e:
             log.error("Failed to generate enhanced deal alert: %s", e)
             # Fallback to basic alert
             return await self._generate_fallback_alert(watch, current_data)
 
+    async def generate_enhanced_deal_alerts(
+        self, items: Sequence[Tuple[Watch, Dict]]
+    ) -> List[Dict]:
+        """Generate enhanced deal alerts for many watches in one pass.
+
+        Product, offer, review, alert and price history data for all ASINs is
+        loaded with a few set-based queries (see ``deal_context``), then
+        quality, AI prediction, urgency and price context are computed
+        without further database access. The alerts are stored in a single
+        commit.
+
+        Args:
+        ----
+            items: (watch, current_data) pairs, as for ``generate_enhanced_deal_alert``
+
+        Returns:
+        -------
+            One alert dict per item, in order (fallback alerts for items that failed)
+        """
+        if not items:
+            return []
+
+        inputs = await load_deal_inputs([watch.asin for watch, _ in items])
+        now = datetime.utcnow()
+        contexts = self._price_contexts(
+            [(inputs[watch.asin], current_data["price"]) for watch, current_data in items], now
+        )
+
+        results = []
+        alerts = []
+        for (watch, current_data), price_context in zip(items, contexts):
+            try:
+                asin_inputs = inputs[watch.asin]
+                deal_quality = await self.market_intel.calculate_deal_quality_from_inputs(
+                    asin_inputs, current_data["price"]
+                )
+                deal_prediction = predictive_engine.predict_deal_success_from_inputs(
+                    asin_inputs, current_data["price"]
+                )
+                base_urgency = self._urgency_level(
+                    deal_quality.get("score", 0),
+                    current_data,
+                    asin_inputs.last_alert_price(now - timedelta(days=7)),
+                )
+                urgency = self._adjust_urgency_for_prediction(base_urgency, deal_prediction)
+
+                caption, keyboard = await self._build_deal_card(
+                    watch, current_data, deal_quality, urgency, price_context
+                )
+                alerts.append(self._deal_alert_row(watch, current_data, deal_quality))
+                results.append(
+                    self._alert_result(
+                        caption, keyboard, deal_quality, urgency, price_context, deal_prediction
+                    )
+                )
+
+            except Exception as e:
+                log.error("Failed to generate enhanced deal alert for watch %s: %s", watch.id, e)
+                results.append(await self._generate_fallback_alert(watch, current_data))
+
+        await self._store_deal_alerts(alerts)
+        log.info("Generated %d enhanced deal alerts for %d products", len(results), len(inputs))
+        return results
+
     async def generate_market_insight_notification(
         self, user_id: int, insight_type: str, data: Dict
     ) -> Dict:
@@ -177,11 +228,11 @@ class SmartAlertEngine:
             keyboard = InlineKeyboardMarkup(keyboard_buttons)
 
             # Send notification
-            await self.bot.send_message(
-                chat_id=user_id,
-                text=caption,
-                reply_markup=keyboard,
-                parse_mode="Markdown",
+            await get_outbound_dispatcher().send(
+                user_id,
+                [text_message(caption, keyboard, parse_mode="Markdown")],
+                Priority.ALERT,
+                bot=self.bot,
             )
 
             return True
@@ -250,11 +301,11 @@ class SmartAlertEngine:
                 ]
             )
 
-            await self.bot.send_message(
-                chat_id=user_id,
-                text=caption,
-                reply_markup=keyboard,
-                parse_mode="Markdown",
+            await get_outbound_dispatcher().send(
+                user_id,
+                [text_message(caption, keyboard, parse_mode="Markdown")],
+                Priority.ALERT,
+                bot=self.bot,
             )
 
             return True
@@ -272,41 +323,69 @@ class SmartAlertEngine:
         try:
             score = deal_quality.get("score", 0)
 
-            # Check stock availability
-            stock_urgent = "stock" in current_data.get("availability", "").lower()
-
-            # Check if price just dropped significantly
-            price_drop_urgent = False
-            with Session(engine) as session:
-                # Get recent price history
-                recent_prices = session.exec(
-                    select(DealAlert)
-                    .where(
-                        DealAlert.asin == watch.asin,
-                        DealAlert.sent_at >= datetime.utcnow() - timedelta(days=7),
+            async with get_async_session() as session:
+                # Get the most recent alert price for this product
+                last_alert = (
+                    await session.exec(
+                        select(DealAlert)
+                        .where(
+                            DealAlert.asin == watch.asin,
+                            DealAlert.sent_at >= datetime.utcnow() - timedelta(days=7),
+                        )
+                        .order_by(DealAlert.sent_at.desc())
+                        .limit(1)
                     )
-                    .order_by(DealAlert.sent_at.desc())
-                ).all()
-
-                if recent_prices and len(recent_prices) > 0:
-                    last_price = recent_prices[0].current_price
-                    if current_data["price"] < last_price * 0.9:  # 10% drop
-                        price_drop_urgent = True
-
-            # Determine urgency
-            if score >= 90 and (stock_urgent or price_drop_urgent):
-                return "critical"
-            elif score >= 80:
-                return "high"
-            elif score >= 60:
-                return "medium"
-            else:
-                return "low"
+                ).first()
+
+            return self._urgency_level(
+                score, current_data, last_alert.current_price if last_alert else None
+            )
 
         except Exception as e:
             log.error("Failed to calculate urgency: %s", e)
             return "low"
 
+    @staticmethod
+    def _urgency_level(score: float, current_data: Dict, last_alert_price: Optional[int]) -> str:
+        """Map deal score, stock state and the last alerted price to an urgency level."""
+        # Check stock availability
+        stock_urgent = "stock" in current_data.get("availability", "").lower()
+
+        # Check if price just dropped significantly
+        price_drop_urgent = bool(
+            last_alert_price and current_data["price"] < last_alert_price * 0.9  # 10% drop
+        )
+
+        # Determine urgency
+        if score >= 90 and (stock_urgent or price_drop_urgent):
+            return "critical"
+        elif score >= 80:
+            return "high"
+        elif score >= 60:
+            return "medium"
+        else:
+            return "low"
+
+    @staticmethod
+    def _adjust_urgency_for_prediction(base_urgency: str, deal_prediction: Dict) -> str:
+        """Raise or lower urgency one step based on the predicted deal success."""
+        success_probability = deal_prediction.get("success_probability", 0.5)
+
+        if success_probability >= 0.8:
+            # AI predicts high success - increase urgency
+            if base_urgency == "medium":
+                return "high"
+            elif base_urgency == "low":
+                return "medium"
+        elif success_probability <= 0.3:
+            # AI predicts poor success - decrease urgency
+            if base_urgency == "high":
+                return "medium"
+            elif base_urgency == "medium":
+                return "low"
+
+        return base_urgency
+
     async def _get_price_context(self, asin: str, current_price: int) -> Dict:
         """Get price context for the alert."""
         try:
@@ -317,34 +396,138 @@ class SmartAlertEngine:
                 return {"context": "No price history available"}
 
             metrics = trends.get("price_metrics", {})
-
-            context = {}
-
-            # Compare to historical prices
-            min_price = metrics.get("min_price", current_price)
-            max_price = metrics.get("max_price", current_price)
-            avg_price = metrics.get("average_price", current_price)
-
-            if current_price <= min_price * 1.05:  # Within 5% of historical minimum
-                context["price_level"] = "historical_low"
-            elif current_price <= avg_price * 0.9:  # 10% below average
-                context["price_level"] = "below_average"
-            elif current_price >= max_price * 0.95:  # Within 5% of historical maximum
-                context["price_level"] = "historical_high"
-            else:
-                context["price_level"] = "average"
-
-            # Add trend information
-            trend_analysis = trends.get("trend_analysis", {})
-            context["trend"] = trend_analysis.get("direction", "stable")
-            context["volatility"] = metrics.get("volatility_percentage", 0)
-
-            return context
+            return self._price_context_from_metrics(
+                current_price,
+                metrics.get("min_price", current_price),
+                metrics.get("max_price", current_price),
+                metrics.get("average_price", current_price),
+                trends.get("trend_analysis", {}).get("direction", "stable"),
+                metrics.get("volatility_percentage", 0),
+            )
 
         except Exception as e:
             log.error("Failed to get price context: %s", e)
             return {"context": "Unable to analyze price context"}
 
+    @staticmethod
+    def _price_context_from_metrics(
+        current_price: int,
+        min_price: float,
+        max_price: float,
+        avg_price: float,
+        trend: str,
+        volatility: float,
+    ) -> Dict:
+        """Place the current price relative to the last month's prices."""
+        context = {}
+
+        # Compare to historical prices
+        if current_price <= min_price * 1.05:  # Within 5% of historical minimum
+            context["price_level"] = "historical_low"
+        elif current_price <= avg_price * 0.9:  # 10% below average
+            context["price_level"] = "below_average"
+        elif current_price >= max_price * 0.95:  # Within 5% of historical maximum
+            context["price_level"] = "historical_high"
+        else:
+            context["price_level"] = "average"
+
+        # Add trend information
+        context["trend"] = trend
+        context["volatility"] = volatility
+
+        return context
+
+    def _price_contexts(
+        self, requests: Sequence[Tuple[DealInputs, int]], now: datetime, chunk_size: int = 1000
+    ) -> List[Dict]:
+        """Price context for many (inputs, current price) pairs, vectorized over ASINs.
+
+        Equivalent to ``_get_price_context`` (one month of history) per pair.
+        """
+        since = now - timedelta(days=30)
+        contexts: List[Dict] = []
+        for start in range(0, len(requests), chunk_size):
+            chunk = requests[start : start + chunk_size]
+            windows = []
+            for inputs, _ in chunk:
+                first = np.searchsorted(inputs.history.timestamps, to_epoch(since), side="left")
+                windows.append((inputs.history.timestamps[first:], inputs.history.prices[first:]))
+
+            matrix = PriceMatrix.from_series(windows)
+            metrics = price_metrics(matrix)
+            trend = trend_metrics(matrix)
+
+            for index, (inputs, current_price) in enumerate(chunk):
+                if not matrix.counts[index]:
+                    contexts.append({"context": "No price history available"})
+                    continue
+                if inputs.enhanced_history:
+                    direction = str(trend["direction"][index])
+                    volatility = float(metrics["volatility_percentage"][index])
+                else:
+                    # Basic price history reports no trend analysis or volatility
+                    direction, volatility = "stable", 0
+                try:
+                    contexts.append(
+                        self._price_context_from_metrics(
+                            current_price,
+                            float(metrics["min"][index]),
+                            float(metrics["max"][index]),
+                            float(metrics["mean"][index]),
+                            direction,
+                            volatility,
+                        )
+                    )
+                except Exception as e:
+                    log.error("Failed to get price context: %s", e)
+                    contexts.append({"context": "Unable to analyze price context"})
+        return contexts
+
+    async def _build_deal_card(
+        self,
+        watch: Watch,
+        current_data: Dict,
+        deal_quality: Dict,
+        urgency: str,
+        price_context: Dict,
+    ) -> tuple:
+        """Build the deal card matching the deal quality."""
+        if deal_quality["score"] >= 80:
+            # High quality deal - use enhanced card
+            return await self._build_premium_deal_card(
+                watch, current_data, deal_quality, urgency, price_context
+            )
+        elif deal_quality["score"] >= 60:
+            # Good quality deal - use enhanced card with moderate emphasis
+            return await self._build_good_deal_card(
+                watch, current_data, deal_quality, urgency, price_context
+            )
+        # Regular deal - use existing card with quality info
+        return await self._build_standard_deal_card(
+            watch, current_data, deal_quality, urgency
+        )
+
+    @staticmethod
+    def _alert_result(
+        caption: str,
+        keyboard,
+        deal_quality: Dict,
+        urgency: str,
+        price_context: Dict,
+        deal_prediction: Dict,
+    ) -> Dict:
+        """Assemble the enhanced alert returned to callers."""
+        return {
+            "caption": caption,
+            "keyboard": keyboard,
+            "quality_score": deal_quality["score"],
+            "quality_category": deal_quality.get("quality", "unknown"),
+            "urgency": urgency,
+            "price_context": price_context,
+            "recommendations": deal_quality.get("recommendations", []),
+            "ai_prediction": deal_prediction,
+        }
+
     async def _build_premium_deal_card(
         self,
         watch: Watch,
@@ -501,26 +684,45 @@ class SmartAlertEngine:
                 watch.id,
             )
 
+    @staticmethod
+    def _deal_alert_row(watch: Watch, current_data: Dict, deal_quality: Dict) -> DealAlert:
+        """Build the analytics record for a generated alert."""
+        return DealAlert(
+            watch_id=watch.id,
+            asin=watch.asin,
+            alert_type="deal_quality",
+            current_price=current_data["price"],
+            deal_quality_score=deal_quality.get("score", 0),
+            discount_percentage=current_data.get("savings_percentage"),
+        )
+
     async def _store_deal_alert(
         self, watch: Watch, current_data: Dict, deal_quality: Dict
     ) -> None:
         """Store deal alert in database for analytics."""
         try:
-            with Session(engine) as session:
-                alert = DealAlert(
-                    watch_id=watch.id,
-                    asin=watch.asin,
-                    alert_type="deal_quality",
-                    current_price=current_data["price"],
-                    deal_quality_score=deal_quality.get("score", 0),
-                    discount_percentage=current_data.get("savings_percentage"),
-                )
-                session.add(alert)
-                session.commit()
+            async with get_async_session() as session:
+                session.add(self._deal_alert_row(watch, current_data, deal_quality))
+                await session.commit()
 
         except Exception as e:
             log.error("Failed to store deal alert: %s", e)
 
+    async def _store_deal_alerts(self, alerts: List[DealAlert]) -> None:
+        """Store deal alerts in database for analytics, in one commit."""
+        if not alerts:
+            return
+        try:
+            async with get_async_session() as session:
+                # Core executemany: the ORM would insert row by row to fetch ids
+                await session.execute(
+                    insert(DealAlert), [alert.model_dump(exclude={"id"}) for alert in alerts]
+                )
+                await session.commit()
+
+        except Exception as e:
+            log.error("Failed to store deal alerts: %s", e)
+
     async def _generate_fallback_alert(self, watch: Watch, current_data: Dict) -> Dict:
         """Generate fallback alert if enhanced alert fails."""
         try:
@@ -745,25 +947,8 @@ class UserPreferenceManager:
         """Calculate alert urgency enhanced with AI predictions."""
         try:
             base_urgency = await self._calculate_urgency(deal_quality, current_data, watch)
-            
-            # Enhance with AI prediction
-            success_probability = deal_prediction.get("success_probability", 0.5)
-            
-            if success_probability >= 0.8:
-                # AI predicts high success - increase urgency
-                if base_urgency == "medium":
-                    return "high"
-                elif base_urgency == "low":
-                    return "medium"
-            elif success_probability <= 0.3:
-                # AI predicts poor success - decrease urgency
-                if base_urgency == "high":
-                    return "medium"
-                elif base_urgency == "medium":
-                    return "low"
-            
-            return base_urgency
-            
+            return SmartAlertEngine._adjust_urgency_for_prediction(base_urgency, deal_prediction)
+
         except Exception as e:
             log.error("Error calculating AI-enhanced urgency: %s", e)
             return "medium"
@@ -2,10 +2,9 @@
 
 from __future__ import annotations
 
-import asyncio
 import logging
 import re
-import time
+from collections.abc import Mapping
 from typing import Optional, List, Dict, Any
 
 from sqlmodel import Session, select
@@ -16,16 +15,19 @@ from telegram.ext import ContextTypes
 from .cache_service import engine, get_price, get_price_async
 from .carousel import build_single_card, build_single_card_with_alternatives
 from .models import User, Watch
+from .outbound import (
+    card_message,
+    carousel_messages,
+    combined_text_messages,
+    get_outbound_dispatcher,
+    text_message,
+)
 from .paapi_factory import get_item_detailed, search_items_advanced
 from .paapi_health import is_in_cooldown, set_rate_limit_cooldown
+from .search_cache import get_search_cache, make_search_key
 from .ui_helpers import build_brand_buttons, build_discount_buttons, build_price_buttons, build_mode_buttons
 from .watch_parser import parse_watch, validate_watch_data
 
-# Enhanced cache to completely eliminate duplicate API calls during watch creation
-_search_cache = {}
-_cache_ttl = 300  # Cache results for 5 minutes
-_active_searches = {}  # Track ongoing searches to prevent duplicates
-
 log = logging.getLogger(__name__)
 
 # Common brand list for buttons (fallback)
@@ -58,50 +60,27 @@ async def _cached_search_items_advanced(keywords: str, item_count: int = 30, pri
     Returns:
         List of search results or None if error
     """
-    cache_key = f"{keywords}_{item_count}_{priority}"
-    current_time = time.time()
+    # Priority does not change the results, so it is not part of the key
+    search_cache = get_search_cache()
+    cache_key = make_search_key(
+        "watch_flow_search", keywords, item_count=item_count, min_price=min_price, max_price=max_price
+    )
 
     # Check cache first
-    if cache_key in _search_cache:
-        cached_data, cache_time = _search_cache[cache_key]
-        if current_time - cache_time < _cache_ttl:
-            log.debug("Cache hit for search: %s", keywords)
-            return cached_data
-        else:
-            # Remove expired cache entry
-            del _search_cache[cache_key]
-
-    # Check if same search is already in progress
-    if cache_key in _active_searches:
-        log.debug("Search already in progress, waiting: %s", keywords)
-        try:
-            # Wait for the ongoing search with timeout
-            await asyncio.wait_for(_active_searches[cache_key], timeout=30.0)
-            # Check cache again after the wait
-            if cache_key in _search_cache:
-                cached_data, _ = _search_cache[cache_key]
-                return cached_data
-        except asyncio.TimeoutError:
-            log.warning("Timeout waiting for ongoing search: %s", keywords)
-        except Exception as e:
-            log.warning("Error waiting for ongoing search: %s", e)
-        finally:
-            _active_searches.pop(cache_key, None)
-
-    # Start new search
-    search_future = asyncio.create_task(_perform_search(keywords, item_count, priority, min_price, max_price))
-    _active_searches[cache_key] = search_future
+    cached_data = search_cache.get(cache_key)
+    if cached_data is not None:
+        log.debug("Cache hit for search: %s", keywords)
+        return cached_data
 
+    # Identical searches already in flight are coalesced by paapi_factory
     try:
-        result = await search_future
+        result = await _perform_search(keywords, item_count, priority, min_price, max_price)
         # Cache the result
-        _search_cache[cache_key] = (result, current_time)
+        search_cache.set(cache_key, result)
         return result
     except Exception as e:
         log.error("Search failed for '%s': %s", keywords, e)
         return None
-    finally:
-        _active_searches.pop(cache_key, None)
 
 
 async def _perform_search(keywords: str, item_count: int, priority: str, min_price: Optional[int] = None, max_price: Optional[int] = None):
@@ -517,14 +496,12 @@ async def _finalize_watch(
                                 from .paapi_ai_bridge import is_ai_analysis_enabled
                                 if is_ai_analysis_enabled():
                                     # Transform existing results to AI format without additional API calls
-                                    from .paapi_ai_bridge import transform_paapi_to_ai_format, create_mock_paapi_item_from_result
+                                    from .paapi_ai_bridge import ai_format_from_result
                                     
                                     ai_enhanced_results = []
                                     for result in search_results[:10]:  # Process top 10 products for AI enhancement
                                         try:
-                                            mock_item = create_mock_paapi_item_from_result(result)
-                                            ai_product = await transform_paapi_to_ai_format(mock_item)
-                                            ai_enhanced_results.append(ai_product)
+                                            ai_enhanced_results.append(ai_format_from_result(result))
                                         except Exception as e:
                                             log.warning(f"AI enhancement failed for {result.get('asin', 'unknown')}: {e}")
                                             ai_enhanced_results.append(result)  # Use original
@@ -714,7 +691,7 @@ async def smart_product_selection_with_ai(
                 log.info(f"DEBUG: smart_product_selection_with_ai returning multi_card with {len(result['products'])} products")
                 first_prod = result['products'][0]
                 log.info(f"DEBUG: First product type: {type(first_prod)}")
-                log.info(f"DEBUG: First product keys: {list(first_prod.keys()) if isinstance(first_prod, dict) else 'Not a dict'}")
+                log.info(f"DEBUG: First product keys: {list(first_prod.keys()) if isinstance(first_prod, Mapping) else 'Not a dict'}")
 
             return result
 
@@ -762,6 +739,57 @@ async def smart_product_selection_with_ai(
             }
 
 
+async def _send_product_cards(chat, cards: List[Dict]) -> None:
+    """Send product cards as one carousel.
+
+    If the media group is rejected (e.g. an image Telegram can't fetch), the
+    cards are sent as one combined text message instead. Without a carousel
+    each card is sent on its own, and a card whose photo fails is sent as text.
+    """
+    if not cards:
+        return
+    dispatcher = get_outbound_dispatcher()
+    messages = carousel_messages(cards)
+    if messages[0].method == "send_media_group":
+        try:
+            await dispatcher.send(chat, messages[:1])
+        except Exception as e:
+            log.warning(f"Carousel media group failed, sending the cards as text: {e}")
+            try:
+                await dispatcher.send(chat, combined_text_messages(cards))
+            except Exception as fallback_error:
+                log.error(f"Fallback also failed: {fallback_error}")
+            return
+        else:
+            for message in messages[1:]:
+                try:
+                    await dispatcher.send(chat, [message])
+                except Exception as e:
+                    log.error(f"Failed to send carousel message: {e}")
+            return
+
+    for i, card in enumerate(cards):
+        try:
+            log.info(f"Sending card {i+1}: image_url={(card.get('image') or '')[:100]}...")
+            await dispatcher.send(chat, [card_message(card)])
+        except Exception as card_error:
+            log.error(f"Failed to send card {i+1}: {card_error}")
+            # Try to send text-only version
+            try:
+                await dispatcher.send(
+                    chat,
+                    [
+                        text_message(
+                            f"Card {i+1} (image failed to load):\n\n{card['caption']}",
+                            card.get("keyboard"),
+                            parse_mode="Markdown",
+                        )
+                    ],
+                )
+            except Exception as fallback_error:
+                log.error(f"Fallback also failed: {fallback_error}")
+
+
 async def send_multi_card_experience(
     update: Update, 
     context: ContextTypes.DEFAULT_TYPE, 
@@ -861,63 +889,27 @@ async def send_multi_card_experience(
         
         # Send AI introduction message
         ai_message = selection_result.get("ai_message", "🤖 AI found multiple great options!")
-        await update.effective_chat.send_message(
-            text=ai_message,
-            parse_mode="Markdown"
-        )
-        
-        # CRITICAL DEBUG: Check carousel_cards structure right before loop
-        log.info(f"DEBUG: About to iterate carousel_cards - length: {len(carousel_cards)}")
+        chat = update.effective_chat
+        dispatcher = get_outbound_dispatcher()
+        await dispatcher.send(chat, [text_message(ai_message, parse_mode="Markdown")])
+
+        # CRITICAL FIX: Validate card structure before accessing
+        valid_cards = []
         for i, card in enumerate(carousel_cards):
-            log.info(f"DEBUG: Processing card {i} - type: {type(card)}")
             if not isinstance(card, dict):
-                log.error(f"CRITICAL: Card {i} is not a dict: type={type(card)}, content={card}")
-                continue  # Skip corrupted cards
-                
-        # Send product cards
-        for i, card in enumerate(carousel_cards):
-            try:
-                # CRITICAL FIX: Validate card structure before accessing
-                if not isinstance(card, dict):
-                    log.error(f"CRITICAL: Skipping corrupted card {i}: type={type(card)}")
-                    continue
-                    
-                if card.get("type") == "product_card":
-                    image_url = card.get("image", "")
-                    log.info(f"Sending card {i+1}: image_url={image_url[:100]}...")
-
-                    if image_url and image_url.startswith("http"):
-                        await update.effective_chat.send_photo(
-                            photo=image_url,
-                            caption=card["caption"],
-                            reply_markup=card.get("keyboard"),
-                            parse_mode="Markdown"
-                        )
-                    else:
-                        log.warning(f"No valid image URL for card {i+1}, sending text only")
-                        await update.effective_chat.send_message(
-                            text=card["caption"],
-                            reply_markup=card.get("keyboard"),
-                            parse_mode="Markdown"
-                        )
-                elif card.get("type") == "summary_card":
-                    await update.effective_chat.send_message(
-                        text=card["caption"],
-                        parse_mode="Markdown"
-                    )
-            except Exception as card_error:
-                log.error(f"Failed to send card {i+1}: {card_error}")
-                # Try to send text-only version
+                log.error(f"CRITICAL: Skipping corrupted card {i}: type={type(card)}, content={card}")
+                continue
+            valid_cards.append(card)
+
+        # Product cards go out as one media group; summary cards follow as text
+        await _send_product_cards(chat, [card for card in valid_cards if card.get("type") == "product_card"])
+        for card in valid_cards:
+            if card.get("type") == "summary_card":
                 try:
-                    await update.effective_chat.send_message(
-                        text=f"Card {i+1} (image failed to load):\n\n{card['caption']}",
-                        reply_markup=card.get("keyboard"),
-                        parse_mode="Markdown"
-                    )
-                except Exception as fallback_error:
-                    log.error(f"Fallback also failed: {fallback_error}")
-                    continue
-        
+                    await dispatcher.send(chat, [text_message(card["caption"], parse_mode="Markdown")])
+                except Exception as card_error:
+                    log.error(f"Failed to send summary card: {card_error}")
+
         # Log multi-card experience
         from .ai_performance_monitor import log_ai_selection
         log_ai_selection(
@@ -1107,29 +1099,13 @@ Selected based on customer ratings and popularity.
 
 ✅ **Watch created successfully!** You'll get alerts when the price drops or deals become available."""
         
-        # Send the message and card
-        await update.effective_chat.send_message(
-            text=ai_message,
-            parse_mode="Markdown"
+        # Send the message and card (as text with the keyboard if there is no image)
+        card = {"caption": caption, "keyboard": keyboard, "image": (selected_product.get("image") or "").strip()}
+        await get_outbound_dispatcher().send(
+            update.effective_chat,
+            [text_message(ai_message, parse_mode="Markdown"), card_message(card)],
         )
 
-        # Only send photo if we have a valid image URL
-        image_url = selected_product.get("image", "")
-        if image_url and image_url.strip():
-            await update.effective_chat.send_photo(
-                photo=image_url,
-                caption=caption,
-                reply_markup=keyboard,
-                parse_mode="Markdown"
-            )
-        else:
-            # Fallback: send as text message with keyboard if no image
-            await update.effective_chat.send_message(
-                text=caption,
-                reply_markup=keyboard,
-                parse_mode="Markdown"
-            )
-
         # Send refinement options
         await send_search_refinement_options(update, context, watch_data)
         
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Benchmark PA-API response decoding on recorded responses.
+
+Decodes the recorded SearchItems and GetItems bodies in tests/fixtures/paapi/
+with the SDK path the bot used before (``ApiClient.deserialize`` into model
+objects, then ``transform_paapi_to_ai_format`` over them) and with the
+single-pass decoder (bot/paapi_decoder.py) producing ``ProductRecord``s and
+the same AI format. The SDK numbers are a lower bound for the old chain: the
+intermediate dict and mock-object steps that used to sit between the two are
+not included.
+
+It also reports the memory that one response's products took on top of the
+records when the bridge still built an AI-format dict per product; the
+bridge now returns the records themselves.
+
+Usage:
+    python scripts/benchmark_paapi_decoding.py [--iterations 2000]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from paapi5_python_sdk.api_client import ApiClient  # noqa: E402
+
+from bot.paapi_ai_bridge import transform_paapi_to_ai_format  # noqa: E402
+from bot.paapi_decoder import (
+    decode_get_items_response,
+    decode_search_response,
+)  # noqa: E402
+
+FIXTURES = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "paapi"
+RESPONSES = {
+    "SearchItems": (
+        "search_items_gaming_monitor.json",
+        "SearchItemsResponse",
+        "search_result",
+    ),
+    "GetItems": ("get_items_monitors.json", "GetItemsResponse", "items_result"),
+}
+
+
+def sdk_decode(
+    loop, api_client: ApiClient, body: bytes, response_type: str, result_attr: str
+) -> list:
+    """Old path: SDK model objects, then the AI transformation walk."""
+    response = api_client.deserialize(
+        SimpleNamespace(data=body.decode("utf8")), response_type
+    )
+    items = getattr(response, result_attr).items
+    return [
+        loop.run_until_complete(transform_paapi_to_ai_format(item)) for item in items
+    ]
+
+
+def single_pass_decode(body: bytes, name: str) -> list:
+    """New path: one decode into records, then the AI format."""
+    decode = (
+        decode_search_response if name == "SearchItems" else decode_get_items_response
+    )
+    return [record.to_ai_dict() for record in decode(body)]
+
+
+def retained_bytes(build) -> int:
+    """Bytes still allocated by ``build()``'s result while it is alive."""
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def measure(func, iterations: int) -> dict:
+    """Per-call latency in microseconds."""
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1e6)
+    timings.sort()
+    return {
+        "p50": statistics.median(timings),
+        "p95": timings[int(len(timings) * 0.95) - 1],
+    }
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--iterations", type=int, default=2000, help="Decodes per measurement"
+    )
+    args = parser.parse_args()
+
+    # The recorded GetItems response carries an invalid-ASIN error that would be logged per decode
+    logging.getLogger("bot.paapi_decoder").setLevel(logging.ERROR)
+    api_client = ApiClient(
+        access_key="x", secret_key="x", host="webservices.amazon.in", region="eu-west-1"
+    )
+    loop = asyncio.new_event_loop()
+
+    for name, (filename, response_type, result_attr) in RESPONSES.items():
+        body = (FIXTURES / filename).read_bytes()
+        items = len(single_pass_decode(body, name))
+        old = measure(
+            lambda: sdk_decode(loop, api_client, body, response_type, result_attr),
+            args.iterations,
+        )
+        new = measure(lambda: single_pass_decode(body, name), args.iterations)
+        print(f"\n{name} ({items} items, {len(body):,} bytes)")
+        print(
+            f"  SDK models + transform   p50 {old['p50']:9.1f} us   p95 {old['p95']:9.1f} us"
+        )
+        print(
+            f"  single-pass decoder      p50 {new['p50']:9.1f} us   p95 {new['p95']:9.1f} us"
+        )
+        print(f"  speedup (p50)            {old['p50'] / new['p50']:9.1f}x")
+
+        decode = (
+            decode_search_response
+            if name == "SearchItems"
+            else decode_get_items_response
+        )
+        records = decode(body)
+        as_dicts = retained_bytes(lambda: [record.to_ai_dict() for record in records])
+        print(
+            f"  AI dicts over records    {as_dicts:9,} bytes ({as_dicts // len(records):,} per product)"
+        )
+
+
+if __name__ == "__main__":
+    main()
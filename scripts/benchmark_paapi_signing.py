@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""Benchmark PA-API request signing.
+
+Signs a SearchItems request with the SDK's ``AWSV4Auth`` the way
+``DefaultApi`` does (a new header dict, the four-step key derivation and
+``json.dumps`` of the payload on every call) and with ``PaapiSigner``
+(bot/paapi_signer.py). The signer caches the day's key and the canonical
+headers, and it hashes the body bytes the transport already encoded. Both
+produce identical headers, and the script checks that before timing.
+
+``--threads`` also runs the signer from several threads at once, the way
+worker threads or processes sign when they share a quota.
+
+Usage:
+    python scripts/benchmark_paapi_signing.py [--iterations 20000] [--threads 4]
+"""
+
+import argparse
+import datetime
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from paapi5_python_sdk.auth.sign_helper import AWSV4Auth  # noqa: E402
+
+from bot.paapi_signer import (
+    SERVICE,
+    TARGET_PREFIX,
+    USER_AGENT,
+    PaapiSigner,
+)  # noqa: E402
+
+CREDENTIALS = {
+    "access_key": "AKIDEXAMPLE",
+    "secret_key": "wJalrXUtnFEMI/K7MDENG+bPxRfiCYEXAMPLEKEY",
+    "host": "webservices.amazon.in",
+    "region": "eu-west-1",
+}
+PATH = "/paapi5/searchitems"
+PAYLOAD = {
+    "Keywords": "gaming monitor 144hz",
+    "SearchIndex": "Electronics",
+    "ItemCount": 10,
+    "ItemPage": 2,
+    "PartnerTag": "tag-21",
+    "PartnerType": "Associates",
+    "Marketplace": "www.amazon.in",
+    "Resources": [
+        "ItemInfo.Title",
+        "ItemInfo.Features",
+        "Offers.Listings.Price",
+        "Images.Primary.Large",
+    ],
+}
+
+
+def sdk_sign(timestamp: datetime.datetime) -> dict:
+    """Old path: headers and signature as DefaultApi builds them."""
+    headers = {
+        "Accept": "application/json",
+        "User-Agent": USER_AGENT,
+        "x-amz-target": TARGET_PREFIX + "SearchItems",
+        "content-encoding": "amz-1.0",
+        "Content-Type": "application/json; charset=utf-8",
+        "host": CREDENTIALS["host"],
+        "x-amz-date": timestamp.strftime("%Y%m%dT%H%M%SZ"),
+    }
+    return AWSV4Auth(
+        service=SERVICE,
+        method_name="POST",
+        timestamp=timestamp,
+        headers=headers,
+        payload=PAYLOAD,
+        path=PATH,
+        **CREDENTIALS,
+    ).get_headers()
+
+
+def measure(func, iterations: int) -> dict:
+    """Per-call latency in microseconds."""
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1e6)
+    timings.sort()
+    return {
+        "p50": statistics.median(timings),
+        "p95": timings[int(len(timings) * 0.95) - 1],
+    }
+
+
+def throughput(func, iterations: int, threads: int) -> float:
+    """Signatures per second with ``threads`` threads signing concurrently."""
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        for _ in pool.map(
+            lambda _: [func() for _ in range(iterations // threads)], range(threads)
+        ):
+            pass
+    return iterations / (time.perf_counter() - started)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--iterations", type=int, default=20000, help="Signatures per measurement"
+    )
+    parser.add_argument(
+        "--threads", type=int, default=4, help="Concurrent signing threads"
+    )
+    args = parser.parse_args()
+
+    timestamp = datetime.datetime.utcnow()
+    signer = PaapiSigner(**CREDENTIALS)
+    body = json.dumps(PAYLOAD).encode("utf-8")
+
+    def cached_sign():
+        return signer.sign("SearchItems", PATH, body, timestamp)
+
+    if sdk_sign(timestamp) != cached_sign():
+        sys.exit("Signer output differs from AWSV4Auth")
+
+    old = measure(lambda: sdk_sign(timestamp), args.iterations)
+    new = measure(cached_sign, args.iterations)
+    print(f"SearchItems signing ({len(body)} byte body)")
+    print(
+        f"  AWSV4Auth                p50 {old['p50']:7.2f} us   p95 {old['p95']:7.2f} us"
+    )
+    print(
+        f"  PaapiSigner              p50 {new['p50']:7.2f} us   p95 {new['p95']:7.2f} us"
+    )
+    print(f"  speedup (p50)            {old['p50'] / new['p50']:7.1f}x")
+
+    old_rate = throughput(lambda: sdk_sign(timestamp), args.iterations, args.threads)
+    new_rate = throughput(cached_sign, args.iterations, args.threads)
+    print(f"\n{args.threads} threads")
+    print(f"  AWSV4Auth                {old_rate:10,.0f} signatures/s")
+    print(f"  PaapiSigner              {new_rate:10,.0f} signatures/s")
+
+
+if __name__ == "__main__":
+    main()
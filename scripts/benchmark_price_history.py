@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""Benchmark price history queries before and after Migration 002.
+
+Builds a SQLite database with a synthetic price history (10M rows by default,
+written in time order like the scheduler does), then times the queries used by
+trend analysis and alert urgency on the legacy layout (no secondary indexes,
+default pragmas) and again after running Migration 002 through the bot's
+tuned engine.
+
+Usage:
+    python scripts/benchmark_price_history.py [--rows 10000000] [--asins 20000]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import text  # noqa: E402
+from sqlmodel import SQLModel  # noqa: E402
+
+from bot.db import create_sync_engine  # noqa: E402
+from bot.migrations.migration_002_query_indexes import (
+    INDEXED_TABLES,
+    Migration002,
+)  # noqa: E402
+
+QUERIES = {
+    # MarketIntelligence.analyze_price_trends / ProductEnrichmentService.detect_price_patterns
+    "trend_30d": (
+        "SELECT price, timestamp FROM pricehistory "
+        "WHERE asin = :asin AND timestamp >= :since ORDER BY timestamp"
+    ),
+    # Latest known price for an ASIN
+    "latest_price": "SELECT price FROM pricehistory WHERE asin = :asin ORDER BY timestamp DESC LIMIT 1",
+}
+
+
+def build_database(path: str, rows: int, asins: int) -> None:
+    """Create the legacy schema and fill it with synthetic price history."""
+    legacy_engine = create_sync_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(legacy_engine)
+    for table in INDEXED_TABLES:
+        for index in table.__table__.indexes:
+            index.drop(legacy_engine)
+    legacy_engine.dispose()
+
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=DELETE")
+    conn.execute("PRAGMA synchronous=OFF")
+
+    rng = random.Random(42)
+    start = datetime(2025, 1, 1)
+    step = timedelta(days=365) / rows
+    chunk = 100_000
+    for offset in range(0, rows, chunk):
+        batch = [
+            (
+                f"B{rng.randrange(asins):09d}",
+                rng.randrange(50_000, 5_000_000),
+                "paapi",
+                (start + step * i).isoformat(sep=" "),
+            )
+            for i in range(offset, min(offset + chunk, rows))
+        ]
+        conn.executemany(
+            "INSERT INTO pricehistory (asin, price, source, timestamp) VALUES (?, ?, ?, ?)",
+            batch,
+        )
+        print(
+            f"\r  inserted {min(offset + chunk, rows):,} / {rows:,} rows",
+            end="",
+            flush=True,
+        )
+    conn.commit()
+    conn.close()
+    print()
+
+
+def time_queries(execute, asins: int, samples: int) -> dict:
+    """Run each query ``samples`` times for random ASINs, return latencies in ms."""
+    rng = random.Random(7)
+    since = (datetime(2025, 1, 1) + timedelta(days=335)).isoformat(sep=" ")
+    results = {}
+    for name, query in QUERIES.items():
+        latencies = []
+        for _ in range(samples):
+            params = {"asin": f"B{rng.randrange(asins):09d}", "since": since}
+            started = time.perf_counter()
+            execute(query, params)
+            latencies.append((time.perf_counter() - started) * 1000)
+        latencies.sort()
+        results[name] = {
+            "p50": statistics.median(latencies),
+            "p95": latencies[int(len(latencies) * 0.95) - 1],
+        }
+    return results
+
+
+def print_results(label: str, results: dict) -> None:
+    """Print a latency table."""
+    print(f"\n{label}")
+    for name, stats in results.items():
+        print(f"  {name:<14} p50 {stats['p50']:9.2f} ms   p95 {stats['p95']:9.2f} ms")
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--rows", type=int, default=10_000_000, help="Price history rows to generate"
+    )
+    parser.add_argument("--asins", type=int, default=20_000, help="Distinct ASINs")
+    parser.add_argument(
+        "--samples", type=int, default=50, help="Queries per measurement"
+    )
+    parser.add_argument("--path", help="Database file (defaults to a temporary file)")
+    args = parser.parse_args()
+
+    path = args.path or os.path.join(tempfile.mkdtemp(), "price_history_benchmark.db")
+    print(f"Building {args.rows:,} rows for {args.asins:,} ASINs in {path}")
+    build_database(path, args.rows, args.asins)
+
+    # Legacy: full table scans with SQLite's default pragmas
+    conn = sqlite3.connect(path)
+    before = time_queries(
+        lambda q, p: conn.execute(q, p).fetchall(), args.asins, args.samples
+    )
+    conn.close()
+    print_results("Before Migration 002 (no indexes, default pragmas)", before)
+
+    engine = create_sync_engine(f"sqlite:///{path}")
+    migration = Migration002()
+    migration.engine = engine
+    started = time.perf_counter()
+    if not asyncio.run(migration.upgrade()):
+        raise SystemExit("Migration 002 failed")
+    print(f"\nMigration 002 took {time.perf_counter() - started:.1f}s")
+
+    with engine.connect() as conn:
+        after = time_queries(
+            lambda q, p: conn.execute(text(q), p).fetchall(), args.asins, args.samples
+        )
+    print_results("After Migration 002 (composite indexes, WAL, tuned pragmas)", after)
+
+    print("\nSpeedup (p50)")
+    for name in QUERIES:
+        print(f"  {name:<14} {before[name]['p50'] / after[name]['p50']:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Replay price history against refresh policies.
+
+Compares the adaptive per-ASIN refresh policy (bot/refresh_policy.py) with
+fixed refresh intervals: how many lookups each spends and how long a price
+change goes unnoticed. History comes from the ``pricehistory`` table of a
+database, or is generated: mostly static products, some that move every few
+days, and a sale window in which a share of products changes several times
+a day.
+
+Usage:
+    python scripts/simulate_refresh_policy.py --db dealbot.db [--days 30]
+    python scripts/simulate_refresh_policy.py --synthetic [--asins 2000]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+from collections import defaultdict
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bot.refresh_policy import (
+    RefreshPolicy,
+    fixed_interval,
+    simulate_refresh,
+)  # noqa: E402
+
+HOUR = 3600
+DAY = 86400
+
+
+def load_history(path: str, days: int) -> tuple:
+    """Read the last ``days`` of price history, returning (histories, start, end)."""
+    conn = sqlite3.connect(path)
+    rows = conn.execute(
+        "SELECT asin, timestamp, price FROM pricehistory "
+        "WHERE timestamp >= datetime((SELECT max(timestamp) FROM pricehistory), ?) "
+        "ORDER BY asin, timestamp",
+        (f"-{days} days",),
+    ).fetchall()
+    conn.close()
+    histories = defaultdict(lambda: ([], []))
+    for asin, timestamp, price in rows:
+        ts = int(datetime.fromisoformat(timestamp).timestamp())
+        histories[asin][0].append(ts)
+        histories[asin][1].append(price)
+    all_ts = [ts for timestamps, _ in histories.values() for ts in timestamps]
+    return dict(histories), min(all_ts), max(all_ts)
+
+
+def synthetic_history(asins: int, days: int, seed: int = 42) -> tuple:
+    """Generate price histories with static, drifting and sale-driven products."""
+    rng = random.Random(seed)
+    start = 1_700_000_000
+    end = start + days * DAY
+    sale_start, sale_end = start + days * DAY // 2, start + days * DAY // 2 + 3 * DAY
+    histories = {}
+    for n in range(asins):
+        kind = rng.random()
+        # Changes per day outside and during the sale
+        base_rate = 0.02 if kind < 0.6 else (0.3 if kind < 0.9 else 2.0)
+        sale_rate = base_rate * (10 if rng.random() < 0.3 else 1)
+        price = rng.randrange(50_000, 5_000_000)
+        t = start
+        timestamps, prices = [t], [price]
+        while t < end:
+            rate = sale_rate if sale_start <= t < sale_end else base_rate
+            t += int(rng.expovariate(rate / DAY)) + 1
+            price = max(1000, int(price * rng.uniform(0.85, 1.1)))
+            timestamps.append(t)
+            prices.append(price)
+        histories[f"B{n:09d}"] = (timestamps, prices)
+    return histories, start, end
+
+
+def main() -> None:
+    """Run the simulation."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--db", help="SQLite database with a pricehistory table")
+    source.add_argument(
+        "--synthetic", action="store_true", help="Generate history instead"
+    )
+    parser.add_argument(
+        "--days", type=int, default=30, help="Days of history to replay"
+    )
+    parser.add_argument("--asins", type=int, default=2000, help="Synthetic ASINs")
+    args = parser.parse_args()
+
+    if args.db:
+        histories, start, end = load_history(args.db, args.days)
+    else:
+        histories, start, end = synthetic_history(args.asins, args.days)
+    print(f"Replaying {len(histories):,} ASINs over {(end - start) / DAY:.1f} days")
+
+    policies = {
+        "fixed 2h": fixed_interval(2 * HOUR),
+        "fixed 6h": fixed_interval(6 * HOUR),
+        "fixed 24h": fixed_interval(24 * HOUR),
+        "adaptive": RefreshPolicy().interval,
+    }
+    print(
+        f"\n{'policy':<10} {'calls':>9} {'changes':>8} {'detected':>9} {'missed':>7} "
+        f"{'p50 min':>8} {'p95 min':>8} {'mean min':>9}"
+    )
+    for name, rule in policies.items():
+        r = simulate_refresh(histories, rule, start, end)
+        print(
+            f"{name:<10} {r['calls']:>9,} {r['changes']:>8,} {r['detected']:>9,} {r['missed']:>7,} "
+            f"{r['latency_p50_minutes'] or 0:>8.0f} {r['latency_p95_minutes'] or 0:>8.0f} "
+            f"{r['latency_mean_minutes'] or 0:>9.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
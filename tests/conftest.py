@@ -0,0 +1,57 @@
+"""Shared test fixtures."""
+
+import weakref
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from sqlmodel import SQLModel
+
+from bot.db import dispose_async_engine, get_async_engine
+
+
+@pytest.fixture
+async def database(tmp_path):
+    """Point DATABASE_URL at an empty SQLite file with all tables created."""
+    url = f"sqlite:///{tmp_path / 'test.db'}"
+    with patch("bot.db.settings.DATABASE_URL", url):
+        async with get_async_engine().begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        yield url
+        await dispose_async_engine()
+
+
+@pytest.fixture
+def async_session_for():
+    """Build ``get_async_session`` replacements that yield a given session."""
+
+    def build(session):
+        @asynccontextmanager
+        async def factory():
+            yield session
+
+        return factory
+
+    return build
+
+
+@pytest.fixture
+def async_session_returning(async_session_for):
+    """Build ``get_async_session`` replacements whose queries return given rows."""
+
+    def build(rows):
+        session = Mock()
+        session.exec = AsyncMock(return_value=Mock(all=Mock(return_value=rows)))
+        return async_session_for(session)
+
+    return build
+
+
+@pytest.fixture
+def fresh_paapi_state(monkeypatch):
+    """Give the test its own request coalescer, search cache and quota budget."""
+    from bot import paapi_coalescer, quota_budget, search_cache
+
+    monkeypatch.setattr(paapi_coalescer, "_coalescers", weakref.WeakKeyDictionary())
+    monkeypatch.setattr(search_cache, "_search_cache", None)
+    monkeypatch.setattr(quota_budget, "_budget_planner", None)
@@ -13,7 +13,8 @@ import pytest
 import time
 from unittest.mock import patch
 
-from bot.ai.feature_extractor import FeatureExtractor
+from bot.ai.feature_extractor import FeatureExtractor, VocabularyMatcher, get_vocabulary_matcher
+from bot.ai.vocabularies import get_supported_categories
 
 
 class TestFeatureExtractor:
@@ -356,6 +357,71 @@ class TestFeatureExtractor:
         assert accuracy >= 0.85, f"Accuracy {accuracy:.1%} below 85% requirement"
 
 
+class TestVocabularyMatcher:
+    """The combined scanner must agree with one findall per pattern."""
+
+    QUERIES = [
+        "gaming monitor 144hz curved 27 inch ips samsung",
+        "27\" 1440p 165 fps flat va panel for coding and office",
+        "68.5 cm full hd monitor 75 hertz 144 refresh",
+        "hp laptop 16gb ram 512gb ssd rtx 4060 core i7 15.6 inch",
+        "512gb ssd 16gb ram macbook laptop",
+        "sony over-ear bluetooth headphones anc wired",
+        "true wireless in-ear earbuds active noise jbl",
+        "nothing to see here",
+    ]
+
+    @staticmethod
+    def _findall_per_pattern(matcher, query):
+        values = {}
+        for feature, patterns in matcher.patterns.items():
+            matched = [pattern.findall(query)[0] for pattern in patterns if pattern.findall(query)]
+            if matched:
+                values[feature] = matched
+        return values
+
+    @pytest.mark.parametrize("category", get_supported_categories())
+    def test_scan_matches_individual_patterns(self, category):
+        """Overlapping patterns (bluetooth as type and wireless) all report their first match."""
+        matcher = get_vocabulary_matcher(category)
+        for query in self.QUERIES:
+            assert matcher.scan(query) == self._findall_per_pattern(matcher, query), query
+
+    def test_optional_group_falls_back_to_the_pattern(self):
+        """A winning pattern whose only group did not take part is still identified."""
+        matcher = VocabularyMatcher({"mode": [r"\b(pro)?max\b", r"\b(max)\b"]})
+        assert matcher.scan("iphone max") == {"mode": ["", "max"]}
+
+    def test_fallback_categories_share_one_matcher(self):
+        """Hints without their own vocabulary reuse the default matcher instead of compiling more."""
+        default = get_vocabulary_matcher("gaming_monitor")
+        assert get_vocabulary_matcher("smartphone") is default
+        assert get_vocabulary_matcher("no-such-category") is default
+
+    def test_all_categories_use_their_vocabulary(self):
+        """Laptop and headphone queries are read with their own patterns."""
+        extractor = FeatureExtractor()
+        laptop = extractor.extract_features("lenovo laptop 16gb ram 512gb ssd")
+        headphones = extractor.extract_features("sony bluetooth headphones with anc")
+
+        assert laptop["category_detected"] == "laptop"
+        assert (laptop["ram"], laptop["storage"], laptop["brand"]) == ("16", "512", "lenovo")
+        assert headphones["category_detected"] == "headphones"
+        assert (headphones["wireless"], headphones["noise_cancellation"]) == ("bluetooth", "anc")
+
+    def test_results_are_cached_per_normalized_query(self):
+        """Equivalent spellings share one extraction; callers get their own copy."""
+        extractor = FeatureExtractor()
+        first = extractor.extract_features("Gaming Monitor  144Hz   Curved")
+        first["validation"] = {"valid": True}
+
+        with patch.object(VocabularyMatcher, "scan", side_effect=AssertionError("not cached")):
+            second = FeatureExtractor().extract_features("gaming monitor 144hz curved")
+
+        assert second["refresh_rate"] == "144" and second["curvature"] == "curved"
+        assert "validation" not in second
+
+
 # Performance benchmark tests
 class TestFeatureExtractorPerformance:
     """Performance-focused tests for FeatureExtractor."""
@@ -0,0 +1,204 @@
+"""Tests for batch deal alert generation."""
+
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import event
+from sqlmodel import create_engine, select
+
+from bot.db import get_async_engine, get_async_session
+from bot.deal_context import load_deal_inputs
+from bot.enhanced_models import (
+    CustomerReviews,
+    DealAlert,
+    PriceHistory,
+    Product,
+    ProductOffers,
+)
+from bot.models import Price, User, Watch
+from bot.price_series import get_price_series_store
+from bot.smart_alerts import SmartAlertEngine
+
+
+@pytest.fixture
+def database(database):
+    """Shared temporary database, also behind the sync market intelligence engine."""
+    sync_engine = create_engine(database)
+    get_price_series_store().clear()
+    with patch("bot.market_intelligence.engine", sync_engine):
+        yield database
+    get_price_series_store().clear()
+    sync_engine.dispose()
+
+
+async def _seed(count: int):
+    """Store products with a week of history, offers, reviews and a recent alert."""
+    now = datetime.utcnow()
+    watches = []
+    async with get_async_session() as session:
+        session.add(User(id=1, tg_user_id=1))
+        for i in range(count):
+            asin = f"B{i:09d}"
+            session.add(Product(asin=asin, title=f"Monitor {i}", brand="samsung"))
+            session.add(
+                CustomerReviews(
+                    asin=asin, review_count=100 + i, average_rating=3.5 + (i % 3) / 2
+                )
+            )
+            session.add(
+                ProductOffers(
+                    asin=asin,
+                    price=15000,
+                    list_price=20000,
+                    fetched_at=now - timedelta(days=2),
+                )
+            )
+            session.add(
+                ProductOffers(
+                    asin=asin,
+                    price=14000,
+                    list_price=20000,
+                    availability_type="InStock",
+                    fetched_at=now,
+                )
+            )
+            for day in range(6, 0, -1):
+                session.add(
+                    PriceHistory(
+                        asin=asin,
+                        price=15000 + day * 500 + i,
+                        timestamp=now - timedelta(days=day),
+                    )
+                )
+            watch = Watch(id=i + 1, user_id=1, asin=asin, keywords=f"monitor {i}")
+            session.add(watch)
+            session.add(
+                DealAlert(
+                    watch_id=i + 1,
+                    asin=asin,
+                    alert_type="deal_quality",
+                    current_price=20000,
+                    sent_at=now - timedelta(days=1),
+                )
+            )
+            watches.append(watch)
+        await session.commit()
+    return watches
+
+
+def _current(i: int) -> dict:
+    return {
+        "title": f"Monitor {i}",
+        "price": 14000 + i,
+        "savings_percentage": 30,
+        "image": "https://example.com/image.jpg",
+        "availability": "In Stock",
+    }
+
+
+@pytest.mark.asyncio
+async def test_load_deal_inputs(database):
+    """Inputs carry the latest offer, reviews, alerts and history per ASIN."""
+    await _seed(3)
+    async with get_async_session() as session:
+        session.add(
+            Price(
+                watch_id=1, asin="B000000099", price=999, fetched_at=datetime.utcnow()
+            )
+        )
+        await session.commit()
+
+    inputs = await load_deal_inputs(
+        ["B000000000", "B000000002", "B000000000", "B000000099"]
+    )
+
+    assert list(inputs) == ["B000000000", "B000000002", "B000000099"]
+    first = inputs["B000000000"]
+    assert first.product.title == "Monitor 0"
+    assert first.offer.price == 14000
+    assert first.reviews.review_count == 100
+    assert len(first.history) == 6
+    assert first.last_alert_price(datetime.utcnow() - timedelta(days=7)) == 20000
+    assert first.alert_count(datetime.utcnow() - timedelta(days=90)) == 1
+
+    # Products without PriceHistory fall back to the Price table
+    basic = inputs["B000000099"]
+    assert basic.product is None
+    assert not basic.enhanced_history
+    assert basic.history.prices.tolist() == [999]
+
+
+@pytest.mark.asyncio
+async def test_batch_matches_single_deal_quality(database):
+    """Batch deal quality scores equal the per-ASIN calculation."""
+    watches = await _seed(4)
+    engine = SmartAlertEngine()
+    inputs = await load_deal_inputs([watch.asin for watch in watches])
+
+    for i, watch in enumerate(watches):
+        single = await engine.market_intel.calculate_deal_quality(
+            watch.asin, _current(i)["price"]
+        )
+        batch = await engine.market_intel.calculate_deal_quality_from_inputs(
+            inputs[watch.asin], _current(i)["price"]
+        )
+        assert batch["score"] == pytest.approx(single["score"])
+        assert batch["factors"] == pytest.approx(single["factors"])
+
+
+@pytest.mark.asyncio
+async def test_generate_alerts_uses_constant_queries(database):
+    """Alerts for many watches take a fixed number of queries and one commit."""
+    watches = await _seed(40)
+    engine = SmartAlertEngine()
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    sync_engine = get_async_engine().sync_engine
+    event.listen(sync_engine, "before_cursor_execute", count)
+    try:
+        results = await engine.generate_enhanced_deal_alerts(
+            [(watch, _current(i)) for i, watch in enumerate(watches)]
+        )
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", count)
+
+    assert len(results) == 40
+    assert all("caption" in result and "urgency" in result for result in results)
+    assert results[0]["price_context"]["price_level"] == "historical_low"
+    assert results[0]["price_context"]["trend"] == "decreasing"
+    assert len(statements) <= 6
+    assert sum(statement.startswith("INSERT") for statement in statements) == 1
+
+    async with get_async_session() as session:
+        stored = (
+            await session.exec(
+                select(DealAlert).where(DealAlert.current_price != 20000)
+            )
+        ).all()
+    assert len(stored) == 40
+
+
+@pytest.mark.asyncio
+async def test_generate_alerts_falls_back_per_item(database):
+    """One failing item gets a fallback alert without affecting the others."""
+    watches = await _seed(2)
+    engine = SmartAlertEngine()
+    score = engine.market_intel.calculate_deal_quality_from_inputs
+
+    async def flaky(inputs, current_price):
+        if inputs.asin == watches[1].asin:
+            raise RuntimeError("scoring failed")
+        return await score(inputs, current_price)
+
+    with patch.object(engine.market_intel, "calculate_deal_quality_from_inputs", flaky):
+        results = await engine.generate_enhanced_deal_alerts(
+            [(watch, _current(i)) for i, watch in enumerate(watches)]
+        )
+
+    assert len(results) == 2
+    assert results[0]["quality_category"] != "unknown"
+    assert results[1]["quality_score"] == 50.0
@@ -0,0 +1,184 @@
+"""Tests for the scraper browser pool."""
+
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from bot.browser_pool import (
+    BrowserPool,
+    BrowserPoolBusy,
+    close_browser_pool,
+    get_browser_pool,
+)
+
+
+def fake_browser():
+    """Create a browser double whose contexts each hold one page."""
+    browser = Mock()
+    browser.is_connected = Mock(return_value=True)
+    browser.close = AsyncMock()
+
+    def new_context(**kwargs):
+        # An empty product page: no selector matches
+        locator = Mock()
+        locator.count = AsyncMock(return_value=0)
+        locator.first = locator
+        page = Mock()
+        page.is_closed = Mock(return_value=False)
+        page.goto = AsyncMock()
+        page.wait_for_selector = AsyncMock()
+        page.content = AsyncMock(return_value="<html></html>")
+        page.locator = Mock(return_value=locator)
+        context = Mock()
+        context.route = AsyncMock()
+        context.new_page = AsyncMock(return_value=page)
+        context.close = AsyncMock()
+        return context
+
+    browser.new_context = AsyncMock(side_effect=new_context)
+    return browser
+
+
+@pytest.fixture
+def browser():
+    """Patch browser launches to return a fake browser."""
+    browser = fake_browser()
+    with patch.object(
+        BrowserPool, "_launch", AsyncMock(return_value=browser)
+    ) as launch:
+        browser.launch = launch
+        yield browser
+
+
+@pytest.mark.asyncio
+async def test_pages_are_reused_across_scrapes(browser):
+    """Sequential scrapes share one browser launch and one context."""
+    pool = BrowserPool(max_pages=2, max_navigations=10)
+
+    for asin in ("B000000001", "B000000002", "B000000003"):
+        async with pool.page() as pooled:
+            await pooled.goto(f"https://www.amazon.in/dp/{asin}")
+
+    browser.launch.assert_awaited_once()
+    browser.new_context.assert_awaited_once()
+    assert pool.stats["reused"] == 2
+    # Resources are blocked once per context, not per scrape
+    pooled.context.route.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_context_recycled_after_max_navigations(browser):
+    """A context is closed and replaced once it has served N navigations."""
+    pool = BrowserPool(max_pages=1, max_navigations=2)
+    contexts = []
+
+    for _ in range(5):
+        async with pool.page() as pooled:
+            await pooled.goto("https://www.amazon.in/dp/B000000001")
+            contexts.append(pooled.context)
+
+    assert browser.new_context.await_count == 3
+    contexts[0].close.assert_awaited_once()
+    assert contexts[0] is contexts[1]
+    assert contexts[2] is not contexts[1]
+
+
+@pytest.mark.asyncio
+async def test_failed_scrape_discards_context(browser):
+    """An exception during a scrape recycles the context instead of reusing it."""
+    pool = BrowserPool(max_pages=1)
+
+    with pytest.raises(ValueError):
+        async with pool.page() as pooled:
+            raise ValueError("Captcha required")
+    pooled.context.close.assert_awaited_once()
+
+    async with pool.page() as second:
+        pass
+    assert second.context is not pooled.context
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded(browser):
+    """No more than ``max_pages`` scrapes run at once; the rest queue."""
+    pool = BrowserPool(max_pages=2, max_queue=10)
+    running = peak = 0
+
+    async def scrape():
+        nonlocal running, peak
+        async with pool.page():
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    await asyncio.gather(*[scrape() for _ in range(8)])
+
+    assert peak == 2
+    assert pool.stats["acquired"] == 8
+    assert browser.new_context.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_and_timeout_raises(browser):
+    """Callers beyond the queue limit, or waiting too long, get BrowserPoolBusy."""
+    pool = BrowserPool(max_pages=1, max_queue=1, acquire_timeout=0.05)
+    release = asyncio.Event()
+
+    async def hold():
+        async with pool.page():
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+
+    with pytest.raises(BrowserPoolBusy, match="queue full"):
+        async with pool.page():
+            pass
+
+    with pytest.raises(BrowserPoolBusy, match="within"):
+        await waiter
+    release.set()
+    await holder
+    assert pool.stats["rejected"] == 1
+    assert pool.stats["timeouts"] == 1
+
+
+@pytest.mark.asyncio
+async def test_disconnected_browser_is_relaunched(browser):
+    """Pages from a crashed browser are dropped and a new browser is launched."""
+    pool = BrowserPool(max_pages=1)
+    async with pool.page() as first:
+        pass
+
+    browser.is_connected.return_value = False
+    async with pool.page() as second:
+        browser.is_connected.return_value = True
+
+    assert browser.launch.await_count == 2
+    assert second.context is not first.context
+    assert pool.get_stats()["browser_launches"] == 2
+
+
+@pytest.mark.asyncio
+async def test_scrape_product_data_uses_pool(browser):
+    """Browser-tier scrapes of several ASINs launch Chromium once and do not sleep."""
+    from bot.scraper import scrape_product_data
+
+    with patch("bot.scraper.settings.SCRAPER_HTTP_ENABLED", False), patch(
+        "bot.scraper.Path"
+    ), patch("asyncio.sleep", AsyncMock()) as sleep:
+        for asin in ("B000000001", "B000000002"):
+            result = await scrape_product_data(asin)
+            assert result["asin"] == asin
+            assert result["price"] is None
+
+    browser.launch.assert_awaited_once()
+    browser.new_context.assert_awaited_once()
+    assert get_browser_pool().stats["reused"] == 1
+    sleep.assert_not_awaited()
+    await close_browser_pool()
+    browser.close.assert_awaited_once()
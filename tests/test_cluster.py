@@ -0,0 +1,148 @@
+"""Tests for the multi-worker webhook receiver."""
+
+import asyncio
+import queue
+from unittest.mock import Mock, patch
+
+import pytest
+from telegram import Update
+
+from bot import health
+from bot.cluster import (
+    WorkerPool,
+    create_receiver_app,
+    run_cluster,
+    serve_updates,
+    shard_for,
+    update_chat_id,
+)
+
+
+def _message(update_id, chat_id):
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 1_700_000_000,
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": chat_id, "is_bot": False, "first_name": "T"},
+            "text": "/start",
+        },
+    }
+
+
+def test_updates_are_sharded_by_chat():
+    """Messages and callback queries use the chat, chat-less updates the sender."""
+    callback = {
+        "update_id": 2,
+        "callback_query": {
+            "id": "1",
+            "from": {"id": 9},
+            "message": {"chat": {"id": -100}},
+        },
+    }
+    inline = {
+        "update_id": 3,
+        "inline_query": {"id": "1", "from": {"id": 77}, "query": "laptop"},
+    }
+
+    assert update_chat_id(_message(1, 12)) == 12
+    assert update_chat_id(callback) == -100
+    assert update_chat_id(inline) == 77
+    assert update_chat_id({"update_id": 4}) is None
+
+    assert [shard_for(chat, 4) for chat in (12, 13, -100, None)] == [0, 1, 0, 0]
+
+
+def test_receiver_routes_updates_and_checks_the_secret():
+    """Each chat's updates land on one worker queue; unauthenticated posts are refused."""
+    queues = [queue.Queue() for _ in range(3)]
+    client = create_receiver_app(queues, secret="s3cret").test_client()
+    headers = {"X-Telegram-Bot-Api-Secret-Token": "s3cret"}
+
+    for update_id, chat in enumerate((1, 4, 2, 1)):
+        assert (
+            client.post(
+                "/telegram", json=_message(update_id, chat), headers=headers
+            ).status_code
+            == 200
+        )
+
+    assert [q.qsize() for q in queues] == [0, 3, 1]
+    assert [queues[1].get()["update_id"] for _ in range(3)] == [0, 1, 3]
+    assert client.post("/telegram", json=_message(9, 1)).status_code == 403
+    assert client.post("/telegram", data="nope", headers=headers).status_code == 400
+    assert client.get("/telegram/stats").get_json() == {
+        "workers": 3,
+        "routed": [0, 3, 1],
+        "alive": [True, True, True],
+    }
+
+
+@pytest.mark.asyncio
+async def test_worker_feeds_updates_into_the_application():
+    """Raw updates become Update objects on the application's queue until the sentinel."""
+    app = Mock()
+    app.bot = None
+    app.update_queue = asyncio.Queue()
+    updates = queue.Queue()
+    updates.put(_message(1, 5))
+    updates.put({"update_id": "broken", "message": "not a message"})
+    updates.put(None)
+
+    await serve_updates(app, updates)
+
+    update = app.update_queue.get_nowait()
+    assert isinstance(update, Update) and update.effective_chat.id == 5
+    assert app.update_queue.empty()
+
+
+class _FakeProcess:
+    def __init__(self, target, args, name, daemon):
+        self.name = name
+        self.alive = False
+        self.exitcode = None
+
+    def start(self):
+        self.alive = True
+
+    def is_alive(self):
+        return self.alive
+
+    def join(self, timeout=None):
+        self.alive = False
+
+
+def test_dead_workers_are_restarted_and_refused_meanwhile():
+    """A dead worker's updates get a 503 and fail /health until it is restarted."""
+    context = Mock(Process=_FakeProcess)
+    pool = WorkerPool(context, [queue.Queue() for _ in range(2)], restart_backoff=0)
+    pool.start()
+    client = create_receiver_app(pool.queues, is_alive=pool.is_alive).test_client()
+
+    pool.processes[1].alive = False
+    pool.processes[1].exitcode = -9
+    with patch.dict(health._liveness_checks, {"bot_workers": pool.all_alive}):
+        assert health.app.test_client().get("/health").status_code == 503
+        assert client.post("/telegram", json=_message(1, 1)).status_code == 503
+        assert client.post("/telegram", json=_message(2, 2)).status_code == 200
+
+        assert pool.restart_dead() == [1]
+        assert pool.restarts == [0, 1]
+        assert health.app.test_client().get("/health").status_code == 200
+        assert client.post("/telegram", json=_message(3, 1)).status_code == 200
+
+    pool.stop()
+    pool.processes[0].alive = False
+    assert pool.restart_dead() == []
+    assert [q.get() for q in pool.queues] == [_message(2, 2), _message(3, 1)]
+
+
+def test_multiple_workers_need_a_shared_rate_limit_backend():
+    """Per-process memory buckets would multiply the PA-API rate by the worker count."""
+    with patch(
+        "bot.cluster.settings.WEBHOOK_URL", "https://bot.example/telegram"
+    ), patch("bot.cluster.settings.RATE_LIMIT_BACKEND", "memory"), pytest.raises(
+        ValueError, match="RATE_LIMIT_BACKEND"
+    ):
+        run_cluster(workers=2)
@@ -0,0 +1,40 @@
+"""Tests for conversation state shared by bot workers."""
+
+import pytest
+
+from bot.conversation_store import SQLPersistence
+
+
+@pytest.mark.asyncio
+async def test_state_written_by_one_worker_is_loaded_by_another(database):
+    """User, chat and bot data survive into a fresh persistence instance."""
+    worker = SQLPersistence()
+    await worker.update_user_data(
+        42, {"pending_watch": {"asin": "B0TEST", "max_price": 50000}}
+    )
+    await worker.update_chat_data(-100123, {"lang": "en"})
+    await worker.update_bot_data({"paapi_configured": True})
+
+    restarted = SQLPersistence()
+    assert await restarted.get_user_data() == {
+        42: {"pending_watch": {"asin": "B0TEST", "max_price": 50000}}
+    }
+    assert await restarted.get_chat_data() == {-100123: {"lang": "en"}}
+    assert await restarted.get_bot_data() == {"paapi_configured": True}
+
+
+@pytest.mark.asyncio
+async def test_finished_conversations_are_removed(database):
+    """Emptied data and ended conversations delete their rows."""
+    store = SQLPersistence()
+    await store.update_user_data(42, {"pending_watch": {}})
+    await store.update_user_data(42, {})
+    await store.update_conversation("watch", (42, 42), 2)
+    await store.update_conversation("watch", (7, 7), 1)
+    await store.update_conversation("watch", (7, 7), None)
+    await store.update_chat_data(5, {"x": 1})
+    await store.drop_chat_data(5)
+
+    assert await store.get_user_data() == {}
+    assert await store.get_chat_data() == {}
+    assert await store.get_conversations("watch") == {(42, 42): 2}
@@ -358,3 +358,57 @@ async def test_priority_scheduling(enrichment_service):
         # Verify priority was passed
         args = mock_get_item.call_args
         assert args[1]["priority"] == "high"  # Second positional arg should be priority
+
+
+@pytest.mark.asyncio
+async def test_store_enriched_batch(enrichment_service, test_session, mock_product_data):
+    """Test bulk storing of enriched data for several ASINs."""
+    with patch('bot.data_enrichment.engine', test_session.bind):
+        # One ASIN already exists and must be updated rather than duplicated
+        test_session.add(Product(asin="B08N5WRWNW", title="Old Title"))
+        test_session.commit()
+
+        second_product = dict(mock_product_data, asin="B09XYZ1234", title="Second Laptop")
+        stored = await enrichment_service._store_enriched_batch({
+            "B08N5WRWNW": mock_product_data,
+            "B09XYZ1234": second_product,
+        })
+
+        assert stored == 2
+        test_session.expire_all()
+        assert test_session.get(Product, "B08N5WRWNW").title == "Test Gaming Laptop"
+        assert test_session.get(Product, "B09XYZ1234").title == "Second Laptop"
+        assert len(test_session.exec(select(ProductOffers)).all()) == 2
+        assert len(test_session.exec(select(PriceHistory)).all()) == 2
+        assert test_session.get(CustomerReviews, "B09XYZ1234").review_count == 250
+
+
+@pytest.mark.asyncio
+async def test_enrich_products_batch(enrichment_service, mock_product_data):
+    """Test batch enrichment fetches once per chunk and stores in bulk."""
+    asins = [f"B0000000{i:02d}" for i in range(25)]
+    with patch('bot.data_enrichment.get_items_detailed_batch', new_callable=AsyncMock) as mock_batch, \
+         patch.object(enrichment_service, '_store_enriched_batch', new_callable=AsyncMock) as mock_store:
+        mock_batch.return_value = {asin: mock_product_data for asin in asins}
+        mock_store.return_value = len(asins)
+
+        enriched = await enrichment_service.enrich_products_batch(asins + asins[:5], priority="high")
+
+        assert enriched == 25
+        mock_batch.assert_called_once_with(asins, "high")
+        mock_store.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_enrich_products_batch_quota_exceeded(enrichment_service):
+    """Test batch enrichment defers remaining ASINs when quota runs out."""
+    from bot.errors import QuotaExceededError
+
+    with patch('bot.data_enrichment.get_items_detailed_batch', new_callable=AsyncMock) as mock_batch, \
+         patch.object(enrichment_service, '_schedule_delayed_enrichment', new_callable=AsyncMock) as mock_delay:
+        mock_batch.side_effect = QuotaExceededError("Quota exceeded")
+
+        enriched = await enrichment_service.enrich_products_batch(["B001", "B002"])
+
+        assert enriched == 0
+        assert mock_delay.call_count == 2
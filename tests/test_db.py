@@ -0,0 +1,97 @@
+"""Tests for database engines and async sessions."""
+
+import asyncio
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlmodel import select
+
+from bot.cache_service import get_price_async
+from bot.db import (
+    _engine_kwargs,
+    dispose_async_engine,
+    get_async_engine,
+    get_async_session,
+    to_async_url,
+)
+from bot.models import Cache
+
+
+def test_to_async_url():
+    """Sync URLs are mapped to their async drivers."""
+    assert to_async_url("sqlite:///dealbot.db") == "sqlite+aiosqlite:///dealbot.db"
+    assert (
+        to_async_url("postgresql://u:p@db:5432/deals")
+        == "postgresql+asyncpg://u:p@db:5432/deals"
+    )
+    assert (
+        to_async_url("postgresql+psycopg2://u:p@db/deals")
+        == "postgresql+asyncpg://u:p@db/deals"
+    )
+    assert to_async_url("sqlite+aiosqlite:///x.db") == "sqlite+aiosqlite:///x.db"
+
+    with pytest.raises(ValueError):
+        to_async_url("mysql://u:p@db/deals")
+
+
+def test_pool_size_is_configurable():
+    """Pool settings come from config, except for in-memory SQLite."""
+    with patch("bot.db.settings.DB_POOL_SIZE", 20), patch(
+        "bot.db.settings.DB_MAX_OVERFLOW", 5
+    ):
+        kwargs = _engine_kwargs("postgresql+asyncpg://u:p@db/deals")
+    assert kwargs["pool_size"] == 20
+    assert kwargs["max_overflow"] == 5
+    assert "connect_args" not in kwargs
+
+    assert "pool_size" not in _engine_kwargs("sqlite://")
+    assert _engine_kwargs("sqlite:///dealbot.db")["connect_args"] == {
+        "check_same_thread": False
+    }
+
+
+@pytest.mark.asyncio
+async def test_async_session_round_trip(database):
+    """Rows written through an async session can be read back."""
+    async with get_async_session() as session:
+        session.add(
+            Cache(asin="B000000001", price=129900, fetched_at=datetime.utcnow())
+        )
+        await session.commit()
+
+    async with get_async_session() as session:
+        cached = (
+            await session.exec(select(Cache).where(Cache.asin == "B000000001"))
+        ).first()
+
+    assert cached.price == 129900
+
+
+@pytest.mark.asyncio
+async def test_engine_is_per_event_loop(database):
+    """Each event loop gets its own async engine."""
+    engine = get_async_engine()
+    assert get_async_engine() is engine
+
+    def other_loop():
+        async def get():
+            other = get_async_engine()
+            await dispose_async_engine()
+            return other
+
+        return asyncio.run(get())
+
+    assert await asyncio.to_thread(other_loop) is not engine
+
+
+@pytest.mark.asyncio
+async def test_get_price_async_uses_async_cache(database):
+    """A fresh price is cached through the async engine and served from it."""
+    with patch(
+        "bot.cache_service.get_item_detailed", AsyncMock(return_value={"price": 49900})
+    ) as fetch:
+        assert await get_price_async("B000000002") == 49900
+        assert await get_price_async("B000000002") == 49900
+
+    fetch.assert_awaited_once()
@@ -0,0 +1,136 @@
+"""Tests for the daily digest pipeline."""
+
+from collections import Counter
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from sqlmodel import select
+
+from bot.cache_service import get_prices_async
+from bot.db import get_async_session
+from bot.digest import get_digest_stats, run_digest, select_cards
+from bot.models import Cache, User, Watch
+from bot.outbound import RateLimits
+
+
+async def _seed_users(count: int, watches_per_user: int = 7):
+    async with get_async_session() as session:
+        watch_id = 1
+        for user_id in range(1, count + 1):
+            session.add(User(id=user_id, tg_user_id=1000 + user_id))
+            for n in range(watches_per_user):
+                session.add(
+                    Watch(
+                        id=watch_id,
+                        user_id=user_id,
+                        asin=f"B{n:09d}",
+                        keywords=f"item {n}",
+                        mode="daily",
+                    )
+                )
+                watch_id += 1
+            # Real-time watches are not part of the digest
+            session.add(
+                Watch(
+                    id=watch_id,
+                    user_id=user_id,
+                    asin="BRT0000000",
+                    keywords="rt",
+                    mode="rt",
+                )
+            )
+            watch_id += 1
+        await session.commit()
+
+
+def test_select_cards_applies_discount_and_limit():
+    """Cards honour min_discount against max_price and stop at the limit."""
+    watches = [
+        Watch(
+            id=1,
+            user_id=1,
+            asin="A1",
+            keywords="cheap",
+            min_discount=20,
+            max_price=10000,
+        ),
+        Watch(
+            id=2,
+            user_id=1,
+            asin="A2",
+            keywords="pricey",
+            min_discount=20,
+            max_price=10000,
+        ),
+        Watch(id=3, user_id=1, asin="A3", keywords="unpriced"),
+        Watch(id=4, user_id=1, asin="A4", keywords="any"),
+        Watch(id=5, user_id=1, asin="A5", keywords="over limit"),
+    ]
+    prices = {"A1": 7000, "A2": 9500, "A4": 5000, "A5": 5000}
+
+    cards = select_cards(watches, prices, max_cards=2)
+
+    assert len(cards) == 2
+    assert "cheap" in cards[0].kwargs["caption"]
+    assert "any" in cards[1].kwargs["caption"]
+
+
+@pytest.mark.asyncio
+async def test_run_digest_streams_all_users(database):
+    """Every user is covered once across shards and pages, with prices fetched per page."""
+    await _seed_users(23)
+    bot = Mock()
+    bot.send_photo = AsyncMock()
+    prices = AsyncMock(
+        side_effect=lambda asins, priority: {asin: 1000 for asin in asins}
+    )
+
+    limits = RateLimits(rate=10000, interactive_headroom=0, chat_interval=0)
+    with patch("bot.digest.get_prices_async", prices), patch(
+        "bot.outbound._rate_limits", limits
+    ):
+        result = await run_digest(bot=bot, shards=3, page_size=4, max_cards=5)
+
+    sends = Counter(call.kwargs["chat_id"] for call in bot.send_photo.await_args_list)
+    assert sends == {1000 + user_id: 5 for user_id in range(1, 24)}
+    # 23 users in 3 shards (7, 8 and 8 users) at 4 users per page
+    assert prices.await_count == result["pages"] == 6
+    assert all("BRT0000000" not in call.args[0] for call in prices.await_args_list)
+    assert result["users"] == 23
+    assert result["send"]["sent"] == 115
+    assert not result["running"]
+    assert get_digest_stats()["send"]["sent"] == 115
+
+
+@pytest.mark.asyncio
+async def test_get_prices_async_batches_and_falls_back(database):
+    """Fresh cache is used, misses go to one PA-API batch, then the scraper, then stale cache."""
+    now = datetime.utcnow()
+    async with get_async_session() as session:
+        session.add(Cache(asin="FRESH", price=100, fetched_at=now))
+        session.add(Cache(asin="STALE", price=200, fetched_at=now - timedelta(days=2)))
+        await session.commit()
+
+    batch = AsyncMock(return_value={"PAAPI": {"price": 300}, "STALE": {"price": None}})
+
+    async def scrape_price(asin):
+        if asin != "SCRAPED":
+            raise ValueError(f"No price found for ASIN: {asin}")
+        return 400
+
+    scrape = AsyncMock(side_effect=scrape_price)
+    with patch("bot.cache_service.get_items_detailed_batch", batch), patch(
+        "bot.cache_service.scrape_price", scrape
+    ):
+        prices = await get_prices_async(
+            ["FRESH", "STALE", "PAAPI", "SCRAPED", "MISSING", "PAAPI"]
+        )
+
+    assert prices == {"FRESH": 100, "STALE": 200, "PAAPI": 300, "SCRAPED": 400}
+    batch.assert_awaited_once()
+    assert batch.await_args.args[0] == ["STALE", "PAAPI", "SCRAPED", "MISSING"]
+    async with get_async_session() as session:
+        cached = {c.asin: c.price for c in (await session.exec(select(Cache))).all()}
+    assert cached["PAAPI"] == 300
+    assert cached["SCRAPED"] == 400
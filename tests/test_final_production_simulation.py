@@ -18,6 +18,7 @@ from concurrent.futures import ThreadPoolExecutor
 from bot.watch_flow import _finalize_watch
 from bot.product_selection_models import smart_product_selection
 from bot.cache_service import get_price
+from bot.outbound import OutboundDispatcher, RateLimits
 
 
 class TestProductionSimulation:
@@ -315,6 +316,10 @@ class TestProductionSimulation:
         ]
         
         demo_results = []
+        # Measure the bot, not Telegram's per-chat pacing of the carousel messages
+        dispatcher = OutboundDispatcher(
+            limits=RateLimits(rate=1000, interactive_headroom=0, chat_interval=0)
+        )
         
         for i, query in enumerate(demo_scenarios):
             print(f"\n🎬 Demo Scenario {i+1}: '{query}'")
@@ -342,7 +347,8 @@ class TestProductionSimulation:
                 products = self._generate_realistic_products(8, {"user_type": "normal", "max_price": 50000})
                 print(f"Generated products: {[p.get('brand', 'NO_BRAND') for p in products]}")
 
-                with patch('bot.watch_flow._cached_search_items_advanced', return_value=products):
+                with patch('bot.watch_flow._cached_search_items_advanced', return_value=products), \
+                     patch('bot.watch_flow.get_outbound_dispatcher', return_value=dispatcher):
                     with patch('bot.cache_service.get_price', return_value=45000):
 
                         await _finalize_watch(mock_update, mock_context, watch_data)
@@ -0,0 +1,75 @@
+"""Tests for scheduler leader election."""
+
+from unittest.mock import Mock
+
+import pytest
+
+from bot.db import create_sync_engine
+from bot.leader import LeaderElector
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def db_engine(tmp_path):
+    engine = create_sync_engine(f"sqlite:///{tmp_path / 'leader.db'}")
+    yield engine
+    engine.dispose()
+
+
+def _elector(db_engine, clock, holder):
+    return LeaderElector(db_engine, lease_seconds=30, holder=holder, clock=clock)
+
+
+def test_one_leader_until_its_lease_expires(db_engine):
+    """Only one process holds the lease; another takes over once it is not renewed."""
+    clock = Clock()
+    first, second = _elector(db_engine, clock, "a"), _elector(db_engine, clock, "b")
+
+    assert first.try_acquire()
+    assert not second.try_acquire()
+
+    clock.now += 20
+    assert first.try_acquire()  # Renewed
+    clock.now += 20
+    assert not second.try_acquire()
+
+    clock.now += 31
+    assert second.try_acquire()
+    assert not first.try_acquire()
+
+
+def test_heartbeat_fires_callbacks_and_release_hands_over(db_engine):
+    """Elected/demoted callbacks follow the lease; releasing lets a follower in immediately."""
+    clock = Clock()
+    first, second = _elector(db_engine, clock, "a"), _elector(db_engine, clock, "b")
+    elected, demoted = Mock(), Mock()
+    first._on_elected, first._on_demoted = elected, demoted
+
+    assert first.heartbeat()
+    assert first.heartbeat()
+    elected.assert_called_once()
+
+    first.release()
+    demoted.assert_called_once()
+    assert not first.is_leader
+    assert second.heartbeat()
+
+
+def test_database_errors_demote_the_leader(db_engine):
+    """A leader that cannot renew its lease stops running jobs."""
+    elector = _elector(db_engine, Clock(), "a")
+    demoted = Mock()
+    elector._on_demoted = demoted
+    assert elector.heartbeat()
+
+    db_engine.dispose()
+    elector.engine = create_sync_engine("sqlite:////nonexistent/dir/leader.db")
+    assert not elector.heartbeat()
+    demoted.assert_called_once()
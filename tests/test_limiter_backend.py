@@ -0,0 +1,198 @@
+"""Tests for the shared rate limiter backends."""
+
+import asyncio
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from bot.api_quota_manager import APIQuotaManager
+from bot.api_rate_limiter import APIRateLimiter, ComprehensiveRateLimiter, RateLimitType
+from bot.limiter_backend import (
+    LimiterBackend,
+    MemoryLimiterBackend,
+    RedisLimiterBackend,
+    SQLiteLimiterBackend,
+)
+
+NOW = 1_700_000_000.0
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def backend(request, tmp_path):
+    """Each backend implementation; Redis runs against fakeredis with Lua support."""
+    if request.param == "memory":
+        return MemoryLimiterBackend()
+    if request.param == "sqlite":
+        return SQLiteLimiterBackend(str(tmp_path / "limiter.db"))
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    return RedisLimiterBackend(fakeredis.FakeRedis())
+
+
+def test_token_bucket(backend):
+    """Burst capacity first, then tokens at the refill rate; returned tokens go back in."""
+    assert [backend.take_token("b", 2.0, 3, NOW) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert backend.take_token("b", 2.0, 3, NOW) == pytest.approx(0.5)
+    assert backend.take_token("b", 2.0, 3, NOW + 0.5) == 0.0
+    assert backend.available_tokens("b", 2.0, 3, NOW + 0.5) == pytest.approx(0.0)
+
+    backend.return_token("b", 2.0, 3, NOW + 0.5)
+    assert backend.available_tokens("b", 2.0, 3, NOW + 0.5) == pytest.approx(1.0)
+    assert backend.available_tokens("b", 2.0, 3, NOW + 60) == pytest.approx(3.0)
+
+    backend.delete(["b"])
+    assert backend.available_tokens("b", 2.0, 3, NOW + 0.5) == pytest.approx(3.0)
+
+
+def test_sliding_window(backend):
+    """At most ``limit`` hits per window, counting only recent hits."""
+    results = [backend.hit_window("w", 2, 10, NOW + offset) for offset in (0, 1, 2)]
+    assert [allowed for allowed, _, _ in results] == [True, True, False]
+    assert results[2][1:] == (2, NOW)
+    assert backend.count_window("w", 10, NOW + 5) == 2
+
+    allowed, count, oldest = backend.hit_window("w", 2, 10, NOW + 10.5)
+    assert allowed and count == 2 and oldest == NOW + 1
+
+
+def test_counters(backend):
+    """Counters add up, can be overwritten and vanish once expired."""
+    future = time.time() + 3600
+    assert backend.incr("c", 2, future) == 2
+    assert backend.incr("c", 3, future) == 5
+    backend.set("d", 7)
+    backend.set("gone", 9, time.time() - 1)
+
+    assert backend.get_many(["c", "d", "gone", "missing"]) == [5, 7, 0, 0]
+    backend.delete(["c"])
+    assert backend.get("c") == 0
+
+
+def test_backends_must_implement_every_primitive():
+    """A backend missing a primitive cannot be instantiated."""
+
+    class Partial(LimiterBackend):
+        def get_many(self, keys):
+            return [0 for _ in keys]
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_sqlite_backend_is_shared_between_connections(tmp_path):
+    """Separate backend instances on one file (as in separate processes) draw from one bucket."""
+    path = str(tmp_path / "shared.db")
+    backends = [SQLiteLimiterBackend(path) for _ in range(4)]
+    granted = []
+
+    def worker(backend):
+        for _ in range(10):
+            granted.append(backend.take_token("paapi", 0.001, 15, NOW) == 0.0)
+
+    threads = [threading.Thread(target=worker, args=(backend,)) for backend in backends]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert granted.count(True) == 15
+
+
+@pytest.mark.asyncio
+async def test_rate_limiters_on_one_backend_share_the_rate(tmp_path):
+    """Two PA-API limiters (e.g. bot and scheduler) only get the burst once between them."""
+    backend = SQLiteLimiterBackend(str(tmp_path / "shared.db"))
+    first, second = APIRateLimiter(backend), APIRateLimiter(backend)
+
+    start = time.monotonic()
+    await asyncio.gather(
+        *(
+            limiter.acquire("high")
+            for limiter in (first, second)
+            for _ in range(first.burst_limit)
+        )
+    )
+    elapsed = time.monotonic() - start
+
+    assert elapsed >= first.burst_limit / first.rate_limit - 0.1
+
+
+class SlowBackend(MemoryLimiterBackend):
+    """A backend whose bucket calls block, like a contended SQLite file."""
+
+    def take_token(self, key, rate, capacity, now):
+        time.sleep(0.2)
+        return super().take_token(key, rate, capacity, now)
+
+
+@pytest.mark.asyncio
+async def test_blocking_backend_does_not_stall_the_event_loop():
+    """Tokens are taken in a worker thread, so the loop keeps serving other tasks."""
+    limiter = APIRateLimiter(SlowBackend())
+    ticks = []
+
+    async def ticker():
+        while True:
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+    task = asyncio.create_task(ticker())
+    await limiter.acquire("high")
+    task.cancel()
+
+    assert len(ticks) >= 10
+    assert max(b - a for a, b in zip(ticks, ticks[1:])) < 0.1
+
+
+@pytest.mark.asyncio
+async def test_locked_sqlite_backend_falls_back_to_a_local_bucket(tmp_path):
+    """A SQLite file held by another writer fails fast and the limiter keeps granting."""
+    path = str(tmp_path / "locked.db")
+    backend = SQLiteLimiterBackend(path, timeout=0.05)
+    holder = sqlite3.connect(path, isolation_level=None)
+    holder.execute("BEGIN IMMEDIATE")
+    try:
+        with pytest.raises(sqlite3.OperationalError):
+            backend.take_token("paapi", 1.0, 5, NOW)
+
+        start = time.monotonic()
+        await APIRateLimiter(backend).acquire("high")
+        assert time.monotonic() - start < 1
+    finally:
+        holder.execute("ROLLBACK")
+        holder.close()
+
+
+def test_user_limits_and_quota_survive_a_restart(tmp_path):
+    """Blocks, windows and the daily quota count are read back by a fresh instance."""
+    path = str(tmp_path / "state.db")
+    limiter = ComprehensiveRateLimiter("user", SQLiteLimiterBackend(path))
+    results = [
+        limiter.check_rate_limit("42", RateLimitType.SEARCH_QUERY).allowed
+        for _ in range(11)
+    ]
+    assert results.count(True) == 6
+
+    restarted = ComprehensiveRateLimiter("user", SQLiteLimiterBackend(path))
+    blocked = restarted.check_rate_limit("42", RateLimitType.USER_INPUT)
+    assert not blocked.allowed and blocked.retry_after > 0
+    assert (
+        restarted.get_usage_stats("42", RateLimitType.SEARCH_QUERY)[
+            "requests_in_window"
+        ]
+        == 0
+    )
+    restarted.check_rate_limit("7", RateLimitType.SEARCH_QUERY)
+    assert (
+        restarted.get_usage_stats("7", RateLimitType.SEARCH_QUERY)["requests_in_window"]
+        == 1
+    )
+
+    restarted.reset_identifier("42")
+    assert restarted.check_rate_limit("42", RateLimitType.SEARCH_QUERY).allowed
+
+    manager = APIQuotaManager(SQLiteLimiterBackend(path))
+    manager.daily_quota_used = 120
+    assert APIQuotaManager(SQLiteLimiterBackend(path)).daily_quota_used == 120
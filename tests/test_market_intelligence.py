@@ -1,5 +1,6 @@
 """Tests for Market Intelligence System."""
 
+import numpy as np
 import pytest
 from datetime import datetime, timedelta
 from unittest.mock import Mock, patch, AsyncMock
@@ -7,6 +8,18 @@ from unittest.mock import Mock, patch, AsyncMock
 from bot.market_intelligence import MarketIntelligence
 from bot.enhanced_models import Product, ProductOffers, CustomerReviews, PriceHistory
 from bot.models import Price
+from bot.price_series import SeriesView, to_epoch
+
+
+def series_view(history):
+    """Build the in-memory series view for a list of PriceHistory rows."""
+    prices = np.array([p.price for p in history], dtype=np.int32)
+    return SeriesView(
+        timestamps=np.array([to_epoch(p.timestamp) for p in history], dtype=np.uint32),
+        prices=prices,
+        lows=prices,
+        highs=prices,
+    )
 
 
 class TestMarketIntelligence:
@@ -68,12 +81,12 @@ class TestMarketIntelligence:
 
     @pytest.mark.asyncio
     async def test_analyze_price_trends_enhanced_history(
-        self, market_intel, sample_price_history
+        self, market_intel, sample_price_history, async_session_returning
     ):
         """Test price trend analysis with enhanced history."""
-        with patch('bot.market_intelligence.Session') as mock_session:
-            mock_session.return_value.__enter__.return_value.exec.return_value.all.return_value = sample_price_history
-            
+        discount_rows = [(p.timestamp, p.discount_percentage) for p in sample_price_history]
+        with patch('bot.market_intelligence.load_price_series', AsyncMock(return_value=series_view(sample_price_history))), \
+             patch('bot.market_intelligence.get_async_session', async_session_returning(discount_rows)):
             result = await market_intel.analyze_price_trends("B0TEST123", "1month")
             
             assert "error" not in result
@@ -84,11 +97,10 @@ class TestMarketIntelligence:
             assert "trend_analysis" in result
 
     @pytest.mark.asyncio
-    async def test_analyze_price_trends_no_history(self, market_intel):
+    async def test_analyze_price_trends_no_history(self, market_intel, async_session_returning):
         """Test price trend analysis with no history."""
-        with patch('bot.market_intelligence.Session') as mock_session:
-            mock_session.return_value.__enter__.return_value.exec.return_value.all.return_value = []
-            
+        with patch('bot.market_intelligence.load_price_series', AsyncMock(return_value=series_view([]))), \
+             patch('bot.market_intelligence.get_async_session', async_session_returning([])):
             result = await market_intel.analyze_price_trends("B0NOHISTORY", "1month")
             
             assert "error" in result
@@ -321,7 +333,7 @@ class TestMarketIntelligence:
     @pytest.mark.asyncio
     async def test_error_handling(self, market_intel):
         """Test error handling in market intelligence."""
-        with patch('bot.market_intelligence.Session', side_effect=Exception("Database error")):
+        with patch('bot.market_intelligence.load_price_series', AsyncMock(side_effect=Exception("Database error"))):
             result = await market_intel.analyze_price_trends("B0ERROR", "1month")
             
             assert "error" in result
@@ -332,7 +344,7 @@ class TestMarketIntelligenceIntegration:
     """Integration tests for Market Intelligence."""
 
     @pytest.mark.asyncio
-    async def test_full_analysis_pipeline(self):
+    async def test_full_analysis_pipeline(self, async_session_returning):
         """Test complete analysis pipeline."""
         market_intel = MarketIntelligence()
         
@@ -365,7 +377,9 @@ class TestMarketIntelligenceIntegration:
             mock_session_instance.exec.return_value.first.return_value = offer
             
             # Test trend analysis
-            trends = await market_intel.analyze_price_trends("B0TEST123", "1month")
+            with patch('bot.market_intelligence.load_price_series', AsyncMock(return_value=series_view(price_history))), \
+                 patch('bot.market_intelligence.get_async_session', async_session_returning([])):
+                trends = await market_intel.analyze_price_trends("B0TEST123", "1month")
             assert "error" not in trends
             assert trends["data_points"] == 30
             
@@ -0,0 +1,101 @@
+"""Tests for Migration 002 (query indexes and SQLite tuning)."""
+
+import pytest
+from sqlalchemy import inspect, text
+from sqlmodel import SQLModel
+
+from bot.db import create_sync_engine
+from bot.migrations.migration_002_query_indexes import INDEXED_TABLES, Migration002
+
+TREND_QUERY = (
+    "SELECT * FROM pricehistory WHERE asin = 'B08N5WRWNW' "
+    "AND timestamp >= '2025-01-01' ORDER BY timestamp"
+)
+
+
+@pytest.fixture
+def legacy_engine(tmp_path):
+    """Create a file database with all tables but none of the new indexes."""
+    engine = create_sync_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    SQLModel.metadata.create_all(engine)
+    for table in INDEXED_TABLES:
+        for index in table.__table__.indexes:
+            index.drop(engine)
+    return engine
+
+
+@pytest.fixture
+def migration(legacy_engine):
+    """Create migration instance bound to the legacy database."""
+    migration = Migration002()
+    migration.engine = legacy_engine
+    return migration
+
+
+def _index_names(engine, table_name):
+    return {index["name"] for index in inspect(engine).get_indexes(table_name)}
+
+
+def _query_plan(engine, query):
+    with engine.connect() as conn:
+        return " ".join(
+            row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {query}"))
+        )
+
+
+@pytest.mark.asyncio
+async def test_migration_creates_composite_indexes(migration, legacy_engine):
+    """All composite indexes exist after the upgrade."""
+    assert "SCAN pricehistory" in _query_plan(legacy_engine, TREND_QUERY)
+
+    assert await migration.upgrade() is True
+
+    assert "ix_pricehistory_asin_timestamp" in _index_names(
+        legacy_engine, "pricehistory"
+    )
+    assert "ix_price_asin_fetched_at" in _index_names(legacy_engine, "price")
+    assert "ix_dealalert_asin_sent_at" in _index_names(legacy_engine, "dealalert")
+    assert "ix_watch_user_id_created" in _index_names(legacy_engine, "watch")
+    assert "ix_searchquery_user_id_timestamp" in _index_names(
+        legacy_engine, "searchquery"
+    )
+
+
+@pytest.mark.asyncio
+async def test_trend_query_uses_index(migration, legacy_engine):
+    """Trend queries search the index instead of scanning, with no sort step."""
+    assert await migration.upgrade() is True
+
+    plan = _query_plan(legacy_engine, TREND_QUERY)
+    assert "USING INDEX ix_pricehistory_asin_timestamp" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+@pytest.mark.asyncio
+async def test_migration_enables_wal_and_is_idempotent(migration, legacy_engine):
+    """The database switches to WAL and the upgrade can be re-run."""
+    assert await migration.upgrade() is True
+    assert await migration.upgrade() is True
+
+    with legacy_engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+
+
+@pytest.mark.asyncio
+async def test_migration_rollback(migration, legacy_engine):
+    """Downgrade removes the indexes."""
+    assert await migration.upgrade() is True
+    assert await migration.downgrade() is True
+
+    assert "ix_pricehistory_asin_timestamp" not in _index_names(
+        legacy_engine, "pricehistory"
+    )
+    assert "ix_watch_user_id_created" not in _index_names(legacy_engine, "watch")
+
+
+def test_connection_pragmas(legacy_engine):
+    """New connections get synchronous=NORMAL and the tuned cache/mmap sizes."""
+    with legacy_engine.connect() as conn:
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA cache_size")).scalar() == -65536
+        assert conn.execute(text("PRAGMA mmap_size")).scalar() == 256 * 1024 * 1024
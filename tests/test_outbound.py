@@ -0,0 +1,311 @@
+"""Tests for the central outbound Telegram dispatcher."""
+
+import asyncio
+import sqlite3
+import time
+from collections import defaultdict
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.error import BadRequest, Forbidden, RetryAfter, TimedOut
+
+from bot.limiter_backend import SQLiteLimiterBackend
+from bot.outbound import (
+    OutboundDispatcher,
+    Priority,
+    RateLimits,
+    TokenBucket,
+    carousel_messages,
+    combined_text_messages,
+    get_outbound_dispatcher,
+    photo_message,
+    text_message,
+)
+
+
+def recording_bot(side_effects=None):
+    """Bot double that records send times per chat."""
+    bot = Mock()
+    bot.sent = defaultdict(list)
+    side_effects = side_effects or {}
+
+    async def send(chat_id, **kwargs):
+        effects = side_effects.get(chat_id)
+        if effects:
+            effect = effects.pop(0)
+            if effect is not None:
+                raise effect
+        bot.sent[chat_id].append(time.monotonic())
+        return kwargs
+
+    bot.send_photo = AsyncMock(side_effect=send)
+    bot.send_message = AsyncMock(side_effect=send)
+    return bot
+
+
+def dispatcher_for(bot, rate=1000, chat_interval=0, chat_burst=1, **kwargs):
+    limits = RateLimits(
+        rate=rate,
+        interactive_headroom=0,
+        chat_interval=chat_interval,
+        chat_burst=chat_burst,
+    )
+    return OutboundDispatcher(bot=bot, limits=limits, **kwargs)
+
+
+def cards(count):
+    return [photo_message("img.png", f"card {i}") for i in range(count)]
+
+
+def test_token_bucket_reservations_queue_up():
+    """Reservations beyond the capacity wait in turn; a pause delays everyone."""
+    bucket = TokenBucket(rate=10, capacity=2)
+    delays = [bucket.reserve() for _ in range(4)]
+    assert delays[:2] == [0.0, 0.0]
+    assert delays[2] == pytest.approx(0.1, abs=0.01)
+    assert delays[3] == pytest.approx(0.2, abs=0.01)
+
+    bucket.pause(1.0)
+    assert bucket.reserve() == pytest.approx(1.3, abs=0.02)
+
+
+@pytest.mark.asyncio
+async def test_global_rate_is_respected():
+    """Queued sends across many chats are spaced by the global rate."""
+    bot = recording_bot()
+    dispatcher = dispatcher_for(bot, rate=100, workers=20)
+    futures = [await dispatcher.submit(chat_id, cards(1)) for chat_id in range(130)]
+    await asyncio.gather(*futures)
+    await dispatcher.close()
+
+    times = sorted(t for sends in bot.sent.values() for t in sends)
+    assert len(times) == 130
+    # The first second's worth goes out as a burst, the rest at the rate
+    assert times[-1] - times[0] >= 29 / 100 * 0.9
+    stats = dispatcher.get_stats()
+    assert stats["bulk"]["sent"] == 130
+    assert stats["backlog"] == 0
+
+
+@pytest.mark.asyncio
+async def test_global_rate_is_shared_between_processes(tmp_path):
+    """Rate limits on one shared limiter backend draw from one global bucket."""
+    backend = SQLiteLimiterBackend(str(tmp_path / "limiter.db"))
+    first, second = (
+        RateLimits(rate=5, interactive_headroom=0, chat_interval=0, backend=backend)
+        for _ in range(2)
+    )
+    for chat_id in range(5):
+        await first.acquire(chat_id, Priority.INTERACTIVE)
+
+    started = time.monotonic()
+    await second.acquire(99, Priority.INTERACTIVE)
+    assert time.monotonic() - started >= 0.15
+
+
+@pytest.mark.asyncio
+async def test_unavailable_backend_falls_back_to_the_local_rate():
+    """A failing limiter backend does not stop sends."""
+    backend = Mock()
+    backend.take_token.side_effect = sqlite3.OperationalError("database is locked")
+    limits = RateLimits(
+        rate=5, interactive_headroom=0, chat_interval=0, backend=backend
+    )
+
+    await asyncio.wait_for(limits.acquire(1, Priority.INTERACTIVE), timeout=1)
+    backend.take_token.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_per_chat_interval_is_respected():
+    """Messages to one chat are spaced by the chat interval without stalling other chats."""
+    bot = recording_bot()
+    dispatcher = dispatcher_for(bot, chat_interval=0.05, workers=4)
+    first = await dispatcher.submit(1, cards(3))
+    second = await dispatcher.submit(2, cards(1))
+    assert await first == {"sent": 3, "failed": 0, "blocked": 0}
+    await second
+    await dispatcher.close()
+
+    gaps = [b - a for a, b in zip(bot.sent[1], bot.sent[1][1:])]
+    assert len(gaps) == 2
+    assert all(gap >= 0.045 for gap in gaps)
+    # Chat 2 was served while chat 1 waited
+    assert bot.sent[2][0] < bot.sent[1][-1]
+
+
+@pytest.mark.asyncio
+async def test_alerts_are_served_before_bulk():
+    """Queued alerts overtake bulk work submitted before them."""
+    release = asyncio.Event()
+    order = []
+
+    async def send_message(chat_id, **kwargs):
+        await release.wait()
+        order.append(chat_id)
+
+    bot = Mock()
+    bot.send_message = AsyncMock(side_effect=send_message)
+    dispatcher = dispatcher_for(bot, workers=1)
+    futures = [
+        await dispatcher.submit(chat_id, [text_message("digest")])
+        for chat_id in (1, 2, 3)
+    ]
+    await asyncio.sleep(0.01)  # The worker takes chat 1 and blocks
+    futures.append(await dispatcher.submit(9, [text_message("alert")], Priority.ALERT))
+
+    release.set()
+    await asyncio.gather(*futures)
+    await dispatcher.close()
+    assert order == [1, 9, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_flood_wait_and_network_errors_are_retried():
+    """RetryAfter and timeouts are retried; the message is still delivered."""
+    bot = recording_bot({1: [RetryAfter(0), TimedOut()]})
+    dispatcher = dispatcher_for(bot, max_retries=3)
+    await dispatcher.send(1, cards(1), Priority.ALERT)
+
+    stats = dispatcher.get_stats()["alert"]
+    assert stats["sent"] == 1
+    assert stats["flood_waits"] == 1
+    assert stats["retries"] == 2
+
+
+@pytest.mark.asyncio
+async def test_flood_wait_pauses_other_senders():
+    """A RetryAfter holds back sends to every chat, not just the one that hit it."""
+    bot = recording_bot({1: [RetryAfter(1)]})
+    dispatcher = dispatcher_for(bot)
+
+    async def later():
+        await asyncio.sleep(0.05)  # After chat 1 hit the flood wait
+        await dispatcher.send(2, cards(1))
+
+    started = time.monotonic()
+    await asyncio.gather(dispatcher.send(1, cards(1)), later())
+    assert bot.sent[2][0] - started >= 0.9
+    assert dispatcher.get_stats()["interactive"]["flood_waits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_blocked_chat_and_bad_request_are_not_retried():
+    """A chat that blocked the bot is skipped; bad requests fail once."""
+    bot = recording_bot(
+        {1: [Forbidden("bot was blocked")], 2: [BadRequest("bad caption")]}
+    )
+    dispatcher = dispatcher_for(bot, workers=2)
+    blocked = await dispatcher.submit(1, cards(3))
+    bad = await dispatcher.submit(2, cards(2))
+
+    assert await blocked == {"sent": 0, "failed": 0, "blocked": 3}
+    assert await bad == {"sent": 1, "failed": 1, "blocked": 0}
+    await dispatcher.close()
+    assert bot.send_photo.await_count == 3
+
+    with pytest.raises(BadRequest):
+        bot.send_photo.side_effect = BadRequest("bad caption")
+        await dispatcher.send(3, cards(1))
+
+
+@pytest.mark.asyncio
+async def test_full_backlog_blocks_producer():
+    """``submit`` waits once the backlog is full."""
+    release = asyncio.Event()
+
+    async def send_photo(**kwargs):
+        await release.wait()
+
+    bot = Mock()
+    bot.send_photo = AsyncMock(side_effect=send_photo)
+    dispatcher = dispatcher_for(bot, workers=1, max_backlog=2)
+
+    await dispatcher.submit(1, cards(1))
+    await asyncio.sleep(0.01)  # Worker takes chat 1
+    await dispatcher.submit(2, cards(1))
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(dispatcher.submit(3, cards(1)), timeout=0.05)
+    assert dispatcher.get_stats()["backlog"] == 1
+
+    release.set()
+    await dispatcher.close()
+
+
+@pytest.mark.asyncio
+async def test_send_to_chat_uses_its_own_bot():
+    """A ``Chat`` target is sent through its shortcut methods, keyed by its id."""
+    chat = Mock(id=42)
+    chat.send_message = AsyncMock(return_value="ok")
+    dispatcher = get_outbound_dispatcher()
+
+    assert await dispatcher.send(chat, [text_message("hi")]) == ["ok"]
+    chat.send_message.assert_awaited_once_with(
+        text="hi", reply_markup=None, parse_mode=None
+    )
+    assert get_outbound_dispatcher() is dispatcher
+
+
+def test_carousel_coalesces_photo_cards():
+    """Photo cards become one media group and one numbered keyboard message."""
+
+    def card(n, image):
+        keyboard = InlineKeyboardMarkup(
+            [[InlineKeyboardButton("🛒 Buy", url=f"https://amazon.in/dp/A{n}")]]
+        )
+        return {"caption": f"card {n}", "image": image, "keyboard": keyboard}
+
+    messages = carousel_messages(
+        [card(1, "https://img/1.jpg"), card(2, "https://img/2.jpg"), card(3, "")]
+    )
+
+    assert [m.method for m in messages] == [
+        "send_media_group",
+        "send_message",
+        "send_message",
+    ]
+    media = messages[0].kwargs["media"]
+    assert [item.caption for item in media] == ["card 1", "card 2"]
+    buttons = [row[0] for row in messages[1].kwargs["reply_markup"].inline_keyboard]
+    assert [b.text for b in buttons] == ["1. 🛒 Buy", "2. 🛒 Buy"]
+    assert buttons[1].url == "https://amazon.in/dp/A2"
+    assert messages[2].kwargs["text"] == "card 3"
+
+    single = carousel_messages([card(1, "https://img/1.jpg")])
+    assert [m.method for m in single] == ["send_photo"]
+
+
+def test_combined_text_messages_merge_cards():
+    """Cards become one numbered text message carrying every card's buttons."""
+    keyboard = InlineKeyboardMarkup([[InlineKeyboardButton("🛒 Buy", url="https://a")]])
+    cards = [{"caption": f"card {n}", "keyboard": keyboard} for n in (1, 2)]
+
+    messages = combined_text_messages(cards)
+
+    assert len(messages) == 1
+    assert messages[0].kwargs["text"] == "1. card 1\n\n2. card 2"
+    buttons = [
+        row[0].text for row in messages[0].kwargs["reply_markup"].inline_keyboard
+    ]
+    assert buttons == ["1. 🛒 Buy", "2. 🛒 Buy"]
+
+    long_cards = [{"caption": "x" * 3000} for _ in range(2)]
+    assert len(combined_text_messages(long_cards)) == 2
+
+
+@pytest.mark.asyncio
+async def test_rejected_carousel_falls_back_to_one_text_message():
+    """A failed media group is replaced by a single combined message, not one per card."""
+    from bot.watch_flow import _send_product_cards
+
+    dispatcher = Mock()
+    dispatcher.send = AsyncMock(side_effect=[BadRequest("bad image"), ["ok"]])
+    cards = [{"caption": f"card {n}", "image": f"https://img/{n}.jpg"} for n in (1, 2)]
+
+    with patch("bot.watch_flow.get_outbound_dispatcher", return_value=dispatcher):
+        await _send_product_cards(Mock(), cards)
+
+    assert dispatcher.send.await_count == 2
+    fallback = dispatcher.send.await_args_list[1].args[1]
+    assert [m.kwargs["text"] for m in fallback] == ["1. card 1\n\n2. card 2"]
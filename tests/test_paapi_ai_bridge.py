@@ -351,6 +351,69 @@ class TestAiSearchFunctionality:
         assert result == {}
 
 
+class TestEventLoopResponsiveness:
+    """Regression tests: PA-API calls must not block the bot's event loop."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_searches_do_not_block_event_loop(self):
+        """Slow PA-API responses are awaited on the shared transport while other coroutines keep ticking."""
+        import time
+
+        import httpx
+
+        from bot.paapi_transport import PaapiTransport
+
+        sdk_latency = 0.2
+        requests = []
+
+        async def slow_paapi(request):
+            requests.append(request)
+            await asyncio.sleep(sdk_latency)  # Simulate a slow HTTP round-trip
+            return httpx.Response(200, content=b'{"SearchResult": {"Items": []}}')
+
+        transport = PaapiTransport(access_key="a", secret_key="b", host="webservices.amazon.in", region="eu-west-1")
+        transport._create_client = lambda: httpx.AsyncClient(
+            base_url="https://webservices.amazon.in", transport=httpx.MockTransport(slow_paapi)
+        )
+
+        mock_settings = Mock(PAAPI_TAG='test-21', PAAPI_MARKETPLACE='www.amazon.in')
+
+        max_lag = 0.0
+        stop = asyncio.Event()
+
+        async def heartbeat():
+            nonlocal max_lag
+            interval = 0.01
+            while not stop.is_set():
+                tick = time.perf_counter()
+                await asyncio.sleep(interval)
+                max_lag = max(max_lag, time.perf_counter() - tick - interval)
+
+        with patch('bot.paapi_ai_bridge.get_paapi_transport', return_value=transport), \
+             patch('bot.paapi_ai_bridge.settings', mock_settings):
+            monitor = asyncio.create_task(heartbeat())
+            started = time.perf_counter()
+            results = await asyncio.gather(*[
+                search_products_with_ai_analysis(
+                    keywords=f'event loop lag probe {i}',
+                    enable_ai_analysis=False,
+                )
+                for i in range(5)
+            ])
+            elapsed = time.perf_counter() - started
+            stop.set()
+            await monitor
+        await transport.close()
+
+        assert len(requests) == 5
+        assert all(request.url.path == "/paapi5/searchitems" for request in requests)
+        assert all(result['products'] == [] for result in results)
+        # The loop never stalls for a full PA-API round-trip...
+        assert max_lag < sdk_latency / 2
+        # ...and the searches overlap instead of running back to back
+        assert elapsed < sdk_latency * 5
+
+
 class TestPerformanceTracking:
     """Test performance tracking functionality."""
 
@@ -0,0 +1,260 @@
+"""Tests for PA-API request coalescing."""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from bot.errors import QuotaExceededError
+from bot.paapi_coalescer import PaapiRequestCoalescer, get_request_coalescer
+
+# Bound at import: concurrent tests elsewhere patch the module attribute
+from bot.paapi_factory import get_item_detailed, search_items_advanced
+
+
+@pytest.fixture
+def coalescer():
+    """Create a coalescer with a short batching window."""
+    return PaapiRequestCoalescer(batch_window_ms=5)
+
+
+@pytest.mark.asyncio
+async def test_identical_requests_share_one_call(coalescer):
+    """Concurrent identical requests result in a single underlying call."""
+    calls = 0
+
+    async def search():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return [{"asin": "B000000001"}]
+
+    results = await asyncio.gather(
+        *[coalescer.run(("search", "laptop"), search) for _ in range(20)]
+    )
+
+    assert calls == 1
+    assert all(result == [{"asin": "B000000001"}] for result in results)
+    # Each caller gets its own list
+    assert results[0] is not results[1]
+    assert coalescer.stats["coalesced"] == 19
+    assert coalescer.get_stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_different_keys_are_not_merged(coalescer):
+    """Requests with different parameters each reach PA-API."""
+    call = AsyncMock(return_value=[])
+
+    await asyncio.gather(
+        coalescer.run(("search", "laptop", 1000), call),
+        coalescer.run(("search", "laptop", 2000), call),
+    )
+
+    assert call.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_finished_request_is_not_reused(coalescer):
+    """Coalescing only covers in-flight requests, not completed ones."""
+    call = AsyncMock(return_value={"ok": True})
+
+    await coalescer.run(("browse", 1), call)
+    await coalescer.run(("browse", 1), call)
+
+    assert call.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_errors_are_shared_with_all_waiters(coalescer):
+    """A failed request raises the same error for every caller."""
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise QuotaExceededError("quota")
+
+    results = await asyncio.gather(
+        *[coalescer.run(("search", "x"), failing) for _ in range(3)],
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, QuotaExceededError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_call(coalescer):
+    """One caller giving up leaves the call running for the others."""
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    first = asyncio.create_task(coalescer.run("key", slow))
+    second = asyncio.create_task(coalescer.run("key", slow))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == "done"
+
+
+@pytest.mark.asyncio
+async def test_item_lookups_merge_into_one_batch(coalescer):
+    """Lookups for different ASINs within the window become one GetItems call."""
+    fetch = AsyncMock(
+        side_effect=lambda asins, priority: {asin: {"asin": asin} for asin in asins}
+    )
+
+    asins = [f"B00000000{i}" for i in range(5)]
+    results = await asyncio.gather(
+        *[coalescer.get_item(asin, "normal", fetch) for asin in asins]
+    )
+
+    assert [result["asin"] for result in results] == asins
+    fetch.assert_awaited_once()
+    assert fetch.await_args.args[0] == asins
+
+
+@pytest.mark.asyncio
+async def test_item_lookups_split_at_batch_limit(coalescer):
+    """No merged GetItems call carries more than 10 ASINs."""
+    fetch = AsyncMock(
+        side_effect=lambda asins, priority: {asin: {"asin": asin} for asin in asins}
+    )
+
+    asins = [f"B0000000{i:02d}" for i in range(25)]
+    await asyncio.gather(*[coalescer.get_item(asin, "normal", fetch) for asin in asins])
+
+    batch_sizes = [len(call.args[0]) for call in fetch.await_args_list]
+    assert batch_sizes == [10, 10, 5]
+
+
+@pytest.mark.asyncio
+async def test_viral_asin_costs_one_lookup(coalescer):
+    """Many users opening the same ASIN share one lookup."""
+    fetch = AsyncMock(
+        side_effect=lambda asins, priority: {asin: {"asin": asin} for asin in asins}
+    )
+
+    results = await asyncio.gather(
+        *[coalescer.get_item("B0VIRAL001", "high", fetch) for _ in range(50)]
+    )
+
+    assert len(results) == 50
+    fetch.assert_awaited_once()
+    assert fetch.await_args.args[0] == ["B0VIRAL001"]
+    assert coalescer.stats["item_lookups_coalesced"] == 49
+    # Each caller gets its own dict
+    results[0]["annotated"] = True
+    assert "annotated" not in results[1]
+
+
+@pytest.mark.asyncio
+async def test_batch_uses_highest_member_priority(coalescer):
+    """A merged batch is fetched at the most urgent priority among its callers."""
+    fetch = AsyncMock(
+        side_effect=lambda asins, priority: {asin: {"asin": asin} for asin in asins}
+    )
+
+    await asyncio.gather(
+        coalescer.get_item("B000000001", "low", fetch),
+        coalescer.get_item("B000000002", "high", fetch),
+    )
+
+    assert fetch.await_args.args[1] == "high"
+
+
+@pytest.mark.asyncio
+async def test_missing_item_raises_for_that_asin_only(coalescer):
+    """An ASIN absent from the batch response fails without affecting others."""
+    fetch = AsyncMock(return_value={"B000000001": {"asin": "B000000001"}})
+
+    found, missing = await asyncio.gather(
+        coalescer.get_item("B000000001", "normal", fetch),
+        coalescer.get_item("B000000002", "normal", fetch),
+        return_exceptions=True,
+    )
+
+    assert found == {"asin": "B000000001"}
+    assert isinstance(missing, ValueError)
+
+
+@pytest.mark.asyncio
+async def test_batch_error_propagates_to_all_lookups(coalescer):
+    """A quota error on the merged batch reaches every waiting caller."""
+    fetch = AsyncMock(side_effect=QuotaExceededError("quota"))
+
+    results = await asyncio.gather(
+        coalescer.get_item("B000000001", "normal", fetch),
+        coalescer.get_item("B000000002", "normal", fetch),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, QuotaExceededError) for result in results)
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("fresh_paapi_state")
+async def test_factory_routes_item_lookups_through_batches():
+    """Factory single-item lookups are served by one batched client call."""
+    client = AsyncMock()
+    client.get_items_detailed_batch.side_effect = lambda asins, priority: {
+        asin: {"asin": asin} for asin in asins
+    }
+
+    with patch("bot.paapi_factory.get_paapi_client", AsyncMock(return_value=client)):
+        results = await asyncio.gather(
+            get_item_detailed("B000000001", priority="high"),
+            get_item_detailed("B000000002"),
+            get_item_detailed("B000000001"),
+        )
+
+    assert [result["asin"] for result in results] == [
+        "B000000001",
+        "B000000002",
+        "B000000001",
+    ]
+    client.get_items_detailed_batch.assert_awaited_once_with(
+        ["B000000001", "B000000002"], "high"
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("fresh_paapi_state")
+async def test_factory_coalesces_identical_searches():
+    """Identical factory searches share a call regardless of caller priority."""
+
+    async def search(**kwargs):
+        await asyncio.sleep(0.02)
+        return [{"asin": "B000000001"}]
+
+    client = AsyncMock()
+    client.search_items_advanced.side_effect = search
+
+    with patch("bot.paapi_factory.get_paapi_client", AsyncMock(return_value=client)):
+        await asyncio.gather(
+            search_items_advanced(
+                keywords="monitor", max_price=2000000, priority="high"
+            ),
+            search_items_advanced(
+                keywords="monitor", max_price=2000000, priority="low"
+            ),
+            search_items_advanced(keywords="monitor", max_price=3000000),
+        )
+
+    assert client.search_items_advanced.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_coalescer_is_per_event_loop():
+    """Each event loop gets its own coalescer."""
+    coalescer = get_request_coalescer()
+    assert get_request_coalescer() is coalescer
+
+    def other_loop():
+        async def get():
+            return get_request_coalescer()
+
+        return asyncio.run(get())
+
+    other = await asyncio.to_thread(other_loop)
+    assert other is not coalescer
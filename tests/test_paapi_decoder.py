@@ -0,0 +1,169 @@
+"""Tests for the single-pass PA-API response decoder."""
+
+import json
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from paapi5_python_sdk.api_client import ApiClient
+
+from bot.paapi_ai_bridge import transform_paapi_to_ai_format
+from bot.paapi_decoder import decode_get_items_response, decode_search_response
+from bot.paapi_official import OfficialPaapiClient
+from bot.product_record import ProductRecord
+
+FIXTURES = Path(__file__).parent / "fixtures" / "paapi"
+SEARCH_BODY = (FIXTURES / "search_items_gaming_monitor.json").read_bytes()
+GET_ITEMS_BODY = (FIXTURES / "get_items_monitors.json").read_bytes()
+
+
+def _sdk_items(body, response_type):
+    """Items as the SDK deserializes them (the old decoding path)."""
+    api_client = ApiClient(
+        access_key="a", secret_key="b", host="webservices.amazon.in", region="eu-west-1"
+    )
+    response = api_client.deserialize(
+        SimpleNamespace(data=body.decode()), response_type
+    )
+    result = (
+        response.search_result
+        if response_type == "SearchItemsResponse"
+        else response.items_result
+    )
+    return result.items
+
+
+def test_search_response_is_decoded_in_order():
+    """Every item becomes a record, with prices in paise and offer fallbacks applied."""
+    records = decode_search_response(SEARCH_BODY)
+    raw_items = json.loads(SEARCH_BODY)["SearchResult"]["Items"]
+
+    assert [record.asin for record in records] == [item["ASIN"] for item in raw_items]
+    first = records[0]
+    listing = raw_items[0]["Offers"]["Listings"][0]
+    assert first.price == round(listing["Price"]["Amount"] * 100)
+    assert first.list_price == round(listing["SavingBasis"]["Amount"] * 100)
+    assert first.savings_percent == listing["Price"]["Savings"]["Percentage"]
+    assert first.brand == "LG" and first.model == "27GP850-B"
+    assert first.technical_details == {"Format": "IPS, QHD"}
+    assert first.dimensions == "45.2 x 61.4 x 21.3 centimeters"
+    assert first.categories[0] == {
+        "id": "1375425031",
+        "name": "Monitors",
+        "is_root": False,
+    }
+
+    # Sparse items: without a listing the lowest offer summary price is used
+    assert "Listings" not in raw_items[8]["Offers"]
+    assert records[8].price == round(
+        raw_items[8]["Offers"]["Summaries"][0]["LowestPrice"]["Amount"] * 100
+    )
+    assert (
+        records[8].brand is None
+        and records[8].image_url is None
+        and records[8].features == []
+    )
+
+
+@pytest.mark.asyncio
+async def test_ai_format_matches_sdk_transformation():
+    """The decoded AI format agrees with transforming the SDK's model objects."""
+    records = decode_search_response(SEARCH_BODY)
+    sdk_items = _sdk_items(SEARCH_BODY, "SearchItemsResponse")
+
+    for record, sdk_item in zip(records, sdk_items):
+        expected = await transform_paapi_to_ai_format(sdk_item)
+        decoded = record.to_ai_dict()
+        if not sdk_item.offers.listings:
+            # The old transformation ignored the offer summaries' lowest price
+            assert expected["price"] is None and decoded["price"]
+            expected["price"] = decoded["price"]
+        for key in (
+            "asin",
+            "title",
+            "features",
+            "price",
+            "image_url",
+            "brand",
+            "manufacturer",
+            "rating_count",
+            "average_rating",
+            "availability",
+        ):
+            assert decoded[key] == expected[key], (record.asin, key)
+        assert decoded["product_info"].get("color") == expected["product_info"].get(
+            "color"
+        )
+        assert decoded["technical_details"].get("Model") == expected[
+            "technical_details"
+        ].get("Model")
+
+
+def test_get_items_response_reads_offers_v2():
+    """GetItems items carry OffersV2 listings; request errors do not drop valid items."""
+    records = decode_get_items_response(GET_ITEMS_BODY)
+    raw_items = json.loads(GET_ITEMS_BODY)["ItemsResult"]["Items"]
+
+    assert len(records) == len(raw_items) == 4
+    price = raw_items[0]["OffersV2"]["Listings"][0]["Price"]
+    detailed = records[0].to_detailed_dict()
+    assert detailed["price"] == round(price["Money"]["Amount"] * 100)
+    assert detailed["offers"]["list_price"] == round(
+        price["SavingBasis"]["Money"]["Amount"] * 100
+    )
+    assert detailed["offers"]["savings_percent"] == price["Savings"]["Percentage"]
+    assert detailed["offers"]["merchant"] == "Appario Retail Private Ltd"
+    assert detailed["offers"]["availability"] == detailed["availability"] == "In stock"
+    assert detailed["image_url"] == detailed["images"]["large"]
+    assert detailed["currency"] == "INR"
+
+
+def test_empty_and_error_only_responses():
+    """Responses without a result section decode to no records."""
+    assert decode_search_response(b"{}") == []
+    assert (
+        decode_get_items_response(
+            {"Errors": [{"Code": "ItemNotAccessible", "Message": "x"}]}
+        )
+        == []
+    )
+
+
+def test_record_round_trips_through_legacy_dicts():
+    """Dictionaries produced from a record rebuild an equivalent record."""
+    record = decode_search_response(SEARCH_BODY)[0]
+    rebuilt = ProductRecord.from_dict(record.to_ai_dict())
+
+    assert rebuilt.asin == record.asin
+    assert rebuilt.price == record.price
+    assert rebuilt.list_price == record.list_price
+    assert rebuilt.features == record.features
+    assert rebuilt.image_url == record.image_url
+    assert (
+        ProductRecord.from_dict(record.to_batch_dict()).review_count
+        == record.review_count
+    )
+
+
+@pytest.mark.asyncio
+async def test_client_decodes_the_transport_body():
+    """Batch results come from decoding the raw GetItems body."""
+    client = OfficialPaapiClient.__new__(OfficialPaapiClient)
+    client.transport = Mock(get_items=AsyncMock(return_value=GET_ITEMS_BODY))
+    client.resource_manager = Mock()
+    client.resource_manager.get_detailed_resources.return_value = []
+
+    asins = ["B000INVALID"] + [
+        record.asin for record in decode_get_items_response(GET_ITEMS_BODY)
+    ]
+    with patch(
+        "bot.paapi_official.settings",
+        Mock(PAAPI_TAG="tag-21", PAAPI_MARKETPLACE="www.amazon.in"),
+    ):
+        results = await client._fetch_items_batch(asins)
+
+    request = client.transport.get_items.await_args.args[0]
+    assert request.item_ids == asins
+    assert len(results) == 4
+    assert all(item["price"] and item["url"] for item in results.values())
@@ -0,0 +1,153 @@
+"""Tests for rate-limit-aware SearchItems pagination."""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from bot.paapi_official import OfficialPaapiClient
+
+
+def _make_page(page, count, price=100000):
+    """Build a raw SearchItems response body with ``count`` items priced in paise."""
+    items = [
+        {
+            "ASIN": f"P{page}I{i}",
+            "Offers": {
+                "Listings": [{"Price": {"Amount": price / 100, "Currency": "INR"}}]
+            },
+        }
+        for i in range(count)
+    ]
+    payload = {"SearchResult": {"Items": items}} if items else {}
+    return json.dumps(payload).encode()
+
+
+@pytest.fixture
+def client():
+    """Create a client without credentials, with request building stubbed out."""
+    client = OfficialPaapiClient.__new__(OfficialPaapiClient)
+    client.transport = Mock()
+    client.transport.search_items = AsyncMock()
+    client.resource_manager = Mock()
+    client.resource_manager.get_detailed_resources.return_value = []
+    client._build_search_request = Mock(
+        side_effect=lambda *args: args[4]
+    )  # page number
+    client._calculate_search_depth = Mock(return_value=8)
+    client._enhance_search_query = Mock(return_value=None)
+    with patch("bot.paapi_resource_manager.force_refresh_resources"):
+        yield client
+
+
+@pytest.mark.asyncio
+async def test_pagination_acquires_token_per_page(client):
+    """Each page request takes its own rate limiter token."""
+    client.transport.search_items.side_effect = lambda page: _make_page(page, 10)
+
+    with patch(
+        "bot.paapi_official.acquire_api_permission", new_callable=AsyncMock
+    ) as acquire:
+        results = await client._search_items_paginated(
+            keywords="laptop", item_count=30, priority="high"
+        )
+
+    assert len(results) == 30
+    assert acquire.await_count == 3
+    acquire.assert_awaited_with("high")
+    assert [c.args[0] for c in client.transport.search_items.call_args_list] == [
+        1,
+        2,
+        3,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_pagination_stops_on_short_page(client):
+    """A short page ends pagination; pages pipelined past it are discarded."""
+    client.transport.search_items.side_effect = lambda page: _make_page(
+        page, 10 if page == 1 else 4
+    )
+
+    with patch("bot.paapi_official.acquire_api_permission", new_callable=AsyncMock):
+        results = await client._search_items_paginated(keywords="laptop", item_count=50)
+
+    assert len(results) == 14
+    assert {item["asin"][:2] for item in results} == {"P1", "P2"}
+    # Never more pages in flight than needed to cover the requested count
+    assert client.transport.search_items.call_count <= 5
+
+
+@pytest.mark.asyncio
+async def test_pagination_filters_price_and_continues_until_enough_matches(client):
+    """Pages keep coming until the price filter has enough matches."""
+
+    def search(page):
+        # Only pages 3 and later have items within the budget
+        return _make_page(page, 10, price=50000 if page >= 3 else 500000)
+
+    client.transport.search_items.side_effect = search
+
+    with patch("bot.paapi_official.acquire_api_permission", new_callable=AsyncMock):
+        results = await client._search_items_paginated(
+            keywords="monitor", item_count=15, min_price=10000, max_price=100000
+        )
+
+    assert len(results) == 15
+    assert all(10000 <= item["price"] <= 100000 for item in results)
+    assert {item["asin"][:2] for item in results} == {"P3", "P4"}
+
+
+@pytest.mark.asyncio
+async def test_pagination_overlaps_page_requests(client):
+    """Pages run concurrently instead of waiting for each other."""
+    in_flight = 0
+    peak = 0
+
+    async def slow_search(page):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.2)
+        in_flight -= 1
+        return _make_page(page, 10)
+
+    client.transport.search_items.side_effect = slow_search
+
+    with patch("bot.paapi_official.acquire_api_permission", new_callable=AsyncMock):
+        start = asyncio.get_running_loop().time()
+        results = await client._search_items_paginated(keywords="phone", item_count=40)
+        elapsed = asyncio.get_running_loop().time() - start
+
+    assert len(results) == 40
+    assert peak > 1
+    assert elapsed < 0.6
+
+
+@pytest.mark.asyncio
+async def test_pagination_first_page_failure_raises(client):
+    """A failing first page is surfaced to the caller."""
+    client.transport.search_items.side_effect = RuntimeError("boom")
+
+    with patch("bot.paapi_official.acquire_api_permission", new_callable=AsyncMock):
+        with pytest.raises(RuntimeError):
+            await client._search_items_paginated(keywords="laptop", item_count=10)
+
+
+@pytest.mark.asyncio
+async def test_pagination_later_page_failure_keeps_results(client):
+    """Results from earlier pages survive a failure on a later page."""
+
+    def search(page):
+        if page == 2:
+            raise RuntimeError("throttled")
+        return _make_page(page, 10)
+
+    client.transport.search_items.side_effect = search
+
+    with patch("bot.paapi_official.acquire_api_permission", new_callable=AsyncMock):
+        results = await client._search_items_paginated(keywords="laptop", item_count=30)
+
+    assert len(results) == 10
+    assert all(item["asin"].startswith("P1") for item in results)
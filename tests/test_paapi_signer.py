@@ -0,0 +1,117 @@
+"""Golden tests: PaapiSigner output matches the SDK's AWSV4Auth byte for byte."""
+
+import datetime
+import json
+
+import pytest
+from paapi5_python_sdk.auth.sign_helper import AWSV4Auth
+
+from bot.paapi_signer import (
+    SERVICE,
+    TARGET_PREFIX,
+    USER_AGENT,
+    PaapiSigner,
+    derive_signing_key,
+)
+from bot.paapi_transport import OPERATION_PATHS
+
+CREDENTIALS = {
+    "access_key": "AKIDEXAMPLE",
+    "secret_key": "wJalrXUtnFEMI/K7MDENG+bPxRfiCYEXAMPLEKEY",
+    "host": "webservices.amazon.in",
+    "region": "eu-west-1",
+}
+PAYLOADS = [
+    {
+        "Keywords": "gaming monitor 144hz",
+        "SearchIndex": "Electronics",
+        "ItemPage": 2,
+        "MinPrice": 1000000,
+        "Resources": ["ItemInfo.Title", "Offers.Listings.Price"],
+        "PartnerTag": "tag-21",
+        "PartnerType": "Associates",
+        "Marketplace": "www.amazon.in",
+    },
+    {
+        "ItemIds": ["B0CHEAP001", "B09XYZ1234"],
+        "PartnerTag": "tag-21",
+        "PartnerType": "Associates",
+    },
+    {
+        "BrowseNodeIds": ["1375248031"],
+        "LanguagesOfPreference": ["en_IN"],
+        "Keywords": "मॉनिटर",
+    },
+]
+TIMESTAMPS = [
+    datetime.datetime(2024, 3, 9, 12, 30, 5),
+    datetime.datetime(2024, 3, 9, 23, 59, 59),
+    datetime.datetime(2024, 3, 10, 0, 0, 0),
+    datetime.datetime(2025, 12, 31, 7, 4, 9),
+]
+
+
+def _sdk_headers(operation, payload, timestamp):
+    """Headers exactly as DefaultApi builds and signs them."""
+    headers = {
+        "Accept": "application/json",
+        "User-Agent": USER_AGENT,
+        "x-amz-target": TARGET_PREFIX + operation,
+        "content-encoding": "amz-1.0",
+        "Content-Type": "application/json; charset=utf-8",
+        "host": CREDENTIALS["host"],
+        "x-amz-date": timestamp.strftime("%Y%m%dT%H%M%SZ"),
+    }
+    return AWSV4Auth(
+        service=SERVICE,
+        method_name="POST",
+        timestamp=timestamp,
+        headers=headers,
+        payload=payload,
+        path=OPERATION_PATHS[operation],
+        **CREDENTIALS
+    ).get_headers()
+
+
+@pytest.mark.parametrize("operation", sorted(OPERATION_PATHS))
+def test_headers_match_the_sdk(operation):
+    """Same header names, order and values, across payloads and a day boundary."""
+    signer = PaapiSigner(**CREDENTIALS)
+    for timestamp in TIMESTAMPS:
+        for payload in PAYLOADS:
+            body = json.dumps(payload).encode("utf-8")
+            expected = _sdk_headers(operation, payload, timestamp)
+            signed = signer.sign(operation, OPERATION_PATHS[operation], body, timestamp)
+
+            assert list(signed.items()) == list(expected.items())
+
+
+def test_signing_key_is_derived_once_per_day(monkeypatch):
+    """The key chain runs once per date stamp, not per request."""
+    derived = []
+
+    def counting(*args):
+        derived.append(args[1])
+        return derive_signing_key(*args)
+
+    monkeypatch.setattr("bot.paapi_signer.derive_signing_key", counting)
+    signer = PaapiSigner(**CREDENTIALS)
+    for timestamp in TIMESTAMPS[:2] * 3 + TIMESTAMPS[2:3]:
+        signer.sign("GetItems", OPERATION_PATHS["GetItems"], b"{}", timestamp)
+
+    assert derived == ["20240309", "20240310"]
+
+
+def test_returned_headers_are_independent():
+    """Callers may add headers without touching the cached templates."""
+    signer = PaapiSigner(**CREDENTIALS)
+    first = signer.sign(
+        "SearchItems", OPERATION_PATHS["SearchItems"], b"{}", TIMESTAMPS[0]
+    )
+    first["X-Extra"] = "1"
+    second = signer.sign(
+        "SearchItems", OPERATION_PATHS["SearchItems"], b"{}", TIMESTAMPS[0]
+    )
+
+    assert "X-Extra" not in second
+    assert second["Authorization"] == first["Authorization"]
@@ -0,0 +1,136 @@
+"""Tests for the pooled async PA-API transport."""
+
+import datetime
+import json
+from unittest.mock import Mock, patch
+
+import httpx
+import pytest
+from paapi5_python_sdk.api.default_api import DefaultApi
+from paapi5_python_sdk.models.condition import Condition
+from paapi5_python_sdk.models.partner_type import PartnerType
+from paapi5_python_sdk.models.search_items_request import SearchItemsRequest
+from paapi5_python_sdk.models.search_items_resource import SearchItemsResource
+from paapi5_python_sdk.rest import ApiException
+
+from bot.paapi_official import OfficialPaapiClient
+from bot.paapi_transport import PaapiTransport, get_paapi_transport
+
+CREDENTIALS = {
+    "access_key": "AKIDEXAMPLE",
+    "secret_key": "secret",
+    "host": "webservices.amazon.in",
+    "region": "eu-west-1",
+}
+FROZEN = datetime.datetime(2024, 3, 9, 12, 30, 5)
+
+
+class _FrozenDatetime(datetime.datetime):
+    @classmethod
+    def utcnow(cls):
+        return FROZEN
+
+
+def _search_request():
+    return SearchItemsRequest(
+        partner_tag="tag-21",
+        partner_type=PartnerType.ASSOCIATES,
+        marketplace="www.amazon.in",
+        keywords="gaming monitor 144hz",
+        search_index="Electronics",
+        condition=Condition.NEW,
+        item_count=10,
+        item_page=2,
+        min_price=1000000,
+        resources=[
+            SearchItemsResource.ITEMINFO_TITLE,
+            SearchItemsResource.OFFERS_LISTINGS_PRICE,
+        ],
+    )
+
+
+def _mock_transport(handler):
+    transport = PaapiTransport(**CREDENTIALS)
+    transport._create_client = lambda: httpx.AsyncClient(
+        base_url="https://webservices.amazon.in", transport=httpx.MockTransport(handler)
+    )
+    return transport
+
+
+@pytest.mark.asyncio
+async def test_request_matches_the_sdk():
+    """Path, body and signed headers are exactly what the SDK would send."""
+    sdk = DefaultApi(**CREDENTIALS)
+    sdk.api_client.request = Mock(
+        return_value=Mock(status=200, data=b"{}", getheaders=dict)
+    )
+    sent = []
+
+    async def handler(request):
+        sent.append(request)
+        return httpx.Response(200, content=b'{"SearchResult": {}}')
+
+    transport = _mock_transport(handler)
+    with patch("datetime.datetime", _FrozenDatetime):
+        sdk.search_items(_search_request(), _preload_content=False)
+        body = await transport.search_items(_search_request())
+    await transport.close()
+
+    method, url = sdk.api_client.request.call_args.args[:2]
+    sdk_headers = sdk.api_client.request.call_args.kwargs["headers"]
+    sdk_body = sdk.api_client.request.call_args.kwargs["body"]
+    request = sent[0]
+
+    assert body == b'{"SearchResult": {}}'
+    assert (request.method, str(request.url)) == (method, url)
+    assert request.content == json.dumps(sdk_body).encode("utf-8")
+    assert "Authorization" in sdk_headers
+    for name, value in sdk_headers.items():
+        assert request.headers[name] == value, name
+
+
+@pytest.mark.asyncio
+async def test_error_status_raises_api_exception():
+    """Throttling surfaces as the SDK's ApiException with status and request id."""
+
+    async def handler(request):
+        return httpx.Response(
+            429, content=b'{"Errors": []}', headers={"x-amzn-RequestId": "req-1"}
+        )
+
+    transport = _mock_transport(handler)
+    with pytest.raises(ApiException) as excinfo:
+        await transport.get_items({"ItemIds": ["B000000000"]})
+    await transport.close()
+
+    assert excinfo.value.status == 429
+    assert excinfo.value.headers.get("x-amzn-RequestId") == "req-1"
+    assert excinfo.value.body == b'{"Errors": []}'
+
+
+@pytest.mark.asyncio
+async def test_client_is_shared_until_closed():
+    """Requests on a loop reuse one pooled client; closing releases it."""
+    transport = PaapiTransport(**CREDENTIALS)
+    client = transport.get_client()
+
+    assert transport.get_client() is client
+    assert client.base_url == httpx.URL("https://webservices.amazon.in")
+
+    await transport.close()
+    assert client.is_closed
+    replacement = transport.get_client()
+    assert replacement is not client
+    await transport.close()
+
+
+def test_clients_share_the_process_transport():
+    """Creating a PA-API client builds no SDK client or connection pool of its own."""
+    with patch(
+        "bot.paapi_official.settings",
+        Mock(PAAPI_ACCESS_KEY="a", PAAPI_SECRET_KEY="b", PAAPI_TAG="t"),
+    ), patch("bot.paapi_official.get_resource_manager"):
+        first, second = OfficialPaapiClient(), OfficialPaapiClient()
+
+    assert first.transport is second.transport is get_paapi_transport()
+    assert not hasattr(first, "api")
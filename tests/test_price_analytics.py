@@ -0,0 +1,172 @@
+"""Tests for the vectorized price analytics core."""
+
+import random
+import statistics
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+import pytest
+
+from bot.price_analytics import (
+    PriceMatrix,
+    analyze_series_batch,
+    drop_probability,
+    percentile_metrics,
+    price_metrics,
+    seasonal_metrics,
+    trend_metrics,
+    trend_slope,
+)
+
+DAY = 86400
+
+
+def _series(prices, start=1_700_000_000):
+    return [start + i * DAY for i in range(len(prices))], prices
+
+
+def _legacy_drop_probability(prices):
+    """Scalar reference implementation (the pre-vectorization logic)."""
+    if len(prices) < 10:
+        return 0.5
+    current = prices[-1]
+    drops = comparisons = 0
+    for i in range(len(prices) - 1):
+        if abs(prices[i] - current) / current < 0.05:
+            comparisons += 1
+            if prices[i + 1] < prices[i]:
+                drops += 1
+    if comparisons:
+        return drops / comparisons
+    return (
+        0.7
+        if statistics.mean(prices[-3:]) - statistics.mean(prices[-6:-3]) < 0
+        else 0.3
+    )
+
+
+@pytest.fixture
+def random_histories():
+    """Price histories of varying length."""
+    rng = random.Random(3)
+    return [
+        [rng.randrange(90000, 110000) for _ in range(rng.randrange(1, 60))]
+        for _ in range(200)
+    ]
+
+
+def test_price_metrics_match_statistics(random_histories):
+    """Batch metrics equal the statistics module per row."""
+    matrix = PriceMatrix.from_series([_series(prices) for prices in random_histories])
+    metrics = price_metrics(matrix)
+
+    for index, prices in enumerate(random_histories):
+        assert metrics["current"][index] == prices[-1]
+        assert metrics["min"][index] == min(prices)
+        assert metrics["max"][index] == max(prices)
+        assert metrics["mean"][index] == pytest.approx(statistics.mean(prices))
+        assert metrics["median"][index] == pytest.approx(statistics.median(prices))
+        expected_stdev = statistics.stdev(prices) if len(prices) > 1 else 0
+        assert metrics["volatility"][index] == pytest.approx(expected_stdev)
+
+
+def test_drop_probability_matches_scalar_logic(random_histories):
+    """Vectorized drop probability equals the original loop for every row."""
+    matrix = PriceMatrix.from_series([_series(prices) for prices in random_histories])
+    probabilities = drop_probability(matrix)
+
+    for index, prices in enumerate(random_histories):
+        assert probabilities[index] == pytest.approx(_legacy_drop_probability(prices))
+
+
+def test_percentiles_use_rank_of_current_price():
+    """Percentile rank counts prices at or below the current one."""
+    matrix = PriceMatrix.from_series([_series([1000, 1100, 1200, 1300, 1400, 1500])])
+    result = percentile_metrics(matrix, current=[1200])
+
+    assert result["current_percentile"][0] == pytest.approx(50.0)
+    assert result["p25"][0] == 1100
+    assert result["p50_median"][0] == 1300
+    assert result["p90"][0] == 1500
+
+
+def test_trend_slope_and_direction():
+    """Slope is in paise per day; direction follows the fitted change."""
+    matrix = PriceMatrix.from_series(
+        [
+            _series([1000, 1050, 1100, 1150, 1200]),
+            _series([1200, 1150, 1100, 1050, 1000]),
+            _series([1000, 1001, 999, 1000, 1000]),
+            _series([1000, 1000]),
+        ]
+    )
+    trend = trend_metrics(matrix)
+
+    assert trend_slope(matrix)[0] == pytest.approx(50.0)
+    assert trend["direction"].tolist() == [
+        "increasing",
+        "decreasing",
+        "stable",
+        "insufficient_data",
+    ]
+
+
+def test_moving_averages_used_with_ten_points():
+    """With 10+ points the 5- and 10-point moving averages decide."""
+    prices = [1000] * 5 + [900] * 5
+    trend = trend_metrics(PriceMatrix.from_series([_series(prices)]))
+
+    assert trend["direction"][0] == "decreasing"
+    assert trend["short_term_ma"][0] == pytest.approx(900)
+    assert trend["medium_term_ma"][0] == pytest.approx(950)
+
+
+def test_seasonal_monthly_averages():
+    """Months are bucketed per row; cheapest and dearest months are found."""
+    start = datetime(2024, 1, 1)
+    timestamps = [start + timedelta(days=i) for i in range(120)]
+    prices = [1000 if ts.month == 2 else 1500 for ts in timestamps]
+    matrix = PriceMatrix.from_series([(timestamps, prices)])
+
+    seasonal = seasonal_metrics(matrix, current_month=2)
+
+    assert seasonal["pattern"][0] == "seasonal_detected"
+    assert seasonal["best_month"][0] == 2
+    assert seasonal["current_month_avg"][0] == pytest.approx(1000)
+    assert seasonal["seasonal_variance"][0] == pytest.approx(50.0)
+
+
+def test_batch_analysis_many_asins():
+    """Thousands of series are analyzed in chunks and keyed by ASIN."""
+    rng = np.random.default_rng(0)
+    series = {
+        f"B{i:09d}": _series(list(rng.integers(90000, 110000, size=30)))
+        for i in range(2500)
+    }
+    series["BEMPTY0000"] = ([], [])
+
+    results = analyze_series_batch(series, chunk_size=1000)
+
+    assert len(results) == 2500
+    assert results["B000000007"]["data_points"] == 30
+    assert 0 <= results["B000000007"]["drop_probability"] <= 1
+    assert "BEMPTY0000" not in results
+
+
+def test_daily_market_analysis_covers_all_products():
+    """The nightly job analyzes every tracked ASIN, not just the first ten."""
+    from bot.scheduler import daily_market_analysis
+
+    asins = [f"B{i:09d}" for i in range(25)]
+    session = MagicMock()
+    session.__enter__.return_value.exec.return_value.all.return_value = asins
+    batch = AsyncMock(return_value={})
+
+    with patch("bot.scheduler.Session", return_value=session), patch(
+        "bot.market_intelligence.MarketIntelligence.analyze_price_trends_batch", batch
+    ):
+        daily_market_analysis()
+
+    batch.assert_awaited_once()
+    assert batch.await_args.args[0] == asins
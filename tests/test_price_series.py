@@ -0,0 +1,171 @@
+"""Tests for the in-memory price series store."""
+
+import time
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, Mock, patch
+
+import numpy as np
+import pytest
+
+from bot.price_series import (
+    DAY,
+    HOUR,
+    PriceSeries,
+    PriceSeriesStore,
+    get_price_series_store,
+    load_price_series,
+    record_prices,
+    to_epoch,
+)
+
+NOW = to_epoch(datetime(2025, 6, 1))
+
+
+def test_append_keeps_points_sorted():
+    """Out-of-order observations are inserted in time order."""
+    series = PriceSeries()
+    for ts, price in [(100, 10), (300, 30), (200, 20)] + [
+        (400 + i, i) for i in range(20)
+    ]:
+        series.append(ts, price)
+
+    view = series.view()
+    assert view.timestamps[:3].tolist() == [100, 200, 300]
+    assert view.prices[:3].tolist() == [10, 20, 30]
+    assert len(view) == 23
+    assert np.all(np.diff(view.timestamps.astype(np.int64)) >= 0)
+
+
+def test_compaction_rolls_up_hourly_and_daily():
+    """Old raw points become hourly low/high/last, older hours become days."""
+    series = PriceSeries()
+    day_start = NOW - 40 * DAY
+    # Three points in one hour, 40 days ago
+    series.extend([day_start + 60, day_start + 120, day_start + 180], [500, 300, 400])
+    # Two points in different hours, 10 days ago
+    series.extend([NOW - 10 * DAY, NOW - 10 * DAY + HOUR], [200, 250])
+    # A recent point stays raw
+    series.append(NOW - 60, 100)
+
+    series.compact(raw_cutoff=NOW - 7 * DAY, hourly_cutoff=NOW - 30 * DAY)
+
+    assert series.daily.tolist() == [(day_start, 300, 500, 400)]
+    assert [bucket[0] for bucket in series.hourly] == [
+        NOW - 10 * DAY,
+        NOW - 10 * DAY + HOUR,
+    ]
+    assert series.raw["price"].tolist() == [100]
+
+    view = series.view()
+    assert view.prices.tolist() == [400, 200, 250, 100]
+    assert view.lows.tolist() == [300, 200, 250, 100]
+    assert view.highs.tolist() == [500, 200, 250, 100]
+
+
+def test_view_since_filters_every_tier():
+    """``since`` cuts across daily, hourly and raw tiers."""
+    series = PriceSeries()
+    series.extend([NOW - d * DAY for d in range(60, 0, -1)], list(range(60)))
+    series.compact(raw_cutoff=NOW - 7 * DAY, hourly_cutoff=NOW - 30 * DAY)
+
+    view = series.view(since=NOW - 45 * DAY)
+
+    assert len(view) == 45
+    assert int(view.timestamps[0]) >= NOW - 45 * DAY
+
+
+def test_store_ignores_unloaded_series():
+    """Points for series that were never loaded stay in the database only."""
+    store = PriceSeriesStore(raw_days=7, hourly_days=30)
+
+    assert store.record("B000000001", 1000) is False
+    assert store.view("B000000001") is None
+
+
+def test_store_merges_points_recorded_during_load():
+    """Points recorded while a load is in flight are not lost or duplicated."""
+    store = PriceSeriesStore(raw_days=7, hourly_days=30)
+    recent = to_epoch(datetime.utcnow())
+
+    store.begin_load("B000000001")
+    store.record("B000000001", 900, recent - 10)  # Also returned by the load query
+    store.record("B000000001", 800, recent)  # Committed after the query ran
+    store.finish_load("B000000001", [recent - 20, recent - 10], [1000, 900])
+
+    assert store.view("B000000001").prices.tolist() == [1000, 900, 800]
+
+
+def test_store_reloads_series_after_ttl():
+    """A series older than the TTL is reported missing so it is reloaded."""
+    store = PriceSeriesStore(ttl_seconds=60)
+    recent = to_epoch(datetime.utcnow())
+
+    with patch("bot.price_series.time.monotonic", return_value=1000.0):
+        store.finish_load("B000000001", [recent], [1000])
+    with patch("bot.price_series.time.monotonic", return_value=1059.0):
+        assert "B000000001" in store
+        assert store.view("B000000001") is not None
+    with patch("bot.price_series.time.monotonic", return_value=1061.0):
+        assert "B000000001" not in store
+        assert store.view("B000000001") is None
+        store.begin_load("B000000001")
+        store.finish_load("B000000001", [recent, recent + 1], [1000, 900])
+        assert store.view("B000000001").prices.tolist() == [1000, 900]
+
+
+def test_store_evicts_least_recently_used_series():
+    """Beyond max_series the least recently viewed series is dropped."""
+    store = PriceSeriesStore(max_series=2)
+    recent = to_epoch(datetime.utcnow())
+
+    store.finish_load("B000000001", [recent], [1000])
+    store.finish_load("B000000002", [recent], [2000])
+    store.view("B000000001")
+    store.finish_load("B000000003", [recent], [3000])
+
+    assert "B000000001" in store and "B000000003" in store
+    assert "B000000002" not in store
+    assert store.get_stats()["evictions"] == 1
+
+
+def test_memory_for_a_year_of_daily_prices():
+    """A year of daily observations stays within a few KB per ASIN."""
+    store = PriceSeriesStore(raw_days=7, hourly_days=30)
+    now = to_epoch(datetime.utcnow())
+    timestamps = [now - d * DAY for d in range(365, 0, -1)]
+
+    for i in range(200):
+        asin = f"B{i:09d}"
+        store.finish_load(
+            asin, timestamps, [100000 + (d % 30) * 100 for d in range(365)]
+        )
+
+    stats = store.get_stats()
+    assert stats["series"] == 200
+    assert stats["memory_bytes"] / 200 < 8 * 1024  # 50k ASINs < 400 MB
+
+    started = time.perf_counter()
+    for _ in range(1000):
+        store.view("B000000007", since=now - 90 * DAY)
+    assert (time.perf_counter() - started) / 1000 < 0.001
+
+
+@pytest.mark.asyncio
+async def test_load_price_series_queries_once(async_session_for):
+    """The first view loads from the database; later views are served from memory."""
+    get_price_series_store().clear()
+    base = datetime.utcnow() - timedelta(days=3)
+    rows = [(base + timedelta(days=i), 1000 - i * 100) for i in range(3)]
+
+    session = Mock()
+    session.exec = AsyncMock(return_value=Mock(all=Mock(return_value=rows)))
+
+    with patch("bot.price_series.get_async_session", async_session_for(session)):
+        view = await load_price_series("B000000042")
+        record_prices([("B000000042", 700, datetime.utcnow())])
+        again = await load_price_series("B000000042")
+
+    assert view.prices.tolist() == [1000, 900, 800]
+    assert again.prices.tolist() == [1000, 900, 800, 700]
+    session.exec.assert_awaited_once()
+    get_price_series_store().clear()
@@ -0,0 +1,112 @@
+"""Tests for ProductRecord as the shared product type of the AI search path."""
+
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from bot.ai.enhanced_carousel import _parse_features_list, build_enhanced_card
+from bot.ai.matching_engine import FeatureMatchingEngine
+from bot.ai.multi_card_selector import _price_rupees
+from bot.paapi_ai_bridge import ai_format_from_result
+from bot.paapi_decoder import decode_search_response
+from bot.product_record import ProductRecord
+
+FIXTURES = Path(__file__).parent / "fixtures" / "paapi"
+SEARCH_BODY = (FIXTURES / "search_items_gaming_monitor.json").read_bytes()
+
+
+@pytest.fixture
+def record():
+    return decode_search_response(SEARCH_BODY)[0]
+
+
+def test_record_reads_as_the_ai_product_format(record):
+    """Mapping access gives the same values as the AI bridge dictionary."""
+    ai_dict = record.to_ai_dict()
+    for key, value in ai_dict.items():
+        if key != "ai_extraction_metadata":
+            assert record[key] == value, key
+            assert record.get(key) == value, key
+    assert record.get("scoring_breakdown", {}) == {}
+    assert "offers_info" in record and "scoring_breakdown" not in record
+    with pytest.raises(KeyError):
+        record["scoring_breakdown"]
+
+
+def test_copy_is_a_plain_dict(record):
+    """Callers that annotate a product get their own dict, leaving the record untouched."""
+    annotated = record.copy()
+    annotated["_ai_metadata"] = {"model": "test"}
+
+    assert isinstance(annotated, dict) and not isinstance(annotated, ProductRecord)
+    assert annotated["asin"] == record.asin
+    assert "_ai_metadata" not in record
+
+
+def test_record_is_compact(record):
+    """Slots only: no per-instance __dict__."""
+    assert not hasattr(record, "__dict__")
+    with pytest.raises(AttributeError):
+        record.unexpected = 1
+
+
+def test_derived_values(record):
+    """Rupee price, savings and parsed specs are computed from the stored fields."""
+    assert record.price_rupees == record.price / 100
+    assert record.savings_pct == record.savings_percent
+
+    record.savings_percent = None
+    assert record.savings_pct == int(
+        (record.list_price - record.price) / record.list_price * 100
+    )
+
+    specs = record.specs
+    assert specs == _parse_features_list(record.features)
+    assert specs["refresh_rate"] == 144
+    assert record.specs is specs  # parsed once
+
+    assert ProductRecord("B000000000").price_rupees is None
+
+
+def test_ai_format_from_result_keeps_records(record):
+    """Records pass through; plain dicts are converted once."""
+    assert ai_format_from_result(record) is record
+    converted = ai_format_from_result(
+        {"asin": "B0TEST0001", "title": "Monitor", "price": 1500000}
+    )
+    assert isinstance(converted, ProductRecord) and converted["price"] == 1500000
+
+
+@pytest.mark.asyncio
+async def test_matching_engine_analyzes_a_record_once(record):
+    """Feature extraction results are kept on the record and reused across scoring runs."""
+    engine = FeatureMatchingEngine()
+    analysis = {
+        "refresh_rate": {"value": "144", "confidence": 0.9, "source": "features"}
+    }
+    with patch(
+        "bot.ai.product_analyzer.ProductFeatureAnalyzer.analyze_product_features",
+        new=AsyncMock(return_value=analysis),
+    ) as analyze:
+        first = await engine.score_products({"refresh_rate": "144"}, [record])
+        second = await engine.score_products({"refresh_rate": "144"}, [record])
+
+    assert analyze.await_count == 1
+    assert first[0][1]["score"] == second[0][1]["score"]
+
+
+def test_record_prices_are_always_paise():
+    """Cheap products are not mistaken for rupee prices."""
+    cheap = ProductRecord("B0CHEAP001", title="Monitor arm", price=89900)
+
+    assert _price_rupees(cheap) == 899.0
+    assert (
+        _price_rupees({"price": 8999}) == 8999
+    )  # plain dicts keep the old unit heuristic
+    assert FeatureMatchingEngine()._get_price_tier_score(cheap) == 0.3
+
+    caption, _ = build_enhanced_card(
+        cheap, 1, 1, {"headers": [], "key_differences": []}, watch_id=1
+    )
+    assert "₹899" in caption
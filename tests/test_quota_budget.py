@@ -0,0 +1,156 @@
+"""Tests for the daily PA-API quota budget planner."""
+
+import sqlite3
+import time
+from unittest.mock import patch
+
+import pytest
+
+from bot.api_rate_limiter import APIRateLimiter
+from bot.errors import QuotaExceededError
+from bot.limiter_backend import MemoryLimiterBackend
+from bot.quota_budget import DAY, HOUR, QuotaBudgetPlanner, pool_for
+
+SHARES = {"user": 0.5, "realtime": 0.25, "enrichment": 0.25, "analytics": 0.0}
+
+# Next UTC midnight, so counters expire after the simulated day
+MIDNIGHT = (int(time.time()) // DAY + 1) * DAY
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _planner(clock, quota=2400, backend=None):
+    return QuotaBudgetPlanner(
+        daily_quota=quota,
+        shares=SHARES,
+        reserve_factor=1.0,
+        forecast_alpha=0.5,
+        clock=clock,
+        backend=backend or MemoryLimiterBackend(),
+    )
+
+
+def test_priorities_map_to_pools():
+    """Rate limiter priorities and RequestPriority names share pools."""
+    assert pool_for("high") == pool_for("USER_TRIGGERED") == "user"
+    assert pool_for("normal") == pool_for("active_watch") == "realtime"
+    assert pool_for("low") == pool_for("data_enrichment") == "enrichment"
+    assert pool_for("analytics") == "analytics"
+    assert pool_for("unknown") == "realtime"
+
+
+def test_background_work_backs_off_before_user_capacity():
+    """Enrichment stops once only the capacity forecast for user and watch traffic is left."""
+    clock = Clock(MIDNIGHT)
+    planner = _planner(clock)
+
+    # At midnight the rest of the day's user and watch demand is reserved: 2400 * 0.75
+    admitted = 0
+    while planner.admit("low"):
+        planner.record("low")
+        admitted += 1
+    assert admitted == 600
+
+    status = planner.get_status()
+    assert status["pools"]["enrichment"]["rejected"] == 1
+    assert status["pools"]["enrichment"]["admitting"] is False
+    assert status["remaining"] == 1800
+
+    # Users and watches are still served
+    assert planner.admit("high")
+    assert planner.admit("normal")
+
+
+def test_reservations_shrink_as_the_day_passes():
+    """Unused forecast capacity of earlier hours becomes available to background pools."""
+    clock = Clock(MIDNIGHT + 12 * HOUR)
+    planner = _planner(clock)
+
+    # Half the day is gone, so only 900 requests are reserved for higher pools
+    status = planner.get_status()
+    assert status["pools"]["enrichment"]["available"] == 2400 - 900
+    assert status["pools"]["realtime"]["available"] == 2400 - 600
+    assert status["reset_in_seconds"] == 12 * HOUR
+
+
+def test_user_requests_only_stop_at_the_daily_quota():
+    """The user pool may use everything left; the quota resets at midnight UTC."""
+    clock = Clock(MIDNIGHT)
+    planner = _planner(clock, quota=10)
+    for _ in range(10):
+        assert planner.admit("high")
+        planner.record("high")
+    assert not planner.admit("high")
+    assert planner.remaining() == 0
+
+    clock.now += DAY
+    assert planner.admit("high")
+    assert planner.remaining() == 10
+
+
+def test_usage_is_shared_through_the_backend():
+    """Planners on one backend (e.g. separate processes) spend one budget, also after a restart."""
+    clock = Clock(MIDNIGHT + HOUR)
+    backend = MemoryLimiterBackend()
+    bot, scheduler = _planner(clock, quota=10, backend=backend), _planner(
+        clock, quota=10, backend=backend
+    )
+
+    bot.record("high", 6)
+    scheduler.record("normal", 4)
+    assert not bot.admit("high")
+    assert _planner(clock, quota=10, backend=backend).get_status()["used"] == 10
+
+
+def test_unavailable_backend_keeps_local_usage():
+    """While the shared store is down, usage is counted locally and admission goes on."""
+    clock = Clock(MIDNIGHT + HOUR)
+    backend = MemoryLimiterBackend()
+    planner = _planner(clock, quota=10, backend=backend)
+    planner.record("high", 4)
+
+    error = sqlite3.OperationalError("database is locked")
+    with patch.object(backend, "get_many", side_effect=error), patch.object(
+        backend, "incr", side_effect=error
+    ):
+        planner.record("high", 5)
+        assert planner.admit("high")
+        assert planner.remaining() == 1
+
+
+def test_forecast_learns_hourly_traffic():
+    """Completed hours are folded into that hour's forecast, idle hours decay."""
+    clock = Clock(MIDNIGHT + 9 * HOUR)
+    planner = _planner(clock)
+    initial = planner.forecast["user"][9]
+    planner.record("high", 300)
+
+    clock.now += 2 * HOUR
+    planner.get_status()
+    assert planner.forecast["user"][9] == pytest.approx(initial + 0.5 * (300 - initial))
+    assert planner.forecast["user"][10] == pytest.approx(initial / 2)
+    assert planner.forecast["user"][11] == pytest.approx(initial)
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_enforces_the_budget():
+    """Granted tokens are recorded, refused requests raise QuotaExceededError without queuing."""
+    clock = Clock(MIDNIGHT)
+    planner = _planner(clock, quota=4)
+    limiter = APIRateLimiter()
+
+    with patch("bot.api_rate_limiter.get_budget_planner", return_value=planner):
+        await limiter.acquire("low")
+        assert planner.used["enrichment"] == 1
+
+        planner.record("high", 3)
+        with pytest.raises(QuotaExceededError):
+            await limiter.acquire("high")
+
+    assert limiter.get_current_usage()["queued"]["high"] == 0
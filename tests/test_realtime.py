@@ -0,0 +1,246 @@
+"""Tests for the real-time watch engine."""
+
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from sqlmodel import select
+
+from bot.db import get_async_session
+from bot.errors import QuotaExceededError
+from bot.models import Cache, Price, User, Watch
+from bot.realtime import RealtimeWatchEngine, fan_out_price_changes, refresh_interval
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _engine(fetch, clock, **kwargs):
+    kwargs.setdefault("calls_per_hour", 3600)
+    engine = RealtimeWatchEngine(
+        fetch=fetch,
+        notify=AsyncMock(),
+        min_interval=60,
+        max_interval=3600,
+        change_alpha=0.5,
+        initial_change_rate=0.5,
+        clock=clock,
+        **kwargs,
+    )
+    engine.reload = AsyncMock()
+    return engine
+
+
+def test_refresh_interval_follows_volatility_and_subscribers():
+    """Volatile and popular ASINs are checked more often, within the bounds."""
+    static = refresh_interval(0.0, 1, 60, 3600)
+    volatile = refresh_interval(1.0, 1, 60, 3600)
+    popular = refresh_interval(0.0, 8, 60, 3600)
+
+    assert static == 3600
+    assert volatile == 360
+    assert popular == 900
+    assert refresh_interval(1.0, 1024, 60, 3600) == 60
+
+
+@pytest.mark.asyncio
+async def test_watches_are_deduplicated_by_asin():
+    """Several watches on one ASIN cost one lookup, and changes reach the notifier once."""
+    clock = Clock()
+    fetch = AsyncMock(return_value={"A1": {"price": 1000}, "A2": {"price": 2000}})
+    engine = _engine(fetch, clock)
+    engine.sync_watches([(1, "A1"), (2, "A1"), (3, "A2")], prices={"A2": 2500})
+
+    changes = await engine.tick()
+
+    fetch.assert_awaited_once_with(["A1", "A2"])
+    assert sorted(changes) == [("A1", None, 1000), ("A2", 2500, 2000)]
+    engine._notify.assert_awaited_once()
+    stats = engine.get_stats()
+    assert stats["asins"] == 2
+    assert stats["watches"] == 3
+
+    # Nothing is due until the next interval
+    fetch.reset_mock()
+    assert await engine.tick() == []
+    fetch.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_volatile_asins_are_rescheduled_sooner():
+    """The change rate learned per ASIN shortens or stretches its interval."""
+    clock = Clock()
+    price = {"VOLATILE": 1000, "STATIC": 5000}
+
+    async def fetch(asins):
+        price["VOLATILE"] += 10
+        return {asin: {"price": price[asin]} for asin in asins}
+
+    engine = _engine(fetch, clock)
+    engine.sync_watches([(1, "VOLATILE"), (2, "STATIC")])
+    for _ in range(6):
+        await engine.tick()
+        clock.now += 3600
+
+    volatile = engine._states["VOLATILE"]
+    static = engine._states["STATIC"]
+    assert volatile.change_rate > 0.9
+    assert static.change_rate < 0.1
+    assert volatile.interval < 600 < 2400 < static.interval
+
+
+@pytest.mark.asyncio
+async def test_budget_limits_calls_and_defers_the_rest():
+    """Due ASINs beyond the hourly call budget wait for a later tick."""
+    clock = Clock()
+    fetch = AsyncMock(
+        side_effect=lambda asins: {asin: {"price": 100} for asin in asins}
+    )
+    # 120 calls/hour: two 10-item calls at once, then one every 30 seconds
+    engine = _engine(fetch, clock, calls_per_hour=120)
+    engine.sync_watches([(n, f"A{n:02d}") for n in range(25)])
+
+    await engine.tick()
+    assert [len(call.args[0]) for call in fetch.await_args_list] == [10, 10]
+    assert engine.get_stats()["deferred"] == 5
+
+    clock.now += 30
+    await engine.tick()
+    assert [len(call.args[0]) for call in fetch.await_args_list] == [10, 10, 5]
+    assert engine.get_stats()["calls"] == 3
+
+
+@pytest.mark.asyncio
+async def test_quota_errors_defer_remaining_batches():
+    """A quota error stops the tick and retries its ASINs later."""
+    clock = Clock()
+    fetch = AsyncMock(side_effect=QuotaExceededError("quota"))
+    engine = _engine(fetch, clock)
+    engine.sync_watches([(n, f"A{n:02d}") for n in range(15)])
+
+    assert await engine.tick() == []
+    fetch.assert_awaited_once()
+    assert all(state.next_check > clock.now for state in engine._states.values())
+
+
+def test_sync_watches_drops_removed_subscriptions():
+    """Watches missing from a re-sync are unsubscribed, and empty ASINs dropped."""
+    engine = _engine(AsyncMock(), Clock())
+    engine.sync_watches([(1, "A1"), (2, "A1"), (3, "A2")])
+    engine.sync_watches([(1, "A1"), (3, "A3")])
+
+    assert engine._states["A1"].watch_ids == {1}
+    assert "A2" not in engine._states
+    assert engine._states["A3"].watch_ids == {3}
+
+
+@pytest.mark.asyncio
+async def test_fan_out_records_prices_and_alerts_matching_watches(database):
+    """Every subscribed watch gets a Price row; drops within criteria send an alert."""
+    async with get_async_session() as session:
+        session.add(User(id=1, tg_user_id=1001))
+        session.add(User(id=2, tg_user_id=1002))
+        session.add(
+            Watch(
+                id=1,
+                user_id=1,
+                asin="A1",
+                keywords="cheap enough",
+                max_price=9000,
+                mode="rt",
+            )
+        )
+        session.add(
+            Watch(
+                id=2,
+                user_id=2,
+                asin="A1",
+                keywords="too pricey",
+                max_price=5000,
+                mode="rt",
+            )
+        )
+        session.add(Watch(id=3, user_id=2, asin="A1", keywords="daily", mode="daily"))
+        await session.commit()
+
+    dispatcher = Mock()
+    dispatcher.submit = AsyncMock(return_value=_done())
+    with patch("bot.outbound.get_outbound_dispatcher", return_value=dispatcher):
+        await fan_out_price_changes([("A1", 10000, 8000)])
+
+    assert [call.args[0] for call in dispatcher.submit.await_args_list] == [1001]
+    async with get_async_session() as session:
+        rows = (await session.exec(select(Price))).all()
+        cache = await session.get(Cache, "A1")
+    assert sorted(row.watch_id for row in rows) == [1, 2]
+    assert cache.price == 8000
+
+
+@pytest.mark.asyncio
+async def test_first_price_is_a_baseline_unless_max_price_is_met(database):
+    """A first observation only alerts watches whose max_price it already meets."""
+    async with get_async_session() as session:
+        session.add(User(id=1, tg_user_id=1001))
+        session.add(User(id=2, tg_user_id=1002))
+        session.add(
+            Watch(
+                id=1,
+                user_id=1,
+                asin="A1",
+                keywords="discount",
+                min_discount=10,
+                mode="rt",
+            )
+        )
+        session.add(
+            Watch(
+                id=2, user_id=2, asin="A1", keywords="budget", max_price=9000, mode="rt"
+            )
+        )
+        await session.commit()
+
+    dispatcher = Mock()
+    dispatcher.submit = AsyncMock(return_value=_done())
+    with patch("bot.outbound.get_outbound_dispatcher", return_value=dispatcher):
+        await fan_out_price_changes([("A1", None, 8000)])
+
+    assert [call.args[0] for call in dispatcher.submit.await_args_list] == [1002]
+
+
+@pytest.mark.asyncio
+async def test_reload_seeds_new_asins_from_cache_or_latest_price(database):
+    """After a restart, last prices come from the cache or the newest Price row."""
+    from datetime import datetime, timedelta
+
+    then = datetime(2024, 5, 1)
+    async with get_async_session() as session:
+        session.add(User(id=1, tg_user_id=1001))
+        session.add(Watch(id=1, user_id=1, asin="A1", keywords="cached", mode="rt"))
+        session.add(Watch(id=2, user_id=1, asin="A2", keywords="history", mode="rt"))
+        session.add(Cache(asin="A1", price=5000, fetched_at=then))
+        session.add(Price(watch_id=2, asin="A2", price=7000, fetched_at=then))
+        session.add(
+            Price(
+                watch_id=2, asin="A2", price=6500, fetched_at=then + timedelta(hours=1)
+            )
+        )
+        await session.commit()
+
+    engine = RealtimeWatchEngine(fetch=AsyncMock(), notify=AsyncMock(), clock=Clock())
+    await engine.reload()
+
+    assert engine._states["A1"].last_price == 5000
+    assert engine._states["A2"].last_price == 6500
+    assert engine.observe("A2", 6500) is None
+
+
+def _done():
+    import asyncio
+
+    future = asyncio.get_running_loop().create_future()
+    future.set_result({"sent": 1, "failed": 0, "blocked": 0})
+    return future
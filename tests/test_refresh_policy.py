@@ -0,0 +1,158 @@
+"""Tests for adaptive per-ASIN refresh intervals."""
+
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from bot.price_series import SeriesView
+from bot.refresh_policy import (
+    DEFAULT_CACHE_TTL,
+    RefreshPolicy,
+    change_rate,
+    fixed_interval,
+    interval_for_rate,
+    simulate_refresh,
+)
+
+HOUR = 3600
+NOW = 1_700_000_000
+
+
+def _view(timestamps, prices):
+    ts = np.array(timestamps, dtype=np.uint32)
+    p = np.array(prices, dtype=np.int32)
+    return SeriesView(timestamps=ts, prices=p, lows=p, highs=p)
+
+
+def _policy():
+    return RefreshPolicy(
+        half_life_hours=24,
+        probability=0.25,
+        min_interval=30 * 60,
+        max_interval=48 * HOUR,
+        default_interval=2 * HOUR,
+    )
+
+
+def test_change_rate_weights_recent_changes():
+    """Changes per hour of exposure, with older gaps counting less."""
+    hourly = np.arange(NOW - 10 * HOUR, NOW + 1, HOUR)
+    every_hour = np.arange(len(hourly)) * 100
+    assert change_rate(hourly, every_hour, NOW, half_life_hours=1e9) == pytest.approx(
+        1.0
+    )
+    assert (
+        change_rate(hourly, np.full(len(hourly), 500), NOW, half_life_hours=1e9) == 0.0
+    )
+
+    # Changes only in the first half: a short half-life forgets them
+    early = np.concatenate((np.arange(6) * 100, np.full(5, 600)))
+    assert change_rate(hourly, early, NOW, half_life_hours=1) < change_rate(
+        hourly, early, NOW, half_life_hours=100
+    )
+
+    # Rolled-up buckets whose low and high differ count as changes
+    flat = np.full(len(hourly), 500)
+    lows = flat.copy()
+    lows[-1] = 400
+    assert change_rate(hourly, flat, NOW, 1e9, lows=lows, highs=flat) == pytest.approx(
+        0.1
+    )
+
+
+def test_interval_for_rate_is_clamped():
+    """Poisson interval for the target change probability, within bounds."""
+    assert interval_for_rate(0.0, 0.25, 60, 3600) == 3600
+    assert interval_for_rate(1 / 24, 0.25, 60, 10**9) == pytest.approx(
+        -np.log(0.75) * 24 * HOUR
+    )
+    assert interval_for_rate(100.0, 0.25, 60, 3600) == 60
+
+
+def test_volatile_asins_get_shorter_intervals_than_static_ones():
+    """A week of hourly moves beats a week of flat prices; no history uses the default."""
+    policy = _policy()
+    hourly = list(range(NOW - 7 * 24 * HOUR, NOW + 1, HOUR))
+    volatile = policy.plan_view(
+        "HOT", _view(hourly, [100 + n % 2 for n in range(len(hourly))]), NOW
+    )
+    static = policy.plan_view("COLD", _view(hourly, [100] * len(hourly)), NOW)
+    new = policy.plan_view("NEW", _view([], []), NOW)
+
+    assert volatile.interval == 30 * 60
+    assert static.interval > 24 * HOUR
+    assert new.interval == pytest.approx(2 * HOUR)
+    assert new.overdue(NOW) == float("inf")
+    assert policy.ttl("HOT") == timedelta(minutes=30)
+    assert policy.ttl("UNPLANNED") == DEFAULT_CACHE_TTL
+
+
+@pytest.mark.asyncio
+async def test_due_asins_orders_by_overdue(monkeypatch):
+    """Only ASINs past their interval are due, never-refreshed and most overdue first."""
+    views = {
+        "FRESH": _view([NOW - 60], [100]),
+        "OVERDUE": _view([NOW - 4 * HOUR], [100]),
+        "VERY_OVERDUE": _view([NOW - 8 * HOUR], [100]),
+        "NEVER": _view([], []),
+    }
+
+    async def load(asins, since=None):
+        return {asin: views[asin] for asin in asins}
+
+    monkeypatch.setattr("bot.refresh_policy.load_price_series_many", load)
+    policy = _policy()
+
+    due = await policy.due_asins(list(views), now=datetime.utcfromtimestamp(NOW))
+    assert due == ["NEVER", "VERY_OVERDUE", "OVERDUE"]
+    assert await policy.due_asins(list(views), now=NOW, limit=2) == [
+        "NEVER",
+        "VERY_OVERDUE",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_ttls_plan_asins_this_process_has_not_planned(monkeypatch):
+    """A worker that is not the leader plans the ASINs it reads, once per tick."""
+    hourly = list(range(int(time.time()) - 7 * 24 * HOUR, int(time.time()), HOUR))
+    loads = []
+
+    async def load(asins, since=None):
+        loads.append(list(asins))
+        return {
+            asin: _view(hourly, [100 + n % 2 for n in range(len(hourly))])
+            for asin in asins
+        }
+
+    monkeypatch.setattr("bot.refresh_policy.load_price_series_many", load)
+    policy = _policy()
+
+    assert await policy.ttls(["HOT", "HOT"]) == {"HOT": timedelta(minutes=30)}
+    await policy.ttls(["HOT"])
+    assert loads == [["HOT"]]
+
+
+def test_simulation_measures_latency_and_calls():
+    """Replays history: adaptive spends fewer lookups on static ASINs and catches volatile ones sooner."""
+    start, end = NOW, NOW + 10 * 24 * HOUR
+    histories = {
+        # Moves every hour
+        "HOT": (
+            list(range(start, end, HOUR)),
+            [100 + n % 3 for n in range((end - start) // HOUR)],
+        ),
+        # One change on day 5
+        "COLD": ([start, start + 5 * 24 * HOUR], [500, 450]),
+    }
+
+    fixed = simulate_refresh(histories, fixed_interval(2 * HOUR), start, end)
+    adaptive = simulate_refresh(histories, _policy().interval, start, end)
+
+    assert fixed["checks"] == 2 * (10 * 12 + 1)
+    assert fixed["changes"] == adaptive["changes"] == (end - start) // HOUR - 1 + 1
+    assert fixed["detected"] + fixed["missed"] == fixed["changes"]
+    assert adaptive["detected"] > fixed["detected"]
+    assert adaptive["latency_p50_minutes"] <= fixed["latency_p50_minutes"]
+    assert adaptive["calls"] == -(-adaptive["checks"] // 10)
@@ -0,0 +1,168 @@
+"""Tests for the tiered scraper, replaying saved Amazon pages offline."""
+
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from bot import scraper
+from bot.page_parser import (
+    ProductNotFound,
+    ScrapeBlocked,
+    parse_product_page,
+    parse_search_results,
+)
+
+FIXTURES = Path(__file__).parent / "fixtures" / "amazon"
+
+BROWSER_DATA = {
+    "asin": "B0CHX1W1XY",
+    "title": "Rendered title",
+    "price": 6399900,
+    "mrp": None,
+    "image": "https://m.media-amazon.com/images/I/81.png",
+    "url": "https://www.amazon.in/dp/B0CHX1W1XY",
+}
+
+
+def fixture(name: str) -> str:
+    """Read a saved page."""
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+def serve(page: str, status_code: int = 200):
+    """Patch the scraper HTTP client to answer every request with a saved page."""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(status_code, text=fixture(page))
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    patcher = patch("bot.http_scraper.get_http_client", return_value=client)
+    patcher.requests = requests
+    return patcher
+
+
+@pytest.fixture
+def metrics():
+    """Give each test fresh scraper metrics."""
+    with patch.object(scraper, "_metrics", scraper.ScraperMetrics()):
+        yield scraper._metrics
+
+
+def test_parse_product_page():
+    """Title, price, MRP and image are read with the shared selectors."""
+    data = parse_product_page(fixture("product_B0CHX1W1XY.html"), "B0CHX1W1XY")
+
+    assert data == {
+        "asin": "B0CHX1W1XY",
+        "title": "Apple iPhone 15 (128 GB) - Black",
+        "price": 6499900,
+        "mrp": 7990000,
+        "image": "https://m.media-amazon.com/images/I/71657TiFeHL._SL1500_.jpg",
+        "url": "https://www.amazon.in/dp/B0CHX1W1XY",
+    }
+
+
+def test_parse_search_results():
+    """Result containers are read in order; missing prices stay None."""
+    results = parse_search_results(fixture("search_gaming_monitor.html"))
+
+    assert [r["asin"] for r in results] == ["B0BXF3Z1M6", "B0C3R8D2KQ", "B0CK2RXBQ4"]
+    assert [r["price"] for r in results] == [2149900, None, 1099900]
+    assert results[0]["title"] == "LG Ultragear 27 inch QHD IPS 165Hz Gaming Monitor"
+    assert (
+        len(parse_search_results(fixture("search_gaming_monitor.html"), max_results=2))
+        == 2
+    )
+
+
+def test_parse_detects_captcha_and_missing_product():
+    """Robot checks and 404 pages raise distinct errors."""
+    with pytest.raises(ScrapeBlocked):
+        parse_product_page(fixture("captcha.html"), "B0CHX1W1XY")
+    with pytest.raises(ScrapeBlocked):
+        parse_search_results(fixture("captcha.html"))
+    with pytest.raises(ProductNotFound):
+        parse_product_page(fixture("not_found.html"), "B0CHX1W1XY")
+
+
+@pytest.mark.asyncio
+async def test_http_tier_serves_static_pages(metrics):
+    """A server-rendered product page never reaches the browser."""
+    browser = AsyncMock()
+    with serve("product_B0CHX1W1XY.html"), patch(
+        "bot.scraper._browser_product_data", browser
+    ):
+        price = await scraper.scrape_price("B0CHX1W1XY")
+
+    assert price == 6499900
+    browser.assert_not_awaited()
+    stats = metrics.get_stats()
+    assert stats["http"]["success"] == 1
+    assert stats["browser"]["attempts"] == 0
+    assert stats["fallbacks"] == 0
+
+
+@pytest.mark.parametrize(
+    ("page", "status_code", "outcome"),
+    [
+        ("captcha.html", 200, "blocked"),
+        ("captcha.html", 503, "blocked"),
+        ("product_js_price.html", 200, "failure"),
+    ],
+)
+@pytest.mark.asyncio
+async def test_browser_fallback(metrics, page, status_code, outcome):
+    """Robot checks and pages whose price needs JavaScript fall back to Chromium."""
+    browser = AsyncMock(return_value=dict(BROWSER_DATA))
+    with serve(page, status_code), patch("bot.scraper._browser_product_data", browser):
+        data = await scraper.scrape_product_data("B0CHX1W1XY")
+
+    assert data["price"] == 6399900
+    browser.assert_awaited_once_with("B0CHX1W1XY")
+    stats = metrics.get_stats()
+    assert stats["http"][outcome] == 1
+    assert stats["browser"]["success"] == 1
+    assert stats["fallbacks"] == 1
+
+
+@pytest.mark.asyncio
+async def test_missing_product_does_not_fall_back(metrics):
+    """Amazon's not-found page is final; rendering it again would not help."""
+    browser = AsyncMock()
+    with serve("not_found.html", 404), patch(
+        "bot.scraper._browser_product_data", browser
+    ):
+        with pytest.raises(ProductNotFound):
+            await scraper.scrape_product_data("B0CHX1W1XY")
+
+    browser.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_search_uses_http_tier(metrics):
+    """Search results are parsed from the static page."""
+    browser = AsyncMock()
+    patcher = serve("search_gaming_monitor.html")
+    with patcher, patch("bot.scraper._browser_search", browser):
+        results = await scraper.scrape_amazon_search("gaming monitor", max_results=5)
+
+    assert len(results) == 3
+    assert str(patcher.requests[0].url) == "https://www.amazon.in/s?k=gaming+monitor"
+    browser.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_search_returns_empty_when_both_tiers_blocked(metrics):
+    """A captcha on both tiers yields no results rather than an error."""
+    browser = AsyncMock(side_effect=ScrapeBlocked("Captcha required"))
+    with serve("captcha.html"), patch("bot.scraper._browser_search", browser):
+        results = await scraper.scrape_amazon_search("gaming monitor")
+
+    assert results == []
+    stats = metrics.get_stats()
+    assert stats["http"]["blocked"] == 1
+    assert stats["browser"]["blocked"] == 1
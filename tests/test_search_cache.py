@@ -0,0 +1,132 @@
+"""Tests for the shared search result cache."""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from bot.search_cache import (
+    SearchResultCache,
+    make_search_key,
+    normalize_keywords,
+    price_bucket,
+)
+
+# Bound at import: concurrent tests elsewhere patch the module attribute
+from bot.watch_flow import _cached_search_items_advanced
+
+
+def test_normalize_keywords():
+    """Case, punctuation, duplicates and token order do not matter."""
+    assert normalize_keywords("Gaming  Monitor, gaming") == "gaming monitor"
+    assert normalize_keywords("monitor gaming") == normalize_keywords("GAMING monitor")
+    assert normalize_keywords(None) == ""
+
+
+def test_price_bucket_rounding():
+    """Prices are rounded to three significant rupee digits."""
+    assert price_bucket(4999900) == 5000000  # ₹49,999 -> ₹50,000
+    assert price_bucket(129900) == 130000  # ₹1,299 -> ₹1,300
+    assert price_bucket(49900) == 49900  # ₹499 stays
+    assert price_bucket(None) is None
+    assert price_bucket(2000000) != price_bucket(3000000)
+
+
+def test_search_key_includes_price_filters():
+    """Searches with different budgets never share an entry."""
+    base = make_search_key("search", "laptop", item_count=10, max_price=5000000)
+    assert make_search_key("search", "Laptop", item_count=10, max_price=4999900) == base
+    assert make_search_key("search", "laptop", item_count=10, max_price=8000000) != base
+    assert (
+        make_search_key(
+            "search", "laptop", item_count=10, max_price=5000000, min_price=2000000
+        )
+        != base
+    )
+    assert make_search_key("search", "laptop", item_count=20, max_price=5000000) != base
+    assert make_search_key("other", "laptop", item_count=10, max_price=5000000) != base
+
+
+def test_cache_hit_and_miss_counters():
+    """Hits and misses are counted."""
+    cache = SearchResultCache(max_entries=10, ttl_seconds=60)
+
+    assert cache.get("key") is None
+    cache.set("key", ["result"])
+    assert cache.get("key") == ["result"]
+
+    stats = cache.get_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_cache_lru_eviction():
+    """The least recently used entry is evicted once the cache is full."""
+    cache = SearchResultCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" is now least recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.get_stats()["evictions"] == 1
+    assert cache.get_stats()["entries"] == 2
+
+
+def test_cache_ttl_expiry():
+    """Entries expire after the TTL."""
+    cache = SearchResultCache(max_entries=10, ttl_seconds=60)
+
+    with patch("bot.search_cache.time.monotonic", return_value=1000.0):
+        cache.set("key", "value")
+    with patch("bot.search_cache.time.monotonic", return_value=1059.0):
+        assert cache.get("key") == "value"
+    with patch("bot.search_cache.time.monotonic", return_value=1061.0):
+        assert cache.get("key") is None
+
+    assert cache.get_stats()["expirations"] == 1
+
+
+def test_purge_expired():
+    """Expired entries can be dropped eagerly."""
+    cache = SearchResultCache(max_entries=10, ttl_seconds=60)
+
+    with patch("bot.search_cache.time.monotonic", return_value=1000.0):
+        cache.set("old", 1)
+    with patch("bot.search_cache.time.monotonic", return_value=1050.0):
+        cache.set("new", 2)
+    with patch("bot.search_cache.time.monotonic", return_value=1070.0):
+        assert cache.purge_expired() == 1
+
+    assert cache.get_stats()["entries"] == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("fresh_paapi_state")
+async def test_watch_flow_cache_respects_budget():
+    """Repeated budget searches hit the cache, different budgets do not."""
+    search = AsyncMock(return_value=[{"asin": "B000000001"}])
+
+    with patch("bot.watch_flow.search_items_advanced", search):
+        await _cached_search_items_advanced("budget phone", 10, max_price=1500000)
+        await _cached_search_items_advanced(
+            "Phone budget", 10, priority="high", max_price=1499900
+        )
+        await _cached_search_items_advanced("budget phone", 10, max_price=3000000)
+
+    assert search.await_count == 2
+
+
+def test_health_ai_reports_cache_counters():
+    """/health/ai exposes the search cache counters."""
+    from bot.health import app
+
+    with app.test_client() as client:
+        response = client.get("/health/ai")
+
+    assert response.status_code == 200
+    payload = response.get_json()
+    assert {"hits", "misses", "evictions", "entries"} <= set(payload["search_cache"])
+    assert "paapi_rate_limiter" in payload
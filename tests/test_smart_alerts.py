@@ -156,16 +156,17 @@ class TestSmartAlertEngine:
                 assert result["quality_score"] == 50.0
 
     @pytest.mark.asyncio
-    async def test_calculate_urgency_critical(self, smart_alerts, sample_watch, sample_current_data):
+    async def test_calculate_urgency_critical(
+        self, smart_alerts, sample_watch, sample_current_data, async_session_for
+    ):
         """Test urgency calculation for critical deals."""
         deal_quality = {"score": 95.0}
         
-        with patch('bot.smart_alerts.Session') as mock_session:
-            # Mock recent price history showing price drop
-            mock_session.return_value.__enter__.return_value.exec.return_value.all.return_value = [
-                Mock(current_price=15000)  # Previous price much higher
-            ]
-            
+        session = Mock()
+        # Mock last alert showing price drop (previous price much higher)
+        session.exec = AsyncMock(return_value=Mock(first=Mock(return_value=Mock(current_price=15000))))
+
+        with patch('bot.smart_alerts.get_async_session', async_session_for(session)):
             # Add stock urgency
             current_data = {**sample_current_data, "availability": "low stock"}
             
@@ -176,13 +177,16 @@ class TestSmartAlertEngine:
             assert result == "critical"
 
     @pytest.mark.asyncio
-    async def test_calculate_urgency_high(self, smart_alerts, sample_watch, sample_current_data):
+    async def test_calculate_urgency_high(
+        self, smart_alerts, sample_watch, sample_current_data, async_session_for
+    ):
         """Test urgency calculation for high priority deals."""
         deal_quality = {"score": 85.0}
         
-        with patch('bot.smart_alerts.Session') as mock_session:
-            mock_session.return_value.__enter__.return_value.exec.return_value.all.return_value = []
-            
+        session = Mock()
+        session.exec = AsyncMock(return_value=Mock(first=Mock(return_value=None)))
+
+        with patch('bot.smart_alerts.get_async_session', async_session_for(session)):
             result = await smart_alerts._calculate_urgency(
                 deal_quality, sample_current_data, sample_watch
             )
@@ -300,18 +304,21 @@ class TestSmartAlertEngine:
         assert result is False  # Should not send due to low confidence
 
     @pytest.mark.asyncio
-    async def test_store_deal_alert(self, smart_alerts, sample_watch, sample_current_data):
+    async def test_store_deal_alert(
+        self, smart_alerts, sample_watch, sample_current_data, async_session_for
+    ):
         """Test storing deal alert in database."""
         deal_quality = {"score": 80.0}
         
-        with patch('bot.smart_alerts.Session') as mock_session:
-            mock_session_instance = mock_session.return_value.__enter__.return_value
-            
+        mock_session_instance = Mock()
+        mock_session_instance.commit = AsyncMock()
+
+        with patch('bot.smart_alerts.get_async_session', async_session_for(mock_session_instance)):
             await smart_alerts._store_deal_alert(sample_watch, sample_current_data, deal_quality)
             
             # Verify DealAlert was added
             mock_session_instance.add.assert_called_once()
-            mock_session_instance.commit.assert_called_once()
+            mock_session_instance.commit.assert_awaited_once()
             
             # Check the alert data
             added_alert = mock_session_instance.add.call_args[0][0]